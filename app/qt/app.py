@@ -5,38 +5,31 @@ import sys
 import json
 import logging
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from typing import List, Any, Dict, Union, Optional
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTextBrowser, QApplication, QLabel, QSystemTrayIcon, QStyle, QDialog
 from PyQt5.QtCore import QTimer, QThreadPool, pyqtSlot, pyqtSignal, Qt, QSharedMemory
-from app.qt.app_state_manager import AppStateManager
+from core.app_state_manager import AppStateManager
+from core.types import Seek, TitleFilter
 from app.qt.app_handlers import LinkActionHandler
-from app.qt.ui_am_generator import UIAMGenerator
-from app.vlc.vlc_player import VLCPlayer
+from core.bulk_refresh import BulkTitleRefresher, release_changed
+from app.qt.jobs import JobManager, JobCancelled, JOB_DONE, JOB_SCHEDULE, JOB_TITLE, JOB_SEARCH, JOB_RANDOM
 from app.qt.app_helpers import TitleDisplayFactory, TitleDataFactory
 from app.qt.ui_manger import UIManager
 from app.qt.ui_generator import UIGenerator
-from app.qt.ui_s_generator import UISGenerator
 
 
-from static.layout_metadata import all_layout_metadata
-from providers.aniliberty.v1.api import APIClient
-from providers.aniliberty.v1.adapter import APIAdapter
+from static.layout_metadata import all_layout_metadata, show_mode_metadata
 from providers.animedia.v0.cache_manager import AniMediaCacheManager, AniMediaCacheStatus, AniMediaCacheConfig
 from providers.animedia.v0.qt_async_worker import AsyncWorker
-from providers.animedia.v0 import create_adapter
 from utils.config.config_manager import ConfigManager
-from utils.downloads.poster_manager import PosterManager
-from utils.downloads.torrent_manager import TorrentManager
 from utils.playlists.playlist_manager import PlaylistManager
 from utils.playlists.playlist_key import calc_bundle_key
+from utils.runtime.startup_profile import lazy_subsystem, profiler
 from utils.integrations.open_router import OpenRouter, PlaylistTargets
-from utils.net.net_client import NetClient
-from utils.net.url_resolve_service import UrlResolveService
-from utils.net.url_resolver import TTLCache
-from utils.net.url_resolver_config import ResolverConfig
 from utils.security.library_loader import verify_library
 from utils.parsing.animedia import parse_schedule_line
 
@@ -50,6 +43,15 @@ SHOW_SYSTEM = "system"
 SHOW_ONE_TITLE = "one_title"
 SHOW_AM_SCHEDULE = "animedia_schedule"
 SHOW_AM_TITLES = "animedia_titles"
+SHOW_POSTER_GRID = "poster_grid"
+SHOW_FILTER = "titles_filter_list"
+FILTER_SIDEBAR_WIDTH = 220
+# Режимы со страницами, для которых соседние страницы грузятся заранее (app/qt/page_prefetch.py)
+PREFETCH_MODES = frozenset({
+    SHOW_DEFAULT, "titles_list", "franchise_list", "need_to_see_list", "ongoing_list",
+    "titles_genre_list", "titles_team_member_list", "titles_year_list", "titles_status_list",
+    "titles_provider_list", SHOW_FILTER,
+})
 SCHEDULE_KEY: str = "am_schedule_cache"
 ALL_TITLES_KEY: str = "am_all_titles_cache"
 DEFAULT_TEMPLATE = "default"
@@ -79,6 +81,7 @@ class ViewState:
     day_of_week: Optional[int] = None
     am_offset: int = 0
     am_page_size: int = 12
+    title_filter: Optional[TitleFilter] = None
 
 
 class APIClientError(Exception):
@@ -89,6 +92,7 @@ class APIClientError(Exception):
 
 class AnimePlayerAppVer3(QWidget):
     add_title_browser_to_layout = pyqtSignal(QTextBrowser, int, int)
+    poster_saved = pyqtSignal(int)  # из потока сохранения PosterManager в UI-поток
 
     def __init__(self, db_manager, version, template_name, prod_key=None):
         super().__init__()
@@ -104,6 +108,11 @@ class AnimePlayerAppVer3(QWidget):
         self.thread_pool = QThreadPool()  # Пул потоков для управления задачами
         self.thread_pool.setMaxThreadCount(4)
         self.thread_pool.setExpiryTimeout(30000)
+        self.job_manager = JobManager(self.thread_pool, parent=self)
+        self.job_manager.jobsChanged.connect(self._on_jobs_changed)
+        self._refresh_timer = QTimer(self)  # склеивает обновления экрана от частичных результатов задач
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(300)
         self.mpv_window = None
         self.view_state = None
         self._am_total_count = None
@@ -112,6 +121,7 @@ class AnimePlayerAppVer3(QWidget):
         self.tray_icon = None
         self._animedia_worker = None
         self.current_title_ids = None
+        self.current_filter = None
         self.current_day_of_week = None
         self.current_title_id = None
         self.vlc_window = None
@@ -121,6 +131,10 @@ class AnimePlayerAppVer3(QWidget):
         self.current_link = None
         self.poster_container = None
         self.scroll_area = None
+        self._poster_grid_revision = None
+        self._poster_grid_scroll = 0
+        self._page_request = None
+        self._page_cursors = {}  # (show_mode, batch_size, title_filter, data_revision) -> {offset: Seek}
         self.posters_layout = None
         self.title_search_entry = None
         self.current_titles = None
@@ -142,16 +156,6 @@ class AnimePlayerAppVer3(QWidget):
         self.pre = "https://"
         self.config_manager = ConfigManager(pathlib.Path('config/config.ini'))
 
-        """Loads the configuration settings needed by the application."""
-        network_config = self.config_manager.network
-        self.net_client = NetClient(network_config)
-        self.logger.info(f"Network client initialized. Proxy enabled: {network_config.proxy_enabled}")
-        self.url_resolver = UrlResolveService(
-            net=self.net_client,
-            cache=TTLCache(max_items=2048),
-            cfg=ResolverConfig(),
-        )
-
         self.base_al_url = self.config_manager.get_setting('Settings', 'base_al_url')
         self.base_am_url = self.config_manager.get_setting('Settings', 'base_am_url')
         self.al_api_version = self.config_manager.get_setting('Settings', 'al_api_version')
@@ -183,51 +187,19 @@ class AnimePlayerAppVer3(QWidget):
 
         self.animedia_cache_cfg = AniMediaCacheConfig(base_dir=Path(self.temp_dir))
         self.animedia_cache = AniMediaCacheManager(self.animedia_cache_cfg.base_dir)
-        self.animedia_adapter = create_adapter(
-            base_url=self.base_am_url,
-            net_client=self.net_client,
-            cache_dir=Path(self.temp_dir),
-            logger=self.logger,
-        )
 
-        # Initialize TorrentManager with the correct paths
-        self.torrent_manager = TorrentManager(
-            torrent_save_path=self.torrent_save_path,
-            torrent_client_path=self.torrent_client_path,
-            base_url=self.base_al_url,  # Передаём base_al_url из конфига
-            net_client=self.net_client
-        )
         # Corrected debug logging of paths using setup values
         self.logger.debug(f"Video Player Path: {self.video_player_path}")
         self.logger.debug(f"Torrent Client Path: {self.torrent_client_path}")
 
-        self.api_client = APIClient(
-            base_url=self.base_al_url,
-            api_version=self.al_api_version,
-            net_client=self.net_client,
-            logger=self.logger,
-            utils_folder=self.temp_dir,
-            sleep_fn=None,
-            max_cache_items=256,
-            enable_dumps=False
-        )
-        self.api_adapter = APIAdapter(
-            self.api_client,
-            self.logger,
-        )
-
-        self.playlist_manager = PlaylistManager()
+        # Сетевой стек, провайдеры, плееры и второстепенные UI-генераторы создаются при первом
+        # обращении (lazy_subsystem ниже): сохранённый вид показывается из БД без них.
         self.db_manager = db_manager
-        self.poster_manager = PosterManager(
-            save_callback=self.db_manager.save_poster,
-            net_client=self.net_client
-        )
-
         self.state_manager = AppStateManager(self.db_manager)
-        self.ui_generator = UIGenerator(self, self.db_manager, self.current_template)
-        self.ui_am_generator = UIAMGenerator(self, self.db_manager, self.current_template)
-        self.ui_s_generator = UISGenerator(self, self.db_manager)
+        with profiler.stage("UIGenerator"):
+            self.ui_generator = UIGenerator(self, self.db_manager, self.current_template)
         self.add_title_browser_to_layout.connect(self.on_add_title_browser_to_layout)
+        self.poster_saved.connect(self._on_poster_saved)
 
         qss_path = pathlib.Path('static/styles.qss')
         if not qss_path.is_file():
@@ -249,8 +221,11 @@ class AnimePlayerAppVer3(QWidget):
             get_search_by_title_animedia=self.get_search_by_title_animedia,
             open_web=self.open_web_link,
             refresh_display=self.refresh_display,
-            reload_poster=self.get_poster_or_placeholder
+            reload_poster=self.get_poster_or_placeholder,
+            cancel_job=self.job_manager.cancel,
+            apply_filter=self.apply_title_filter,
         )
+        self._refresh_timer.timeout.connect(self.refresh_display)
 
         # init open router
         self.router = OpenRouter(self)
@@ -262,9 +237,129 @@ class AnimePlayerAppVer3(QWidget):
 
         app = QApplication.instance()
         if app is not None:
-            app.aboutToQuit.connect(self.api_client.close)
+            app.aboutToQuit.connect(self.job_manager.cancel_all)
+            app.aboutToQuit.connect(self._close_api_client)
 
-        self.init_ui()
+        with profiler.stage("init_ui"):
+            self.init_ui()
+
+    # =========================
+    # Lazy subsystems
+    # =========================
+    @lazy_subsystem
+    def net_client(self):
+        from utils.net.net_client import NetClient
+
+        network_config = self.config_manager.network
+        net_client = NetClient(network_config)
+        self.logger.info(f"Network client initialized. Proxy enabled: {network_config.proxy_enabled}")
+        return net_client
+
+    @lazy_subsystem
+    def url_resolver(self):
+        from utils.net.url_resolve_service import UrlResolveService
+        from utils.net.url_resolver import TTLCache
+        from utils.net.url_resolver_config import ResolverConfig
+
+        return UrlResolveService(
+            net=self.net_client,
+            cache=TTLCache(max_items=2048),
+            cfg=ResolverConfig(),
+        )
+
+    @lazy_subsystem
+    def animedia_adapter(self):
+        from providers.animedia.v0 import create_adapter
+
+        return create_adapter(
+            base_url=self.base_am_url,
+            net_client=self.net_client,
+            cache_dir=Path(self.temp_dir),
+            logger=self.logger,
+        )
+
+    @lazy_subsystem
+    def torrent_manager(self):
+        from utils.downloads.torrent_manager import TorrentManager
+
+        # Initialize TorrentManager with the correct paths
+        return TorrentManager(
+            torrent_save_path=self.torrent_save_path,
+            torrent_client_path=self.torrent_client_path,
+            base_url=self.base_al_url,  # Передаём base_al_url из конфига
+            net_client=self.net_client,
+            load_callback=self.db_manager.iter_torrent_file,
+            save_callback=self.db_manager.save_torrent_file_blob,
+        )
+
+    @lazy_subsystem
+    def api_client(self):
+        from providers.aniliberty.v1.api import APIClient
+
+        return APIClient(
+            base_url=self.base_al_url,
+            api_version=self.al_api_version,
+            net_client=self.net_client,
+            logger=self.logger,
+            utils_folder=self.temp_dir,
+            sleep_fn=None,
+            max_cache_items=256,
+            enable_dumps=False
+        )
+
+    @lazy_subsystem
+    def api_adapter(self):
+        from providers.aniliberty.v1.adapter import APIAdapter
+
+        return APIAdapter(
+            self.api_client,
+            self.logger,
+        )
+
+    @lazy_subsystem
+    def bulk_refresher(self):
+        return BulkTitleRefresher(self.db_manager, self.api_adapter)
+
+    @lazy_subsystem
+    def poster_manager(self):
+        from utils.downloads.poster_manager import PosterManager
+
+        return PosterManager(
+            save_callback=self._save_poster,
+            net_client=self.net_client,
+            validators_callback=self.db_manager.get_poster_validators,
+            touch_callback=self.db_manager.touch_poster,
+        )
+
+    def _save_poster(self, title_id, *args):
+        """save_callback PosterManager (поток сохранения): записать постер и сообщить UI-потоку."""
+        self.db_manager.save_poster(title_id, *args)
+        self.poster_saved.emit(title_id)
+
+    def _on_poster_saved(self, title_id):
+        """UI-поток: карточка сетки с заглушкой (или старым постером) перечитает его из БД."""
+        if AnimePlayerAppVer3.poster_grid_model.is_created(self):
+            self.poster_grid_model.forget_posters([title_id])
+
+    @lazy_subsystem
+    def playlist_manager(self):
+        return PlaylistManager()
+
+    @lazy_subsystem
+    def ui_am_generator(self):
+        from app.qt.ui_am_generator import UIAMGenerator
+
+        return UIAMGenerator(self, self.db_manager, self.current_template)
+
+    @lazy_subsystem
+    def ui_s_generator(self):
+        from app.qt.ui_s_generator import UISGenerator
+
+        return UISGenerator(self, self.db_manager)
+
+    def _close_api_client(self):
+        if type(self).api_client.is_created(self):
+            self.api_client.close()
 
     def _get_cfg(self, section: str, option: str, default: Any, *, lower: bool = False) -> Any:
         """
@@ -351,9 +446,11 @@ class AnimePlayerAppVer3(QWidget):
 
     def set_view_state(self, state: ViewState) -> None:
         self.view_state = state
+        self._page_request = None  # display_titles выставит заново, если новый экран — страница списка
         self.current_show_mode = state.show_mode
         self.current_title_id = state.title_id
         self.current_title_ids = state.title_ids
+        self.current_filter = state.title_filter
         self.current_day_of_week = state.day_of_week
 
     def refresh_display(self):
@@ -371,6 +468,9 @@ class AnimePlayerAppVer3(QWidget):
             elif state.show_mode == SHOW_SYSTEM:
                 self.display_titles(show_mode=SHOW_SYSTEM)
                 return
+            elif state.show_mode == SHOW_POSTER_GRID:
+                self.display_poster_grid()
+                return
 
             if state.title_id is not None:
                 titles = self.db_manager.get_titles_from_db(title_id=state.title_id)
@@ -403,20 +503,15 @@ class AnimePlayerAppVer3(QWidget):
         return title
 
     def reload_schedule(self):
-        """Обновляет и отображает расписание тайтлов."""
+        """Обновляет расписание текущего дня в фоне; экран перерисовывается по мере сохранения тайтлов."""
         try:
             day = self.current_day_of_week
             if not day:
                 day = 1  # Monday (1–7)
 
             current_titles = self.total_titles if self.total_titles else set()
-            status, new_title_ids = self.check_and_update_schedule(day, current_titles)
-            self.current_title_id = None
-
-            if status and new_title_ids:
-                self.display_titles_for_day(day, force_reload=False)
-            else:
-                self.display_titles_for_day(day, force_reload=True)
+            self.set_view_state(ViewState(show_mode=SHOW_DEFAULT, day_of_week=day))
+            self.check_and_update_schedule(day, current_titles)
         except Exception as e:
             self.logger.error(f"Ошибка при обновлении reload_schedule: {e}")
 
@@ -457,6 +552,8 @@ class AnimePlayerAppVer3(QWidget):
                 self.display_titles(show_next=True)
             elif callback_name == "display_titles_text_list":
                 self.display_titles(show_mode='titles_list', batch_size=self.titles_list_batch_size)
+            elif callback_name == "display_title_filter":
+                self.apply_title_filter()
             elif callback_name == "display_ongoing_list":
                 self.display_titles(show_mode='ongoing_list', batch_size=self.titles_list_batch_size)
             elif callback_name == "display_franchises":
@@ -465,6 +562,8 @@ class AnimePlayerAppVer3(QWidget):
                 self.display_titles(show_mode='need_to_see_list', batch_size=self.titles_list_batch_size)
             elif callback_name == "display_system":
                 self.display_titles(show_mode='system')
+            elif callback_name == "display_poster_grid":
+                self.display_poster_grid()
             else:
                 self.logger.warning(f"Неизвестный колбек: {callback_name}")
 
@@ -479,6 +578,9 @@ class AnimePlayerAppVer3(QWidget):
             "player_offset": self.current_offset,
             "template_name": self.current_template,
             "show_mode": self.current_show_mode,
+            "page_seek": self._page_request.seek.to_state()
+            if self._page_request is not None and self._page_request.seek else None,
+            "title_filter": self.current_filter.to_state() if self.current_filter is not None else None,
         }
 
     def _restore_day(self, day: int) -> None:
@@ -542,7 +644,13 @@ class AnimePlayerAppVer3(QWidget):
             has_title_id = title_id is not None
             has_title_ids = bool(title_ids)
 
-            if has_day and not has_title_id and not has_title_ids:
+            if show_mode == SHOW_FILTER:
+                # фильтр, а не список id: страница перечитывается запросом (данные могли измениться)
+                title_filter = TitleFilter.from_state(state.get("title_filter")) or TitleFilter()
+                self.logger.info("Restoring filtered titles: %s", title_filter)
+                self.display_titles(show_mode=SHOW_FILTER, batch_size=self.titles_list_batch_size,
+                                    title_filter=title_filter)
+            elif has_day and not has_title_id and not has_title_ids:
                 self._restore_day(day)
             elif has_day and has_title_id and not has_title_ids:
                 self._restore_title(title_id)
@@ -556,8 +664,16 @@ class AnimePlayerAppVer3(QWidget):
                 self.display_animedia_titles_screen()
             elif show_mode == SHOW_SYSTEM:
                 self.display_titles(show_mode=SHOW_SYSTEM)
+            elif show_mode == SHOW_POSTER_GRID:
+                self.display_poster_grid()
             else:
                 self.logger.info("Falling back to offset-based restore")
+                seek = Seek.from_state(state.get("page_seek"))
+                if seek is not None:
+                    # keyset-курсор сохранённой страницы: после рестарта она читается без OFFSET
+                    key = self._page_key(SHOW_DEFAULT, None, self.current_offset, None)
+                    if key is not None:
+                        self._page_cursors.setdefault(self._cursor_scope(key), {})[key.offset] = seek
                 self.display_titles(start=True)
 
         except Exception as exc:
@@ -601,24 +717,35 @@ class AnimePlayerAppVer3(QWidget):
                 if self._navigate_animedia_mode(show_mode, go_forward):
                     return
 
-            if self.current_title_ids:
-                total_count = len(self.current_title_ids)
+            # current_title_ids — только тайтлы на экране; листаем полный список запроса
+            request = self._page_request
+            title_ids = self.current_title_ids
+            title_filter = self.current_filter
+            if request is not None and request.show_mode == show_mode:
+                title_ids = list(request.title_ids) if request.title_ids else None
+                batch_size = request.batch_size or batch_size
+                title_filter = request.title_filter
+            if show_mode == SHOW_FILTER:
+                title_ids = None  # на экране — страница фильтра, листаем сам запрос
+
+            if title_ids:
+                total_count = len(title_ids)
                 self.current_offset = self._update_pagination_offset(total_count, batch_size, go_forward)
                 self.logger.debug(
                     f"Navigation: offset={self.current_offset}, batch_size={batch_size}, total={total_count}")
-                self.display_titles(title_ids=self.current_title_ids, batch_size=batch_size, show_mode=show_mode)
+                self.display_titles(title_ids=title_ids, batch_size=batch_size, show_mode=show_mode)
             else:
-                total_count = self.db_manager.get_total_titles_count(show_mode=show_mode)
+                total_count = self._count_titles(show_mode, title_filter)
                 self.current_offset = self._update_pagination_offset(total_count, batch_size, go_forward)
                 self.logger.debug(
                     f"Navigation: offset={self.current_offset}, batch_size={batch_size}, total={total_count}")
-                self.display_titles(batch_size=batch_size, show_mode=show_mode)
+                self.display_titles(batch_size=batch_size, show_mode=show_mode, title_filter=title_filter)
 
         except Exception as e:
             self.logger.error(f"Ошибка при навигации по результатам: {e}")
 
     def display_titles(self, title_ids=None, batch_size=None, show_mode='default', show_previous=False, show_next=False,
-                       start=False):
+                       start=False, title_filter: Optional[TitleFilter] = None):
         try:
             self.ui_manager.show_loader("Loading titles...")
             self.ui_manager.set_buttons_enabled(False)
@@ -629,13 +756,18 @@ class AnimePlayerAppVer3(QWidget):
                 except TypeError:
                     title_ids = title_ids
 
+            if show_mode != SHOW_FILTER:
+                title_filter = None
+            elif title_filter is None:
+                title_filter = self.current_filter or TitleFilter()
+
             if start:
                 self.logger.debug(
                     f"START: current_offset: {self.current_offset} - titles_batch_size: {self.titles_batch_size}")
 
             if show_next or show_previous:
-                statistics = self.db_manager.get_statistics_from_db() if show_next else None
-                total_available_titles = statistics.get('titles_count', 0) if show_next else 0
+                # COUNT(*) вместо всей статистики (get_statistics_from_db — десяток запросов)
+                total_available_titles = self.db_manager.get_total_titles_count() if show_next else 0
 
                 if show_next:
                     self.current_offset = self._update_pagination_offset(
@@ -651,17 +783,25 @@ class AnimePlayerAppVer3(QWidget):
                         f"PREV: current_offset: {self.current_offset} - titles_batch_size: {self.titles_batch_size}")
 
             data_factory = TitleDataFactory(self.db_manager, self.user_id)
-            titles = data_factory.get_titles(
-                show_mode=show_mode,
-                title_ids=title_ids,
-                current_offset=self.current_offset,
-                batch_size=batch_size
-            )
+            page_key = self._page_key(show_mode, title_ids, self.current_offset, batch_size, title_filter)
+            prefetched = self.page_prefetcher.take(page_key) if page_key is not None else None
+            if prefetched is not None:
+                titles = prefetched.titles
+            else:
+                titles = data_factory.get_titles(
+                    show_mode=show_mode,
+                    title_ids=title_ids,
+                    current_offset=self.current_offset,
+                    batch_size=batch_size,
+                    seek=page_key.seek if page_key is not None else None,
+                    title_filter=title_filter,
+                )
 
             self.current_title_ids = [t.title_id for t in titles if getattr(t, "title_id", None) is not None]
-            self.set_view_state(ViewState(show_mode=show_mode, title_ids=self.current_title_ids))
+            self.set_view_state(ViewState(show_mode=show_mode, title_ids=self.current_title_ids,
+                                          title_filter=title_filter))
             description = data_factory.get_metadata_description(show_mode=show_mode)
-            show_modes = ['titles_list', 'franchise_list', 'need_to_see_list', 'ongoing_list']
+            show_modes = ['titles_list', 'franchise_list', 'need_to_see_list', 'ongoing_list', SHOW_FILTER]
 
             if not titles and description:
                 self.logger.info("Нет доступных данных для отображения, сбрасываем оффсет.")
@@ -683,15 +823,20 @@ class AnimePlayerAppVer3(QWidget):
                         pagination_widget.setVisible(False)
             elif show_mode in show_modes:
                 self.logger.info(f"Was sent to display {show_mode} ")
-                count_titles = self.db_manager.get_total_titles_count(show_mode=show_mode)
+                count_titles = self._count_titles(show_mode, title_filter)
                 self._setup_pagination_ui(count_titles, batch_size, description)
             else:
                 pagination_widget = self.ui_manager.parent_widgets.get("pagination_widget")
                 if pagination_widget:
                     pagination_widget.setVisible(False)
 
-            self.display_titles_in_ui(titles, show_mode)
+            self.display_titles_in_ui(titles, show_mode,
+                                      context=prefetched.context if prefetched is not None else None)
             self.logger.debug(f"Was sent to display {show_mode} {len(titles)} titles.")
+            if page_key is not None:
+                self._page_request = page_key
+                self._remember_page_cursors(page_key, self.current_title_ids)
+                self._prefetch_neighbour_pages(page_key)
             if isinstance(self.total_titles, list):
                 self.logger.debug(f"self.total_titles: {len(self.total_titles)}")
             else:
@@ -704,6 +849,164 @@ class AnimePlayerAppVer3(QWidget):
             self.ui_manager.hide_loader()
             self.ui_manager.set_buttons_enabled(True)
 
+    @lazy_subsystem
+    def page_prefetcher(self):
+        from app.qt.page_prefetch import PagePrefetcher
+
+        prefetcher = PagePrefetcher(self._load_prefetched_page, parent=self)
+        prefetcher.pageReady.connect(self._on_page_prefetched)
+        return prefetcher
+
+    @lazy_subsystem
+    def _prefetch_get_manager(self):
+        # своя сессия для рабочего потока предзагрузки; history_cache не передаём — он для UI-потока
+        from core.get import GetManager
+
+        return GetManager(self.db_manager.engine)
+
+    def _page_key(self, show_mode, title_ids, offset, batch_size, title_filter=None):
+        """Ключ страницы для предзагрузки; None — режим без страниц (system, день недели, один тайтл)."""
+        from app.qt.page_prefetch import PageKey
+
+        if show_mode not in PREFETCH_MODES:
+            return None
+        if title_ids and not batch_size:
+            return None  # список id показывается целиком
+        key = PageKey(show_mode, tuple(title_ids) if title_ids else None, int(offset or 0), batch_size,
+                      getattr(self.db_manager, "data_revision", 0), title_filter)
+        return key.at(key.offset, self._cursor_for(key))
+
+    @staticmethod
+    def _cursor_scope(key):
+        # курсоры годятся, пока не менялись ни режим, ни размер страницы, ни фильтр, ни данные
+        return key.show_mode, key.batch_size, key.title_filter, key.revision
+
+    def _cursor_for(self, key) -> Optional[Seek]:
+        """Keyset-курсор страницы, если он известен по соседней уже показанной странице."""
+        if key.title_ids or not key.offset:
+            return None  # срез списка id / первая страница — курсор не нужен
+        return self._page_cursors.get(self._cursor_scope(key), {}).get(key.offset)
+
+    def _neighbour_offsets(self, key):
+        """(следующий, предыдущий, размер шага) offset — те же, что выставят LOAD MORE/PREV и пагинация."""
+        if key.title_ids:
+            total, step = len(key.title_ids), key.batch_size
+        elif key.show_mode == SHOW_DEFAULT:
+            total, step = self.db_manager.get_total_titles_count(), self.titles_batch_size
+        else:
+            total = self._count_titles(key.show_mode, key.title_filter)
+            step = key.batch_size or show_mode_metadata[key.show_mode].get("batch_size") or 12
+        return (self._calc_offset(key.offset, total, step, go_forward=True),
+                self._calc_offset(key.offset, total, step, go_forward=False), step)
+
+    def _remember_page_cursors(self, key, title_ids):
+        """
+        Показанная страница БД задаёт курсоры соседних: следующая — после последнего title_id,
+        предыдущая — перед первым. Только если шаг листания равен размеру страницы, иначе курсор
+        указал бы не на ту страницу, которую ждёт offset.
+        """
+        if key.title_ids or not title_ids:
+            return
+        try:
+            page_size = key.batch_size or show_mode_metadata[key.show_mode].get("batch_size") or 2
+            next_offset, prev_offset, step = self._neighbour_offsets(key)
+            if step != page_size:
+                return
+            scope = self._cursor_scope(key)
+            for stale in [s for s in self._page_cursors if s[:3] == scope[:3] and s != scope]:
+                del self._page_cursors[stale]
+            cursors = self._page_cursors.setdefault(scope, {})
+            if next_offset > key.offset:
+                cursors[next_offset] = Seek(after_id=max(title_ids))
+            if 0 < prev_offset < key.offset:
+                cursors.setdefault(prev_offset, Seek(before_id=min(title_ids)))
+        except Exception as e:
+            self.logger.debug(f"Page cursors skipped: {e}")
+
+    def _prefetch_neighbour_pages(self, key):
+        """Следующая и предыдущая страницы — с теми же аргументами, что передадут LOAD MORE/PREV и пагинация."""
+        if key.title_filter is not None and key.title_filter.not_watched:
+            return  # отметка «просмотрено» не меняет data_revision — заранее загруженная страница устарела бы
+        try:
+            next_offset, prev_offset, _ = self._neighbour_offsets(key)
+            offsets = {next_offset, prev_offset} - {key.offset}
+            self.page_prefetcher.prefetch(key.at(offset, self._cursor_for(key.at(offset)))
+                                          for offset in sorted(offsets, reverse=True))
+        except Exception as e:
+            self.logger.debug(f"Page prefetch skipped: {e}")
+
+    def _load_prefetched_page(self, key):
+        """Рабочий поток предзагрузки: тайтлы, контекст карточек и постеры страницы."""
+        from app.qt.page_prefetch import PrefetchedPage
+
+        get_manager = self._prefetch_get_manager
+        titles = TitleDataFactory(get_manager, self.user_id).get_titles(
+            show_mode=key.show_mode,
+            title_ids=list(key.title_ids) if key.title_ids else None,
+            current_offset=key.offset,
+            batch_size=key.batch_size,
+            seek=key.seek,
+            title_filter=key.title_filter,
+        )
+        title_ids = [t.title_id for t in titles if getattr(t, "title_id", None) is not None]
+        # ревизии до запросов: если тайтл изменится во время загрузки, его постер просто не совпадёт
+        revisions = {tid: self.db_manager.get_title_revision(tid) for tid in title_ids}
+        with_posters = show_mode_metadata[key.show_mode].get("generator") == "_generate_default_html"
+        return PrefetchedPage(
+            titles=titles,
+            context=get_manager.get_title_cards_context(title_ids),
+            posters=get_manager.get_poster_entries(title_ids, "original") if with_posters else {},
+            revisions=revisions,
+        )
+
+    def _on_page_prefetched(self, key):
+        """UI-поток: недостающие постеры предзагруженной страницы ставим на скачивание заранее."""
+        if show_mode_metadata[key.show_mode].get("generator") != "_generate_default_html":
+            return
+        page = self.page_prefetcher.take(key)
+        if page is None:
+            return
+        for title in page.titles:
+            if title.title_id not in page.posters:
+                self.get_poster_or_placeholder(title.title_id)
+
+    def _count_titles(self, show_mode, title_filter=None) -> int:
+        """Всего тайтлов постраничного режима — COUNT по тому же запросу, что читает страницы."""
+        if show_mode == SHOW_FILTER:
+            return self.db_manager.get_filtered_count(title_filter or TitleFilter(), self.user_id)
+        return self.db_manager.get_total_titles_count(show_mode=show_mode)
+
+    def apply_title_filter(self, facet=None, value=None, toggle=False):
+        """
+        Ссылки filter_by_* из карточек и filter_toggle/* из панели фильтров.
+        Если список уже отфильтрован, значение добавляется к текущему фильтру (жанр AND год AND статус …),
+        иначе фильтр начинается заново. facet=None — все тайтлы без фильтров.
+        """
+        current = self.current_filter if self.current_show_mode == SHOW_FILTER and self.current_filter else TitleFilter()
+        if facet is None:
+            title_filter = TitleFilter()
+        elif toggle:
+            title_filter = current.toggle(facet, value)
+        else:
+            title_filter = current.with_value(facet, value)
+        if title_filter and not self._count_titles(SHOW_FILTER, title_filter):
+            self.logger.warning(f"No titles found for filter: {title_filter}")
+            return
+        self.current_offset = 0
+        self.display_titles(show_mode=SHOW_FILTER, batch_size=self.titles_list_batch_size, title_filter=title_filter)
+
+    def _add_filter_sidebar(self):
+        """Панель фильтров справа от списка: выбранные значения и число тайтлов у остальных."""
+        title_filter = self.current_filter or TitleFilter()
+        facets = self.db_manager.get_facet_counts(title_filter, self.user_id)
+        sidebar = QTextBrowser()
+        sidebar.setOpenLinks(False)
+        sidebar.anchorClicked.connect(self.on_link_click)
+        sidebar.setFixedWidth(FILTER_SIDEBAR_WIDTH)
+        sidebar.setHtml(self.ui_generator.generate_filter_sidebar_html(title_filter, facets))
+        self.posters_layout.addWidget(sidebar, 0, self.posters_layout.columnCount(),
+                                      max(1, self.posters_layout.rowCount()), 1)
+
     @staticmethod
     def _calc_offset(offset: int, total: int, page_size: int, go_forward: bool) -> int:
         if total <= 0:
@@ -905,13 +1208,16 @@ class AnimePlayerAppVer3(QWidget):
 
         return out
 
-    def display_titles_in_ui(self, titles, show_mode='default', row_start=0, col_start=0):
+    def display_titles_in_ui(self, titles, show_mode='default', row_start=0, col_start=0, context=None):
         try:
-            special_modes = {SHOW_SYSTEM, SHOW_AM_SCHEDULE, SHOW_AM_TITLES}
+            special_modes = {SHOW_SYSTEM, SHOW_AM_SCHEDULE, SHOW_AM_TITLES, SHOW_POSTER_GRID}
             self.clear_previous_posters()
 
             factory = TitleDisplayFactory(self)
 
+            if show_mode not in special_modes:
+                self.ui_generator.prepare_page(titles, context=context)
+
             if show_mode in special_modes:
                 widget, _ = factory.create(show_mode, titles)  # titles тут целиком список блоков/данных
                 self.posters_layout.addWidget(widget, 0, 0, 1, 2)
@@ -925,6 +1231,9 @@ class AnimePlayerAppVer3(QWidget):
                     column = (index + col_start) % num_columns
                     self.posters_layout.addWidget(title_widget, row, column)
 
+            if show_mode == SHOW_FILTER:
+                self._add_filter_sidebar()
+
             self.logger.debug(f"Displayed {show_mode} with {len(titles)} titles.")
             app_state = self.get_current_state()
             QTimer.singleShot(100, lambda: self.state_manager.save_state(app_state))
@@ -986,13 +1295,8 @@ class AnimePlayerAppVer3(QWidget):
                 self.total_titles = {title.title_id for title in titles}
                 self.display_titles_in_ui(titles)
             else:
-                status, new_title_ids = self.fetch_and_process_schedule(day_of_week)
-                if status and new_title_ids:
-                    titles = self.db_manager.get_titles_from_db(day_of_week=day_of_week)
-                    self.total_titles = {title.title_id for title in titles}
-                    self.display_titles_in_ui(titles)
-                else:
-                    self.display_titles(start=True)
+                # День грузится в фоне: карточки появляются по мере сохранения тайтлов
+                self.load_schedule_async(day_of_week)
 
         except Exception as e:
             self.logger.error(f"Error displaying titles for day: {e}")
@@ -1019,79 +1323,202 @@ class AnimePlayerAppVer3(QWidget):
         except Exception as e:
             self.logger.error(f"Ошибка при save titles расписания: {e}")
 
-    def fetch_and_process_schedule(self, day_of_week):
+    def load_schedule_async(self, day_of_week, current_titles=None):
         """
-        Получает и обрабатывает расписание с сервера.
+        Загружает расписание дня фоновыми задачами.
+        1. schedule:<day> — один HTTP-запрос расписания без догрузки бандлов;
+        2. schedule:<day>:bundles — полные бандлы только изменившихся тайтлов, каждый сохраняется сразу.
+        Повторный запрос того же дня присоединяется к активной задаче.
         Args:
             day_of_week (int): День недели.
+            current_titles (set): title_ids дня до обновления; лишние снимаются с расписания по завершении.
         Returns:
-            tuple: (bool, set) Успешность операции и набор title_ids.
+            Job: Активная задача загрузки дня.
         """
-        try:
-            data = self.get_schedule(day_of_week)
-            if data is None:
-                self.logger.warning(f"No data available for day {day_of_week}.")
-                return False, None
-
-            titles_list = []
-            for item in data:
-                titles = item.get("list", [])
-                titles_list.extend(titles)
-
-            self.logger.debug(f"Total titles (light): {len(titles_list)}")
-            ids = [t.get('external_id') for t in titles_list if t.get('external_id') is not None]
-            if ids:
-                full_list = self.api_adapter.get_releases_full(ids, max_workers=4)
-                if full_list:
-                    self.logger.debug(f"Full bundles fetched: {len(full_list)} (parallel)")
-                    new_title_ids = self._save_titles_list(full_list)
-                else:
-                    # fallback:
-                    new_title_ids = self._save_titles_list(titles_list)
+        active = self.job_manager.active_job(f"schedule:{day_of_week}:bundles")
+        if active is not None:
+            active.coalesced += 1
+            return active
+
+        return self.job_manager.submit(
+            JOB_SCHEDULE,
+            f"schedule:{day_of_week}",
+            lambda ctx: self._fetch_schedule_payload(day_of_week),
+            label=f"Schedule day {day_of_week}",
+            on_finished=lambda data: self._on_schedule_payload(day_of_week, data, current_titles),
+            on_error=lambda message: self._on_schedule_failed(day_of_week, message),
+        )
+
+    def _fetch_schedule_payload(self, day_of_week):
+        """Рабочий поток: расписание маппится из ответа без догрузки бандлов — один HTTP-запрос."""
+        data = self.api_adapter.get_schedule(day_of_week, enrich=False)
+        if data is None:
+            raise APIClientError(f"No data returned for day {day_of_week}.")
+        if isinstance(data, dict) and 'error' in data:
+            raise APIClientError(f"API returned an error: {data['error']}")
+        self.logger.debug(f"Data received for day {day_of_week}: {len(data)} keys (type: {type(data).__name__})")
+        return data
+
+    def _on_schedule_payload(self, day_of_week, data, current_titles):
+        """UI-поток: делит тайтлы расписания на актуальные и изменившиеся, для вторых запускает догрузку."""
+        self.current_data = data
+        titles_list, day_by_external_id = [], {}
+        for item in data if isinstance(data, list) else []:
+            for t in item.get("list", []):
+                titles_list.append(t)
+                day_by_external_id[str(t.get('external_id'))] = item.get("day", day_of_week)
+
+        self.logger.debug(f"Total titles (light): {len(titles_list)}")
+        ids = [t.get('external_id') for t in titles_list if t.get('external_id') is not None]
+        markers = self.db_manager.get_title_change_markers(PROVIDER_ANILIBERTY, ids)
+
+        changed, new_title_ids = [], []
+        for t in titles_list:
+            marker = markers.get(str(t.get('external_id')))
+            if self._schedule_release_changed(t, marker):
+                changed.append(t)
             else:
-                new_title_ids = self._save_titles_list(titles_list)
+                new_title_ids.append(marker[0])
+        self.logger.debug(f"Schedule day {day_of_week}: {len(changed)} changed, {len(new_title_ids)} up to date")
 
-            parsed_data = self.parse_schedule_data(data, new_title_ids)
-            self.logger.debug(f"Parsed data: {parsed_data}")
-            self._save_parsed_data(parsed_data)
+        changed = [t for t in changed if t.get('external_id') is not None]
+        if not changed:
+            self._finish_schedule_ingest(day_of_week, data, ids, new_title_ids, current_titles)
+            return
 
-            return True, new_title_ids
-        except Exception as e:
-            self.logger.error(f"Error while fetching and processing schedule: {e}")
-            return False, None
+        def on_release(item):
+            light, full = item
+            # fallback: для неудачных бандлов сохраняем то, что пришло в расписании
+            saved = self._save_titles_list([full or light]) or []
+            day = day_by_external_id.get(str(light.get('external_id')), day_of_week)
+            for title_id in saved:
+                self.db_manager.save_schedule(day, title_id, last_updated=datetime.now(timezone.utc))
+            new_title_ids.extend(saved)
+            self._refresh_if_showing(saved, day_of_week=day)
+
+        self.job_manager.submit(
+            JOB_SCHEDULE,
+            f"schedule:{day_of_week}:bundles",
+            lambda ctx: self._fetch_releases_full(ctx, changed),
+            label=f"Schedule day {day_of_week}",
+            total=len(changed),
+            on_partial=on_release,
+            # после отмены/ошибки список дня неполный — снимать с расписания нечего
+            on_done=lambda job: self._finish_schedule_ingest(
+                day_of_week, data, ids, new_title_ids, current_titles if job.state == JOB_DONE else None),
+        )
 
-    def check_and_update_schedule(self, day_of_week, current_titles):
+    def _fetch_releases_full(self, ctx, releases):
         """
-        Проверяет наличие обновлений в расписании и обновляет базу данных.
-        Args:
-            day_of_week (int): День недели.
-            current_titles (set): Текущий набор title_ids.
-
-        Returns:
-            tuple: (bool, set) Успешность операции и набор обновленных title_ids.
+        Рабочий поток: полные бандлы релизов, параллельно.
+        Каждый готовый релиз сразу уходит в UI-поток парой (light, full); full=None, если бандл не загрузился.
         """
+        total = len(releases)
+        ctx.progress(0, total)
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = {pool.submit(self.api_adapter.get_release_full, r.get('external_id')): r for r in releases}
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    ctx.check()
+                    light = futures[future]
+                    try:
+                        full = future.result()
+                    except Exception as e:
+                        full = {'error': str(e)}
+                    if not isinstance(full, dict) or 'error' in full:
+                        self.logger.warning(f"Full bundle failed for {light.get('external_id')}: "
+                                            f"{full.get('error') if isinstance(full, dict) else full}")
+                        full = None
+                    else:
+                        fetched += 1
+                    ctx.partial((light, full))
+                    ctx.progress(done, total)
+            except JobCancelled:
+                for future in futures:
+                    future.cancel()
+                raise
+        self.logger.debug(f"Full bundles fetched: {fetched}/{total} (parallel)")
+        return fetched
+
+    def _finish_schedule_ingest(self, day_of_week, data, external_ids, new_title_ids, current_titles):
+        """UI-поток: записи расписания, снятие выпавших тайтлов и перерисовка дня."""
         try:
-            self.ui_manager.show_loader("Updating schedule...")
-            self.ui_manager.set_buttons_enabled(False)
-            status, new_title_ids = self.fetch_and_process_schedule(day_of_week)
-            if not status:
-                return False, None
+            markers = self.db_manager.get_title_change_markers(PROVIDER_ANILIBERTY, external_ids)
+            parsed_data = self.parse_schedule_data(data, new_title_ids, markers=markers)
+            self.logger.debug(f"Parsed data: {parsed_data}")
+            self._save_parsed_data(parsed_data)
 
-            if current_titles:
+            if isinstance(current_titles, set) and current_titles:
                 titles_to_remove = current_titles.difference(new_title_ids)
                 if titles_to_remove:
                     self.logger.debug(f"Titles to remove: {titles_to_remove}")
                     self.db_manager.remove_schedule_day(titles_to_remove, day_of_week)
                 else:
                     self.logger.debug(f"No updates required: {current_titles} == {new_title_ids}")
-
-            return True, new_title_ids
         except Exception as e:
-            self.logger.error(f"Error while checking and updating schedule: {e}")
-            return False, None
+            self.logger.error(f"Error while processing schedule: {e}")
         finally:
-            self.ui_manager.hide_loader()
-            self.ui_manager.set_buttons_enabled(True)
+            self._show_schedule_day_if_current(day_of_week)
+
+    def _on_schedule_failed(self, day_of_week, message):
+        self.show_error_notification("API Error", message)
+        self._show_schedule_day_if_current(day_of_week)
+
+    def _show_schedule_day_if_current(self, day_of_week):
+        """Перерисовывает день из БД, если пользователь всё ещё на нём."""
+        state = self.view_state
+        if state is None or state.show_mode != SHOW_DEFAULT or state.day_of_week != day_of_week:
+            return
+        self._refresh_timer.stop()
+        titles = self.db_manager.get_titles_from_db(day_of_week=day_of_week)
+        if titles:
+            self.clear_previous_posters()
+            self.total_titles = {title.title_id for title in titles}
+            self.display_titles_in_ui(titles)
+        else:
+            self.display_titles(start=True)
+
+    def _refresh_if_showing(self, title_ids, day_of_week=None):
+        """Отложенная перерисовка, если свежие тайтлы видны на экране (частые вызовы склеиваются)."""
+        state = self.view_state
+        if state is None or state.show_mode != SHOW_DEFAULT:
+            return
+        on_day = day_of_week is not None and state.day_of_week == day_of_week
+        if on_day or any(self.ui_generator.is_on_page(tid) for tid in title_ids or ()):
+            self._refresh_timer.start()
+
+    def _on_jobs_changed(self):
+        """Немодальный индикатор активных фоновых задач."""
+        active = [job for job in self.job_manager.jobs() if job.is_active]
+        if not active:
+            self.ui_manager.hide_progress()
+            return
+        job = active[0]
+        text = job.label + (f" {job.done}/{job.total}" if job.total else "...")
+        if len(active) > 1:
+            text += f" (+{len(active) - 1})"
+        self.ui_manager.show_progress(text)
+
+    @staticmethod
+    def _schedule_release_changed(release: dict, marker) -> bool:
+        """
+        Нужно ли догружать полный бандл релиза из расписания.
+        marker — (title_id, updated, last_change, has_episodes) из get_title_change_markers либо None.
+        """
+        return release_changed(release, marker)
+
+    def check_and_update_schedule(self, day_of_week, current_titles):
+        """
+        Запускает фоновую проверку расписания дня; выпавшие из расписания тайтлы снимаются по завершении.
+        Args:
+            day_of_week (int): День недели.
+            current_titles (set): Текущий набор title_ids.
+
+        Returns:
+            Job: Задача загрузки дня (или уже активная для этого дня).
+        """
+        return self.load_schedule_async(day_of_week, current_titles=current_titles)
 
     def clear_previous_posters(self):
         """Удаляет все предыдущие виджеты из сетки постеров."""
@@ -1136,6 +1563,55 @@ class AnimePlayerAppVer3(QWidget):
         self.logger.debug(f"Пытаемся создать animedia_titles_browser с параметрами: {len(titles)}")
         return self.ui_am_generator.create_animedia_titles_browser(titles)
 
+    @lazy_subsystem
+    def poster_grid_model(self):
+        from app.qt.poster_grid import PosterGridModel, POSTER_SIZE
+        from utils.media.image_manager import make_small_poster
+
+        return PosterGridModel(
+            self.db_manager.get_title_cards_window,
+            self._load_grid_posters,
+            parent=self,
+            convert=lambda blob: make_small_poster(blob, target_w=POSTER_SIZE.width()),
+        )
+
+    def display_poster_grid(self):
+        """Вся библиотека одной сеткой постеров с бесконечной прокруткой вместо страниц."""
+        self.set_view_state(ViewState(show_mode=SHOW_POSTER_GRID))
+        pagination_widget = self.ui_manager.parent_widgets.get("pagination_widget")
+        if pagination_widget:
+            pagination_widget.setVisible(False)
+        self.display_titles_in_ui([], show_mode=SHOW_POSTER_GRID)
+
+    def create_poster_grid(self):
+        """Новый view над общей моделью: строки, постеры и позиция прокрутки переживают переход в тайтл и обратно."""
+        from app.qt.poster_grid import PosterGridView
+
+        model = self.poster_grid_model
+        revision = getattr(self.db_manager, "data_revision", 0)
+        if revision != self._poster_grid_revision:
+            if self._poster_grid_revision is not None:
+                model.reload()
+                self._poster_grid_scroll = 0
+            self._poster_grid_revision = revision
+
+        view = PosterGridView(model, self)
+        view.titleActivated.connect(self.display_info)
+        scroll_bar = view.verticalScrollBar()
+        scroll_bar.valueChanged.connect(lambda value: setattr(self, "_poster_grid_scroll", value))
+        if self._poster_grid_scroll:
+            position = self._poster_grid_scroll
+            QTimer.singleShot(0, lambda: scroll_bar.setValue(position))
+        return view
+
+    def _load_grid_posters(self, title_ids):
+        """Постеры видимых карточек пачкой; для отсутствующих ставит скачивание (как get_poster_or_placeholder)."""
+        blobs = self.db_manager.get_poster_blobs(title_ids)
+        for title_id in title_ids:
+            if title_id not in blobs:
+                self.get_poster_or_placeholder(title_id)
+        return blobs
+
     def create_title_browser(self, title, show_mode=SHOW_DEFAULT):
         """
         Прокси-метод, который делегирует создание title_browser в UIGenerator.
@@ -1147,59 +1623,31 @@ class AnimePlayerAppVer3(QWidget):
         Сохраняет тайтлы + эпизоды + торренты.
         Возвращает список ВНУТРЕННИХ title_id из БД.
         """
-        self.logger.debug(f"Processing title data: {len(title_list)}")
-        internal_ids: list[int] = []
-
-        processes = {
-            self.db_manager.process_episodes: "episodes",
-            self.db_manager.process_torrents: "torrents",
-        }
-
-        for raw_title_data in title_list:
-            title_ok, title_id = self.db_manager.process_titles(raw_title_data)
-
-            if not title_ok or title_id is None:
-                self.logger.warning(
-                    f"Failed to process title (external_id={raw_title_data.get('external_id')}, "
-                    f"provider={raw_title_data.get('provider')})"
-                )
-                continue
-
-            internal_ids.append(title_id)
-            payload = {"title_id": title_id, **raw_title_data}
-
-            for process_func, process_name in processes.items():
-                try:
-                    result = process_func(payload)
-                    if result:
-                        self.logger.debug(
-                            f"Successfully saved {process_name} table for title_id={title_id}. STATUS: {result}")
-                    else:
-                        self.logger.warning(f"Failed to process {process_name} for title_id={title_id}")
-                except Exception as e:
-                    self.logger.error(f"Exception while processing {process_name} for title_id={title_id}: {e}")
-
-        return internal_ids
+        return self.db_manager.ingest_titles(title_list)
 
     def get_random_title(self):
-        try:
-            self.ui_manager.show_loader("Fetching random title...")
-            self.ui_manager.set_buttons_enabled(False)
-
-            data = self.api_adapter.get_random_title()
-
-            if not isinstance(data, dict):
-                self.logger.error(f"Unexpected response format: {type(data).__name__}")
-                self.show_error_notification("API Error", "Unexpected response format.")
-                return
-
-            if 'error' in data:
-                self.logger.error(data['error'])
-                self.show_error_notification("API Error", data['error'])
-                return
-
-            self.logger.debug(f"Full response data: {len(data)} keys (type: {type(data).__name__})")
+        """Случайный тайтл: запрос к API в фоне, сохранение и показ — по готовности."""
+        return self.job_manager.submit(
+            JOB_RANDOM,
+            "random",
+            lambda ctx: self._fetch_random_title(),
+            label="Random title",
+            on_finished=self._on_random_title,
+            on_error=lambda message: self.show_error_notification("API Error", message),
+        )
 
+    def _fetch_random_title(self):
+        """Рабочий поток: случайный релиз с полными данными."""
+        data = self.api_adapter.get_random_title()
+        if not isinstance(data, dict):
+            raise APIClientError(f"Unexpected response format: {type(data).__name__}")
+        if 'error' in data:
+            raise APIClientError(data['error'])
+        self.logger.debug(f"Full response data: {len(data)} keys (type: {type(data).__name__})")
+        return data
+
+    def _on_random_title(self, data):
+        try:
             title_list = data.get('list', [])
             if not title_list:
                 self.logger.error("No titles found in the response.")
@@ -1219,23 +1667,20 @@ class AnimePlayerAppVer3(QWidget):
         except Exception as e:
             self.logger.error(f"Error while fetching random title: {e}")
             self.show_error_notification("Error", "Unexpected error. Check logs for details.")
-            return False, None
-        finally:
-            self.ui_manager.hide_loader()
-            self.ui_manager.set_buttons_enabled(True)
 
-    def get_schedule(self, day):
+    def get_schedule(self, day, enrich=True):
         """
         Получает расписание с сервера API.
         Args:
             day (int): День недели для запроса.
+            enrich (bool): Догружать полные бандлы релизов внутри адаптера.
         Returns:
             list: Данные расписания.
         Raises:
             APIClientError: Если произошла ошибка при запросе или обработке данных.
         """
         try:
-            data = self.api_adapter.get_schedule(day)
+            data = self.api_adapter.get_schedule(day, enrich=enrich)
             if data is None:
                 raise APIClientError(f"No data returned for day {day}.")
             if isinstance(data, dict) and 'error' in data:
@@ -1253,8 +1698,11 @@ class AnimePlayerAppVer3(QWidget):
             self.show_error_notification("Error", "Unexpected error. Check logs for details.")
             return None
 
-    def parse_schedule_data(self, data, title_ids):
-        """Парсит расписание и возвращает список {day, title_id}."""
+    def parse_schedule_data(self, data, title_ids, markers=None):
+        """
+        Парсит расписание и возвращает список {day, title_id}.
+        markers — результат get_title_change_markers, чтобы не искать каждый тайтл отдельным запросом.
+        """
         parsed_data = []
         if not isinstance(data, list):
             self.logger.error(f"Ожидался список, получен: {type(data).__name__}")
@@ -1283,8 +1731,12 @@ class AnimePlayerAppVer3(QWidget):
                 external_id = title.get("external_id")
                 if not external_id:
                     continue
-                title_db = self.db_manager.get_title_by_external_id(PROVIDER_ANILIBERTY, external_id)
-                internal_title_id = title_db.title_id
+                marker = (markers or {}).get(str(external_id))
+                if marker:
+                    internal_title_id = marker[0]
+                else:
+                    title_db = self.db_manager.get_title_by_external_id(PROVIDER_ANILIBERTY, external_id)
+                    internal_title_id = title_db.title_id if title_db else None
 
                 if internal_title_id:
                     parsed_data.append({"day": day, "title_id": internal_title_id})
@@ -1368,6 +1820,7 @@ class AnimePlayerAppVer3(QWidget):
                 self.show_error_notification("Update", "No titles found for update.")
                 return False
 
+            aniliberty_refs: list[TitleRef] = []
             for tref in titles:
                 self.logger.info(
                     f"Updating title: {tref.title_id}, {tref.name_ru}, {tref.name_en}, "
@@ -1379,11 +1832,7 @@ class AnimePlayerAppVer3(QWidget):
                     )
                     continue
                 if tref.provider == PROVIDER_ANILIBERTY or provider_filter == PROVIDER_ANILIBERTY:
-                    query_name = str(tref.external_id or tref.title_id) or tref.name_en or tref.name_ru
-                    self.logger.info(f"Updating via AniLiberty API: query={query_name}")
-                    title_ids = self._handle_get_titles_from_api(query_name)
-                    if title_ids:
-                        self._handle_found_titles(title_ids, query_name)
+                    aniliberty_refs.append(tref)
                     continue
                 if tref.provider == PROVIDER_ANIMEDIA or provider_filter == PROVIDER_ANIMEDIA:
                     query_name = tref.name_en or tref.name_ru or str(tref.external_id or tref.title_id)
@@ -1405,6 +1854,8 @@ class AnimePlayerAppVer3(QWidget):
                     f"(filter={provider_filter})"
                 )
 
+            if aniliberty_refs:
+                self._update_titles_aniliberty(aniliberty_refs)
             return True
 
         except Exception as e:
@@ -1415,6 +1866,62 @@ class AnimePlayerAppVer3(QWidget):
             self.ui_manager.hide_loader()
             self.ui_manager.set_buttons_enabled(True)
 
+    def _update_titles_aniliberty(self, refs: list[TitleRef]) -> None:
+        """
+        Один тайтл — принудительная полная загрузка задачей title:aniliberty:<id>.
+        Несколько — массовое обновление (core.bulk_refresh): пачки через list-эндпоинт,
+        полные бандлы и запись только для изменившихся. Карточки на экране перерисовываются
+        по мере готовности; в конце показываем обновлённые тайтлы, если экран не сменили.
+        """
+        title_ids = [tref.title_id for tref in refs]
+        search_text = ",".join(str(tid) for tid in title_ids)
+        view_state = self.view_state
+
+        def on_done(job):
+            if self.view_state == view_state:
+                self._handle_found_titles(title_ids, search_text)
+
+        if len(refs) == 1:
+            tref = refs[0]
+            query_name = str(tref.external_id or tref.title_id) or tref.name_en or tref.name_ru
+            self.logger.info(f"Updating via AniLiberty API: query={query_name}")
+            job = self._handle_get_titles_from_api(
+                query_name,
+                on_ids=self._refresh_if_showing,
+                kind=JOB_TITLE,
+                key=f"title:{PROVIDER_ANILIBERTY}:{query_name}",
+                label=f"Update {tref.name_en or tref.name_ru or query_name}",
+            )
+            self.job_manager.when_done(job, on_done)
+            return
+
+        ext_ids = [tref.external_id for tref in refs if tref.external_id]
+        markers = self.db_manager.get_title_change_markers(PROVIDER_ANILIBERTY, ext_ids)
+        batches = self.bulk_refresher.batches(markers)
+        self.logger.info(f"Bulk update via AniLiberty list endpoint: {len(markers)} titles, {len(batches)} batches")
+
+        def fetch(ctx):
+            for i, chunk in enumerate(batches, 1):
+                ctx.check()
+                ctx.partial(self.bulk_refresher.fetch_batch(chunk))
+                ctx.progress(i, len(batches))
+            return len(batches)
+
+        def on_batch(batch):
+            saved_ids = self.bulk_refresher.apply_batch(batch)
+            self._refresh_if_showing(saved_ids + batch.unchanged_ids)
+
+        job = self.job_manager.submit(
+            JOB_TITLE,
+            f"bulk:{PROVIDER_ANILIBERTY}:{','.join(sorted(markers))}",
+            fetch,
+            label=f"Update {len(markers)} titles",
+            total=len(batches),
+            on_partial=on_batch,
+            on_error=lambda message: self.show_error_notification("API Error", message),
+        )
+        self.job_manager.when_done(job, on_done)
+
     def get_update_title(self):
         """Обновление с авто-определением провайдера."""
         return self._update_titles(provider_filter=None)
@@ -1490,6 +1997,7 @@ class AnimePlayerAppVer3(QWidget):
             PROVIDER_ANILIBERTY → фокус на AniLiberty (БД + AniLiberty)
             PROVIDER_ANIMEDIA   → фокус на Animedia (БД + Animedia)
         """
+        loader_pending = False  # индикатор прячет фоновая задача/Animedia, когда закончит
         try:
             self.ui_manager.show_loader("Fetching by title...")
             self.ui_manager.set_buttons_enabled(False)
@@ -1524,47 +2032,60 @@ class AnimePlayerAppVer3(QWidget):
             )
 
             if provider_filter in (None, PROVIDER_ANILIBERTY):
-                try:
-                    self.logger.info("...Try to load from AniLiberty provider")
-                    title_ids = self._handle_get_titles_from_api(search_text)
+                self.logger.info("...Try to load from AniLiberty provider (async)")
+
+                def on_ids(title_ids):
                     if title_ids:
-                        self.logger.info(
-                            f"AniLiberty returned {len(title_ids)} titles for '{search_text}'"
-                        )
+                        self.logger.info(f"AniLiberty returned {len(title_ids)} titles for '{search_text}'")
+                        self.ui_manager.hide_loader()
                         self._handle_found_titles(title_ids, search_text)
-                        return True
-                except Exception as e:
-                    self.logger.warning(f"AniLiberty provider error: {e}")
+                    elif not self._search_fallback(provider_filter, search_text):
+                        self.ui_manager.hide_loader()
 
-            if provider_filter in (None, PROVIDER_ANIMEDIA):
-                try:
-                    self.logger.info("...Try to load from Animedia (async)")
-                    self._last_search_text = search_text
-                    self._animedia_worker = AsyncWorker(
-                        self.animedia_adapter.get_by_title,
-                        search_text,
-                        max_titles=5,
-                    )
-                    self._animedia_worker.finished.connect(self._on_animedia_result)
-                    self._animedia_worker.error.connect(self._on_animedia_error)
-                    self._animedia_worker.start()
-                    return True
-                except Exception as e:
-                    self.logger.error(f"Error starting Animedia worker: {e}")
-                    return False
+                def on_error(message):
+                    self.logger.warning(f"AniLiberty provider error: {message}")
+                    if not self._search_fallback(provider_filter, search_text):
+                        self.ui_manager.hide_loader()
 
-            self.logger.warning(f"No titles found anywhere for '{search_text}'")
-            self.show_error_notification("Search", "No titles found.")
-            return False
+                self._handle_get_titles_from_api(search_text, on_ids=on_ids, on_error=on_error)
+                loader_pending = True
+                return True
+
+            # Animedia-воркер сам прячет индикатор в _on_animedia_result/_on_animedia_error
+            loader_pending = self._search_fallback(provider_filter, search_text)
+            return loader_pending
 
         except Exception as e:
             self.logger.error(f"Error while fetching get_search_by_title: {e}")
             return False
         finally:
-            # TODO: для асинхронного пути Animedia надо делать внутри рутин
-            self.ui_manager.hide_loader()
+            if not loader_pending:
+                self.ui_manager.hide_loader()
             self.ui_manager.set_buttons_enabled(True)
 
+    def _search_fallback(self, provider_filter: str | None, search_text: str) -> bool:
+        """Поиск после AniLiberty: Animedia (async) либо уведомление, что ничего не найдено."""
+        if provider_filter in (None, PROVIDER_ANIMEDIA):
+            try:
+                self.logger.info("...Try to load from Animedia (async)")
+                self._last_search_text = search_text
+                self._animedia_worker = AsyncWorker(
+                    self.animedia_adapter.get_by_title,
+                    search_text,
+                    max_titles=5,
+                )
+                self._animedia_worker.finished.connect(self._on_animedia_result)
+                self._animedia_worker.error.connect(self._on_animedia_error)
+                self._animedia_worker.start()
+                return True
+            except Exception as e:
+                self.logger.error(f"Error starting Animedia worker: {e}")
+                return False
+
+        self.logger.warning(f"No titles found anywhere for '{search_text}'")
+        self.show_error_notification("Search", "No titles found.")
+        return False
+
     def get_search_by_title(self):
         """Поиск тайтла: локальная БД → AniLiberty → Animedia."""
         return self._search_by_title(provider_filter=None, search_text=None)
@@ -1652,51 +2173,57 @@ class AnimePlayerAppVer3(QWidget):
             self.ui_manager.hide_loader()
             self.ui_manager.set_buttons_enabled(True)
 
-    def _handle_get_titles_from_api(self, search_text) -> list[int] | None:
-        try:
-            keywords = search_text.split(',')
-            keywords = [kw.strip() for kw in keywords]
-            if len(keywords) == 1 and keywords[0].isdigit():
-                title_id = int(keywords[0])
-                data = self.api_adapter.get_release_full(title_id)
-            elif all(kw.isdigit() for kw in keywords):
-                title_ids = [int(kw) for kw in keywords]
-                data = self.api_adapter.get_releases_full(title_ids)
-            else:
-                data = self.api_adapter.get_search_by_title(search_text)
-
-            if isinstance(data, dict) and 'error' in data:
-                self.logger.error(data['error'])
-                self.show_error_notification("API Error", data['error'])
-                return
+    def _handle_get_titles_from_api(self, search_text, on_ids, *, on_error=None, kind=JOB_SEARCH, key=None,
+                                    label=None):
+        """
+        Запрашивает тайтлы у AniLiberty фоновой задачей (по умолчанию search:<текст>, дубли склеиваются).
+        Сохранение в БД и on_ids(title_ids) — в UI-потоке; пустой ответ даёт on_ids([]).
+        """
+        def on_finished(title_list):
+            title_ids = []
+            if title_list:
+                self.logger.debug(f"Processing title data: {len(title_list)}")
+                title_ids = self.invoke_database_save(title_list)
+                self.current_data = title_list
+            on_ids(title_ids)
+
+        return self.job_manager.submit(
+            kind,
+            key or f"search:{search_text.strip().lower()}",
+            lambda ctx: self._fetch_titles_from_api(search_text),
+            label=label or f"Search {search_text}",
+            on_finished=on_finished,
+            on_error=on_error or (lambda message: self.show_error_notification("API Error", message)),
+        )
 
-            if isinstance(data, dict) and 'list' in data:
-                title_list = data['list']
-            elif isinstance(data, dict) and 'external_id' in data:
-                title_list = [data]
-            elif isinstance(data, list):
-                title_list = data
-            else:
-                self.logger.error("No titles found in the response.")
-                self.show_error_notification("Error", "No titles found in the response.")
-                return
+    def _fetch_titles_from_api(self, search_text) -> list[dict]:
+        """Рабочий поток: release по id, пакет по списку id или поиск по названию."""
+        keywords = search_text.split(',')
+        keywords = [kw.strip() for kw in keywords]
+        if len(keywords) == 1 and keywords[0].isdigit():
+            title_id = int(keywords[0])
+            data = self.api_adapter.get_release_full(title_id)
+        elif all(kw.isdigit() for kw in keywords):
+            title_ids = [int(kw) for kw in keywords]
+            data = self.api_adapter.get_releases_full(title_ids)
+        else:
+            data = self.api_adapter.get_search_by_title(search_text)
 
-            if not title_list:
-                self.logger.error("No titles found in the response.")
-                self.show_error_notification("Error", "No titles found in the response.")
-                return
+        if isinstance(data, dict) and 'error' in data:
+            raise APIClientError(data['error'])
 
-            self.logger.debug(f"Processing title data: {title_list}")
-            title_ids = self.invoke_database_save(title_list)
+        if isinstance(data, dict) and 'list' in data:
+            title_list = data['list']
+        elif isinstance(data, dict) and 'external_id' in data:
+            title_list = [data]
+        elif isinstance(data, list):
+            title_list = [t for t in data if not (isinstance(t, dict) and 'error' in t)]
+        else:
+            title_list = []
 
-            self.current_data = data
-            return title_ids
-        except APIClientError as api_error:
-            self.logger.error(f"API Client Error: {api_error}")
-            self.show_error_notification("API Error", str(api_error))
-        except Exception as e:
-            self.logger.error(f"Error while fetching title from AL: {e}")
-            self.show_error_notification("Error", "Unexpected error. Check logs for details.")
+        if not title_list:
+            self.logger.error(f"No titles found in the response for '{search_text}'.")
+        return title_list
 
     def save_playlist_wrapper(self):
         """
@@ -1798,7 +2325,7 @@ class AnimePlayerAppVer3(QWidget):
             sanitized_title_name = self.sanitize_filename(title_name)
             file_name = f"{sanitized_title_name}_{torrent_id}.torrent"
 
-            self.torrent_manager.save_torrent_file(link, file_name)
+            self.torrent_manager.save_torrent_file(link, file_name, torrent_id=torrent_id)
             self.logger.debug("Opening torrent client ..")
         except Exception as e:
             error_message = f"Error in save_torrent_wrapper: {str(e)}"
@@ -1814,7 +2341,13 @@ class AnimePlayerAppVer3(QWidget):
         Инициирует скачивание постера только если существующий постер устарел или отсутствует.
         """
         try:
-            poster_data, is_placeholder = self.db_manager.get_poster_blob(title_id, size_key=size_key)
+            prefetched = None
+            if not force_download and size_key == "original":
+                prefetched = self.page_prefetcher.poster(title_id, self.db_manager.get_title_revision(title_id))
+            if prefetched is not None:
+                (poster_data, prefetched_date), is_placeholder = prefetched, False
+            else:
+                poster_data, is_placeholder = self.db_manager.get_poster_blob(title_id, size_key=size_key)
             need_download = False
 
             if force_download:
@@ -1824,7 +2357,8 @@ class AnimePlayerAppVer3(QWidget):
                 if not poster_data or is_placeholder:
                     need_download = True
                 else:
-                    poster_date = self.db_manager.get_poster_last_updated(title_id, size_key=size_key)
+                    poster_date = prefetched_date if prefetched is not None else \
+                        self.db_manager.get_poster_last_updated(title_id, size_key=size_key)
                     if poster_date:
                         if poster_date.tzinfo is None:
                             poster_date = poster_date.replace(tzinfo=timezone.utc)
@@ -1924,6 +2458,8 @@ class AnimePlayerAppVer3(QWidget):
             vlc_kwargs["log"] = self.log_enabled
             vlc_kwargs["log_level"] = self.verbose
 
+        from app.vlc.vlc_player import VLCPlayer  # python-vlc и QtMultimedia — только при первом запуске плеера
+
         self.vlc_window = VLCPlayer(**vlc_kwargs)
 
         final_path = playlist_path
@@ -5,6 +5,7 @@ from urllib.parse import urlparse, parse_qs, unquote
 from PyQt5.QtCore import QTimer
 from typing import Callable, Optional, Any
 
+from core.types import FACETS
 from providers.animedia.v0.cache_manager import AniMediaCacheManager
 
 Handler = Callable[[list[str]], Any]
@@ -25,7 +26,9 @@ class LinkActionHandler:
                  get_search_by_title_animedia,
                  open_web,
                  refresh_display,
-                 reload_poster):
+                 reload_poster,
+                 cancel_job=None,
+                 apply_filter=None):
 
         self.logger = logger
         self.db_manager = db_manager
@@ -40,6 +43,8 @@ class LinkActionHandler:
         self.open_web_link = open_web
         self.refresh_display = refresh_display
         self.get_poster_or_placeholder = reload_poster
+        self.cancel_job = cancel_job
+        self.apply_filter = apply_filter
         self.animedia_cache = animedia_cache
 
         self.dispatch: dict[str, Handler] = {
@@ -51,6 +56,8 @@ class LinkActionHandler:
             'filter_by_year': self._handle_filter_by_year,
             'filter_by_status': self._handle_filter_by_status,
             'filter_by_provider': self._handle_filter_by_provider,
+            'filter_toggle': self._handle_filter_toggle,
+            'filter_clear': self._handle_filter_clear,
             'reload_template': self._handle_reload_template,
             'reset_offset': self._handle_reset_offset,
             'reload_info': self._handle_display_info,
@@ -65,6 +72,7 @@ class LinkActionHandler:
             'open_web': self._handle_open_web,
             'refresh_display': self._handle_refresh_display,
             'reload_poster': self._handle_reload_poster,
+            'cancel_job': self._handle_cancel_job,
         }
 
     def handle(self, link: str) -> Optional[Any]:
@@ -147,61 +155,42 @@ class LinkActionHandler:
         QTimer.singleShot(100, lambda: self.display_titles(title_ids=title_ids))
 
     def _handle_filter_by_genre(self, parts: list[str]) -> None:
-        genre_id = parts[1]
+        genre_id = int(parts[1])
         self.logger.debug(f"Filtering by genre: {genre_id}")
-        title_ids = self.db_manager.get_titles_by_genre(genre_id)
-        if title_ids:
-            QTimer.singleShot(100, lambda: self.display_titles(
-                show_mode='titles_genre_list',
-                batch_size=self.titles_list_batch_size,
-                title_ids=title_ids
-            ))
-        else:
-            self.logger.warning(f"No titles found with genre: '{genre_id}'")
+        QTimer.singleShot(100, lambda: self.apply_filter('genre', genre_id))
 
     def _handle_filter_by_team_member(self, parts: list[str]) -> None:
-        team_member = parts[1]
+        team_member = unquote(parts[1])
         self.logger.debug(f"Filtering by team_member: {team_member}")
-        title_ids = self.db_manager.get_titles_by_team_member(team_member)
-        if title_ids:
-            QTimer.singleShot(100, lambda: self.display_titles(show_mode='titles_team_member_list',
-                                                               batch_size=self.titles_list_batch_size,
-                                                               title_ids=title_ids))
-        else:
-            self.logger.warning(f"No titles found with team_member: '{team_member}'")
+        QTimer.singleShot(100, lambda: self.apply_filter('team_member', team_member))
 
     def _handle_filter_by_year(self, parts: list[str]) -> None:
         year = int(parts[1])
         self.logger.debug(f"Filtering by year: {year}")
-        title_ids = self.db_manager.get_titles_by_year(year)
-        if title_ids:
-            QTimer.singleShot(100, lambda: self.display_titles(show_mode='titles_year_list',
-                                                               batch_size=self.titles_list_batch_size,
-                                                               title_ids=title_ids))
-        else:
-            self.logger.warning(f"No titles found with year: '{year}'")
+        QTimer.singleShot(100, lambda: self.apply_filter('year', year))
+
     def _handle_filter_by_status(self, parts: list[str]) -> None:
         status_code = int(parts[1])
-        self.logger.debug(f"Filtering by status: {status_code}, type: {type(status_code)}")
-        title_ids = self.db_manager.get_titles_by_status(status_code)
-        self.logger.debug(f"Query returned {len(title_ids)} titles: {title_ids[:5] if title_ids else []}")
-        if title_ids:
-            QTimer.singleShot(100, lambda: self.display_titles(show_mode='titles_status_list',
-                                                               batch_size=self.titles_list_batch_size,
-                                                               title_ids=title_ids))
-        else:
-            self.logger.warning(f"No titles found with status: '{status_code}'")
+        self.logger.debug(f"Filtering by status: {status_code}")
+        QTimer.singleShot(100, lambda: self.apply_filter('status', status_code))
+
     def _handle_filter_by_provider(self, parts: list[str]) -> None:
         provider_code = parts[1]
         self.logger.debug(f"Filtering by provider: {provider_code}")
-        title_ids = self.db_manager.get_title_ids_by_provider(provider_code)
-        self.logger.debug(f"Query returned {len(title_ids)} titles: {title_ids[:5] if title_ids else []}")
-        if title_ids:
-            QTimer.singleShot(100, lambda: self.display_titles(show_mode='titles_provider_list',
-                                                               batch_size=self.titles_list_batch_size,
-                                                               title_ids=title_ids))
-        else:
-            self.logger.warning(f"No titles found with provider: '{provider_code}'")
+        QTimer.singleShot(100, lambda: self.apply_filter('provider', provider_code))
+
+    def _handle_filter_toggle(self, parts: list[str]) -> None:
+        """Панель фильтров: filter_toggle/<facet>/<value> включает или выключает значение."""
+        if len(parts) < 3 or parts[1] not in FACETS:
+            self.logger.error(f"Invalid filter_toggle link: {parts}")
+            return
+        facet, value = parts[1], unquote('/'.join(parts[2:]))
+        self.logger.debug(f"Toggling filter {facet}: {value}")
+        QTimer.singleShot(100, lambda: self.apply_filter(facet, value, toggle=True))
+
+    def _handle_filter_clear(self, parts: list[str]) -> None:
+        self.logger.debug("Clearing title filter")
+        QTimer.singleShot(100, lambda: self.apply_filter())
 
     def _handle_reload_template(self, parts: list[str]) -> None:
         template_name = parts[1]
@@ -214,6 +203,13 @@ class LinkActionHandler:
             self.reset_offset()
             QTimer.singleShot(100, lambda: self.display_titles(start=True))
 
+    def _handle_cancel_job(self, parts: list[str]) -> None:
+        if self.cancel_job is None or len(parts) < 2 or not parts[1].isdigit():
+            self.logger.error(f"Invalid cancel_job link: {parts}")
+            return
+        if not self.cancel_job(int(parts[1])):
+            self.logger.info(f"Job #{parts[1]} is not active, nothing to cancel")
+
     def _handle_set_download_status(self, parts: list[str]) -> None:
         if len(parts) >= 4:
             user_id = int(parts[1])
@@ -1,10 +1,10 @@
 # app_helpers.py
 import logging
 
-from jinja2 import Template
 from PyQt5.QtWidgets import QTextBrowser, QLabel, QWidget
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt
+from app.qt.html_cache import CardEntry
 from static.layout_metadata import show_mode_metadata
 
 
@@ -59,6 +59,10 @@ class TitleDisplayFactory:
         animedia_titles_widget.setLayout(animedia_layout)
         return animedia_titles_widget
 
+    def create_poster_grid_widget(self, _titles):
+        """Виртуализированная сетка постеров: строки и постеры модель грузит сама."""
+        return self.app.create_poster_grid()
+
     def create_default_widget(self, title):
         """Создает виджет по умолчанию."""
         return self.app.create_title_browser(title, show_mode='default')
@@ -78,8 +82,13 @@ class TitleDataFactory:
             self.logger.error(f"Error in get_metadata_description: {str(e)}")
             return ""
 
-    def get_titles(self, show_mode='default', title_ids=None, current_offset=0, batch_size=None):
-        """Возвращает данные тайтлов на основе режима отображения."""
+    def get_titles(self, show_mode='default', title_ids=None, current_offset=0, batch_size=None, seek=None,
+                   title_filter=None):
+        """
+        Возвращает данные тайтлов на основе режима отображения.
+        seek — keyset-курсор страницы (core.types.Seek) для режимов, которые листают БД, а не список title_ids.
+        title_filter — core.types.TitleFilter для режима titles_filter_list.
+        """
         try:
             if show_mode not in show_mode_metadata:
                 self.logger.warning(f"Режим отображения {show_mode} не найден. Используется 'default'.")
@@ -94,6 +103,13 @@ class TitleDataFactory:
             if data_fetcher_name == 'system':
                 return self.db_manager.get_statistics_from_db()
 
+            elif data_fetcher_name == 'get_filtered_titles':
+                if title_filter is None:
+                    self.logger.warning(f"Режим {show_mode} без фильтра — пустой список.")
+                    return []
+                return self.db_manager.get_filtered_titles(title_filter, user_id=self.user_id, batch_size=batch_size,
+                                                           offset=current_offset, seek=seek)
+
             elif str(data_fetcher_name) in [str(mode) for mode in pagination_modes]:
                 if current_offset >= len(title_ids):
                     self.logger.warning(
@@ -106,31 +122,41 @@ class TitleDataFactory:
 
                     self.logger.debug(f"Применяем пагинацию: {current_offset}:{end_idx} из {len(title_ids)} title_ids")
 
-                    return self.db_manager.get_titles_from_db(show_all=False, title_ids=page_title_ids, offset=current_offset)
+                    return self.db_manager.get_title_summaries(page_title_ids)
                 else:
-                    return self.db_manager.get_titles_from_db(show_all=False, title_ids=title_ids)
+                    return self.db_manager.get_title_summaries(title_ids)
 
             elif data_fetcher_name and hasattr(self.db_manager, data_fetcher_name):
                 data_fetcher = getattr(self.db_manager, data_fetcher_name)
                 if callable(data_fetcher):
-                    return data_fetcher(batch_size=batch_size, offset=current_offset)
+                    return data_fetcher(batch_size=batch_size, offset=current_offset, seek=seek)
                 else:
                     return []
             elif title_ids:
                 return self.db_manager.get_titles_from_db(show_all=False, offset=current_offset, title_ids=title_ids)
             else:
-                return self.db_manager.get_titles_from_db(show_all=True, batch_size=batch_size, offset=current_offset)
+                return self.db_manager.get_titles_from_db(show_all=True, batch_size=batch_size, offset=current_offset,
+                                                          seek=seek)
 
         except Exception as e:
             self.logger.error(f"Error in get_titles: {str(e)}")
             return []
 
 class TitleHtmlFactory:
+    # Генераторы с побочными эффектами (app.playlists, app.stream_video_url), которые нужно восстановить из кэша
+    EPISODE_GENERATORS = ("_generate_one_title_html", "_generate_default_html")
+
     def __init__(self, app, template_name):
         self.logger = logging.getLogger(__name__)
         self.app = app
         self.current_template = template_name
 
+    def _restore_card_side_effects(self, title, entry):
+        if entry.playlist is not None:
+            self.app.playlists[title.title_id] = entry.playlist
+        if entry.stream_video_url is not None:
+            self.app.stream_video_url = entry.stream_video_url
+
     def generate_html(self, title, show_mode):
         """Генерирует HTML для отображения информации о тайтле в зависимости от show_mode."""
         try:
@@ -146,7 +172,23 @@ class TitleHtmlFactory:
             if not callable(generator):
                 raise ValueError(f"Генератор {generator_name} не является вызываемой функцией.")
 
+            ui_generator = self.app.ui_generator
+            quality = self.app.quality_dropdown.currentText()
+            key = ui_generator.card_cache.make_key(
+                title, self.current_template, quality, show_mode, ui_generator.card_revision(title.title_id))
+            cached = ui_generator.card_cache.get(key)
+            if cached is not None:
+                self._restore_card_side_effects(title, cached)
+                self.logger.debug(f"HTML карточки title_id: {title.title_id} взят из кэша")
+                return cached.html
+
             html_content = generator(title)
+            renders_episodes = generator_name in self.EPISODE_GENERATORS
+            ui_generator.card_cache.put(key, CardEntry(
+                html=html_content,
+                playlist=self.app.playlists.get(title.title_id) if renders_episodes else None,
+                stream_video_url=getattr(title, "host_for_player", None) if renders_episodes else None,
+            ))
             self.logger.debug(f"Генерация HTML завершена для режима: {show_mode}")
             return html_content
 
@@ -172,13 +214,12 @@ class TitleHtmlFactory:
             episodes_html = self.app.ui_generator.generate_episodes_html(title)
             torrents_html = self.app.ui_generator.generate_torrents_html(title)
 
-            _, one_title_html, _, styles_css = self.app.ui_generator.db_manager.get_template(self.current_template)
+            compiled = self.app.ui_generator.template_cache.get(self.current_template)
             poster_html = self.app.ui_generator.generate_poster_html(title, need_placeholder=True)
             reload_poster_html = self.app.ui_generator.generate_reload_poster_html(title)
-            template = Template(one_title_html)
-            html_content = template.render(
+            html_content = compiled.one_title.render(
                 title=title,
-                styles_css=styles_css,
+                styles_css=compiled.styles_css,
                 poster_html=poster_html,
                 reload_poster_html=reload_poster_html,
                 provider_html=provider_html,
@@ -207,11 +248,10 @@ class TitleHtmlFactory:
         try:
             year_html = self.app.ui_generator.generate_year_html(title, show_text_list=True)
             status_html = self.app.ui_generator.generate_status_html(title, show_text_list=True)
-            _, _, show_text_list_html, styles_css = self.app.ui_generator.db_manager.get_template(self.current_template)
-            template = Template(show_text_list_html)
-            html_content = template.render(
+            compiled = self.app.ui_generator.template_cache.get(self.current_template)
+            html_content = compiled.text_list.render(
                 title=title,
-                styles_css=styles_css,
+                styles_css=compiled.styles_css,
                 year_html=year_html,
                 status_html=status_html,
             )
@@ -237,15 +277,14 @@ class TitleHtmlFactory:
             episodes_html = self.app.ui_generator.generate_episodes_html(title)
             torrents_html = self.app.ui_generator.generate_torrents_html(title)
 
-            titles_html, _, _, styles_css = self.app.ui_generator.db_manager.get_template(self.current_template)
+            compiled = self.app.ui_generator.template_cache.get(self.current_template)
             poster_html = self.app.ui_generator.generate_poster_html(title, need_background=True)
             reload_poster_html = self.app.ui_generator.generate_reload_poster_html(title)
             show_more_html = self.app.ui_generator.generate_show_more_html(title.title_id)
 
-            template = Template(titles_html)
-            html_content = template.render(
+            html_content = compiled.titles.render(
                 title=title,
-                styles_css=styles_css,
+                styles_css=compiled.styles_css,
                 poster_html=poster_html,
                 reload_poster_html=reload_poster_html,
                 provider_html=provider_html,
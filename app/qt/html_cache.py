@@ -0,0 +1,136 @@
+# html_cache.py
+import logging
+import threading
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from jinja2 import Template
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Скомпилированные jinja2-шаблоны одной записи таблицы templates."""
+    name: str
+    titles: Optional[Template]
+    one_title: Optional[Template]
+    text_list: Optional[Template]
+    styles_css: Optional[str]
+
+
+class TemplateCache:
+    """
+    Компилирует шаблоны из таблицы templates один раз на имя шаблона.
+    loader — GetManager.get_template-совместимая функция: name -> (titles_html, one_title_html, text_list_html, styles_css).
+    revision — счётчик ревизий шаблонов (DatabaseManager.template_revision); при его смене кэш сбрасывается.
+    """
+
+    def __init__(self, loader: Callable[[str], tuple], revision: Optional[Callable[[], Any]] = None):
+        self.logger = logging.getLogger(__name__)
+        self._loader = loader
+        self._revision = revision
+        self._seen_revision = revision() if revision else None
+        self._compiled: dict[str, CompiledTemplate] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _compile(source: Optional[str]) -> Optional[Template]:
+        return Template(source) if source else None
+
+    def get(self, name: str) -> CompiledTemplate:
+        with self._lock:
+            if self._revision is not None:
+                rev = self._revision()
+                if rev != self._seen_revision:
+                    self._compiled.clear()
+                    self._seen_revision = rev
+
+            compiled = self._compiled.get(name)
+            if compiled is not None:
+                return compiled
+
+            titles_html, one_title_html, text_list_html, styles_css = self._loader(name)
+            compiled = CompiledTemplate(
+                name=name,
+                titles=self._compile(titles_html),
+                one_title=self._compile(one_title_html),
+                text_list=self._compile(text_list_html),
+                styles_css=styles_css,
+            )
+            # Не кэшируем отсутствующий шаблон: он может появиться после initialize_templates
+            if any((compiled.titles, compiled.one_title, compiled.text_list)):
+                self._compiled[name] = compiled
+            self.logger.debug(f"Template '{name}' compiled")
+            return compiled
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._compiled.clear()
+            else:
+                self._compiled.pop(name, None)
+
+
+@dataclass(frozen=True)
+class CardEntry:
+    """Готовый HTML карточки + побочные эффекты рендера, которые нужно восстановить при попадании в кэш."""
+    html: str
+    playlist: Optional[dict] = None
+    stream_video_url: Optional[str] = None
+
+
+class CardHtmlCache:
+    """
+    LRU-кэш HTML карточек тайтлов.
+    Ключ: (title_id, last_updated, template, quality, show_mode, revision) — см. make_key.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, CardEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(title, template_name: str, quality: str, show_mode: str, revision: Any = None) -> tuple:
+        return (
+            getattr(title, "title_id", None),
+            getattr(title, "last_updated", None),
+            template_name,
+            quality,
+            show_mode,
+            revision,
+        )
+
+    def get(self, key: tuple) -> Optional[CardEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, entry: CardEntry) -> None:
+        if not entry.html:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_title(self, title_id: int) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == title_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,292 @@
+# jobs.py
+import itertools
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+ACTIVE_STATES = (JOB_QUEUED, JOB_RUNNING)
+
+# Типы задач (kind) — для инспектора и массовой отмены
+JOB_SCHEDULE = "schedule"
+JOB_TITLE = "title"
+JOB_SEARCH = "search"
+JOB_RANDOM = "random"
+
+
+class JobCancelled(Exception):
+    """Задача отменена: бросается из JobContext.check() внутри рабочего потока."""
+
+
+@dataclass
+class Job:
+    job_id: int
+    kind: str
+    key: str
+    label: str
+    state: str = JOB_QUEUED
+    done: int = 0
+    total: int = 0
+    message: str = ""
+    error: Optional[str] = None
+    coalesced: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        start = self.started_at or self.created_at
+        end = self.finished_at or time.monotonic()
+        return max(0.0, end - start)
+
+
+@dataclass
+class _JobCallbacks:
+    on_partial: Optional[Callable[[Any], None]] = None
+    on_finished: Optional[Callable[[Any], None]] = None
+    on_error: Optional[Callable[[str], None]] = None
+    on_done: list[Callable[[Job], None]] = field(default_factory=list)
+
+
+class JobContext:
+    """Передаётся функции задачи в рабочем потоке: прогресс, частичные результаты, проверка отмены."""
+
+    def __init__(self, job: Job, signals: "JobSignals"):
+        self._job = job
+        self._signals = signals
+
+    @property
+    def cancelled(self) -> bool:
+        return self._job.cancel_requested
+
+    def check(self) -> None:
+        if self._job.cancel_requested:
+            raise JobCancelled(self._job.key)
+
+    def progress(self, done: int, total: Optional[int] = None, message: str = "") -> None:
+        total = self._job.total if total is None else total
+        self._signals.progress.emit(self._job.job_id, int(done), int(total or 0), message)
+
+    def partial(self, item: Any) -> None:
+        """Отдать готовую часть результата в UI-поток, не дожидаясь конца задачи."""
+        self._signals.partial.emit(self._job.job_id, item)
+
+
+class JobSignals(QObject):
+    """Сигналы из рабочих потоков; принимает JobManager в UI-потоке (queued connection)."""
+    started = pyqtSignal(int)
+    progress = pyqtSignal(int, int, int, str)  # job_id, done, total, message
+    partial = pyqtSignal(int, object)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    cancelled = pyqtSignal(int)
+
+
+class JobRunnable(QRunnable):
+    """Обёртка над функцией задачи для QThreadPool."""
+
+    def __init__(self, job: Job, fn: Callable[[JobContext], Any], signals: JobSignals):
+        super().__init__()
+        self.job = job
+        self.fn = fn
+        self.signals = signals
+
+    def run(self):
+        job_id = self.job.job_id
+        if self.job.cancel_requested:
+            self.signals.cancelled.emit(job_id)
+            return
+
+        self.signals.started.emit(job_id)
+        try:
+            result = self.fn(JobContext(self.job, self.signals))
+        except JobCancelled:
+            self.signals.cancelled.emit(job_id)
+        except Exception as e:
+            self.signals.failed.emit(job_id, str(e) or type(e).__name__)
+        else:
+            if self.job.cancel_requested:
+                self.signals.cancelled.emit(job_id)
+            else:
+                self.signals.finished.emit(job_id, result)
+
+
+class JobManager(QObject):
+    """
+    Фоновые задачи поверх общего QThreadPool приложения.
+    Функция задачи выполняется в рабочем потоке и не трогает виджеты; все колбэки
+    (on_partial/on_finished/on_error/on_done) вызываются в UI-потоке.
+    Повторный submit с ключом активной задачи не создаёт новую — возвращается существующая.
+    """
+    jobsChanged = pyqtSignal()
+
+    def __init__(self, thread_pool, history_size: int = 50, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self.thread_pool = thread_pool
+        self.history_size = history_size
+        self._ids = itertools.count(1)
+        self._jobs: OrderedDict[int, Job] = OrderedDict()
+        self._callbacks: dict[int, _JobCallbacks] = {}
+        self._active_by_key: dict[str, int] = {}
+
+        self.signals = JobSignals()
+        self.signals.started.connect(self._on_started)
+        self.signals.progress.connect(self._on_progress)
+        self.signals.partial.connect(self._on_partial)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+        self.signals.cancelled.connect(self._on_cancelled)
+
+    def submit(self, kind: str, key: str, fn: Callable[[JobContext], Any], *, label: Optional[str] = None,
+               total: int = 0, on_partial=None, on_finished=None, on_error=None, on_done=None) -> Job:
+        active_id = self._active_by_key.get(key)
+        if active_id is not None:
+            job = self._jobs[active_id]
+            job.coalesced += 1
+            self.logger.debug(f"Job {key} already {job.state} (#{job.job_id}), request coalesced")
+            self.jobsChanged.emit()
+            return job
+
+        job = Job(job_id=next(self._ids), kind=kind, key=key, label=label or key, total=total)
+        self._jobs[job.job_id] = job
+        self._callbacks[job.job_id] = _JobCallbacks(on_partial, on_finished, on_error, [on_done] if on_done else [])
+        self._active_by_key[key] = job.job_id
+        self._trim_history()
+
+        self.logger.debug(f"Job #{job.job_id} {key} queued")
+        self.thread_pool.start(JobRunnable(job, fn, self.signals))
+        self.jobsChanged.emit()
+        return job
+
+    def when_done(self, job: Job, callback: Callable[[Job], None]) -> None:
+        """Подписка на завершение (в т.ч. склеенной) задачи; результат получает только исходный submit."""
+        callbacks = self._callbacks.get(job.job_id)
+        if callbacks is None:
+            callback(job)
+        else:
+            callbacks.on_done.append(callback)
+
+    def cancel(self, job_id: int) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or not job.is_active:
+            return False
+        job._cancel.set()
+        self.logger.info(f"Job #{job_id} {job.key} cancel requested")
+        self.jobsChanged.emit()
+        return True
+
+    def cancel_all(self, kind: Optional[str] = None) -> int:
+        ids = [j.job_id for j in self._jobs.values() if j.is_active and (kind is None or j.kind == kind)]
+        return sum(1 for job_id in ids if self.cancel(job_id))
+
+    def get(self, job_id: int) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def active_job(self, key: str) -> Optional[Job]:
+        job_id = self._active_by_key.get(key)
+        return self._jobs.get(job_id) if job_id is not None else None
+
+    def jobs(self) -> list[Job]:
+        """Снимок для инспектора: активные сверху, дальше завершённые от новых к старым."""
+        items = list(reversed(self._jobs.values()))
+        return [j for j in items if j.is_active] + [j for j in items if not j.is_active]
+
+    def active_count(self) -> int:
+        return len(self._active_by_key)
+
+    def _trim_history(self):
+        finished = [job_id for job_id, j in self._jobs.items() if not j.is_active]
+        for job_id in finished[:max(0, len(self._jobs) - self.history_size)]:
+            del self._jobs[job_id]
+
+    def _complete(self, job_id: int, state: str, *, result=None, error: Optional[str] = None):
+        job = self._jobs.get(job_id)
+        if job is None or not job.is_active:
+            return
+        job.state = state
+        job.error = error
+        job.finished_at = time.monotonic()
+        if self._active_by_key.get(job.key) == job_id:
+            del self._active_by_key[job.key]
+        callbacks = self._callbacks.pop(job_id, _JobCallbacks())
+
+        self.logger.debug(f"Job #{job_id} {job.key} {state} in {job.elapsed:.2f}s")
+        try:
+            if state == JOB_DONE and callbacks.on_finished:
+                callbacks.on_finished(result)
+            elif state == JOB_FAILED and callbacks.on_error:
+                callbacks.on_error(error or "")
+        except Exception as e:
+            self.logger.error(f"Job #{job_id} {job.key} callback error: {e}")
+        finally:
+            for on_done in callbacks.on_done:
+                try:
+                    on_done(job)
+                except Exception as e:
+                    self.logger.error(f"Job #{job_id} {job.key} on_done error: {e}")
+            self.jobsChanged.emit()
+
+    @pyqtSlot(int)
+    def _on_started(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None and job.state == JOB_QUEUED:
+            job.state = JOB_RUNNING
+            job.started_at = time.monotonic()
+            self.jobsChanged.emit()
+
+    @pyqtSlot(int, int, int, str)
+    def _on_progress(self, job_id, done, total, message):
+        job = self._jobs.get(job_id)
+        if job is not None and job.is_active:
+            job.done, job.total, job.message = done, total, message
+            self.jobsChanged.emit()
+
+    @pyqtSlot(int, object)
+    def _on_partial(self, job_id, item):
+        job = self._jobs.get(job_id)
+        callbacks = self._callbacks.get(job_id)
+        # После отмены частичные результаты в UI не применяем
+        if job is None or not job.is_active or job.cancel_requested or callbacks is None:
+            return
+        if callbacks.on_partial:
+            try:
+                callbacks.on_partial(item)
+            except Exception as e:
+                self.logger.error(f"Job #{job_id} {job.key} partial handler error: {e}")
+
+    @pyqtSlot(int, object)
+    def _on_finished(self, job_id, result):
+        self._complete(job_id, JOB_DONE, result=result)
+
+    @pyqtSlot(int, str)
+    def _on_failed(self, job_id, error):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            self.logger.error(f"Job #{job_id} {job.key} failed: {error}")
+        self._complete(job_id, JOB_FAILED, error=error)
+
+    @pyqtSlot(int)
+    def _on_cancelled(self, job_id):
+        self._complete(job_id, JOB_CANCELLED)
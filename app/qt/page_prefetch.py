@@ -0,0 +1,136 @@
+# page_prefetch.py
+"""
+Предзагрузка соседних страниц постраничных списков тайтлов.
+
+Когда страница показана, app ставит в очередь соседние (следующую и предыдущую) — PageKey с теми же
+аргументами, с которыми display_titles их запросит. Рабочий поток (отдельный QThreadPool на один поток
+и собственная сессия GetManager: общая сессия DatabaseManager не потокобезопасна) грузит тайтлы,
+контекст карточек и постеры в ограниченный LRU. Переход на страницу — take() из кэша без запросов к БД.
+Ключ содержит data_revision базы, поэтому после записи старые страницы просто перестают совпадать.
+seek (keyset-курсор, core.types.Seek) в ключ не входит: это лишь способ дочитать ту же страницу.
+title_filter (core.types.TitleFilter режима titles_filter_list) входит: другой фильтр — другая страница.
+"""
+import logging
+import threading
+
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Callable, Iterable, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from core.types import Seek, TitleFilter
+
+
+PAGE_CACHE_SIZE = 6  # текущая ± соседние для пары последних страниц
+
+
+@dataclass(frozen=True)
+class PageKey:
+    show_mode: str
+    title_ids: Optional[tuple]
+    offset: int
+    batch_size: Optional[int]
+    revision: int = 0
+    title_filter: Optional[TitleFilter] = None
+    seek: Optional[Seek] = field(default=None, compare=False)
+
+    def at(self, offset: int, seek: Optional[Seek] = None) -> "PageKey":
+        return replace(self, offset=offset, seek=seek)
+
+
+@dataclass
+class PrefetchedPage:
+    titles: list
+    context: dict = field(default_factory=dict)    # get_title_cards_context страницы
+    posters: dict = field(default_factory=dict)    # {title_id: (blob, updated)}
+    revisions: dict = field(default_factory=dict)  # {title_id: ревизия тайтла на момент загрузки}
+
+
+LoadPage = Callable[[PageKey], PrefetchedPage]
+
+
+class _PrefetchTask(QRunnable):
+    def __init__(self, prefetcher: "PagePrefetcher", key: PageKey):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.key = key
+
+    def run(self):
+        self.prefetcher._load(self.key)
+
+
+class PagePrefetcher(QObject):
+    pageReady = pyqtSignal(object)  # PageKey; доставляется в UI-поток
+
+    def __init__(self, load_page: LoadPage, capacity: int = PAGE_CACHE_SIZE,
+                 pool: Optional[QThreadPool] = None, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self._load_page = load_page
+        self.capacity = capacity
+        if pool is None:
+            pool = QThreadPool(self)
+            pool.setMaxThreadCount(1)
+        self._pool = pool
+        self._lock = threading.Lock()
+        self._pages: OrderedDict[PageKey, PrefetchedPage] = OrderedDict()
+        self._inflight: set[PageKey] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def take(self, key: PageKey) -> Optional[PrefetchedPage]:
+        """Страница из кэша (остаётся в нём: листание туда-обратно — тоже попадание) или None."""
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+        self.logger.debug(f"Page prefetch hit: {key.show_mode} offset={key.offset} (hits={self.hits}, "
+                          f"misses={self.misses})")
+        return page
+
+    def put(self, key: PageKey, page: PrefetchedPage) -> None:
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.capacity:
+                self._pages.popitem(last=False)
+
+    def prefetch(self, keys: Iterable[PageKey]) -> None:
+        for key in keys:
+            with self._lock:
+                if key in self._pages or key in self._inflight:
+                    continue
+                self._inflight.add(key)
+            self._pool.start(_PrefetchTask(self, key))
+
+    def poster(self, title_id: int, revision) -> Optional[tuple]:
+        """(blob, updated) из предзагруженной страницы, если тайтл с тех пор не менялся."""
+        with self._lock:
+            for page in reversed(self._pages.values()):
+                entry = page.posters.get(title_id)
+                if entry is not None and page.revisions.get(title_id) == revision:
+                    return entry
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    def _load(self, key: PageKey) -> None:
+        """Рабочий поток."""
+        try:
+            page = self._load_page(key)
+        except Exception as e:
+            self.logger.warning(f"Page prefetch failed for {key.show_mode} offset={key.offset}: {e}")
+            return
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+        if page is None:
+            return
+        self.put(key, page)
+        self.pageReady.emit(key)
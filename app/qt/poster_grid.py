@@ -0,0 +1,287 @@
+# poster_grid.py
+"""
+Виртуализированная сетка постеров библиотеки (model/view вместо QTextBrowser на каждый тайтл).
+
+PosterGridModel — строки тайтлов грузятся окнами через canFetchMore/fetchMore: QListView сам
+просит следующее окно, когда прокрутка доходит до конца (бесконечная прокрутка без страниц).
+Окна только дописываются в конец, поэтому следующее читается keyset'ом после последнего title_id.
+Постеры запрашиваются только из data() — т.е. для карточек, которые реально рисуются;
+blob'ы берутся из БД пачкой в UI-потоке, декодирование и масштабирование — в QThreadPool,
+готовые QPixmap лежат в ограниченном LRU.
+PosterCardDelegate рисует карточку сам: виджетов на элемент нет, QListView переиспользует отрисовку.
+"""
+import logging
+
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from PyQt5.QtCore import (Qt, QAbstractListModel, QModelIndex, QObject, QRect, QRunnable, QSize,
+                          QThreadPool, QTimer, pyqtSignal)
+from PyQt5.QtGui import QColor, QImage, QPixmap
+from PyQt5.QtWidgets import QListView, QStyle, QStyledItemDelegate
+
+from core.types import Seek
+
+
+WINDOW_SIZE = 60          # строк тайтлов за один fetchMore
+PIXMAP_CACHE_SIZE = 240   # готовых постеров в памяти (~180 KB каждый)
+POSTER_SIZE = QSize(180, 255)
+CARD_SIZE = QSize(196, 310)
+TEXT_HEIGHT = CARD_SIZE.height() - POSTER_SIZE.height() - 12
+
+TITLE_ID_ROLE = Qt.UserRole + 1
+YEAR_ROLE = Qt.UserRole + 2
+
+# (offset, limit, seek) -> [(title_id, name_ru, name_en, season_year), ...]; seek — после последней строки
+LoadWindow = Callable[[int, int, Optional[Seek]], list]
+# title_ids -> {title_id: blob}
+LoadPosters = Callable[[list], dict]
+# bytes -> PNG bytes для форматов, которых нет в плагинах Qt (webp); зовётся из рабочего потока — без QPixmap
+Convert = Callable[[bytes], Optional[bytes]]
+
+
+class _DecodeSignals(QObject):
+    decoded = pyqtSignal(int, QImage)
+    failed = pyqtSignal(int)
+
+
+class _DecodeTask(QRunnable):
+    """Рабочий поток: bytes -> QImage нужного размера (QImage, в отличие от QPixmap, потокобезопасен)."""
+
+    def __init__(self, blobs: dict, size: QSize, signals: _DecodeSignals, convert: Optional[Convert] = None):
+        super().__init__()
+        self.blobs = blobs
+        self.size = size
+        self.signals = signals
+        self.convert = convert
+
+    def run(self):
+        for title_id, blob in self.blobs.items():
+            image = QImage.fromData(blob)
+            if image.isNull() and self.convert is not None:
+                try:
+                    converted = self.convert(blob)
+                except Exception:
+                    converted = None
+                if converted:
+                    image = QImage.fromData(converted)
+            if image.isNull():
+                self.signals.failed.emit(title_id)
+                continue
+            self.signals.decoded.emit(title_id, image.scaled(
+                self.size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation))
+
+
+class PosterGridModel(QAbstractListModel):
+    def __init__(self, load_window: LoadWindow, load_posters: LoadPosters, parent=None,
+                 window_size: int = WINDOW_SIZE, cache_size: int = PIXMAP_CACHE_SIZE,
+                 pool: Optional[QThreadPool] = None, convert: Optional[Convert] = None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self._load_window = load_window
+        self._load_posters = load_posters
+        self.window_size = window_size
+        self.cache_size = cache_size
+        self._pool = pool or QThreadPool.globalInstance()
+        self._convert = convert
+        self._rows: list[tuple] = []
+        self._row_by_id: dict[int, int] = {}
+        self._exhausted = False
+        self._pixmaps: OrderedDict[int, QPixmap] = OrderedDict()
+        self._pending: set[int] = set()    # ушли на декодирование
+        self._missing: set[int] = set()    # постера в БД нет/битый — не спрашиваем повторно
+        self._wanted: list[int] = []       # запрошены отрисовкой, ждут пачки
+        self._signals = _DecodeSignals(self)
+        self._signals.decoded.connect(self._on_decoded)
+        self._signals.failed.connect(self._on_failed)
+        self._flush_timer = QTimer(self)  # склеивает запросы постеров одного кадра в одну пачку
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self._flush_poster_requests)
+
+    # --- строки -------------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        seek = Seek(after_id=self._rows[-1][0]) if self._rows else None
+        rows = self._load_window(len(self._rows), self.window_size, seek) or []
+        if len(rows) < self.window_size:
+            self._exhausted = True
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for i, row in enumerate(rows, start=first):
+            self._rows.append(row)
+            self._row_by_id[row[0]] = i
+        self.endInsertRows()
+        self.logger.debug(f"Poster grid: loaded rows {first}..{first + len(rows) - 1}")
+
+    def reload(self):
+        """Данные библиотеки изменились: строки заново, постеры, что уже в кэше, остаются."""
+        self.beginResetModel()
+        self._rows.clear()
+        self._row_by_id.clear()
+        self._exhausted = False
+        self._missing.clear()
+        self.endResetModel()
+
+    def title_id_at(self, row: int) -> Optional[int]:
+        return self._rows[row][0] if 0 <= row < len(self._rows) else None
+
+    # --- данные -------------------------------------------------------------
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        title_id, name_ru, name_en, year = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return name_ru or name_en or str(title_id)
+        if role == Qt.ToolTipRole:
+            return "\n".join(x for x in (name_ru, name_en) if x)
+        if role == TITLE_ID_ROLE:
+            return title_id
+        if role == YEAR_ROLE:
+            return year
+        if role == Qt.DecorationRole:
+            return self._pixmap(title_id)
+        return None
+
+    def _pixmap(self, title_id: int) -> Optional[QPixmap]:
+        pixmap = self._pixmaps.get(title_id)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(title_id)
+            return pixmap
+        if title_id not in self._pending and title_id not in self._missing:
+            self._pending.add(title_id)
+            self._wanted.append(title_id)
+            self._flush_timer.start()
+        return None
+
+    def _flush_poster_requests(self):
+        wanted, self._wanted = self._wanted, []
+        if not wanted:
+            return
+        try:
+            blobs = self._load_posters(wanted) or {}
+        except Exception as e:
+            self.logger.error(f"Poster grid: failed to load posters: {e}")
+            blobs = {}
+        for title_id in wanted:
+            if title_id not in blobs:
+                self._pending.discard(title_id)
+                self._missing.add(title_id)
+        if blobs:
+            self._pool.start(_DecodeTask(blobs, POSTER_SIZE, self._signals, self._convert))
+
+    def _on_decoded(self, title_id: int, image: QImage):
+        self._pending.discard(title_id)
+        self._pixmaps[title_id] = QPixmap.fromImage(image)
+        self._pixmaps.move_to_end(title_id)
+        while len(self._pixmaps) > self.cache_size:
+            self._pixmaps.popitem(last=False)
+        self._emit_changed(title_id)
+
+    def _on_failed(self, title_id: int):
+        self._pending.discard(title_id)
+        self._missing.add(title_id)
+
+    def _emit_changed(self, title_id: int):
+        row = self._row_by_id.get(title_id)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def forget_posters(self, title_ids: Iterable[int]):
+        """Постеры перекачаны — при следующей отрисовке взять из БД заново."""
+        for title_id in title_ids:
+            self._pixmaps.pop(title_id, None)
+            self._missing.discard(title_id)
+            self._emit_changed(title_id)
+
+
+class PosterCardDelegate(QStyledItemDelegate):
+    """Карточка: постер + название в две строки + год. Фиксированный размер — uniformItemSizes."""
+
+    PLACEHOLDER = QColor(120, 120, 120, 90)
+
+    def sizeHint(self, option, index):
+        return CARD_SIZE
+
+    def paint(self, painter, option, index):
+        painter.save()
+        try:
+            rect = option.rect
+            if option.state & QStyle.State_MouseOver:
+                painter.fillRect(rect, option.palette.highlight().color().lighter(170))
+
+            poster_rect = QRect(rect.x() + (rect.width() - POSTER_SIZE.width()) // 2, rect.y() + 4,
+                                POSTER_SIZE.width(), POSTER_SIZE.height())
+            pixmap = index.data(Qt.DecorationRole)
+            if pixmap is not None:
+                # KeepAspectRatioByExpanding: рисуем центр картинки
+                source = QRect((pixmap.width() - poster_rect.width()) // 2,
+                               (pixmap.height() - poster_rect.height()) // 2,
+                               poster_rect.width(), poster_rect.height())
+                painter.drawPixmap(poster_rect, pixmap, source)
+            else:
+                painter.fillRect(poster_rect, self.PLACEHOLDER)
+
+            text_rect = QRect(rect.x() + 4, poster_rect.bottom() + 6, rect.width() - 8, TEXT_HEIGHT)
+            title = index.data(Qt.DisplayRole) or ""
+            year = index.data(YEAR_ROLE)
+            metrics = option.fontMetrics
+            line_h = metrics.height()
+            lines = self._two_lines(title, metrics, text_rect.width())
+            painter.setPen(option.palette.text().color())
+            for i, line in enumerate(lines):
+                painter.drawText(QRect(text_rect.x(), text_rect.y() + i * line_h, text_rect.width(), line_h),
+                                 Qt.AlignHCenter | Qt.AlignVCenter, line)
+            if year:
+                painter.setPen(option.palette.placeholderText().color())
+                painter.drawText(QRect(text_rect.x(), text_rect.y() + 2 * line_h, text_rect.width(), line_h),
+                                 Qt.AlignHCenter | Qt.AlignVCenter, str(year))
+        finally:
+            painter.restore()
+
+    @staticmethod
+    def _two_lines(text, metrics, width):
+        words, first = text.split(), ""
+        while words and metrics.horizontalAdvance(f"{first} {words[0]}".strip()) <= width:
+            first = f"{first} {words.pop(0)}".strip()
+        if not first:  # одно длинное слово
+            return [metrics.elidedText(text, Qt.ElideRight, width)]
+        rest = " ".join(words)
+        return [first, metrics.elidedText(rest, Qt.ElideRight, width)] if rest else [first]
+
+
+class PosterGridView(QListView):
+    titleActivated = pyqtSignal(int)
+
+    def __init__(self, model: PosterGridModel, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(model.window_size)
+        self.setSpacing(6)
+        self.setWrapping(True)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(24)
+        self.setSelectionMode(QListView.NoSelection)
+        self.setMouseTracking(True)
+        self.setItemDelegate(PosterCardDelegate(self))
+        self.setModel(model)
+        self.clicked.connect(self._on_clicked)
+
+    def _on_clicked(self, index):
+        title_id = index.data(TITLE_ID_ROLE)
+        if title_id is not None:
+            self.titleActivated.emit(int(title_id))
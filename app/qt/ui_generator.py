@@ -10,6 +10,7 @@ from PyQt5.QtWidgets import QHBoxLayout
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import QByteArray, QBuffer
 from app.qt.app_helpers import TitleBrowserFactory, TitleHtmlFactory
+from app.qt.html_cache import TemplateCache, CardHtmlCache
 from utils.media.image_manager import guess_mime, convert_image
 
 
@@ -19,6 +20,14 @@ class UIGenerator:
         self.app = app
         self.db_manager = db_manager
         self.current_template = template_name
+        self.template_cache = TemplateCache(
+            db_manager.get_template,
+            revision=lambda: getattr(db_manager, "template_revision", 0),
+        )
+        self.card_cache = CardHtmlCache()
+        # View-model текущей страницы: title_ids и лениво загружаемый контекст карточек
+        self._page_title_ids = []
+        self._page_context = None
         self.title_html_factory = TitleHtmlFactory(app, self.current_template)
         self.title_browser_factory = TitleBrowserFactory(app)
         self.blank_spase = '&nbsp;'
@@ -55,10 +64,40 @@ class UIGenerator:
         """
         return self.title_html_factory.generate_html(title, show_mode)
 
+    def prepare_page(self, titles, context=None):
+        """
+        Запоминает тайтлы страницы; контекст карточек грузится одним батчем при первом промахе кэша
+        (или уже загружен предзагрузкой страниц — context).
+        """
+        self._page_title_ids = [t.title_id for t in titles or [] if getattr(t, "title_id", None) is not None]
+        self._page_context = context
+
+    def is_on_page(self, title_id):
+        return title_id in self._page_title_ids
+
+    def card_revision(self, title_id):
+        """Ревизия данных карточки для ключа CardHtmlCache."""
+        return (getattr(self.db_manager, "template_revision", 0),) + tuple(
+            self.db_manager.get_title_revision(title_id))
+
+    def _card_context(self, title_id):
+        """Контекст карточки из батча страницы или None (тогда генераторы идут в БД по-старому)."""
+        if title_id not in self._page_title_ids:
+            return None
+        if self._page_context is None:
+            self._page_context = self.db_manager.get_title_cards_context(self._page_title_ids) or {}
+        return self._page_context.get(title_id)
+
+    def _history_state(self, title_id):
+        """Статусы history тайтла; для тайтла страницы первый вызов грузит карту всей страницы одним запросом."""
+        title_ids = self._page_title_ids if title_id in self._page_title_ids else [title_id]
+        return self.db_manager.get_history_map(self.app.user_id, title_ids)[title_id]
+
     def generate_provider_html(self, title_id):
         """Generates HTML to display provider"""
         try:
-            provider = self.db_manager.get_provider_by_title_id(title_id)
+            ctx = self._card_context(title_id)
+            provider = ctx['provider'] if ctx else self.db_manager.get_provider_by_title_id(title_id)
             provider_link = provider.lower()
             html = f'<span class="decorate_name">{provider}<span>'
             html_link = f'{self.blank_spase}<a href="filter_by_provider/{provider_link}" title="Filter by Provider">{html}</a>{self.blank_spase}'
@@ -68,11 +107,47 @@ class UIGenerator:
             self.logger.error(error_message)
             return ""
 
+    def generate_filter_sidebar_html(self, title_filter, facets):
+        """
+        Панель фильтров режима titles_filter_list: выбранные значения отмечены, у остальных — сколько
+        тайтлов будет в списке (для годов и статусов — если выбрать ещё и это значение).
+        """
+        try:
+            headers = (('status', 'Статус'), ('year', 'Год'), ('genre', 'Жанры'))
+            parts = ['<p><a href="filter_clear/all" title="Reset filters">✖ Сбросить фильтры</a></p>']
+            mark = '☑' if title_filter.not_watched else '☐'
+            parts.append(f'<p><a href="filter_toggle/not_watched/1" title="Only not watched">{mark} Не просмотрено</a></p>')
+            for facet, caption, value in (('provider', 'Провайдер', title_filter.provider_code),
+                                          ('team_member', 'Команда', title_filter.team_member)):
+                if value:
+                    parts.append(f'<p>{caption}: <a href="filter_toggle/{facet}/{quote(value, safe="")}" '
+                                 f'title="Remove filter">☑ {html.escape(value)}</a></p>')
+            for facet, caption in headers:
+                rows = facets.get(facet) or []
+                if facet == 'year':
+                    rows = sorted(rows, reverse=True)
+                items = []
+                for value, label, count in rows:
+                    label = html.escape(label or str(value))
+                    link = f'filter_toggle/{facet}/{value}'
+                    if title_filter.has(facet, value):
+                        items.append(f'<b><a href="{link}" title="Remove filter">☑ {label}</a></b> ({count})')
+                    elif count:
+                        items.append(f'<a href="{link}" title="Add filter">{label}</a> ({count})')
+                if items:
+                    parts.append(f'<p><b>{caption}</b><br>{"<br>".join(items)}</p>')
+            return ''.join(parts)
+        except Exception as e:
+            error_message = f"Error in generate_filter_sidebar_html: {str(e)}"
+            self.logger.error(error_message)
+            return ""
+
     def generate_studio_html(self, title_id):
         """Generates HTML to display studio"""
         try:
             # TODO: Add filtering here
-            studio = self.db_manager.get_studio_by_title_id(title_id)
+            ctx = self._card_context(title_id)
+            studio = ctx['studio'] if ctx else self.db_manager.get_studio_by_title_id(title_id)
             if studio:
                 html = f'<p>Студия: {studio}{self.blank_spase}</p>'
             else:
@@ -108,13 +183,19 @@ class UIGenerator:
     def generate_rating_html(self, title):
         """Generates HTML to display ratings and allows updating"""
         try:
-            ratings = self.db_manager.get_rating_from_db(title.title_id)
+            ctx = self._card_context(title.title_id)
+            if ctx:
+                has_rating = ctx['rating_value'] is not None
+                rating_name, rating_value = ctx['rating_name'], ctx['rating_value']
+            else:
+                ratings = self.db_manager.get_rating_from_db(title.title_id)
+                has_rating = ratings is not None
+                if ratings:
+                    rating_name, rating_value = ratings.rating_name, ratings.rating_value
             rating_icons = []
             image_html_full = f"""★"""
             image_html_blank = f"""☆"""
-            if ratings:
-                rating_name = ratings.rating_name
-                rating_value = ratings.rating_value
+            if has_rating:
                 for i in range(self.max_rating):
                     if i < rating_value:
                         rating_icons.append(
@@ -150,7 +231,7 @@ class UIGenerator:
             user_id = self.app.user_id
 
             if torrent_id:
-                _, is_download = self.db_manager.get_history_status(user_id, title_id, torrent_id=torrent_id)
+                _, is_download = self._history_state(title_id).status(torrent_id=torrent_id)
                 self.logger.debug(
                     f"user_id/title_id/torrent_id: {user_id}/{title_id}/{torrent_id} Status: {bool(is_download)}")
                 if is_download:
@@ -171,7 +252,7 @@ class UIGenerator:
             # TODO: fix it later
             user_id = self.app.user_id
 
-            all_watched = self.db_manager.get_all_episodes_watched_status(user_id, title_id)
+            all_watched = self._history_state(title_id).all_episodes_watched
             self.logger.debug(f"user_id/title_id/episode_ids: {user_id}/{title_id}/{len(episode_ids)} Status: {bool(all_watched)}")
             if all_watched:
                 return f'<a href="set_watch_all_episodes_status/{user_id}/{title_id}/{episode_ids}" title="Set watch all episodes">{image_html_green}</a>'
@@ -190,7 +271,7 @@ class UIGenerator:
             user_id = self.app.user_id
 
             if title_id:
-                is_need_to_see = self.db_manager.get_need_to_see(user_id, title_id)
+                is_need_to_see = self._history_state(title_id).need_to_see
                 self.logger.debug(f"user_id/title_id : {user_id}/{title_id} Status: {bool(is_need_to_see)}")
                 if is_need_to_see:
                     return f'<a href="set_need_to_see/{user_id}/{title_id}" title="Set need to see">{image_html_green}</a>'
@@ -210,7 +291,7 @@ class UIGenerator:
             user_id = self.app.user_id
 
             if episode_id or title_id:
-                is_watched, _ = self.db_manager.get_history_status(user_id, title_id, episode_id=episode_id)
+                is_watched, _ = self._history_state(title_id).status(episode_id=episode_id)
                 self.logger.debug(f"user_id/title_id/episode_id: {user_id}/{title_id}/{episode_id} Status: {bool(is_watched)}")
                 if is_watched:
                     return f'<a href="set_watch_status/{user_id}/{title_id}/{episode_id}" title="Set watch status">{image_html_green}</a>'
@@ -336,7 +417,8 @@ class UIGenerator:
     def generate_team_html(self, title):
         """Генерирует HTML для отображения team_data с поддержкой кликабельных ссылок и разбивкой по ролям."""
         try:
-            team_data = self.db_manager.get_team_from_db(title.title_id)
+            ctx = self._card_context(title.title_id)
+            team_data = ctx['team'] if ctx else self.db_manager.get_team_from_db(title.title_id)
             if team_data:
                 try:
                     role_translation = {
@@ -519,7 +601,6 @@ class UIGenerator:
                     "skip_ending": episode.skips_ending if episode.skips_ending else []
                 })
             global_skip_data_encoded = base64.urlsafe_b64encode(json.dumps(global_skip_data).encode()).decode()
-            play_all_html = self.generate_play_all_html(title, global_skip_data_encoded)
 
             for i, episode in enumerate(title.episodes):
                 name = (episode.name or "").strip()
@@ -565,6 +646,15 @@ class UIGenerator:
                         f"Нет ссылки для эпизода '{episode_name}' для выбранного качества '{selected_quality}'"
                     )
 
+            sanitized_name = self.app.sanitize_filename(title.code)
+            # Плейлист регистрируем до ссылки "Play all", иначе bundle появляется только со второго рендера
+            if episode_links:
+                self.app.playlists[title.title_id] = {
+                    **self.app.playlists.get(title.title_id, {}),
+                    'links': [link for _, _, link, _ in episode_links],
+                    'sanitized_title': sanitized_name
+                }
+            play_all_html = self.generate_play_all_html(title, global_skip_data_encoded)
             watch_all_episodes_html = self.generate_watch_all_episodes_html(title.title_id, episode_ids)
 
             if episode_links:
@@ -598,15 +688,8 @@ class UIGenerator:
                     f'<li>Нет доступных ссылок для выбранного качества: {selected_quality}</li></ul>'
                 )
 
-            sanitized_name = self.app.sanitize_filename(title.code)
             self.app.sanitized_titles.append(sanitized_name)
 
-            if self.app.discovered_links:
-                self.app.playlists[title.title_id] = {
-                    'links': list(self.app.discovered_links),
-                    'sanitized_title': sanitized_name
-                }
-
             self.logger.debug(f"discovered_links: {len(self.app.discovered_links)}")
             self.logger.debug(f"sanitized_name: {sanitized_name}")
             return episodes_html
@@ -8,6 +8,8 @@ class UIManager:
     def __init__(self, parent, qss_raw_styles=None):
         self.parent = parent
         self.loading_dialog = LoadingDialog(self.parent)
+        self._modal_loader = False   # show_loader: лоадер открыт вызывающим, прячет его hide_loader
+        self._progress_text = None   # show_progress: есть фоновые задачи, прячет hide_progress
         self.parent_widgets = {}
         self.qss_raw = qss_raw_styles
         def block(name: str) -> str:
@@ -288,13 +290,37 @@ class UIManager:
 
     def show_loader(self, message="Loading..."):
         """Показывает анимированный лоадер"""
+        self._modal_loader = True
         self.loading_dialog.label.setText(message)
+        self.loading_dialog.setModal(True)
         self.loading_dialog.start()
 
+    def show_progress(self, message):
+        """
+        Немодальный индикатор фоновых задач: окно остаётся доступным для ввода.
+        Открытый модальный лоадер не подменяется — индикатор покажется, когда его спрячут.
+        """
+        self._progress_text = message
+        if self._modal_loader:
+            return
+        self.loading_dialog.label.setText(message)
+        self.loading_dialog.setModal(False)
+        self.loading_dialog.show()
+
     def hide_loader(self):
-        """Скрывает лоадер"""
+        """Скрывает лоадер; если фоновые задачи ещё идут, остаётся их индикатор."""
+        self._modal_loader = False
+        if self._progress_text is not None:
+            self.show_progress(self._progress_text)
+            return
         self.loading_dialog.stop()
 
+    def hide_progress(self):
+        """Фоновых задач больше нет: прячет только свой индикатор, модальный лоадер остаётся."""
+        self._progress_text = None
+        if not self._modal_loader:
+            self.loading_dialog.stop()
+
     def set_buttons_enabled(self, enabled):
         """Включает или выключает все кнопки в UI"""
         for widget in self.parent.findChildren(QPushButton):
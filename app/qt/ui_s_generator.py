@@ -1,5 +1,7 @@
 # ui_s_generator.py
+import html
 import logging
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QTextBrowser, QVBoxLayout, QWidget, QLineEdit, QPushButton, QHBoxLayout, QComboBox
 
 from utils.runtime.runtime_manager import restart_application, LogWindow
@@ -78,6 +80,16 @@ class UISGenerator:
         self.studio_input = None
         self.delete_title_input = None
         self.delete_title_button = None
+        self.system_browser = None
+        self._statistics = None
+        self._template = None
+        self._jobs_timer = QTimer()
+        self._jobs_timer.setSingleShot(True)
+        self._jobs_timer.setInterval(500)
+        self._jobs_timer.timeout.connect(self._refresh_system_html)
+        job_manager = getattr(self.app, "job_manager", None)
+        if job_manager is not None:
+            job_manager.jobsChanged.connect(self._on_jobs_changed)
 
     def create_line_edit(self, placeholder_text, parent, max_width=150):
         """Создает QLineEdit с предустановленным стилем."""
@@ -193,6 +205,8 @@ class UISGenerator:
                 """
             )
 
+            self._statistics, self._template = statistics, template
+            self.system_browser = system_browser
             system_browser.setHtml(self._generate_statistics_html(statistics, template))
             container_layout.addWidget(system_browser)
             bottom_layout = QHBoxLayout()
@@ -237,6 +251,46 @@ class UISGenerator:
             self.logger.error(f"Error create_system_browser: {e}")
             return None
 
+    def _on_jobs_changed(self):
+        if self.system_browser is not None and not self._jobs_timer.isActive():
+            self._jobs_timer.start()
+
+    def _refresh_system_html(self):
+        """Перерисовывает системный экран, чтобы инспектор задач показывал актуальное состояние."""
+        try:
+            if self.system_browser is None or not self.system_browser.isVisible():
+                return
+            scroll = self.system_browser.verticalScrollBar().value()
+            self.system_browser.setHtml(self._generate_statistics_html(self._statistics, self._template))
+            self.system_browser.verticalScrollBar().setValue(scroll)
+        except RuntimeError:
+            # виджет уже удалён (экран сменили) — больше не обновляем
+            self.system_browser = None
+
+    def _generate_jobs_html(self):
+        """Инспектор фоновых задач: состояние, прогресс, время и ссылка на отмену активных."""
+        job_manager = getattr(self.app, "job_manager", None)
+        if job_manager is None:
+            return ""
+        rows = []
+        for job in job_manager.jobs():
+            progress = f"{job.done}/{job.total}" if job.total else ""
+            coalesced = f" (+{job.coalesced} merged)" if job.coalesced else ""
+            action = f'<a href="cancel_job/{job.job_id}">Cancel</a>' if job.is_active and not job.cancel_requested else ""
+            error = f" — {html.escape(job.error)}" if job.error else ""
+            rows.append(
+                f"<tr><td>#{job.job_id}</td><td>{html.escape(job.kind)}</td>"
+                f"<td>{html.escape(job.label)}{coalesced}</td><td>{job.state}{error}</td>"
+                f"<td>{progress}</td><td>{job.elapsed:.1f}s</td><td>{action}</td></tr>"
+            )
+        body = ''.join(rows) or '<tr><td colspan="7">No jobs yet</td></tr>'
+        return f'''
+             <div class="jobs">
+                 <p>Background jobs (active: {job_manager.active_count()}):</p>
+                 <table cellspacing="6">{body}</table>
+             </div>
+         '''
+
     def show_log_window(self):
         if self.log_window is None or not self.log_window.isVisible():
             self.log_window = LogWindow("logs/debug_log.txt", self.current_template)
@@ -342,6 +396,7 @@ class UISGenerator:
                  <p>Заблокированные тайтлы (no more updates):</p>
                  <ul>{blocked_titles_list}</ul>
              </div>
+             {self._generate_jobs_html()}
          </div>
          '''
 
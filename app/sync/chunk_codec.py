@@ -0,0 +1,130 @@
+# chunk_codec.py
+"""
+Сжатие снапшота БД по чанкам для DBSender/DBReceiver.
+
+Каждый чанк сжимается независимо, поэтому докачка (resume from offset) работает и со сжатием,
+а чанки можно готовить параллельно. Внутри чанка данные режутся на блоки по 64 KiB;
+блок, похожий на уже сжатые данные (страницы с BLOB постеров: jpeg/webp/png), уходит как есть.
+Соседние блоки одного типа склеиваются в сегмент:
+
+    [flag:1][len:4][body] ...    flag: 0 — как есть, 1 — сжато кодеком
+
+zstd (пакет zstandard) — если установлен, иначе zlib.
+"""
+from __future__ import annotations
+
+import zlib
+import struct
+import threading
+
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+
+CODEC_ZSTD = "zstd"
+CODEC_ZLIB = "zlib"
+SEG_STORED = 0
+SEG_PACKED = 1
+SEGMENT = struct.Struct("!BI")
+BLOCK_SIZE = 64 * 1024
+SAMPLE_SIZE = 4 * 1024
+# если пробный блок сжимается хуже, чем до 90% — это картинка/архив, не тратим CPU
+INCOMPRESSIBLE_RATIO = 0.9
+
+
+def available_codecs() -> tuple[str, ...]:
+    return (CODEC_ZSTD, CODEC_ZLIB) if zstandard is not None else (CODEC_ZLIB,)
+
+
+def pick_codec() -> str:
+    return available_codecs()[0]
+
+
+def negotiate_codec(offered) -> str | None:
+    """
+    Приёмник выбирает кодек из предложенных отправителем (в порядке его предпочтения) среди своих
+    available_codecs(); общего нет — zlib, он есть у всех. Пустое предложение — без сжатия.
+    """
+    if not offered:
+        return None
+    supported = available_codecs()
+    return next((name for name in offered if name in supported), CODEC_ZLIB)
+
+
+class ChunkCodec:
+    """
+    encode()/decode() одного чанка. encode потокобезопасен: у каждого потока свой компрессор
+    (ZstdCompressor не разрешает параллельное использование одного экземпляра).
+    """
+
+    def __init__(self, name: str, level: int | None = None):
+        if name not in available_codecs():
+            raise ValueError(f"codec is not available: {name}")
+        self.name = name
+        self.level = level if level is not None else (3 if name == CODEC_ZSTD else 6)
+        self._local = threading.local()
+
+    # --- compression ---
+    def _compress(self, data) -> bytes:
+        if self.name == CODEC_ZLIB:
+            return zlib.compress(data, self.level)
+        cctx = getattr(self._local, "cctx", None)
+        if cctx is None:
+            cctx = self._local.cctx = zstandard.ZstdCompressor(level=self.level)
+        return cctx.compress(data)
+
+    @staticmethod
+    def _looks_compressed(block: memoryview) -> bool:
+        mid = max(0, (len(block) - SAMPLE_SIZE) // 2)
+        sample = block[mid:mid + SAMPLE_SIZE]
+        return len(zlib.compress(sample, 1)) > len(sample) * INCOMPRESSIBLE_RATIO
+
+    def encode(self, raw: bytes) -> bytes:
+        view = memoryview(raw)
+        out = bytearray()
+        run_flag, run_start = None, 0
+        for off in range(0, len(view), BLOCK_SIZE):
+            flag = SEG_STORED if self._looks_compressed(view[off:off + BLOCK_SIZE]) else SEG_PACKED
+            if run_flag is not None and flag != run_flag:
+                self._emit(out, run_flag, view[run_start:off])
+                run_start = off
+            run_flag = flag
+        if run_flag is not None:
+            self._emit(out, run_flag, view[run_start:])
+        return bytes(out)
+
+    def _emit(self, out: bytearray, flag: int, segment: memoryview) -> None:
+        body = segment
+        if flag == SEG_PACKED:
+            packed = self._compress(segment)
+            if len(packed) < len(segment):
+                body = packed
+            else:
+                flag = SEG_STORED
+        out += SEGMENT.pack(flag, len(body))
+        out += body
+
+    # --- decompression ---
+    def _decompress(self, data) -> bytes:
+        if self.name == CODEC_ZLIB:
+            return zlib.decompress(data)
+        dctx = getattr(self._local, "dctx", None)
+        if dctx is None:
+            dctx = self._local.dctx = zstandard.ZstdDecompressor()
+        return dctx.decompress(data)
+
+    def decode(self, body: bytes) -> bytes:
+        view = memoryview(body)
+        parts = []
+        pos = 0
+        while pos < len(view):
+            flag, length = SEGMENT.unpack_from(view, pos)
+            pos += SEGMENT.size
+            segment = view[pos:pos + length]
+            if len(segment) != length:
+                raise ValueError("truncated segment")
+            pos += length
+            parts.append(self._decompress(segment) if flag == SEG_PACKED else segment)
+        return b"".join(parts)
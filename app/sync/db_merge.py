@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 from contextlib import closing
-import argparse, sqlite3, time, sys
+import argparse, base64, binascii, sqlite3, time, sys
 
 
 NOW = int(time.time())
+# Legacy inline payload в torrents; новая схема хранит .torrent байтами в torrent_files
+TORRENT_PAYLOAD_COLS = {"raw_base64_file", "torrent_metadata"}
 
 def open_db(path: str) -> sqlite3.Connection:
     con = sqlite3.connect(path, check_same_thread=False)
@@ -69,6 +71,9 @@ def resolve_dst_episode_id_by_src_id_via_uuid(src, dst, src_episode_id: int):
         return None
     return resolve_dst_episode_id_by_uuid(dst, row["uuid"])
 
+def table_exists(con, name: str) -> bool:
+    return fetch_one(con, "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)) is not None
+
 def resolve_dst_torrent_id_by_hash(dst, h: str):
     row = fetch_one(dst, "SELECT torrent_id FROM torrents WHERE hash=?", (h,))
     return row["torrent_id"] if row else None
@@ -269,6 +274,9 @@ def merge_episodes(src, dst, stats, on_event=None):
 
 def merge_torrents(src, dst, stats, on_event=None):
     cols = [c[1] for c in fetch_all(src, "PRAGMA table_info(torrents)")]
+    if table_exists(dst, "torrent_files"):
+        # payload переносится отдельно в merge_torrent_files, не тащим base64 через строки torrents
+        cols = [c for c in cols if c not in TORRENT_PAYLOAD_COLS]
     rows = fetch_all(src, f"SELECT {', '.join(cols)} FROM torrents")
     with dst:
         cur = dst.cursor()
@@ -288,6 +296,56 @@ def merge_torrents(src, dst, stats, on_event=None):
                                 on_event=on_event)
             stats["torrents"][op] += 1
 
+def merge_torrent_files(src, dst, stats, on_event=None):
+    """
+    torrent_files сопоставляются по torrents.hash (torrent_id в разных БД может отличаться).
+    Legacy base64 из src.torrents.raw_base64_file декодируется в сырые байты.
+    """
+    if not table_exists(dst, "torrent_files"):
+        return
+    rows = []
+    if table_exists(src, "torrent_files"):
+        rows.extend(dict(r) for r in fetch_all(src, """
+            SELECT t.hash AS hash, tf.file_blob AS file_blob, tf.torrent_metadata AS torrent_metadata,
+                   tf.last_updated AS last_updated
+            FROM torrent_files tf JOIN torrents t ON t.torrent_id = tf.torrent_id
+        """))
+    src_cols = {c[1] for c in fetch_all(src, "PRAGMA table_info(torrents)")}
+    if TORRENT_PAYLOAD_COLS <= src_cols:
+        for r in fetch_all(src, """
+            SELECT hash, raw_base64_file, torrent_metadata FROM torrents
+            WHERE raw_base64_file IS NOT NULL OR torrent_metadata IS NOT NULL
+        """):
+            blob = None
+            if r["raw_base64_file"]:
+                try:
+                    blob = base64.b64decode(r["raw_base64_file"])
+                except (binascii.Error, ValueError):
+                    if on_event: on_event("torrent_files", f"skip:bad-base64:{r['hash']}")
+            rows.append({"hash": r["hash"], "file_blob": blob,
+                         "torrent_metadata": r["torrent_metadata"], "last_updated": None})
+
+    with dst:
+        cur = dst.cursor()
+        for data in rows:
+            h = data.get("hash")
+            dst_row = fetch_one(dst, "SELECT torrent_id, title_id FROM torrents WHERE hash=?", (h,)) if h else None
+            if not dst_row:
+                if on_event: on_event("torrent_files", f"skip_orphan_torrent:{h}")
+                continue
+            payload = {
+                "torrent_id": dst_row["torrent_id"],
+                "title_id": dst_row["title_id"],
+                "file_blob": data["file_blob"],
+                "file_size": len(data["file_blob"]) if data["file_blob"] is not None else None,
+                "torrent_metadata": data["torrent_metadata"],
+                "last_updated": data["last_updated"],
+            }
+            op = upsert_generic(cur, "torrent_files", ["torrent_id"], payload,
+                                fill_only_cols={"file_blob", "file_size", "torrent_metadata"},
+                                on_event=on_event)
+            stats["torrent_files"][op] += 1
+
 def merge_posters(src, dst, stats, on_event=None, skip_flag=False):
     """
     Политика:
@@ -583,6 +641,22 @@ def merge_history(src, dst, stats, on_event=None):
                                 on_event=on_event)
             stats["history"][op] += 1
 
+def invalidate_title_summary(src, dst):
+    """
+    title_summary и title_facet_counts ведёт приложение (core/title_summary.py), а merge пишет в обход него.
+    Строки слитых тайтлов удаляются: TitleSummaryManager.ensure на старте увидит расхождение числа строк
+    и пересоберёт проекцию вместе со счётчиками фасетов.
+    """
+    if not table_exists(dst, "title_summary"):
+        return 0
+    ids = [r["title_id"] for r in fetch_all(src, "SELECT title_id FROM titles")]
+    with dst:
+        cur = dst.cursor()
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            cur.execute(f"DELETE FROM title_summary WHERE title_id IN ({', '.join('?' * len(chunk))})", chunk)
+    return len(ids)
+
 def run_merge(
         src_path, dst_path,
         skip_posters_without_hash=False,
@@ -598,7 +672,7 @@ def run_merge(
             raise SystemExit("source и destination совпадают")
         stats = {}
         for t in ["days_of_week","genres","team_members","titles","production_studios","schedule",
-                  "episodes","torrents","posters","franchises","franchise_releases",
+                  "episodes","torrents","torrent_files","posters","franchises","franchise_releases",
                   "title_genre_relation","title_team_relation","ratings","history"]:
             ensure_table_stats(stats, t)
         orphans = []
@@ -626,6 +700,7 @@ def run_merge(
         merge_schedule(src, dst, stats, on_event=record_event)
         merge_episodes(src, dst, stats, on_event=record_event)
         merge_torrents(src, dst, stats, on_event=record_event)
+        merge_torrent_files(src, dst, stats, on_event=record_event)
         merge_posters(src, dst, stats, on_event=record_event, skip_flag=skip_posters_without_hash)
         merge_franchises(src, dst, stats, on_event=record_event)
         merge_franchise_releases(src, dst, stats, on_event=record_event)
@@ -633,6 +708,7 @@ def run_merge(
         merge_title_team_relations(src, dst, stats, on_event=record_event)
         merge_ratings(src, dst, stats, on_event=record_event)
         merge_history(src, dst, stats, on_event=record_event)
+        invalidate_title_summary(src, dst)
         violate = fetch_all(dst, "PRAGMA foreign_key_check")
 
         if skip_orphans:
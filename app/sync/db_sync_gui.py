@@ -15,11 +15,13 @@ from db_merge import run_merge
 try:
     from transports import WebRTCSenderTransport
     from webrtc_transport import WebRTCReceiverCore, WebRTCSignalingError
+    from webrtc_stream import FileStreamReceiver
     HAS_WEBRTC = True
 except Exception:
     WebRTCSenderTransport = None
     WebRTCReceiverCore = None
     WebRTCSignalingError = None
+    FileStreamReceiver = None
     HAS_WEBRTC = False
 
 try:
@@ -145,10 +147,8 @@ class App(tk.Tk):
         self.webrtc_rx_core: Optional[WebRTCReceiverCore] = None
         self.webrtc_ice_status = tk.StringVar(value="idle")
 
-        # WebRTC receive state (file transfer)
-        self.webrtc_rx_meta = None      # dict с метаданными header
-        self.webrtc_rx_file = None      # открытый файловый дескриптор
-        self.webrtc_rx_received = 0     # сколько байт уже приняли
+        # WebRTC receive state (file transfer): приём/докачка в ./incoming, см. webrtc_stream
+        self.webrtc_rx_stream = None
         self.webrtc_rx_got_any = False
 
         # WebRTC (send) – ожидание Answer
@@ -290,7 +290,7 @@ class App(tk.Tk):
         self.var_send_compress = tk.BooleanVar(value=self.cfg.get("compress_gzip", False))
         ttk.Checkbutton(
             setgrp,
-            text="Compress snapshot (gzip)",
+            text="Compress snapshot (zstd/zlib, per chunk)",
             variable=self.var_send_compress,
         ).pack(anchor="w", pady=(2, 2))
 
@@ -301,6 +301,13 @@ class App(tk.Tk):
             variable=self.var_send_vacuum,
         ).pack(anchor="w", pady=(0, 2))
 
+        self.var_send_delta = tk.BooleanVar(value=self.cfg.get("sender_delta", False))
+        ttk.Checkbutton(
+            setgrp,
+            text="Delta sync (send only pages changed since last transfer)",
+            variable=self.var_send_delta,
+        ).pack(anchor="w", pady=(0, 2))
+
         self.entry_chunk.bind(
             "<KeyRelease>",
             lambda e: self._update_human(self.entry_chunk, self.chunk_human, "chunk"),
@@ -1070,9 +1077,9 @@ class App(tk.Tk):
         if is_webrtc_widget:
             # Если идёт отправка по WebRTC — не даём чистить поля
             current_sender = getattr(self, "_current_webrtc_sender", None)
-            rx_file = getattr(self, "webrtc_rx_file", None)
+            rx_stream = getattr(self, "webrtc_rx_stream", None)
 
-            if current_sender is not None or rx_file is not None:
+            if current_sender is not None or (rx_stream is not None and rx_stream.active):
                 # Без pop-up, просто запись в лог, чтобы не раздражать
                 self._log("[webrtc] Clear is disabled while WebRTC transfer is active")
                 return
@@ -1257,6 +1264,7 @@ class App(tk.Tk):
 
     def _webrtc_cancel_receive(self):
         self._log("[webrtc] receive cancelled by user")
+        self._webrtc_close_rx_stream()
         if self.webrtc_rx_core:
             self.asyncio_thread.call(self.webrtc_rx_core.close())
             self.webrtc_rx_core = None
@@ -1268,104 +1276,30 @@ class App(tk.Tk):
 
     def _on_webrtc_message(self, data: bytes):
         """
-        Обработчик сообщений по WebRTC DataChannel (receiver side).
+        Обработчик сообщений по WebRTC DataChannel (receiver side), поток asyncio.
 
-        Протокол:
-          1) первое сообщение — JSON header {"kind":"header","name":"...","size":...}
-          2) далее — сырые чанки байт файла
+        Протокол (webrtc_stream): JSON header -> ответ resume -> бинарные чанки с seq -> done c SHA-256.
+        Запись и хеширование идут в отдельном потоке, готовый файл проверяется до os.replace.
         """
-        # 1) Если метаданных ещё нет — ожидаем header
-        if self.webrtc_rx_meta is None:
-            self.webrtc_rx_got_any = True
-            try:
-                text = data.decode("utf-8")
-                obj = json.loads(text)
-            except Exception:
-                self._log("[webrtc] first message is not valid JSON header; ignoring")
-                return
-
-            if obj.get("kind") != "header":
-                self._log(f"[webrtc] unexpected JSON message (no kind=header): {obj}")
-                return
-
-            name = obj.get("name") or "webrtc_incoming.db"
-            size = int(obj.get("size") or 0)
-
-            incoming_dir = Path("./incoming")
-            incoming_dir.mkdir(parents=True, exist_ok=True)
-            tmp_path = incoming_dir / f"{name}.tmp"
-
-            try:
-                f = open(tmp_path, "wb")
-            except Exception as e:
-                self._log(f"[webrtc] cannot open file for write: {e}")
-                return
-
-            self.webrtc_rx_meta = {
-                "name": name,
-                "size": size,
-                "tmp_path": tmp_path,
-            }
-            self.webrtc_rx_file = f
-            self.webrtc_rx_received = 0
-            self.webrtc_rx_got_any = True
-
-            self._log(f"[webrtc] header received: {name} ({size} bytes)")
-            # подготовим прогрессбар
-            self.after(0, lambda: self._set_progress(self.prog_recv, 0, size))
-            return
-
-        # 2) Метаданные уже есть — это должен быть чанк байт
-        if self.webrtc_rx_file is None:
-            self._log("[webrtc] got data chunk but file handle is None; ignoring")
-            return
-
         self.webrtc_rx_got_any = True
-        try:
-            self.webrtc_rx_file.write(data)
-            self.webrtc_rx_received += len(data)
-        except Exception as e:
-            self._log(f"[webrtc] write error: {e}")
-            try:
-                self.webrtc_rx_file.close()
-            except Exception:
-                pass
-            self.webrtc_rx_file = None
-            return
-
-        meta = self.webrtc_rx_meta or {}
-        total = int(meta.get("size") or 0)
-        done = self.webrtc_rx_received
-
-        # обновляем прогрессбар в GUI-потоке
-        self.after(0, lambda: self._on_progress_recv(done, total))
+        if self.webrtc_rx_stream is None:
+            self.webrtc_rx_stream = FileStreamReceiver(
+                self.webrtc_rx_core.send_text,
+                Path("./incoming"),
+                log=self._log,
+                on_progress=self._on_progress_recv,
+                on_done=self._on_receive_done,
+            )
+        self.webrtc_rx_stream.feed(data)
 
-        # 3) Проверяем завершение по размеру
-        if total and done >= total:
+    def _webrtc_close_rx_stream(self):
+        # .part остаётся на диске — следующая попытка с тем же файлом продолжит с последнего чанка
+        stream, self.webrtc_rx_stream = self.webrtc_rx_stream, None
+        if stream is not None:
             try:
-                self.webrtc_rx_file.close()
+                stream.shutdown()
             except Exception:
                 pass
-            self.webrtc_rx_file = None
-
-            tmp_path = meta.get("tmp_path")
-            name = meta.get("name") or "webrtc_incoming.db"
-            incoming_dir = os.path.dirname(str(tmp_path)) if tmp_path else "./incoming"
-            final_path = os.path.join(incoming_dir, name)
-
-            try:
-                if tmp_path:
-                    os.replace(tmp_path, final_path)
-                self._log(f"[webrtc] file received and saved: {final_path}")
-                # выносим диалог и финальный прогресс в GUI-поток
-                self.after(0, lambda: self._on_receive_done(final_path))
-            except Exception as e:
-                self._log(f"[webrtc] finalize error: {e}")
-
-            # сбрасываем состояние
-            self.webrtc_rx_meta = None
-            self.webrtc_rx_file = None
-            self.webrtc_rx_received = 0
 
     def _webrtc_apply_offer(self):
         offer = self.webrtc_offer_recv.get("1.0", "end").strip()
@@ -1374,15 +1308,8 @@ class App(tk.Tk):
             return
 
         # сброс состояния приёмника WebRTC
-        if self.webrtc_rx_file:
-            try:
-                self.webrtc_rx_file.close()
-            except Exception:
-                pass
+        self._webrtc_close_rx_stream()
         self.webrtc_rx_got_any = False
-        self.webrtc_rx_meta = None
-        self.webrtc_rx_file = None
-        self.webrtc_rx_received = 0
 
         # лениво создаём core
         if not self.webrtc_rx_core:
@@ -1684,6 +1611,7 @@ class App(tk.Tk):
 
         use_gzip = self.var_send_compress.get()
         vacuum_snapshot = self.var_send_vacuum.get()
+        delta_sync = self.var_send_delta.get()
 
         # --- Выбор транспорта ---
         if mode == "tcp":
@@ -1699,6 +1627,7 @@ class App(tk.Tk):
                     sas_info=sas_info_cb,
                     use_gzip=use_gzip,
                     vacuum_snapshot=vacuum_snapshot,
+                    delta_sync=delta_sync,
                 )
             else:
                 self._log("[tcp] Using LAN TCP transport (no STUN/UPnP in this build)")
@@ -1712,6 +1641,7 @@ class App(tk.Tk):
                     sas_info=sas_info_cb,
                     use_gzip=use_gzip,
                     vacuum_snapshot=vacuum_snapshot,
+                    delta_sync=delta_sync,
                 )
         elif mode == "webrtc":
             def show_offer(sdp: str) -> None:
@@ -1809,6 +1739,7 @@ class App(tk.Tk):
                 self.cfg["speed_kbps"] = "" if speed_kbps is None else str(speed_kbps)
                 self.cfg["compress_gzip"] = "1" if self.var_send_compress.get() else "0"
                 self.cfg["sender_vacuum"] = "1" if self.var_send_vacuum.get() else "0"
+                self.cfg["sender_delta"] = "1" if self.var_send_delta.get() else "0"
                 save_gui_cfg(self.cfg)
                 self.cmb_host["values"] = self.cfg["recent"]
         fut.add_done_callback(done_cb)
@@ -1892,6 +1823,7 @@ class App(tk.Tk):
             elif self.receiver_mode == "internet" and self.receiver_inet:
                 self.asyncio_thread.call(self.receiver_inet.stop())
             elif self.receiver_mode == "webrtc" and self.webrtc_rx_core:
+                self._webrtc_close_rx_stream()
                 self.asyncio_thread.call(self.webrtc_rx_core.close())
 
             self.receiver_tcp = None
@@ -1966,10 +1898,15 @@ class App(tk.Tk):
             self.recv_status.set("Server: Stopped")
             self.webrtc_ice_status.set("idle")
 
-            if self.webrtc_rx_core:
-                # закрываем peerconnection в фоне
-                self.asyncio_thread.call(self.webrtc_rx_core.close())
-                self.webrtc_rx_core = None
+            def close_rx():
+                # сюда приходим из потока записи приёмника: закрываем из Tk-потока и с паузой,
+                # чтобы итоговый result успел уйти отправителю до закрытия peerconnection
+                self._webrtc_close_rx_stream()
+                if self.webrtc_rx_core:
+                    self.asyncio_thread.call(self.webrtc_rx_core.close())
+                    self.webrtc_rx_core = None
+
+            self.after(1500, close_rx)
 
     # ---------- shutdown ----------
     def on_close(self):
@@ -1992,6 +1929,7 @@ class App(tk.Tk):
                 elif self.receiver_mode == "internet" and self.receiver_inet:
                     self.asyncio_thread.call(self.receiver_inet.stop())
                 elif self.receiver_mode == "webrtc" and self.webrtc_rx_core:
+                    self._webrtc_close_rx_stream()
                     fut = self.asyncio_thread.call(self.webrtc_rx_core.close())
                     # Добавим в список "ожидаемых", чтобы дождаться shutdown'а aiortc
                     self._pending.append(fut)
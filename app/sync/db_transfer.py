@@ -1,7 +1,9 @@
 # db_transfer.py
-import os, hmac, time, json, gzip, shutil, socket, struct, asyncio, sqlite3, hashlib, aiofiles, argparse
+import os, hmac, time, json, gzip, socket, struct, asyncio, sqlite3, hashlib, aiofiles, argparse
 
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from nacl.secret import SecretBox
 from nacl.public import PrivateKey, PublicKey
 from nacl import bindings as nacl_bindings
@@ -13,11 +15,17 @@ except Exception:
     Zeroconf = None
     ServiceInfo = None
 
+from chunk_codec import ChunkCodec, available_codecs, negotiate_codec
+from snapshot_delta import (DIGEST_SIZE, sqlite_backup_snapshot, sqlite_page_size, block_digests,
+                            encode_delta, apply_delta)
+
 
 MDNS_SERVICE_TYPE = "_playersync._tcp.local."
 DEFAULT_PORT = 8765
 DEFAULT_CHUNK = 2 * 1024 * 1024
 TOFU_FILE: Path = Path.home() / ".player_db_trust.json"
+# сколько чанков сжимается/шифруется наперёд, пока текущий уходит в сеть
+PREPARE_AHEAD = max(2, min(8, os.cpu_count() or 2))
 
 
 def hkdf_extract(salt: bytes, ikm: bytes) -> bytes:
@@ -45,14 +53,6 @@ def compute_sas(pub_a: bytes, pub_b: bytes, digits: int = 6) -> str:
     h = hashlib.sha256(x).digest()
     return f"{int.from_bytes(h[:4],'big') % 1_000_000:06d}"
 
-def sqlite_make_snapshot(src_path: str, dst_path: str):
-    src = sqlite3.connect(src_path)
-    dst = sqlite3.connect(dst_path)
-    with dst:
-        src.backup(dst)
-    src.close()
-    dst.close()
-
 def load_tofu() -> Dict[str, Any]:
     """
     Безопасно читает TOFU JSON.
@@ -120,6 +120,7 @@ class DBReceiver:
                  sas_confirm: Optional[Callable[[str, str], bool]] = None,
                  on_done: Optional[Callable[[str], None]] = None,
                  allow_resume: bool = True,
+                 allow_delta: bool = True,
                  verify_chunks: bool = False,
                  log: Optional[Callable[[str], None]] = None):
         self.host = host
@@ -138,6 +139,7 @@ class DBReceiver:
         self._zc = None
         self._mdns_info = None
         self.allow_resume = allow_resume
+        self.allow_delta = allow_delta
         self.verify_chunks = verify_chunks
         self._log_cb = log
 
@@ -213,9 +215,20 @@ class DBReceiver:
             writer.close(); await writer.wait_closed()
             return
 
-        gzip_mode = bool(hello.get("gzip"))
+        gzip_mode = bool(hello.get("gzip"))  # старый отправитель: целиком gzip-файл, без resume
         file_size = int(hello.get("file_size", 0))
         chunk_size = int(hello.get("chunk_size", DEFAULT_CHUNK))
+        if "codecs" in hello:
+            # отправитель предлагает список — выбираем сами и сообщаем в ответе (общего нет — zlib)
+            codec_name = negotiate_codec(hello.get("codecs"))
+        else:
+            # старый отправитель: кодек уже выбран им, договориться нельзя
+            codec_name = hello.get("codec")
+            if codec_name and codec_name not in available_codecs():
+                self._log(f"[receiver] unsupported codec {codec_name!r} (install zstandard?)")
+                writer.close(); await writer.wait_closed()
+                return
+        codec = ChunkCodec(codec_name) if codec_name else None
 
         try:
             sender_pub = await reader.readexactly(32)
@@ -287,10 +300,33 @@ class DBReceiver:
 
         if not self.allow_resume or gzip_mode:
             resume_from = 0
-        writer.write((json.dumps({"resume_from": resume_from}) + "\n").encode())
+        # дельта: отдаём дайджесты страниц прошлой принятой копии, отправитель шлёт только отличия
+        basis_path = self.chunk_dir / self.final_name
+        block_size = int(hello.get("block_size") or 0)
+        basis_digests = b""
+        if (hello.get("delta") and self.allow_delta and not gzip_mode and block_size > 0
+                and chunk_size % block_size == 0 and basis_path.exists()):
+            loop = asyncio.get_running_loop()
+            basis_digests = await loop.run_in_executor(None, block_digests, str(basis_path), block_size)
+            self._log(f"[receiver] delta basis: {basis_path} ({len(basis_digests) // DIGEST_SIZE} pages)")
+        basis_enc = box_recv.encrypt(basis_digests) if basis_digests else b""
+        writer.write((json.dumps({"resume_from": resume_from, "basis_len": len(basis_enc),
+                                  "codec": codec_name, "codecs": list(available_codecs())}) + "\n").encode())
+        if basis_enc:
+            writer.write(basis_enc)
         await writer.drain()
+        basis_f = open(basis_path, "rb") if basis_enc else None
         tmp_path = self.chunk_dir / self.tmp_name
         mode = "ab" if resume_from else "wb"
+        # SHA-256 считается по ходу записи; при докачке — сначала по уже принятому префиксу
+        sha = hashlib.sha256()
+        if resume_from:
+            async with aiofiles.open(tmp_path, "rb") as fr:
+                while True:
+                    data = await fr.read(1024 * 1024)
+                    if not data:
+                        break
+                    sha.update(data)
         f = await aiofiles.open(tmp_path, mode)
         received = resume_from
         expected_seq = resume_from // chunk_size
@@ -311,8 +347,15 @@ class DBReceiver:
                         if seq != expected_seq:
                             self._log(f"[receiver] out-of-order chunk, expected: {expected_seq} got: {seq}")
                             break
+                        if codec:
+                            plain = codec.decode(plain)
+                        if basis_enc:
+                            plain = apply_delta(plain, seq * chunk_size // block_size, basis_f, block_size,
+                                                min(chunk_size, file_size - seq * chunk_size))
 
                         await f.write(plain)
+                        if not gzip_mode:
+                            sha.update(plain)
                         received += len(plain)
                         writer.write((json.dumps({"ack": seq}) + "\n").encode());
                         await writer.drain()
@@ -336,6 +379,8 @@ class DBReceiver:
             self._log(f"[receiver] connection closed unexpectedly during transfer")
         finally:
             await f.close()
+            if basis_f:
+                basis_f.close()  # до os.replace поверх него (Windows)
             writer.close()
             try:
                 await writer.wait_closed()
@@ -383,13 +428,6 @@ class DBReceiver:
                 else:
                     self._log(f"[receiver] SHA mismatch or missing after gunzip; tmp kept at {db_tmp_path}")
             else:
-                sha = hashlib.sha256()
-                async with aiofiles.open(tmp_path, "rb") as fr:
-                    while True:
-                        data = await fr.read(1024 * 1024)
-                        if not data:
-                            break
-                        sha.update(data)
                 got = sha.hexdigest()
                 self._log(f"[receiver] calculated sha: {got}")
                 if expected_sha and got == expected_sha:
@@ -422,7 +460,8 @@ class DBSender:
                  sas_info: Optional[Callable[[str, str], None]] = None,
                  log: Optional[Callable[[str], None]] = None,
                  use_gzip: bool = False,
-                 vacuum_snapshot: bool = False):
+                 vacuum_snapshot: bool = False,
+                 delta_sync: bool = False):
         self.chunk_size = chunk_size
         self.throttle_kbps = throttle_kbps
         self.on_progress = on_progress
@@ -431,6 +470,7 @@ class DBSender:
         self._log_cb = log
         self.use_gzip = use_gzip
         self.vacuum_snapshot = vacuum_snapshot
+        self.delta_sync = delta_sync
 
     def _log(self, msg: str):
         if self._log_cb:
@@ -440,49 +480,47 @@ class DBSender:
 
     async def connect_and_send(self, host: str, port: int, src_db_path: str,
                                snapshot_path: str = "db_snapshot.sqlite", schema_version: str = "1"):
+        loop = asyncio.get_running_loop()
         if not os.path.exists(snapshot_path):
-            sqlite_make_snapshot(src_db_path, snapshot_path)
+            reported = [0]
+
+            def snapshot_progress(done: int, total: int):
+                pct = done * 100 // total if total else 100
+                if pct >= reported[0] + 25 or done == total:
+                    reported[0] = pct
+                    self._log(f"[sender] snapshot: {done}/{total} pages ({pct}%)")
+
+            # backup API шагами в пуле: event loop (и GUI) не ждёт, приложение может писать в БД
+            await loop.run_in_executor(
+                None, lambda: sqlite_backup_snapshot(src_db_path, snapshot_path, progress=snapshot_progress))
 
         if self.vacuum_snapshot:
-            try:
-                self._log(f"[sender] VACUUM snapshot {snapshot_path} ...")
+            if self.delta_sync:
+                self._log("[sender] VACUUM переставляет страницы — дельта почти не сработает")
+
+            def vacuum():
                 con = sqlite3.connect(snapshot_path)
                 with con:
                     con.execute("PRAGMA optimize")
                     con.execute("VACUUM")
                 con.close()
+
+            try:
+                self._log(f"[sender] VACUUM snapshot {snapshot_path} ...")
+                await loop.run_in_executor(None, vacuum)
                 self._log("[sender] VACUUM snapshot: done")
             except Exception as e:
                 self._log(f"[sender] VACUUM snapshot failed: {e}")
 
         db_path = snapshot_path
-        orig_size = os.path.getsize(db_path)
-
-        if self.use_gzip:
-            gz_path = snapshot_path + ".gz"
-            with open(db_path, "rb") as fin, gzip.open(gz_path, "wb") as fout:
-                shutil.copyfileobj(fin, fout)
-            xfer_path = gz_path
-        else:
-            xfer_path = db_path
-
-        size = os.path.getsize(xfer_path)
-        if self.use_gzip:
-            if orig_size > 0:
-                saved = (1.0 - size / orig_size) * 100.0
-                self._log(
-                    "[sender] gzip ratio: "
-                    f"{orig_size / (1024*1024):.2f} MiB -> {size / (1024*1024):.2f} MiB "
-                    f"({saved:.1f}% saved)"
-                )
-            else:
-                self._log("[sender] gzip ratio: original size is 0?")
-
-        sha = hashlib.sha256()
-        with open(snapshot_path, "rb") as ff:
-            for block in iter(lambda: ff.read(1024 * 1024), b""):
-                sha.update(block)
-        full_sha_hex = sha.hexdigest()
+        size = os.path.getsize(db_path)
+        # сжатие по чанкам на лету (без промежуточного .gz): resume работает и со сжатием
+        # предлагаем свои кодеки по предпочтению, приёмник выбирает из них (см. negotiate_codec)
+        offered = list(available_codecs()) if self.use_gzip else []
+        block_size = sqlite_page_size(db_path)
+        delta = self.delta_sync and self.chunk_size % block_size == 0
+        if self.delta_sync and not delta:
+            self._log(f"[sender] delta disabled: chunk size is not a multiple of page size {block_size}")
         reader = writer = None
         last_err = None
         for _ in range(20):
@@ -494,7 +532,9 @@ class DBSender:
                 await asyncio.sleep(0.5)
         if not reader:
             raise last_err or ConnectionError("Unable to connect")
-        hello = {"role":"sender","schema_version":schema_version,"file_size":size,"chunk_size":self.chunk_size,"gzip": bool(self.use_gzip),}
+        hello = {"role":"sender","schema_version":schema_version,"file_size":size,"chunk_size":self.chunk_size,
+                 "gzip": False, "codec": offered[0] if offered else None, "codecs": offered,
+                 "delta": delta, "block_size": block_size}
         writer.write((json.dumps(hello) + "\n").encode()); await writer.drain()
         priv = PrivateKey.generate()
         pub = bytes(priv.public_key)
@@ -525,11 +565,23 @@ class DBSender:
         self._log(f"[sender] key tag: {key_send[:4].hex()}")
         line = await reader.readline()
         resume_from = 0
+        codec_name = offered[0] if offered else None  # старый приёмник принимает кодек из hello
         try:
             msg = json.loads(line.decode())
             resume_from = int(msg.get("resume_from", 0))
+            basis_len = int(msg.get("basis_len", 0))
+            if "codec" in msg:
+                codec_name = msg["codec"]
         except:
             resume_from = 0
+            basis_len = 0
+        codec = ChunkCodec(codec_name) if codec_name else None
+        if codec:
+            self._log(f"[sender] codec: {codec.name}")
+        # дайджесты страниц копии приёмника (пусто — копии нет, шлём всё)
+        basis = box_send.decrypt(await reader.readexactly(basis_len)) if basis_len else b""
+        if basis:
+            self._log(f"[sender] delta: receiver has {len(basis) // DIGEST_SIZE} pages, sending only changed ones")
 
         if resume_from:
             self._log(f"[sender] receiver requests resume from {resume_from} bytes")
@@ -541,23 +593,49 @@ class DBSender:
         kbps = max(int(self.throttle_kbps or 0), 0)
         byte_budget = kbps * 1024 if kbps > 0 else None
 
+        def prepare(raw: bytes, first_block: int) -> bytes:
+            # blake2b, zlib/zstd и libsodium отпускают GIL — чанки готовятся параллельно
+            body = encode_delta(raw, first_block, basis, block_size) if basis else raw
+            return box_send.encrypt(codec.encode(body) if codec else body)
+
+        # SHA-256 исходного файла считается в том же проходе чтения
+        sha = hashlib.sha256()
+        wire_bytes = 0
         try:
-            with open(xfer_path, "rb") as f:
-                if resume_from:
-                    f.seek(resume_from)
-                while True:
-                    chunk = f.read(self.chunk_size)
-                    if not chunk:
+            with open(db_path, "rb") as f, ThreadPoolExecutor(PREPARE_AHEAD, thread_name_prefix="db-send") as pool:
+                remaining = resume_from
+                while remaining:
+                    block = f.read(min(1024 * 1024, remaining))
+                    if not block:
                         break
-
-                    enc = box_send.encrypt(chunk)
+                    sha.update(block)
+                    remaining -= len(block)
+
+                pending = deque()
+                next_seq = [seq]
+
+                def fill():
+                    while len(pending) < PREPARE_AHEAD:
+                        raw = f.read(self.chunk_size)
+                        if not raw:
+                            return
+                        sha.update(raw)
+                        first_block = next_seq[0] * self.chunk_size // block_size
+                        next_seq[0] += 1
+                        pending.append(pool.submit(prepare, raw, first_block))
+
+                fill()
+                while pending:
+                    enc = await asyncio.wrap_future(pending.popleft())
+                    fill()
                     writer.write(b"CHNK")
                     writer.write(struct.pack("!Q", seq))
                     writer.write(struct.pack("!Q", len(enc)))
                     writer.write(enc)
                     await writer.drain()
+                    wire_bytes += len(enc)
                     if byte_budget:
-                        sent_in_window += len(chunk)
+                        sent_in_window += len(enc)
                         now = time.monotonic()
                         elapsed = now - start_window
                         if elapsed < window_sec and sent_in_window >= byte_budget:
@@ -580,8 +658,18 @@ class DBSender:
                     if self.on_progress:
                         self.on_progress(min(seq * self.chunk_size, size), size)
 
+            if codec or basis:
+                raw_sent = max(size - resume_from, 0)
+                saved = (1.0 - wire_bytes / raw_sent) * 100.0 if raw_sent else 0.0
+                mode = "+".join(m for m in ("delta" if basis else "", codec.name if codec else "") if m)
+                self._log(
+                    f"[sender] {mode} ratio: "
+                    f"{raw_sent / (1024*1024):.2f} MiB -> {wire_bytes / (1024*1024):.2f} MiB "
+                    f"({saved:.1f}% saved)"
+                )
+
             writer.write(b"DONE")
-            writer.write((full_sha_hex + "\n").encode())
+            writer.write((sha.hexdigest() + "\n").encode())
             await writer.drain()
             writer.close(); await writer.wait_closed()
             self._log(f"[sender] finished send, seqs: {seq}")
@@ -595,10 +683,8 @@ class DBSender:
             try:
                 if snapshot_path and os.path.exists(snapshot_path):
                     os.remove(snapshot_path)
-                if xfer_path and xfer_path != snapshot_path and os.path.exists(xfer_path):
-                    os.remove(xfer_path)
             except Exception as e:
-                self._log(f"[ERROR][sender] removing snapshot/xfer: {e}")
+                self._log(f"[ERROR][sender] removing snapshot: {e}")
                 pass
 
 if __name__ == "__main__":
@@ -46,6 +46,7 @@ class TcpSenderTransportLan(SenderTransportBase):
         sas_info: SasInfoCb,
         use_gzip: bool,
         vacuum_snapshot: bool,
+        delta_sync: bool = False,
     ) -> None:
         self._host = host
         self._port = port
@@ -57,6 +58,7 @@ class TcpSenderTransportLan(SenderTransportBase):
             log=log,
             use_gzip=use_gzip,
             vacuum_snapshot=vacuum_snapshot,
+            delta_sync=delta_sync,
         )
 
     async def send_db(self, db_path: str) -> None:
@@ -1,11 +1,12 @@
 # transports.py
 from __future__ import annotations
 
-import os, json
+import os
 from abc import ABC, abstractmethod
 from typing import Optional, Callable
 
 from webrtc_transport import WebRTCSenderCore, WebRTCSignalingError
+from webrtc_stream import FileStreamSender, StreamProtocolError, DEFAULT_CHUNK as WEBRTC_CHUNK
 from db_transfer import DBSender
 
 LogFunc = Optional[Callable[[str], None]]
@@ -49,6 +50,7 @@ class TcpSenderTransport(SenderTransportBase):
         sas_info: SasInfoCb,
         use_gzip: bool,
         vacuum_snapshot: bool,
+        delta_sync: bool = False,
     ) -> None:
         self._host = host
         self._port = port
@@ -60,6 +62,7 @@ class TcpSenderTransport(SenderTransportBase):
             log=log,
             use_gzip=use_gzip,
             vacuum_snapshot=vacuum_snapshot,
+            delta_sync=delta_sync,
         )
 
     async def send_db(self, db_path: str) -> None:
@@ -80,14 +83,14 @@ class WebRTCSenderTransport(SenderTransportBase):
         show_offer: Callable[[str], None],
         wait_for_answer: Callable[[], str],
         *,
-        chunk_size: int = 2 * 1024 * 1024,  # MiB из GUI
+        chunk_size: int = WEBRTC_CHUNK,  # из GUI приходит MiB, режется до размера сообщения SCTP
     ) -> None:
         self._log = log
         self._on_progress = on_progress
         self._show_offer = show_offer
         self._wait_for_answer = wait_for_answer
         self._core = WebRTCSenderCore(log=log)
-        self._chunk_size = max(1, int(chunk_size))
+        self._chunk_size = max(1, min(int(chunk_size), WEBRTC_CHUNK))
 
     async def send_db(self, db_path: str) -> None:
         try:
@@ -104,46 +107,30 @@ class WebRTCSenderTransport(SenderTransportBase):
 
             await self._core.accept_answer(answer_sdp)
 
-            # --- Мини-протокол: header + чанки ---
             if not os.path.exists(db_path):
                 raise WebRTCSignalingError(f"DB file not found: {db_path}")
 
-            total = os.path.getsize(db_path)
-            name = os.path.basename(db_path)
-
             if self._log:
-                self._log(f"[webrtc] start sending DB over DataChannel: {name} ({total} bytes)")
-
-            # 1) Header (JSON)
-            header_obj = {
-                "kind": "header",
-                "name": name,
-                "size": total,
-            }
-            header_bytes = json.dumps(header_obj).encode("utf-8")
-            await self._core.send_bytes(header_bytes)
-
-            # 2) Raw chunks
-            sent = 0
-            chunk_size = self._chunk_size
-
-            with open(db_path, "rb") as f:
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-                    await self._core.send_bytes(chunk)
-                    sent += len(chunk)
-
-                    if self._on_progress:
-                        try:
-                            self._on_progress(sent, total)
-                        except Exception:
-                            pass
-
+                self._log(f"[webrtc] start sending DB over DataChannel: {os.path.basename(db_path)} "
+                          f"({os.path.getsize(db_path)} bytes, chunk {self._chunk_size} bytes)")
+
+            # header -> resume -> чанки с окном ack -> done/sha256 (см. webrtc_stream)
+            stream = FileStreamSender(
+                self._core.send_bytes,
+                chunk_size=self._chunk_size,
+                log=self._log,
+                on_progress=self._on_progress,
+            )
+            self._core.set_on_message(stream.on_control)
+            try:
+                await stream.send_file(db_path)
+            finally:
+                self._core.set_on_message(None)
+
+        except StreamProtocolError as e:
             if self._log:
-                self._log(f"[webrtc] DB sent over DataChannel: {sent}/{total} bytes")
-
+                self._log(f"[webrtc] transfer failed: {e}. Повтори отправку — приёмник докачает файл.")
+            raise
         except WebRTCSignalingError as e:
             if self._log:
                 self._log(f"[webrtc] failed: {e}. WebRTC не установился, используй режим Internet TCP.")
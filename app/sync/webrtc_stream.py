@@ -0,0 +1,398 @@
+# webrtc_stream.py
+"""
+Протокол передачи файла БД поверх WebRTC DataChannel.
+
+Канал сам по себе шифрованный (DTLS) и надёжный/упорядоченный (SCTP), поэтому здесь только
+фрейминг, управление потоком, контроль целостности и докачка:
+
+  sender -> receiver   {"kind":"header","name","size","chunk_size","chunks","id"}   (текст, JSON)
+  receiver -> sender   {"kind":"resume","seq":N}      N чанков уже лежат в .part (0 — с начала)
+  sender -> receiver   b"CHNK" + seq(!Q) + payload    (бинарные фреймы фиксированного размера)
+  receiver -> sender   {"kind":"ack","seq":N}         N чанков записано на диск (каждые ACK_EVERY)
+  sender -> receiver   {"kind":"done","chunks","sha256"}
+  receiver -> sender   {"kind":"result","ok":bool,"sha256","error"}
+
+Отправитель держит не больше WINDOW неподтверждённых чанков, поэтому медленный диск
+приёмника не раздувает очереди; локальный буфер канала ограничивает сам core (bufferedAmount).
+Модуль без сторонних зависимостей — его можно гонять на любом транспорте с send/feed.
+"""
+from __future__ import annotations
+
+import os
+import json
+import struct
+import asyncio
+import hashlib
+
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, Awaitable
+
+LogFunc = Optional[Callable[[str], None]]
+ProgressCb = Optional[Callable[[int, int], None]]
+
+FRAME_MAGIC = b"CHNK"
+FRAME_HEADER = struct.Struct("!4sQ")
+# 64 KiB на сообщение — безопасный max-message-size для SCTP у aiortc и браузеров
+MAX_MESSAGE = 64 * 1024
+DEFAULT_CHUNK = MAX_MESSAGE - FRAME_HEADER.size
+ACK_EVERY = 16
+WINDOW = 64  # неподтверждённых чанков в полёте (~4 MiB)
+CONTROL_TIMEOUT = 60.0
+
+
+class StreamProtocolError(Exception):
+    pass
+
+
+def file_transfer_id(path: str) -> str:
+    """Идентификатор версии файла: докачка возможна только в тот же самый файл."""
+    st = os.stat(path)
+    key = f"{os.path.basename(path)}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def _chunk_count(size: int, chunk_size: int) -> int:
+    return (size + chunk_size - 1) // chunk_size
+
+
+class FileStreamSender:
+    """
+    Отправка файла чанками. send(data) — корутина транспорта (bytes или str),
+    ответы приёмника передаются в on_control(msg_bytes) из потока event loop.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes | str], Awaitable[None]],
+        *,
+        chunk_size: int = DEFAULT_CHUNK,
+        log: LogFunc = None,
+        on_progress: ProgressCb = None,
+        window: int = WINDOW,
+        timeout: float = CONTROL_TIMEOUT,
+    ) -> None:
+        self._send = send
+        self._chunk_size = max(1, min(int(chunk_size), DEFAULT_CHUNK))
+        self._log = log or (lambda s: None)
+        self._on_progress = on_progress
+        self._window = max(2 * ACK_EVERY, int(window))  # ack приходит раз в ACK_EVERY чанков
+        self._timeout = timeout
+        self._resume: Optional[asyncio.Future] = None
+        self._result: Optional[asyncio.Future] = None
+        self._acked = 0
+        self._ack_event = asyncio.Event()
+
+    def on_control(self, data: bytes) -> None:
+        try:
+            msg = json.loads(data.decode("utf-8"))
+        except Exception:
+            self._log(f"[webrtc] sender: unexpected message ({len(data)} bytes)")
+            return
+        kind = msg.get("kind")
+        if kind == "resume" and self._resume and not self._resume.done():
+            self._resume.set_result(int(msg.get("seq") or 0))
+        elif kind == "ack":
+            self._acked = max(self._acked, int(msg.get("seq") or 0))
+            self._ack_event.set()
+        elif kind == "result" and self._result and not self._result.done():
+            self._result.set_result(msg)
+            self._ack_event.set()
+            if self._resume and not self._resume.done():
+                self._resume.set_exception(StreamProtocolError(f"receiver aborted: {msg.get('error')}"))
+
+    def _failed(self) -> Optional[dict]:
+        if self._result and self._result.done() and not self._result.result().get("ok"):
+            return self._result.result()
+        return None
+
+    async def _wait_window(self, seq: int) -> None:
+        while seq - self._acked >= self._window:
+            if self._failed():
+                raise StreamProtocolError(f"receiver aborted: {self._failed().get('error')}")
+            self._ack_event.clear()
+            try:
+                await asyncio.wait_for(self._ack_event.wait(), self._timeout)
+            except asyncio.TimeoutError:
+                raise StreamProtocolError(f"no ack from receiver after chunk {self._acked}") from None
+
+    async def send_file(self, path: str) -> dict:
+        loop = asyncio.get_running_loop()
+        self._resume = loop.create_future()
+        self._result = loop.create_future()
+        self._acked = 0
+
+        size = os.path.getsize(path)
+        chunk_size = self._chunk_size
+        chunks = _chunk_count(size, chunk_size)
+        header = {
+            "kind": "header",
+            "name": os.path.basename(path),
+            "size": size,
+            "chunk_size": chunk_size,
+            "chunks": chunks,
+            "id": file_transfer_id(path),
+        }
+        await self._send(json.dumps(header))
+        try:
+            seq = await asyncio.wait_for(self._resume, self._timeout)
+        except asyncio.TimeoutError:
+            raise StreamProtocolError("receiver did not answer the header") from None
+        seq = max(0, min(seq, chunks))
+        self._acked = seq
+        if seq:
+            self._log(f"[webrtc] receiver resumes from chunk {seq}/{chunks}")
+
+        sha = hashlib.sha256()
+        hsize = FRAME_HEADER.size
+        buf = bytearray(hsize + chunk_size)
+        view = memoryview(buf)
+        payload = view[hsize:]
+
+        with open(path, "rb", buffering=0) as f:
+            # префикс, который уже есть у приёмника, только хешируем
+            remaining = seq * chunk_size
+            while remaining:
+                n = f.readinto(payload[:min(chunk_size, remaining)])
+                if not n:
+                    break
+                sha.update(payload[:n])
+                remaining -= n
+
+            sent = seq * chunk_size
+            while True:
+                n = f.readinto(payload)
+                if not n:
+                    break
+                sha.update(payload[:n])
+                FRAME_HEADER.pack_into(buf, 0, FRAME_MAGIC, seq)
+                await self._wait_window(seq)
+                # aiortc принимает только bytes — одна копия из переиспользуемого буфера
+                await self._send(bytes(view[:hsize + n]))
+                seq += 1
+                sent += n
+                if self._on_progress:
+                    try:
+                        self._on_progress(sent, size)
+                    except Exception:
+                        pass
+
+        digest = sha.hexdigest()
+        await self._send(json.dumps({"kind": "done", "chunks": seq, "sha256": digest}))
+        try:
+            result = await asyncio.wait_for(self._result, self._timeout)
+        except asyncio.TimeoutError:
+            raise StreamProtocolError("receiver did not confirm the transfer") from None
+        if not result.get("ok"):
+            raise StreamProtocolError(f"receiver rejected the file: {result.get('error')}")
+        if result.get("sha256") != digest:
+            raise StreamProtocolError("receiver reported a different SHA-256")
+        self._log(f"[webrtc] DB sent: {size} bytes, {seq} chunks, sha256 {digest[:16]}…")
+        return result
+
+
+class FileStreamReceiver:
+    """
+    Приём файла. feed(data) вызывается из event loop на каждое сообщение канала,
+    send_text(s) отправляет управляющий ответ. Запись и хеширование — в отдельном потоке,
+    чтобы блокирующий I/O не тормозил event loop (и DataChannel вместе с ним).
+
+    Незаконченный файл лежит в <dir>/<name>.part, рядом <name>.part.json с id версии;
+    повторная отправка того же файла продолжает с последнего целого чанка.
+    """
+
+    def __init__(
+        self,
+        send_text: Callable[[str], None],
+        incoming_dir: str | Path = "./incoming",
+        *,
+        log: LogFunc = None,
+        on_progress: ProgressCb = None,
+        on_done: Optional[Callable[[str], None]] = None,
+        allow_resume: bool = True,
+    ) -> None:
+        self._send_text = send_text
+        self._dir = Path(incoming_dir)
+        self._log = log or (lambda s: None)
+        self._on_progress = on_progress
+        self._on_done = on_done
+        self._allow_resume = allow_resume
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="webrtc-rx")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.meta: Optional[dict] = None
+        self._file = None
+        self._sha = None
+        self._expected = 0  # следующий seq, принятый из канала
+        self._written = 0   # чанков на диске (поток записи)
+        self._received = 0  # байт на диске
+        self._failed = False
+
+    @property
+    def active(self) -> bool:
+        return self.meta is not None
+
+    def feed(self, data: bytes) -> None:
+        if data[:4] == FRAME_MAGIC:
+            self._on_frame(data)
+            return
+        try:
+            msg = json.loads(data.decode("utf-8"))
+        except Exception:
+            self._log(f"[webrtc] unexpected message ({len(data)} bytes); ignoring")
+            return
+        kind = msg.get("kind")
+        if kind == "header":
+            self._on_header(msg)
+        elif kind == "done":
+            self._on_done_msg(msg)
+        else:
+            self._log(f"[webrtc] unexpected control message: {msg}")
+
+    def close(self) -> None:
+        """Закрыть .part без удаления (докачка при следующем подключении)."""
+        def _close():
+            if self._file:
+                try:
+                    self._file.close()
+                except Exception:
+                    pass
+            self._reset()
+        self._writer.submit(_close).result()
+
+    def shutdown(self) -> None:
+        self.close()
+        self._writer.shutdown(wait=True)
+
+    # --- helpers (loop thread) ---
+    def _reply(self, msg: dict) -> None:
+        text = json.dumps(msg)
+        if self._loop is None:
+            self._send_text(text)
+        else:
+            self._loop.call_soon_threadsafe(self._send_text, text)
+
+    def _fail(self, error: str) -> None:
+        self._log(f"[webrtc] receive failed: {error}")
+        self._failed = True
+        self._reply({"kind": "result", "ok": False, "error": error})
+
+    def _paths(self, name: str) -> tuple[Path, Path]:
+        part = self._dir / f"{name}.part"
+        return part, part.with_name(part.name + ".json")
+
+    def _on_header(self, msg: dict) -> None:
+        if self.meta is not None:
+            self.close()
+        self._loop = asyncio.get_running_loop()
+        name = os.path.basename(str(msg.get("name") or "webrtc_incoming.db"))
+        try:
+            meta = {
+                "name": name,
+                "size": int(msg["size"]),
+                "chunk_size": int(msg["chunk_size"]),
+                "chunks": int(msg["chunks"]),
+                "id": str(msg["id"]),
+            }
+        except (KeyError, TypeError, ValueError):
+            self._fail("header without size/chunk_size/id (old sender?)")
+            return
+        self.meta = meta
+        self._log(f"[webrtc] header received: {name} ({meta['size']} bytes, {meta['chunks']} chunks)")
+        self._writer.submit(self._open_part, meta)
+
+    def _open_part(self, meta: dict) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        part, side = self._paths(meta["name"])
+        chunk_size = meta["chunk_size"]
+        resume = 0
+        if self._allow_resume and part.exists() and side.exists():
+            try:
+                old = json.loads(side.read_text(encoding="utf-8"))
+                if old.get("id") == meta["id"] and int(old.get("chunk_size", 0)) == chunk_size:
+                    resume = min(part.stat().st_size // chunk_size, meta["chunks"])
+            except Exception as e:
+                self._log(f"[webrtc] resume check failed: {e}")
+
+        self._sha = hashlib.sha256()
+        if resume:
+            f = open(part, "r+b")
+            f.truncate(resume * chunk_size)  # хвост недописанного чанка отбрасываем
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                self._sha.update(block)
+            self._log(f"[webrtc] resume from chunk {resume}/{meta['chunks']}")
+        else:
+            f = open(part, "wb")
+            side.write_text(json.dumps({"id": meta["id"], "chunk_size": chunk_size}), encoding="utf-8")
+        self._file = f
+        self._written = self._expected = resume
+        self._received = min(resume * chunk_size, meta["size"])
+        self._reply({"kind": "resume", "seq": resume})
+        self._progress()
+
+    def _on_frame(self, data: bytes) -> None:
+        if self.meta is None or self._failed:
+            return
+        _, seq = FRAME_HEADER.unpack_from(data)
+        # _expected ставит поток записи в _open_part; фреймы приходят только после ответа resume
+        if seq != self._expected:
+            self._fail(f"out-of-order chunk: expected {self._expected}, got {seq}")
+            return
+        self._expected += 1
+        self._writer.submit(self._write, seq, memoryview(data)[FRAME_HEADER.size:])
+
+    def _write(self, seq: int, payload: memoryview) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.write(payload)
+        except OSError as e:
+            self._loop.call_soon_threadsafe(self._fail, f"write error: {e}")
+            return
+        self._sha.update(payload)
+        self._written = seq + 1
+        self._received += len(payload)
+        if self._written % ACK_EVERY == 0:
+            self._reply({"kind": "ack", "seq": self._written})
+        self._progress()
+
+    def _progress(self) -> None:
+        if self._on_progress and self.meta:
+            try:
+                self._on_progress(self._received, self.meta["size"])
+            except Exception:
+                pass
+
+    def _on_done_msg(self, msg: dict) -> None:
+        if self.meta is None or self._failed:
+            return
+        self._writer.submit(self._finish, dict(self.meta), str(msg.get("sha256") or ""), int(msg.get("chunks") or 0))
+
+    def _finish(self, meta: dict, expected_sha: str, chunks: int) -> None:
+        part, side = self._paths(meta["name"])
+        f, self._file = self._file, None
+        if f:
+            f.close()
+        got = self._sha.hexdigest() if self._sha else ""
+        ok = bool(expected_sha) and got == expected_sha and chunks == self._written \
+            and part.stat().st_size == meta["size"]
+        self._reset()
+        if not ok:
+            # битый файл докачивать бессмысленно
+            part.unlink(missing_ok=True)
+            side.unlink(missing_ok=True)
+            self._log(f"[webrtc] SHA-256 mismatch: expected {expected_sha[:16]}…, got {got[:16]}…")
+            self._reply({"kind": "result", "ok": False, "sha256": got, "error": "sha256 mismatch"})
+            return
+        final = self._dir / meta["name"]
+        os.replace(part, final)
+        side.unlink(missing_ok=True)
+        self._log(f"[webrtc] file received and saved: {final} (sha256 {got[:16]}…)")
+        self._reply({"kind": "result", "ok": True, "sha256": got})
+        if self._on_done:
+            try:
+                self._on_done(str(final))
+            except Exception:
+                pass
@@ -10,6 +10,21 @@ from aiortc import RTCDataChannel
 
 LogFunc = Optional[Callable[[str], None]]
 
+DEFAULT_ICE_SERVERS = ["stun:stun.l.google.com:19302"]
+# Backpressure: пока в SCTP-буфере канала больше BUFFER_HIGH байт, send_bytes ждёт события
+# bufferedamountlow (буфер опустился до BUFFER_LOW), а не копит весь файл в памяти
+BUFFER_HIGH = 4 * 1024 * 1024
+BUFFER_LOW = 1 * 1024 * 1024
+
+
+def _rtc_config(ice_servers: Optional[list[str]]) -> RTCConfiguration:
+    urls = DEFAULT_ICE_SERVERS if ice_servers is None else ice_servers
+    return RTCConfiguration(iceServers=[RTCIceServer(urls=[u]) for u in urls])
+
+
+def _as_bytes(msg) -> bytes:
+    return msg.encode("utf-8") if isinstance(msg, str) else msg
+
 class WebRTCSignalingError(Exception):
     pass
 
@@ -23,22 +38,26 @@ class WebRTCSenderCore:
       - ждёт ICE + открытие канала
     """
 
-    def __init__(self, log: LogFunc = None) -> None:
+    def __init__(self, log: LogFunc = None, ice_servers: Optional[list[str]] = None) -> None:
         self._log = log or (lambda s: None)
+        self._ice_servers = ice_servers
         self._pc: Optional[RTCPeerConnection] = None
         self._channel: Optional[RTCDataChannel] = None
         self._connected = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._on_message: Optional[Callable[[bytes], None]] = None
+
+    def set_on_message(self, cb: Callable[[bytes], None]) -> None:
+        """Ответы приёмника (ack/resume/result) — вызывается в потоке event loop."""
+        self._on_message = cb
 
     async def create_offer(self) -> str:
-        # раньше было просто: pc = RTCPeerConnection()
-        config = RTCConfiguration(
-            iceServers=[RTCIceServer(urls=["stun:stun.l.google.com:19302"])]
-        )
-        pc = RTCPeerConnection(configuration=config)
+        pc = RTCPeerConnection(configuration=_rtc_config(self._ice_servers))
         self._pc = pc
 
         # создаём datachannel заранее
         channel = pc.createDataChannel("db")
+        channel.bufferedAmountLowThreshold = BUFFER_LOW
         self._channel = channel
 
         @channel.on("open")
@@ -46,6 +65,19 @@ class WebRTCSenderCore:
             self._log("[webrtc] datachannel 'db' opened")
             self._connected.set()
 
+        @channel.on("bufferedamountlow")
+        def _on_buffered_low():
+            self._writable.set()
+
+        @channel.on("close")
+        def _on_close():
+            self._writable.set()  # будим send_bytes, он увидит закрытый канал
+
+        @channel.on("message")
+        def _on_message(msg):
+            if self._on_message:
+                self._on_message(_as_bytes(msg))
+
         @pc.on("iceconnectionstatechange")
         def _on_state_change():
             self._log(f"[webrtc] ICE state: {pc.iceConnectionState}")
@@ -87,10 +119,16 @@ class WebRTCSenderCore:
 
         self._log("[webrtc] WebRTC connected (sender side)")
 
-    async def send_bytes(self, data: bytes) -> None:
-        if not self._channel or self._channel.readyState != "open":
+    async def send_bytes(self, data: bytes | str) -> None:
+        channel = self._channel
+        while channel and channel.readyState == "open" and channel.bufferedAmount > BUFFER_HIGH:
+            self._writable.clear()
+            if channel.bufferedAmount <= BUFFER_HIGH:
+                break
+            await self._writable.wait()
+        if not channel or channel.readyState != "open":
             raise WebRTCSignalingError("Channel is not open")
-        self._channel.send(data)
+        channel.send(data)
 
     async def close(self) -> None:
         if self._channel:
@@ -112,8 +150,9 @@ class WebRTCReceiverCore:
       - ждёт datachannel "db"
     """
 
-    def __init__(self, log: LogFunc = None) -> None:
+    def __init__(self, log: LogFunc = None, ice_servers: Optional[list[str]] = None) -> None:
         self._log = log or (lambda s: None)
+        self._ice_servers = ice_servers
         self._pc: Optional[RTCPeerConnection] = None
         self._channel: Optional[RTCDataChannel] = None
         self._connected = asyncio.Event()
@@ -122,11 +161,15 @@ class WebRTCReceiverCore:
     def set_on_message(self, cb: Callable[[bytes], None]) -> None:
         self._on_message = cb
 
+    def send_text(self, text: str) -> None:
+        """Управляющий ответ отправителю (ack/resume/result); вызывать из потока event loop."""
+        if self._channel and self._channel.readyState == "open":
+            self._channel.send(text)
+        else:
+            self._log("[webrtc] control message dropped: channel is not open")
+
     async def accept_offer_and_create_answer(self, offer_sdp: str) -> str:
-        config = RTCConfiguration(
-            iceServers=[RTCIceServer(urls=["stun:stun.l.google.com:19302"])]
-        )
-        pc = RTCPeerConnection(configuration=config)
+        pc = RTCPeerConnection(configuration=_rtc_config(self._ice_servers))
         self._pc = pc
 
         @pc.on("datachannel")
@@ -141,12 +184,8 @@ class WebRTCReceiverCore:
 
             @ch.on("message")
             def _on_message(msg):
-                if isinstance(msg, str):
-                    msg_bytes = msg.encode("utf-8")
-                else:
-                    msg_bytes = msg
                 if self._on_message:
-                    self._on_message(msg_bytes)
+                    self._on_message(_as_bytes(msg))
 
         @pc.on("iceconnectionstatechange")
         def _on_state_change():
@@ -1,9 +1,8 @@
 import io
 import os
 import time
-import json
-import atexit
 import logging
+import itertools
 import urllib
 import warnings
 import datetime
@@ -21,6 +20,9 @@ from tkinter.ttk import Combobox
 from urllib.parse import urlparse, urlsplit, urlunsplit
 from logging.handlers import TimedRotatingFileHandler
 
+from poster_cache import PosterCache, PhotoLRU
+from tk_tasks import TkTaskRunner
+
 warnings.filterwarnings("ignore", category=UserWarning, module='urllib3')
 os.environ['TK_SILENCE_DEPRECATION'] = '1'
 
@@ -88,11 +90,16 @@ class AnimePlayerAppVer1:
         self.current_poster_index = 0
         self.clear_cache_file()
         self.executor = ThreadPoolExecutor(max_workers=6)
+        self.tasks = TkTaskRunner(self.window, self.executor, self.logger)
+        self.poster_cache = PosterCache(os.path.join('temp', 'posters'), self.http, logger=self.logger)
+        self.photo_cache = PhotoLRU()
+        self._poster_token = 0
+        self._placeholder_seq = itertools.count()
+        # адаптированный ответ последнего запроса к API ({"list": [...]})
+        self.response_data = None
         self._is_saving = False
         self._load_posters = True
 
-        atexit.register(self.delete_response_json)
-
     def load_config(self):
         self.stream_video_url = self.config_manager.get_setting('Settings', 'stream_video_url')
         self.base_url = self.config_manager.get_setting('Settings', 'base_url')
@@ -161,43 +168,15 @@ class AnimePlayerAppVer1:
         self.logger.addHandler(handler)
         self.log_message("Start application...")
 
-    def read_json_data(self):
-        try:
-            utils_folder = 'temp'
-            os.makedirs(utils_folder, exist_ok=True)
-            utils_json = os.path.join(utils_folder, 'response.json')
-            self.log_message(f"Attempting to read {utils_json}.")
-            with open(utils_json, 'r', encoding='utf-8') as file:
-                raw = json.load(file)
-            self.log_message(f"Successfully read data from {utils_json}.")
-            return self._adapt_payload_for_display_list(raw)
-        except FileNotFoundError:
-            self.log_message(f"File {utils_json} not found.")
-            return None
-        except json.JSONDecodeError as e:
-            self.log_message(f"Error decoding JSON data from {utils_json}: {str(e)}")
-            return None
-
-    def delete_response_json(self):
-        try:
-            utils_folder = 'temp'
-            utils_json = os.path.join(utils_folder, 'response.json')
-            if os.path.exists(utils_json):
-                self.log_message(f"Attempting to delete {utils_json}.")
-                os.remove(utils_json)
-                self.log_message(f"Successfully deleted {utils_json}.")
-            else:
-                self.log_message(f"File {utils_json} does not exist. No need to delete.")
-        except OSError as e:
-            error_message = f"An error occurred while deleting {utils_json}: {str(e)}"
-            self.log_message(error_message)
+    def get_response_data(self):
+        return self.response_data
 
     def save_playlist(self):
         if self._is_saving:
             print("Сохранение уже идёт...")
             return
         self._is_saving = True
-        self.window.after(0, lambda: self._set_status("Собираю ссылки..."))
+        self.tasks.call_soon(lambda: self._set_status("Собираю ссылки..."))
         t = threading.Thread(target=self._build_and_save_playlist_worker, daemon=True)
         t.start()
 
@@ -305,33 +284,39 @@ class AnimePlayerAppVer1:
             print(f"An error occurred while GET processing the poster: {str(e)}")
 
     def show_poster(self, poster_url):
-        try:
-            self.clear_poster()
-            params = {'no_cache': 'true', 'timestamp': time.time()}
-            start_time = time.time()
-            response = self.http.get(poster_url, stream=True, params=params, timeout=15)
-            end_time = time.time()
-            response.raise_for_status()
-            poster_image = Image.open(io.BytesIO(response.content))
-            poster_photo = ImageTk.PhotoImage(poster_image)
-            self.poster_label = tk.Label(self.window, image=poster_photo)
-            self.poster_label.grid(row=2, column=0, columnspan=3)
-            self.poster_label.image = poster_photo
-            response.raise_for_status()
-            num_bytes = len(response.content) if response.content else 0
-            num_kilobytes = num_bytes / 1024
-            self.logger.debug(f"Successfully SHOW poster. URL: '{poster_url}', "
-                              f"Time taken: {end_time - start_time:.2f} seconds, "
-                              f"Image size: {num_kilobytes} Kb.")
-
-        except requests.exceptions.RequestException as e:
-            error_message = f"An error occurred while SHOW downloading the poster: {str(e)}"
-            self.log_message(error_message)
-            print(error_message)
-        except Exception as e:
-            error_message = f"An error occurred while SHOW processing the poster: {str(e)}"
-            self.log_message(error_message)
-            print(error_message)
+        """Постер из LRU сразу, иначе загрузка и декодирование в фоне; окно не блокируется."""
+        self._poster_token += 1
+        token = self._poster_token
+        photo = self.photo_cache.get(poster_url)
+        if photo is not None:
+            self._set_poster_photo(photo)
+            self.logger.debug(f"Successfully SHOW poster from memory. URL: '{poster_url}'")
+            return
+        self.clear_poster()
+        self.tasks.submit(
+            self._load_poster_image, poster_url,
+            on_done=lambda image: self._on_poster_loaded(token, poster_url, image),
+            on_error=lambda e: self.log_message(f"An error occurred while SHOW downloading the poster: {e}"),
+        )
+
+    def _load_poster_image(self, poster_url):
+        """Рабочий поток: байты из дискового кэша/сети и декодирование PIL."""
+        image = Image.open(io.BytesIO(self.poster_cache.get(poster_url)))
+        image.load()
+        return image
+
+    def _on_poster_loaded(self, token, poster_url, image):
+        photo = ImageTk.PhotoImage(image)
+        self.photo_cache.put(poster_url, photo)
+        if token == self._poster_token:  # пока грузили, могли выбрать другой тайтл
+            self._set_poster_photo(photo)
+            self.logger.debug(f"Successfully SHOW poster. URL: '{poster_url}'")
+
+    def _set_poster_photo(self, photo):
+        self.clear_poster()
+        self.poster_label = tk.Label(self.window, image=photo)
+        self.poster_label.grid(row=2, column=0, columnspan=3)
+        self.poster_label.image = photo
 
     def clear_cache_file(self):
         try:
@@ -392,10 +377,6 @@ class AnimePlayerAppVer1:
                 current_poster_url = poster_links[self.current_poster_index]
                 self.show_poster(current_poster_url)
                 self.logger.debug(f"Successfully CHANGE poster. URL: '{current_poster_url}' ")
-        except requests.exceptions.RequestException as e:
-            error_message = f"An error occurred while CHANGE downloading the poster: {str(e)}"
-            self.log_message(error_message)
-            print(error_message)
         except Exception as e:
             error_message = f"An error occurred while CHANGE processing the poster: {str(e)}"
             self.log_message(error_message)
@@ -412,9 +393,9 @@ class AnimePlayerAppVer1:
 
     def _build_and_save_playlist_worker(self):
         try:
-            data = self.read_json_data()
+            data = self.get_response_data()
             if not (data and "list" in data and isinstance(data["list"], list) and data["list"]):
-                self.window.after(0, lambda: self._set_status("Нет данных: сначала получите список."))
+                self.tasks.call_soon(lambda: self._set_status("Нет данных: сначала получите список."))
                 return
 
             q = self.quality_var.get()
@@ -433,7 +414,7 @@ class AnimePlayerAppVer1:
                         episode_ids.append(str(eid))
 
             if not episode_ids:
-                self.window.after(0, lambda: self._set_status("Эпизоды не найдены."))
+                self.tasks.call_soon(lambda: self._set_status("Эпизоды не найдены."))
                 return
 
             total = len(episode_ids)
@@ -465,11 +446,11 @@ class AnimePlayerAppVer1:
                 finally:
                     done += 1
                     if done % 10 == 0 or done == total:
-                        self.window.after(0, lambda d=done, t=total: self._set_status(f"Собрано {d}/{t} потоков..."))
+                        self.tasks.call_soon(lambda d=done, t=total: self._set_status(f"Собрано {d}/{t} потоков..."))
             discovered = list(dict.fromkeys(discovered))
 
             if not discovered:
-                self.window.after(0, lambda: self._set_status("Не найдено пригодных HLS-потоков."))
+                self.tasks.call_soon(lambda: self._set_status("Не найдено пригодных HLS-потоков."))
                 return
 
             playlists_folder = 'playlists'
@@ -486,10 +467,10 @@ class AnimePlayerAppVer1:
                 self.playlist_name = playlist_path
                 self._set_status(f"Плейлист сохранён: {playlist_path}")
 
-            self.window.after(0, _finish_ok)
+            self.tasks.call_soon(_finish_ok)
 
         except Exception as e:
-            self.window.after(0, lambda: self._set_status(f"Ошибка при сохранении: {e}"))
+            self.tasks.call_soon(self._set_status, f"Ошибка при сохранении: {e}")
         finally:
             self._is_saving = False
 
@@ -644,25 +625,12 @@ class AnimePlayerAppVer1:
         """Возвращает то, чем можно запросить релиз: alias (code) или id."""
         return (title.get("code") or title.get("id") or "").strip()
 
-    def _ensure_temp(self):
-        utils_folder = 'temp'
-        os.makedirs(utils_folder, exist_ok=True)
-        return os.path.join(utils_folder, 'response.json')
-
-    def _fetch_to_temp_and_render(self, url: str, render_fn):
-        start = time.time()
-        try:
+    def _fetch_and_render(self, url: str, render_fn):
+        """Запрос к API в фоне; ответ держим в памяти (response_data), render_fn — в главном потоке."""
+        def _fetch():
+            start = time.time()
             r = self.http.get(url, timeout=15)
-            text = r.text or ""
-            if r.status_code == 200:
-                utils_json = self._ensure_temp()
-                with open(utils_json, 'w', encoding='utf-8') as f:
-                    f.write(text)
-                render_fn()
-                self.logger.debug(
-                    f"GET OK: {url}, time={time.time() - start:.2f}s, size={len(text)}"
-                )
-            else:
+            if r.status_code != 200:
                 msg = f"Error {r.status_code}: Unable to fetch data from the API."
                 try:
                     err = r.json()
@@ -670,12 +638,43 @@ class AnimePlayerAppVer1:
                         msg += f" Error message: {err['error'].get('message', '')}"
                 except Exception:
                     pass
-                self.log_message(msg)
-                print(msg)
-        except Exception as e:
+                raise RuntimeError(msg)
+            payload = r.json()
+            self.logger.debug(f"GET OK: {url}, time={time.time() - start:.2f}s, size={len(r.content)}")
+            return self._adapt_payload_for_display_list(payload)
+
+        def _done(data):
+            self.response_data = data
+            render_fn()
+
+        def _failed(e):
             self.log_message(f"Request failed {url}: {e}")
             print(f"Request failed {url}: {e}")
 
+        self.tasks.submit(_fetch, on_done=_done, on_error=_failed)
+
+    def _insert_placeholder(self, text: str) -> str:
+        """Вставить временный текст с уникальным тегом; позже его заменит _fill_placeholder."""
+        tag = f"pending_{next(self._placeholder_seq)}"
+        self.text.insert(tk.END, text, (tag,))
+        return tag
+
+    def _fill_placeholder(self, tag: str, render_at):
+        """
+        Заменить плейсхолдер: render_at(mark) вставляет текст по метке.
+        Если текст уже очищен (пользователь открыл другое), тега нет — ничего не делаем.
+        """
+        ranges = self.text.tag_ranges(tag)
+        if not ranges:
+            return
+        mark = f"{tag}_mark"
+        self.text.mark_set(mark, ranges[0])
+        self.text.delete(ranges[0], ranges[1])
+        try:
+            render_at(mark)
+        finally:
+            self.text.mark_unset(mark)
+
     def _get_json(self, url: str):
         try:
             r = self.http.get(url, timeout=15)
@@ -710,38 +709,26 @@ class AnimePlayerAppVer1:
 
     def _render_episodes_list(self, release_identity: str, title: dict = None):
         """
-        Тянем /anime/releases/{id_or_alias} и показываем список серий.
+        Список серий: из расписания (prefetched) сразу, иначе /anime/releases/{id_or_alias} в фоне.
         """
         if not release_identity:
             self.text.insert(tk.END, "\nЭпизоды: неизвестен идентификатор релиза\n")
             return
 
         if title and isinstance(title.get("_prefetched_episodes"), list) and title["_prefetched_episodes"]:
-            episodes = title["_prefetched_episodes"]
-            self.text.insert(tk.END, "\nЭпизоды:\n")
-            for ep in episodes:
-                eid = ep.get("id") or ep.get("releaseEpisodeId") or ep.get("episodeId")
-                num = int(ep.get("ordinal") or 0)
-                nm = ep.get("name") or ep.get("title") or ""
-                line = f"• Серия {num}"
-                if nm:
-                    line += f": {nm}"
-                line += " — "
-                tag = f"hyperlink_play_ep_{eid or num}"
-                self.text.insert(tk.END, line)
-                self.text.insert(tk.END, "Смотреть", (tag,))
-                self.text.insert(tk.END, "\n")
-                if eid:
-                    self.text.tag_bind(tag, "<Button-1>", lambda e, _eid=eid: self.play_episode_by_id(_eid))
-                    self.text.tag_config(tag, foreground="blue")
-                else:
-                    self.text.tag_config(tag, foreground="gray")
+            self._insert_episodes(tk.END, title["_prefetched_episodes"])
             return
 
+        tag = self._insert_placeholder("\nЭпизоды: загрузка...\n")
         url = self._api(f"anime/releases/{urllib.parse.quote(release_identity)}")
-        data = self._get_json(url)
+        self.tasks.submit(
+            self._get_json, url,
+            on_done=lambda data: self._fill_placeholder(tag, lambda at: self._insert_release_episodes(at, data)),
+        )
+
+    def _insert_release_episodes(self, at, data):
         if not data:
-            self.text.insert(tk.END, "\nЭпизоды: не удалось получить данные\n")
+            self.text.insert(at, "\nЭпизоды: не удалось получить данные\n")
             return
 
         episodes = data.get("episodes") or data.get("data", {}).get("episodes") or []
@@ -753,17 +740,19 @@ class AnimePlayerAppVer1:
                 for ep in player_list.values():
                     episodes.append({
                         "id": ep.get("id") or ep.get("episodeId"),
-                        "number": int(ep.get("ordinal") or 0),
+                        "ordinal": ep.get("ordinal"),
                         "name": ep.get("name") or ""
                     })
 
         if not episodes:
-            self.text.insert(tk.END, "\nЭпизоды: не найдены\n")
+            self.text.insert(at, "\nЭпизоды: не найдены\n")
             return
+        self._insert_episodes(at, episodes)
 
-        self.text.insert(tk.END, "\nЭпизоды:\n")
+    def _insert_episodes(self, at, episodes):
+        self.text.insert(at, "\nЭпизоды:\n")
         for ep in episodes:
-            eid = ep.get("id") or ep.get("episodeId") or ep.get("releaseEpisodeId")
+            eid = ep.get("id") or ep.get("releaseEpisodeId") or ep.get("episodeId")
             num = int(ep.get("ordinal") or 0)
             nm = ep.get("name") or ep.get("title") or ""
             line = f"• Серия {num}"
@@ -771,10 +760,9 @@ class AnimePlayerAppVer1:
                 line += f": {nm}"
             line += " — "
             tag = f"hyperlink_play_ep_{eid or num}"
-            start = self.text.index(tk.END)
-            self.text.insert(tk.END, line)
-            self.text.insert(tk.END, "Смотреть", (tag,))
-            self.text.insert(tk.END, "\n")
+            self.text.insert(at, line)
+            self.text.insert(at, "Смотреть", (tag,))
+            self.text.insert(at, "\n")
             if eid:
                 self.text.tag_bind(tag, "<Button-1>", lambda e, _eid=eid: self.play_episode_by_id(_eid))
                 self.text.tag_config(tag, foreground="blue")
@@ -782,18 +770,24 @@ class AnimePlayerAppVer1:
                 self.text.tag_config(tag, foreground="gray")
 
     def _fetch_and_render_torrents(self, release_identity: str):
-        """Догружаем /anime/releases/{id|alias}, рисуем торрент-ссылки под текущим курсором."""
+        """Догружаем /anime/releases/{id|alias} в фоне, рисуем торрент-ссылки на месте плейсхолдера."""
         url = self._api(f"anime/releases/{urllib.parse.quote(release_identity)}")
-        data = self._get_json(url)
+        tag = self._insert_placeholder(" (загрузка...)")
+        self.tasks.submit(
+            self._get_json, url,
+            on_done=lambda data: self._fill_placeholder(tag, lambda at: self._insert_torrents(at, data)),
+        )
+
+    def _insert_torrents(self, at, data):
         if not data:
-            self.text.insert(tk.END, " (ошибка загрузки)\n")
+            self.text.insert(at, " (ошибка загрузки)\n")
             return
         a = self._adapt_release(data)
         torrents = (a.get("torrents") or {}).get("list") or []
         if not torrents:
-            self.text.insert(tk.END, " (торрентов нет)\n")
+            self.text.insert(at, " (торрентов нет)\n")
             return
-        self.text.insert(tk.END, "\n")
+        self.text.insert(at, "\n")
         for torrent in torrents:
             url = torrent.get("url") or torrent.get("magnet")
             quality = (torrent.get("quality") or {}).get("string") or "Качество не указано"
@@ -801,10 +795,8 @@ class AnimePlayerAppVer1:
                 continue
             idx = len(self.discovered_links)
             tag = f"hyperlink_torrent_{idx}"
-            start = self.text.index(tk.END)
-            self.text.insert(tk.END, f"Скачать ({quality})", (tag,))
-            end = self.text.index(tk.END)
-            self.text.insert(tk.END, "\n")
+            self.text.insert(at, f"Скачать ({quality})", (tag,))
+            self.text.insert(at, "\n")
             self.text.tag_bind(tag, "<Button-1>", self.on_link_click)
             self.text.tag_config(tag, foreground="blue")
             self.discovered_links.append(url)
@@ -823,8 +815,11 @@ class AnimePlayerAppVer1:
 
     def play_episode_by_id(self, episode_id: str):
         """
-        Тянем /anime/releases/episodes/{id}, выбираем hls по качеству и сразу запускаем плеер.
+        Тянем /anime/releases/episodes/{id}, выбираем hls по качеству и сразу запускаем плеер (в фоне).
         """
+        self.executor.submit(self._play_episode_worker, episode_id, self.quality_var.get())
+
+    def _play_episode_worker(self, episode_id: str, q: str):
         try:
             url = self._api(f"anime/releases/episodes/{episode_id}")
             payload = self._get_json(url)
@@ -838,7 +833,6 @@ class AnimePlayerAppVer1:
                 print("HLS не найдено в ответе эпизода")
                 return
 
-            q = self.quality_var.get()
             m3u8 = hls.get(q) or hls.get("hls_1080") or hls.get("hls_720") or hls.get("hls_480")
             if not m3u8:
                 print("Для эпизода не нашлось подходящего качества")
@@ -863,11 +857,11 @@ class AnimePlayerAppVer1:
 
     def get_schedule_now(self):
         url = self._api("anime/schedule/now")
-        self._fetch_to_temp_and_render(url, self.display_schedule_now)
+        self._fetch_and_render(url, self.display_schedule_now)
 
     def get_schedule_week(self):
         url = self._api("anime/schedule/week")
-        self._fetch_to_temp_and_render(url, self.display_schedule_week)
+        self._fetch_and_render(url, self.display_schedule_week)
 
     def search_by_title(self):
         search_text = self.title_search_entry.get()
@@ -875,11 +869,11 @@ class AnimePlayerAppVer1:
             print("Search text is empty.")
             return
         url = self._api(f"anime/releases/{urllib.parse.quote(search_text)}")
-        self._fetch_to_temp_and_render(url, self.display_info)
+        self._fetch_and_render(url, self.display_info)
 
     def random_title(self):
         url = self._api("anime/releases/random?limit=1")
-        self._fetch_to_temp_and_render(url, self.display_info)
+        self._fetch_and_render(url, self.display_info)
 
     def display_title_info(self, title, index, show_description=True, load_poster=True):
         self.text.insert(tk.END, "---\n\n")
@@ -952,7 +946,7 @@ class AnimePlayerAppVer1:
     def display_schedule_now(self):
         try:
             self.clear_cache_file()
-            data = self.read_json_data()
+            data = self.get_response_data()
             self.text.delete("1.0", tk.END)
             self.clear_poster()
             items = (data or {}).get("list") or []
@@ -969,7 +963,7 @@ class AnimePlayerAppVer1:
     def display_schedule_week(self):
         try:
             self.clear_cache_file()
-            data = self.read_json_data()
+            data = self.get_response_data()
             self.text.delete("1.0", tk.END)
             self.clear_poster()
             items = (data or {}).get("list") or []
@@ -990,7 +984,7 @@ class AnimePlayerAppVer1:
         try:
             self.clear_cache_file()
             self.title_search_entry.delete(0, tk.END)
-            data = self.read_json_data()
+            data = self.get_response_data()
             self.text.delete("1.0", tk.END)
             if data is not None:
                 selected_quality = self.quality_var.get()
@@ -1005,7 +999,7 @@ class AnimePlayerAppVer1:
 
     def update_quality_and_refresh(self, event=None):
         selected_quality = self.quality_var.get()
-        data = self.read_json_data()
+        data = self.get_response_data()
         if data:
             if "list" in data and isinstance(data["list"], list) and len(data["list"]) > 0:
                 self.display_info()
@@ -0,0 +1,189 @@
+# poster_cache.py
+"""
+Кэш постеров для Lite-версии.
+
+PosterCache — на диске: <cache_dir>/<sha1(url)>.img и рядом .json с ETag/Last-Modified.
+Свежий файл (моложе max_age) отдаётся без сети, устаревший перепроверяется условным GET:
+304 — берём байты с диска, 200 — перезаписываем. Если сеть недоступна, отдаём то, что есть.
+Каталог ограничен max_bytes: при старте и после записи сверх лимита удаляются
+давно не открывавшиеся постеры (mtime .img обновляется при каждом попадании).
+
+PhotoLRU — ограниченный по размеру LRU для готовых объектов (ImageTk.PhotoImage):
+повторный клик по тайтлу показывает постер без декодирования.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from collections import OrderedDict
+
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60  # 7d
+DEFAULT_TIMEOUT = 15
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+PHOTO_LRU_SIZE = 64
+
+
+class PosterCache:
+    def __init__(self, cache_dir, session, max_age=DEFAULT_MAX_AGE, timeout=DEFAULT_TIMEOUT,
+                 max_bytes=DEFAULT_MAX_BYTES, logger=None):
+        self.cache_dir = cache_dir
+        self.session = session
+        self.max_age = max_age
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.logger = logger or logging.getLogger(__name__)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._size_guard = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total = self.prune()
+
+    @staticmethod
+    def _digest(url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, url):
+        base = os.path.join(self.cache_dir, self._digest(url))
+        return base + ".img", base + ".json"
+
+    def _lock_for(self, digest):
+        # один и тот же постер не качаем параллельно из нескольких потоков
+        with self._locks_guard:
+            return self._locks.setdefault(digest, threading.Lock())
+
+    def prune(self):
+        """Удаляет самые давно использованные постеры, пока каталог больше max_bytes. Возвращает размер."""
+        with self._size_guard:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".img"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name[:-4]))
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, digest in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                lock = self._lock_for(digest)
+                if not lock.acquire(blocking=False):
+                    continue  # постер сейчас читают или качают
+                try:
+                    base = os.path.join(self.cache_dir, digest)
+                    for path in (base + ".img", base + ".json"):
+                        try:
+                            os.remove(path)
+                        except FileNotFoundError:
+                            pass
+                finally:
+                    lock.release()
+                total -= size
+                removed += 1
+            if removed:
+                self.logger.debug(f"Poster cache pruned: {removed} files, {total / 1024 / 1024:.1f} Mb left")
+            self._total = total
+            return total
+
+    def _account(self, delta):
+        with self._size_guard:
+            self._total += delta
+            over = self._total > self.max_bytes
+        if over:
+            self.prune()
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta_path, meta):
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def _write(self, img_path, meta_path, content, meta):
+        tmp = img_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, img_path)
+        self._write_meta(meta_path, meta)
+
+    def get(self, url):
+        """Байты постера: с диска, после 304 или из сети. Вызывать из рабочего потока."""
+        img_path, meta_path = self._paths(url)
+        with self._lock_for(self._digest(url)):
+            meta = self._read_meta(meta_path) if os.path.exists(img_path) else None
+            if meta and time.time() - meta.get("fetched_at", 0) < self.max_age:
+                os.utime(img_path)  # для prune: постер недавно использовался
+                with open(img_path, "rb") as f:
+                    return f.read()
+
+            headers = {}
+            if meta and meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta and meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+            start = time.time()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code == 304 and meta:
+                    meta["fetched_at"] = time.time()
+                    self._write_meta(meta_path, meta)
+                    os.utime(img_path)
+                    with open(img_path, "rb") as f:
+                        content = f.read()
+                    self.logger.debug(f"Poster not modified: {url}")
+                    return content
+                response.raise_for_status()
+            except Exception:
+                if meta:  # офлайн: лучше старый постер, чем никакого
+                    self.logger.debug(f"Poster revalidation failed, using stale copy: {url}")
+                    with open(img_path, "rb") as f:
+                        return f.read()
+                raise
+
+            content = response.content
+            old_size = os.path.getsize(img_path) if meta else 0
+            self._write(img_path, meta_path, content, {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            })
+            self.logger.debug(f"Poster downloaded: {url}, {len(content) / 1024:.1f} Kb, "
+                              f"{time.time() - start:.2f}s")
+        self._account(len(content) - old_size)
+        return content
+
+
+class PhotoLRU:
+    """LRU по ключу (URL). Только для главного потока Tk — PhotoImage не потокобезопасен."""
+
+    def __init__(self, capacity=PHOTO_LRU_SIZE):
+        self.capacity = capacity
+        self._items = OrderedDict()
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
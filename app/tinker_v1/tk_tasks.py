@@ -0,0 +1,57 @@
+# tk_tasks.py
+"""
+Фоновые задачи для Tkinter.
+
+Tk нельзя трогать из рабочих потоков (в т.ч. window.after), поэтому результаты складываются
+в потокобезопасную очередь, а главный поток разбирает её по таймеру after(POLL_MS).
+"""
+import queue
+import logging
+
+
+class TkTaskRunner:
+    POLL_MS = 30
+
+    def __init__(self, window, executor, logger=None):
+        self.window = window
+        self.executor = executor
+        self.logger = logger or logging.getLogger(__name__)
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self.window.after(self.POLL_MS, self._poll)
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        """fn(*args) — в пуле; on_done(result) / on_error(exc) — в главном потоке Tk."""
+        def _deliver(future):
+            exc = future.exception()
+            if exc is not None:
+                if on_error is not None:
+                    self.call_soon(on_error, exc)
+                else:
+                    self.logger.debug(f"Background task {getattr(fn, '__name__', fn)} failed: {exc}")
+            elif on_done is not None:
+                self.call_soon(on_done, future.result())
+
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(_deliver)
+        return future
+
+    def call_soon(self, callback, *args):
+        """Потокобезопасно: выполнить callback(*args) в главном потоке Tk."""
+        self._queue.put((callback, args))
+
+    def close(self):
+        self._closed = True
+
+    def _poll(self):
+        while True:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                self.logger.debug(f"Tk callback {getattr(callback, '__name__', callback)} failed: {e}")
+        if not self._closed:
+            self.window.after(self.POLL_MS, self._poll)
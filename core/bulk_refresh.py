@@ -0,0 +1,219 @@
+# bulk_refresh.py
+"""
+Массовое обновление тайтлов AniLiberty через /anime/releases/list.
+
+    python -m core.bulk_refresh --db db/anime_player.db --older-than-hours 24
+    python -m core.bulk_refresh --db db/anime_player.db --all --batch-size 50 --dry-run
+
+Схема на пачку из batch_size тайтлов:
+  1. один запрос list-эндпоинта — облегчённые релизы (updated/last_change);
+  2. сверка с маркерами БД, полные бандлы только для изменившихся;
+  3. изменившиеся сохраняются обычным ingest, остальным одним UPDATE сдвигается last_updated.
+Пачка не атомарна: ingest идёт через save_* SaveManager, а каждый из них коммитит свою сессию
+(вместе с title_summary). Сбой посреди пачки оставляет уже сохранённые тайтлы сохранёнными —
+повторный проход их просто не увидит изменившимися.
+Сеть (fetch_batch) и запись в БД (apply_batch) разделены: Qt-приложение выполняет первое
+в фоновой задаче, второе — в UI-потоке.
+"""
+import argparse
+import logging
+import time
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Optional
+
+
+PROVIDER_ANILIBERTY = "aniliberty"
+DEFAULT_BATCH_SIZE = 50
+
+
+def release_changed(release: dict, marker) -> bool:
+    """
+    Нужно ли догружать полный бандл релиза.
+    marker — (title_id, updated, last_change, has_episodes) из get_title_change_markers либо None.
+    """
+    if marker is None:
+        return True
+    _, updated, last_change, has_episodes = marker
+    if not has_episodes:
+        return True  # тайтл сохранён из поиска без эпизодов/торрентов
+    new_updated = release.get('updated')
+    if not new_updated:
+        return True  # без отметки времени сравнивать не с чем
+    return new_updated != updated or release.get('last_change', last_change) != last_change
+
+
+@dataclass
+class RefreshBatch:
+    """Результат сетевой части для одной пачки: что сохранить и что только отметить проверенным."""
+    releases: list[dict] = field(default_factory=list)      # полные (или облегчённые, если бандл не загрузился)
+    unchanged_ids: list[int] = field(default_factory=list)  # внутренние title_id
+    missing: list[str] = field(default_factory=list)        # external_id, которых нет в ответе API
+    error: Optional[str] = None
+
+
+@dataclass
+class RefreshReport:
+    checked: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    missing: int = 0
+    failed_batches: int = 0
+    title_ids: list[int] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def add(self, batch: RefreshBatch, saved_ids: list[int]) -> None:
+        self.checked += len(batch.releases) + len(batch.unchanged_ids) + len(batch.missing)
+        self.changed += len(batch.releases)
+        self.unchanged += len(batch.unchanged_ids)
+        self.missing += len(batch.missing)
+        self.failed_batches += 1 if batch.error else 0
+        self.title_ids.extend(saved_ids)
+
+
+class BulkTitleRefresher:
+    def __init__(self, db_manager, api_adapter, *, provider_code: str = PROVIDER_ANILIBERTY,
+                 batch_size: int = DEFAULT_BATCH_SIZE, max_workers: int = 4):
+        self.logger = logging.getLogger(__name__)
+        self.db_manager = db_manager
+        self.api_adapter = api_adapter
+        self.provider_code = provider_code
+        self.batch_size = max(1, int(batch_size))
+        self.max_workers = max_workers
+
+    def stale_markers(self, older_than: Optional[timedelta] = None, limit: Optional[int] = None,
+                      status_code: Optional[int] = None) -> dict[str, tuple]:
+        """Маркеры тайтлов, не обновлявшихся дольше older_than (None — вся библиотека провайдера)."""
+        updated_before = datetime.now(timezone.utc) - older_than if older_than is not None else None
+        return self.db_manager.get_stale_title_markers(self.provider_code, updated_before, limit, status_code)
+
+    def batches(self, markers: dict[str, tuple]) -> list[dict[str, tuple]]:
+        items = list(markers.items())
+        return [dict(items[i:i + self.batch_size]) for i in range(0, len(items), self.batch_size)]
+
+    def fetch_batch(self, markers: dict[str, tuple], *, dry_run: bool = False) -> RefreshBatch:
+        """Сетевая часть (без БД): list-эндпоинт, сверка, полные бандлы изменившихся."""
+        ext_ids = [int(ext) for ext in markers if str(ext).isdigit()]
+        data = self.api_adapter.get_releases_list(ext_ids)
+        if not isinstance(data, dict) or 'error' in data:
+            error = data.get('error') if isinstance(data, dict) else f"unexpected {type(data).__name__}"
+            self.logger.error(f"Releases list failed for {len(ext_ids)} ids: {error}")
+            return RefreshBatch(error=str(error))
+
+        batch = RefreshBatch()
+        light_by_id = {str(r.get('external_id')): r for r in data.get('list') or [] if isinstance(r, dict)}
+        changed = []
+        for ext, marker in markers.items():
+            light = light_by_id.get(str(ext))
+            if light is None:
+                batch.missing.append(str(ext))
+            elif release_changed(light, marker):
+                changed.append(light)
+            else:
+                batch.unchanged_ids.append(marker[0])
+
+        if changed and not dry_run:
+            ids = [r['external_id'] for r in changed]
+            full_list = self.api_adapter.get_releases_full(ids, max_workers=self.max_workers) or []
+            full_by_id = {str(r.get('external_id')): r for r in full_list
+                          if isinstance(r, dict) and 'error' not in r}
+            # fallback: для неудачных бандлов сохраняем облегчённый релиз
+            batch.releases = [full_by_id.get(str(r['external_id']), r) for r in changed]
+        else:
+            batch.releases = changed
+
+        self.logger.debug(f"Batch of {len(markers)}: {len(batch.releases)} changed, "
+                          f"{len(batch.unchanged_ids)} unchanged, {len(batch.missing)} missing")
+        return batch
+
+    def apply_batch(self, batch: RefreshBatch) -> list[int]:
+        """
+        Запись в БД: изменившиеся — полным ingest, остальные — один UPDATE last_updated.
+        Не одна транзакция: каждый тайтл коммитится своими save_* (см. DatabaseManager.ingest_titles).
+        """
+        saved_ids = self.db_manager.ingest_titles(batch.releases) if batch.releases else []
+        if batch.unchanged_ids:
+            self.db_manager.mark_titles_checked(batch.unchanged_ids)
+        return saved_ids
+
+    def run(self, markers: Optional[dict[str, tuple]] = None, *, older_than: Optional[timedelta] = None,
+            limit: Optional[int] = None, dry_run: bool = False,
+            cancelled: Optional[Callable[[], bool]] = None) -> RefreshReport:
+        """Синхронный проход по всем пачкам (CLI / headless)."""
+        started = time.monotonic()
+        if markers is None:
+            markers = self.stale_markers(older_than, limit)
+        report = RefreshReport()
+        batches = self.batches(markers)
+        self.logger.info(f"Bulk refresh: {len(markers)} '{self.provider_code}' titles in {len(batches)} batches")
+
+        for i, chunk in enumerate(batches, 1):
+            if cancelled is not None and cancelled():
+                self.logger.info("Bulk refresh cancelled")
+                break
+            batch = self.fetch_batch(chunk, dry_run=dry_run)
+            saved_ids = [] if dry_run else self.apply_batch(batch)
+            report.add(batch, saved_ids)
+            self.logger.info(f"[{i}/{len(batches)}] changed={len(batch.releases)} "
+                             f"unchanged={len(batch.unchanged_ids)} missing={len(batch.missing)}")
+
+        report.elapsed = time.monotonic() - started
+        return report
+
+
+def build_aniliberty_adapter(config_path: str = "config/config.ini", logger=None, net_client=None):
+    """APIAdapter из config.ini без Qt: NetClient + APIClient, как в приложении."""
+    from utils.config.config_manager import ConfigManager
+    from utils.net.net_client import NetClient
+    from providers.aniliberty.v1.api import APIClient
+    from providers.aniliberty.v1.adapter import APIAdapter
+
+    logger = logger or logging.getLogger(__name__)
+    config_manager = ConfigManager(config_path)
+    client = APIClient(
+        base_url=config_manager.get_setting('Settings', 'base_al_url'),
+        api_version=config_manager.get_setting('Settings', 'al_api_version'),
+        net_client=net_client or NetClient(config_manager.network),
+        logger=logger,
+        utils_folder="temp",
+        sleep_fn=None,
+        max_cache_items=256,
+        enable_dumps=False,
+    )
+    return client, APIAdapter(client, logger)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Bulk refresh of AniLiberty titles through the releases list endpoint.")
+    ap.add_argument("--db", default="db/anime_player.db", help="Путь к SQLite базе приложения.")
+    ap.add_argument("--config", default="config/config.ini")
+    ap.add_argument("--older-than-hours", type=float, default=24.0,
+                    help="Обновлять тайтлы, не обновлявшиеся дольше N часов.")
+    ap.add_argument("--all", action="store_true", help="Вся библиотека провайдера независимо от last_updated.")
+    ap.add_argument("--limit", type=int, default=None, help="Не больше N тайтлов за запуск.")
+    ap.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    ap.add_argument("--workers", type=int, default=4, help="Параллельная загрузка полных бандлов.")
+    ap.add_argument("--dry-run", action="store_true", help="Только сверка, без полной загрузки и записи.")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    from core.database_manager import DatabaseManager
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.initialize_tables()
+    client, adapter = build_aniliberty_adapter(args.config)
+    try:
+        refresher = BulkTitleRefresher(db_manager, adapter, batch_size=args.batch_size, max_workers=args.workers)
+        older_than = None if args.all else timedelta(hours=args.older_than_hours)
+        report = refresher.run(older_than=older_than, limit=args.limit, dry_run=args.dry_run)
+    finally:
+        client.close()
+
+    print(f"checked={report.checked} changed={report.changed} unchanged={report.unchanged} "
+          f"missing={report.missing} failed_batches={report.failed_batches} elapsed={report.elapsed:.1f}s")
+    return 1 if report.failed_batches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
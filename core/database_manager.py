@@ -9,9 +9,11 @@ from core.process import ProcessManager
 from core.get import GetManager
 from core.delete import DeleteManager
 from core.utils import PlaceholderManager, TemplateManager, StateManager
-from core.tables import Base, DaysOfWeek, History, Title
-from core.types import PosterSize
-from app.qt.app_state_manager import AppStateManager
+from core.tables import Base, DaysOfWeek, History, Title, TitleGenreRelation, TitleTeamRelation
+from core.history_cache import HistoryCache
+from core.title_summary import TitleSummaryManager
+from core.types import PosterSize, PosterValidators, Seek
+from core.app_state_manager import AppStateManager
 
 
 class DatabaseManager:
@@ -25,15 +27,45 @@ class DatabaseManager:
         # Инициализация менеджеров
         self.template_manager = TemplateManager(self.engine)
         self.placeholder_manager = PlaceholderManager(self.engine)
-        self.save_manager = SaveManager(self.engine)
+        # Общая карта history: GetManager читает батчем, SaveManager поддерживает её после записи
+        self.history_cache = HistoryCache()
+        self.save_manager = SaveManager(self.engine, self.history_cache)
         self.process_manager = ProcessManager(self.save_manager)
-        self.get_manager = GetManager(self.engine)
+        self.get_manager = GetManager(self.engine, self.history_cache)
         self.delete_manager = DeleteManager(self.engine)
         self.state_manager = StateManager(self.engine)
+        self.title_summary = TitleSummaryManager(self.engine)
+
+        # Ревизии для кэша HTML карточек (app/qt/html_cache.py):
+        # template_revision — смена шаблонов, data_revision — массовые записи, _title_revisions — правки одного тайтла
+        self.template_revision = 0
+        self.data_revision = 0
+        self._title_revisions: dict[int, int] = {}
+
+    def touch_title(self, title_id=None):
+        """Помечает карточку тайтла устаревшей; без title_id — все карточки."""
+        if title_id is None:
+            self.data_revision += 1
+            return
+        try:
+            tid = int(title_id)
+        except (TypeError, ValueError):
+            self.data_revision += 1
+            return
+        self._title_revisions[tid] = self._title_revisions.get(tid, 0) + 1
 
-    def initialize_tables(self):
+    def get_title_revision(self, title_id) -> tuple[int, int]:
+        return self.data_revision, self._title_revisions.get(title_id, 0)
+
+    def initialize_tables(self, ensure_summary=True):
         # Создаем таблицы, если они еще не существуют
         Base.metadata.create_all(self.engine)
+        # create_all не добавляет индексы в уже существующие таблицы
+        for table in (History, TitleGenreRelation, TitleTeamRelation):
+            for index in table.__table__.indexes:
+                index.create(self.engine, checkfirst=True)
+        # Переносим inline base64-торренты в torrent_files (однократно, дальше no-op)
+        self.save_manager.migrate_torrent_payloads()
         days = [
             {"day_of_week": 1, "day_name": "Monday"},
             {"day_of_week": 2, "day_name": "Tuesday"},
@@ -59,6 +91,24 @@ class DatabaseManager:
                 except Exception as e:
                     session.rollback()
                     self.logger.error(f"Error initializing '{days}' image in posters table: {e}")
+        if ensure_summary:
+            # Новая таблица или записи в обход SaveManager (app/sync) — пересобираем title_summary
+            try:
+                if self.title_summary.ensure():
+                    self.touch_title()
+            except Exception as e:
+                self.logger.error(f"Error ensuring title summary: {e}")
+
+    def rebuild_title_summary(self) -> int:
+        result = self.title_summary.rebuild()
+        self.touch_title()
+        return result
+
+    def check_title_summary(self, fix=False):
+        report = self.title_summary.check(fix)
+        if report.fixed:
+            self.touch_title()
+        return report
 
     def initialize_templates(self):
         """Автоматически загружает все папки из 'templates/' как шаблоны в БД, если их там ещё нет."""
@@ -85,58 +135,152 @@ class DatabaseManager:
         :type template_name: str
         :return:
         """
-        return self.template_manager.save_template(template_name)
+        result = self.template_manager.save_template(template_name)
+        self.template_revision += 1
+        return result
 
     def remove_schedule_day(self, title_ids, day_of_week):
-        return self.save_manager.remove_schedule_day(title_ids, day_of_week)
+        result = self.save_manager.remove_schedule_day(title_ids, day_of_week)
+        self.touch_title()
+        return result
 
     def save_studio_to_db(self, title_id, studio_name):
-        return self.save_manager.save_studio_to_db(title_id, studio_name)
+        result = self.save_manager.save_studio_to_db(title_id, studio_name)
+        self.touch_title()
+        return result
 
     def save_title(self, provider_code: str, external_id: int | str, title_fields: dict):
-        return self.save_manager.save_title(provider_code, external_id, title_fields)
+        result = self.save_manager.save_title(provider_code, external_id, title_fields)
+        self.touch_title()
+        return result
 
     def save_franchise(self, franchise_data):
-        return self.save_manager.save_franchise(franchise_data)
+        result = self.save_manager.save_franchise(franchise_data)
+        self.touch_title()
+        return result
 
     def save_genre(self, title_id, genres):
-        return self.save_manager.save_genre(title_id, genres)
+        result = self.save_manager.save_genre(title_id, genres)
+        self.touch_title(title_id)
+        return result
 
     def save_team_members(self, title_id, team_data):
-        return self.save_manager.save_team_members(title_id, team_data)
+        result = self.save_manager.save_team_members(title_id, team_data)
+        self.touch_title(title_id)
+        return result
 
     def save_episode(self, episode_data):
-        return self.save_manager.save_episode(episode_data)
+        result = self.save_manager.save_episode(episode_data)
+        self.touch_title()
+        return result
 
     def save_schedule(self, day_of_week, title_id, last_updated=None):
-        return self.save_manager.save_schedule(day_of_week, title_id, last_updated)
+        result = self.save_manager.save_schedule(day_of_week, title_id, last_updated)
+        self.touch_title(title_id)
+        return result
 
     def save_torrent(self, torrent_data):
-        return self.save_manager.save_torrent(torrent_data)
+        result = self.save_manager.save_torrent(torrent_data)
+        self.touch_title()
+        return result
+
+    def save_torrents(self, title_id, torrents):
+        result = self.save_manager.save_torrents(title_id, torrents)
+        self.touch_title(title_id)
+        return result
+
+    def save_torrent_file_blob(self, torrent_id, file_blob):
+        return self.save_manager.save_torrent_file_blob(torrent_id, file_blob)
 
     def process_franchises(self, title_data):
-        return self.process_manager.process_franchises(title_data)
+        result = self.process_manager.process_franchises(title_data)
+        self.touch_title()
+        return result
 
     def process_titles(self, title_data):
-        return self.process_manager.process_titles(title_data)
+        result = self.process_manager.process_titles(title_data)
+        self.touch_title()
+        return result
 
     def process_episodes(self, title_data):
-        return self.process_manager.process_episodes(title_data)
+        result = self.process_manager.process_episodes(title_data)
+        self.touch_title()
+        return result
 
     def process_torrents(self, title_data):
-        return self.process_manager.process_torrents(title_data)
+        result = self.process_manager.process_torrents(title_data)
+        self.touch_title()
+        return result
+
+    def ingest_titles(self, title_list: list[dict]) -> list[int]:
+        """
+        Сохраняет тайтлы + эпизоды + торренты в legacy-формате адаптеров.
+        Возвращает список ВНУТРЕННИХ title_id.
+        Каждый тайтл коммитится отдельно: save_* SaveManager открывают и коммитят свои сессии,
+        общей транзакции на список нет — упавший тайтл пропускается, остальные сохраняются.
+        """
+        self.logger.debug(f"Processing title data: {len(title_list)}")
+        internal_ids: list[int] = []
+
+        processes = {
+            self.process_episodes: "episodes",
+            self.process_torrents: "torrents",
+        }
+
+        for raw_title_data in title_list:
+            title_ok, title_id = self.process_titles(raw_title_data)
+
+            if not title_ok or title_id is None:
+                self.logger.warning(
+                    f"Failed to process title (external_id={raw_title_data.get('external_id')}, "
+                    f"provider={raw_title_data.get('provider')})"
+                )
+                continue
+
+            internal_ids.append(title_id)
+            payload = {"title_id": title_id, **raw_title_data}
+
+            for process_func, process_name in processes.items():
+                try:
+                    result = process_func(payload)
+                    if result:
+                        self.logger.debug(
+                            f"Successfully saved {process_name} table for title_id={title_id}. STATUS: {result}")
+                    else:
+                        self.logger.warning(f"Failed to process {process_name} for title_id={title_id}")
+                except Exception as e:
+                    self.logger.error(f"Exception while processing {process_name} for title_id={title_id}: {e}")
+
+        return internal_ids
 
-    def save_poster(self, title_id, poster_blob, hash_value, size_key: PosterSize = "original"):
-        return self.save_manager.save_poster(title_id, poster_blob, hash_value, size_key)
+    def mark_titles_checked(self, title_ids, checked_at=None) -> int:
+        """Тайтлы сверены с API и не изменились: сдвигаем last_updated одним UPDATE."""
+        return self.save_manager.mark_titles_checked(title_ids, checked_at)
+
+    def save_poster(self, title_id, poster_blob, hash_value, size_key: PosterSize = "original",
+                    validators: Optional[PosterValidators] = None):
+        result = self.save_manager.save_poster(title_id, poster_blob, hash_value, size_key, validators)
+        self.touch_title(title_id)
+        return result
+
+    def touch_poster(self, title_id, size_key: PosterSize = "original", validators: Optional[PosterValidators] = None):
+        """304 Not Modified: только дата проверки; blob тот же, карточки не инвалидируем."""
+        return self.save_manager.touch_poster(title_id, size_key, validators)
 
     def save_need_to_see(self, user_id, title_id, need_to_see=True):
-        return self.save_manager.save_need_to_see(user_id, title_id, need_to_see)
+        result = self.save_manager.save_need_to_see(user_id, title_id, need_to_see)
+        self.touch_title(title_id)
+        return result
 
     def save_watch_all_episodes(self, user_id, title_id, is_watched=False, episode_ids=None):
-        return self.save_manager.save_watch_all_episodes(user_id, title_id, is_watched, episode_ids)
+        result = self.save_manager.save_watch_all_episodes(user_id, title_id, is_watched, episode_ids)
+        self.touch_title(title_id)
+        return result
 
     def save_watch_status(self, user_id, title_id, episode_id=None, is_watched=False, torrent_id=None, is_download=False):
-        return self.save_manager.save_watch_status(user_id,title_id, episode_id, is_watched, torrent_id, is_download)
+        result = self.save_manager.save_watch_status(user_id,title_id, episode_id, is_watched, torrent_id, is_download)
+        self.touch_title(title_id)
+        return result
 
     def save_ratings(self, title_id: int, rating_name: str, rating_value: int, name_external: Optional[str] = None, score_external: Optional[float] = None):
         """
@@ -148,7 +292,9 @@ class DatabaseManager:
             - User-Provided Ratings
             - External Source Ratings
         """
-        return self.save_manager.save_ratings(title_id, rating_name, rating_value, name_external, score_external)
+        result = self.save_manager.save_ratings(title_id, rating_name, rating_value, name_external, score_external)
+        self.touch_title(title_id)
+        return result
 
     def get_titles_for_day(self, day_of_week):
         """Загружает тайтлы для указанного дня недели из базы данных."""
@@ -157,6 +303,10 @@ class DatabaseManager:
     def get_history_status(self, user_id, title_id, episode_id=None, torrent_id=None):
         return self.get_manager.get_history_status(user_id, title_id, episode_id, torrent_id)
 
+    def get_history_map(self, user_id, title_ids):
+        """Watch/download/need_to_see state for a page of titles, served from the shared history cache."""
+        return self.get_manager.get_history_map(user_id, title_ids)
+
     def get_need_to_see(self, user_id, title_id):
         return self.get_manager.get_need_to_see(user_id, title_id)
 
@@ -169,16 +319,19 @@ class DatabaseManager:
     def get_statistics_from_db(self):
         return self.get_manager.get_statistics_from_db()
 
-    def get_franchises_from_db(self, batch_size=None, offset=0, title_id=None):
-        return self.get_manager.get_franchises_from_db(batch_size, offset, title_id)
+    def get_franchises_from_db(self, batch_size=None, offset=0, title_id=None, seek: Optional[Seek] = None):
+        return self.get_manager.get_franchises_from_db(batch_size, offset, title_id, seek)
 
-    def get_need_to_see_from_db(self, batch_size=None, offset=0, title_id=None):
+    def get_need_to_see_from_db(self, batch_size=None, offset=0, title_id=None, seek: Optional[Seek] = None):
         """Need to see Titles without episodes"""
-        return self.get_manager.get_need_to_see_from_db(batch_size, offset, title_id)
+        return self.get_manager.get_need_to_see_from_db(batch_size, offset, title_id, seek)
 
     def get_poster_last_updated(self, title_id, size_key: PosterSize = "original"):
         return self.get_manager.get_poster_last_updated(title_id, size_key)
 
+    def get_poster_validators(self, title_id, size_key: PosterSize = "original") -> Optional[PosterValidators]:
+        return self.get_manager.get_poster_validators(title_id, size_key)
+
     def get_poster_link(self, title_id, size_key: PosterSize = "original"):
         return self.get_manager.get_poster_link(title_id, size_key)
 
@@ -192,12 +345,32 @@ class DatabaseManager:
     def get_torrents_from_db(self, title_id):
         return self.get_manager.get_torrents_from_db(title_id)
 
+    def iter_torrent_file(self, torrent_id, chunk_size=64 * 1024):
+        """Streams a stored .torrent file from torrent_files in chunks."""
+        return self.get_manager.iter_torrent_file(torrent_id, chunk_size)
+
     def get_genres_from_db(self, title_id):
         return self.get_manager.get_genres_from_db(title_id)
 
     def get_team_from_db(self, title_id):
         return self.get_manager.get_team_from_db(title_id)
 
+    def get_title_summaries(self, title_ids):
+        """Rows of the title_summary projection for list views."""
+        return self.get_manager.get_title_summaries(title_ids)
+
+    def get_title_cards_context(self, title_ids):
+        """Batched view-model for a page of title cards (provider, studio, rating, team)."""
+        return self.get_manager.get_title_cards_context(title_ids)
+
+    def get_title_cards_window(self, offset=0, limit=60, seek: Optional[Seek] = None):
+        """Lightweight (title_id, name_ru, name_en, season_year) rows for the poster grid."""
+        return self.get_manager.get_title_cards_window(offset, limit, seek)
+
+    def get_poster_blobs(self, title_ids, size_keys=("medium", "original")):
+        """{title_id: blob} for a batch of titles, first non-empty size; no placeholder."""
+        return self.get_manager.get_poster_blobs(title_ids, size_keys)
+
     def get_titles_by_keywords(self, search_string):
         """Searches for titles by keywords in code, name_ru, name_en, alternative_name, or by title_id, and returns a list of title_ids."""
         return self.get_manager.get_titles_by_keywords(search_string)
@@ -214,7 +387,8 @@ class DatabaseManager:
         """
         return self.get_manager.get_available_templates()
 
-    def get_titles_from_db(self, show_all=False, day_of_week=None, batch_size=None, title_id=None, title_ids=None, offset=0):
+    def get_titles_from_db(self, show_all=False, day_of_week=None, batch_size=None, title_id=None, title_ids=None,
+                           offset=0, seek: Optional[Seek] = None):
         """Получает список тайтлов из базы данных через DatabaseManager."""
         """
         Returns a SQLAlchemy query for fetching titles based on given conditions.
@@ -223,11 +397,23 @@ class DatabaseManager:
         :param title_id: If specified, returns a title with the given title_id.
         :return: SQLAlchemy Query object
         """
-        return self.get_manager.get_titles_from_db(show_all, day_of_week, batch_size, title_id, title_ids, offset)
+        return self.get_manager.get_titles_from_db(show_all, day_of_week, batch_size, title_id, title_ids, offset, seek)
 
-    def get_titles_list_from_db(self, title_ids=None, batch_size=None, offset=0):
+    def get_titles_list_from_db(self, title_ids=None, batch_size=None, offset=0, seek: Optional[Seek] = None):
         """Titles without episodes"""
-        return self.get_manager.get_titles_list_from_db(title_ids, batch_size, offset)
+        return self.get_manager.get_titles_list_from_db(title_ids, batch_size, offset, seek)
+
+    def get_filtered_titles(self, title_filter, user_id=None, batch_size=None, offset=0,
+                            seek: Optional[Seek] = None):
+        """Titles matching a combined genre/year/status/provider/team/not-watched filter"""
+        return self.get_manager.get_filtered_titles(title_filter, user_id, batch_size, offset, seek)
+
+    def get_filtered_count(self, title_filter, user_id=None):
+        return self.get_manager.get_filtered_count(title_filter, user_id)
+
+    def get_facet_counts(self, title_filter=None, user_id=None):
+        """Per-value title counts (genre, year, status) for the filter sidebar"""
+        return self.get_manager.get_facet_counts(title_filter, user_id)
 
     def get_titles_by_genre(self, genre_name):
         """Titles by genre"""
@@ -245,9 +431,9 @@ class DatabaseManager:
         """Titles by status"""
         return self.get_manager.get_titles_by_status(status_code)
 
-    def get_ongoing_titles(self, batch_size=None, offset=0):
+    def get_ongoing_titles(self, batch_size=None, offset=0, seek: Optional[Seek] = None):
         """Titles by status ongoing"""
-        return self.get_manager.get_ongoing_titles(batch_size, offset)
+        return self.get_manager.get_ongoing_titles(batch_size, offset, seek)
 
     def get_total_titles_count(self, show_mode=None):
         """Titles count"""
@@ -259,9 +445,22 @@ class DatabaseManager:
     def get_title_by_external_id(self, provider_code: str, external_id: int | str):
         return self.get_manager.get_title_by_external_id(provider_code, external_id)
 
+    def get_title_change_markers(self, provider_code: str, external_ids) -> dict[str, tuple]:
+        """{external_id: (title_id, updated, last_change, has_episodes)} for titles already stored."""
+        return self.get_manager.get_title_change_markers(provider_code, external_ids)
+
     def get_title_ids_by_provider(self, provider_code: str) -> list[int]:
         return self.get_manager.get_title_ids_by_provider(provider_code)
 
+    def get_stale_title_markers(self, provider_code: str, updated_before=None, limit=None,
+                                status_code=None) -> dict[str, tuple]:
+        """Маркеры тайтлов провайдера с last_updated раньше updated_before, самые старые первыми."""
+        return self.get_manager.get_stale_title_markers(provider_code, updated_before, limit, status_code)
+
+    def get_stale_poster_links(self, size_key: PosterSize, refresh_before, final_before, limit=None) -> list[tuple]:
+        """[(title_id, poster_link)] постеров без blob или устаревших, но ещё не финальных."""
+        return self.get_manager.get_stale_poster_links(size_key, refresh_before, final_before, limit)
+
     def get_provider_by_title_id(self, title_id: int) -> str | None:
         return self.get_manager.get_provider_by_title_id(title_id)
 
@@ -272,7 +471,10 @@ class DatabaseManager:
         return self.get_manager.get_player_host_by_title_id(title_id)
 
     def delete_titles(self, title_ids_input) -> dict:
-        return self.delete_manager.delete_titles(title_ids_input)
+        result = self.delete_manager.delete_titles(title_ids_input)
+        self.history_cache.invalidate()
+        self.touch_title()
+        return result
 
     def process_animedia_titles(self, data):
         return self.process_manager.process_animedia_titles(data)
@@ -1,6 +1,7 @@
 import logging
 from sqlalchemy.orm import sessionmaker
 from core.tables import Title
+from core.title_summary import refresh_title_summary
 
 
 class DeleteManager:
@@ -57,6 +58,8 @@ class DeleteManager:
                 for t in titles:
                     session.delete(t)
 
+                # строки title_summary уходят каскадом, refresh снимает их со счётчиков фасетов
+                refresh_title_summary(session, found_ids)
                 session.commit()
                 deleted = list(found_ids)
 
@@ -3,19 +3,25 @@ import json
 import logging
 import sqlalchemy
 
-from sqlalchemy import or_, and_
+from datetime import datetime, timezone
+
+from sqlalchemy import or_, and_, func
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy.orm import sessionmaker, joinedload
+from sqlalchemy.orm import sessionmaker, joinedload, selectinload
 from core.tables import Title, Schedule, History, Rating, FranchiseRelease, Franchise, Poster, Torrent, \
     TitleGenreRelation, \
-    Template, Genre, TitleTeamRelation, TeamMember, TitleProviderMap, Provider, ProductionStudio
-from core.types import PosterSize, POSTER_FIELDS
+    Template, Genre, TitleTeamRelation, TeamMember, TitleProviderMap, Provider, ProductionStudio, TorrentFile, Episode, \
+    PosterValidator, TitleSummary
+from core.types import PosterSize, POSTER_FIELDS, PosterValidators, Seek, TitleFilter
+from core.title_filter import filtered_query, facet_counts
+from core.history_cache import HistoryCache, HistoryRow, TitleHistoryState
 
 
 class GetManager:
-    def __init__(self, engine):
+    def __init__(self, engine, history_cache: HistoryCache | None = None):
         self.logger = logging.getLogger(__name__)
         self.Session = sessionmaker(bind=engine)()
+        self.history_cache = history_cache
 
     def get_titles_for_day(self, day_of_week):
         """Загружает тайтлы для указанного дня недели из базы данных."""
@@ -28,7 +34,49 @@ class GetManager:
                 self.logger.error(f"Ошибка при получении тайтлов для дня недели: {e}")
                 return None
 
+    def get_history_map(self, user_id, title_ids) -> dict[int, TitleHistoryState]:
+        """
+        Состояние просмотра/скачивания/need_to_see по тайтлам одним запросом.
+        С history_cache из БД читаются только ещё не загруженные тайтлы.
+        :return: {title_id: TitleHistoryState} для каждого title_id (пустое состояние, если записей нет)
+        """
+        ids = list(dict.fromkeys(int(tid) for tid in (title_ids or []) if tid is not None))
+        if not ids:
+            return {}
+        cache = self.history_cache
+        to_load = cache.missing(user_id, ids) if cache is not None else ids
+
+        loaded: dict[int, TitleHistoryState] = {}
+        if to_load:
+            with self.Session as session:
+                try:
+                    rows = session.query(
+                        History.title_id, History.episode_id, History.torrent_id,
+                        History.is_watched, History.is_download, History.need_to_see,
+                    ).filter(
+                        History.user_id == user_id,
+                        History.title_id.in_(to_load),
+                    ).all()
+                except Exception as e:
+                    self.logger.error(f"Error fetching history map for user_id {user_id}, {len(to_load)} titles: {e}")
+                    raise
+
+            loaded = {tid: TitleHistoryState() for tid in to_load}
+            for title_id, episode_id, torrent_id, is_watched, is_download, need_to_see in rows:
+                loaded[title_id].rows[(episode_id, torrent_id)] = HistoryRow(
+                    is_watched=bool(is_watched), is_download=bool(is_download), need_to_see=bool(need_to_see))
+            if cache is not None:
+                for title_id, state in loaded.items():
+                    cache.put(user_id, title_id, state)
+            self.logger.debug(f"History map loaded: user_id={user_id}, titles={len(to_load)}, rows={len(rows)}")
+
+        if cache is None:
+            return loaded
+        return {tid: loaded.get(tid) or cache.get(user_id, tid) or TitleHistoryState() for tid in ids}
+
     def get_history_status(self, user_id, title_id, episode_id=None, torrent_id=None):
+        if self.history_cache is not None:
+            return self.get_history_map(user_id, [title_id])[title_id].status(episode_id, torrent_id)
         with self.Session as session:
             try:
                 history_status = session.query(History).filter_by(user_id=user_id, title_id=title_id, episode_id=episode_id, torrent_id=torrent_id).one_or_none()
@@ -65,6 +113,8 @@ class GetManager:
                 raise
 
     def get_all_episodes_watched_status(self, user_id, title_id):
+        if self.history_cache is not None:
+            return self.get_history_map(user_id, [title_id])[title_id].all_episodes_watched
         with self.Session as session:
             try:
                 query = session.query(History).filter(
@@ -234,6 +284,27 @@ class GetManager:
                 self.logger.error(f"Ошибка при получении даты обновления постера: {e}")
                 return None
 
+    def get_poster_validators(self, title_id, size_key: PosterSize = "original") -> PosterValidators | None:
+        """
+        ETag/Last-Modified сохранённого постера для условного запроса.
+        None, если валидаторов нет или blob отсутствует (тогда нужен обычный GET, не 304).
+        """
+        with self.Session as session:
+            try:
+                fields = POSTER_FIELDS[size_key]
+                row = (
+                    session.query(PosterValidator.etag, PosterValidator.last_modified, PosterValidator.content_length)
+                    .join(Poster, Poster.title_id == PosterValidator.title_id)
+                    .filter(PosterValidator.title_id == title_id, PosterValidator.size_key == size_key,
+                            getattr(Poster, fields.blob).isnot(None))
+                    .first()
+                )
+                validators = PosterValidators(*row) if row else None
+                return validators or None
+            except Exception as e:
+                self.logger.error(f"Ошибка при получении валидаторов постера: {e}")
+                return None
+
     def get_torrents_from_db(self, title_id):
         with self.Session as session:
             try:
@@ -248,6 +319,30 @@ class GetManager:
                 self.logger.error(f"Error fetching torrent data from database: {e}")
                 return None
 
+    def iter_torrent_file(self, torrent_id: int, chunk_size: int = 64 * 1024):
+        """
+        Отдаёт сохранённый .torrent по частям через substr(), не загружая payload других торрентов.
+        Каждая часть читается в своём коротком блоке сессии, yield — уже после него: потребитель,
+        бросивший поток на середине, не оставляет общую сессию с открытой транзакцией.
+        Ничего не отдаёт, если файла в БД нет.
+        """
+        try:
+            size = self._torrent_file_scalar(torrent_id, sqlalchemy.func.length(TorrentFile.file_blob))
+            offset = 1  # substr в SQLite индексируется с 1
+            while size and offset <= size:
+                chunk = self._torrent_file_scalar(
+                    torrent_id, sqlalchemy.func.substr(TorrentFile.file_blob, offset, chunk_size))
+                if not chunk:
+                    break
+                yield bytes(chunk)
+                offset += len(chunk)
+        except Exception as e:
+            self.logger.error(f"Error streaming torrent file for torrent_id={torrent_id}: {e}")
+
+    def _torrent_file_scalar(self, torrent_id: int, column):
+        with self.Session as session:
+            return session.query(column).filter(TorrentFile.torrent_id == torrent_id).scalar()
+
     def get_genres_from_db(self, title_id):
         with self.Session as session:
             try:
@@ -299,6 +394,172 @@ class GetManager:
                 self.logger.error(f"Ошибка при загрузке данных о команде из базы данных: {e}")
                 return None
 
+    def get_title_cards_window(self, offset: int = 0, limit: int = 60, seek: Seek | None = None) -> list[tuple]:
+        """
+        Окно лёгких строк для сетки постеров (app/qt/poster_grid.py), без связей и blob'ов.
+        seek=Seek(after_id=последний загруженный) — keyset, окно на любой глубине читается по индексу.
+        :return: [(title_id, name_ru, name_en, season_year), ...] по title_id
+        """
+        with self.Session as session:
+            try:
+                query = session.query(TitleSummary.title_id, TitleSummary.name_ru, TitleSummary.name_en,
+                                      TitleSummary.season_year)
+                rows = self._seek_page(query, TitleSummary.title_id, int(limit), offset, seek)
+                return [tuple(r) for r in rows]
+            except Exception as e:
+                self.logger.error(f"Ошибка при загрузке окна тайтлов для сетки: {e}")
+                return []
+
+    def get_poster_blobs(self, title_ids, size_keys: tuple[PosterSize, ...] = ("medium", "original")) -> dict[int, bytes]:
+        """
+        Постеры пачки тайтлов одним запросом: первый непустой blob из size_keys.
+        Плейсхолдер не подставляется — тайтлы без постера в ответ не попадают.
+        """
+        ids = list({int(tid) for tid in (title_ids or []) if tid is not None})
+        if not ids:
+            return {}
+        with self.Session as session:
+            try:
+                blob = func.coalesce(*(getattr(Poster, POSTER_FIELDS[k].blob) for k in size_keys))
+                rows = (
+                    session.query(Poster.title_id, blob)
+                    .filter(Poster.title_id.in_(ids), blob.isnot(None))
+                    .all()
+                )
+                return {title_id: data for title_id, data in rows}
+            except Exception as e:
+                self.logger.error(f"Ошибка при загрузке постеров пачкой: {e}")
+                return {}
+
+    def get_poster_entries(self, title_ids, size_key: PosterSize = "original") -> dict[int, tuple]:
+        """
+        {title_id: (blob, updated)} одного размера для пачки тайтлов — то же, что get_poster_blob +
+        get_poster_last_updated, но одним запросом (предзагрузка страниц, app/qt/page_prefetch.py).
+        """
+        ids = list({int(tid) for tid in (title_ids or []) if tid is not None})
+        if not ids:
+            return {}
+        with self.Session as session:
+            try:
+                fields = POSTER_FIELDS[size_key]
+                blob, updated = getattr(Poster, fields.blob), getattr(Poster, fields.updated)
+                rows = (
+                    session.query(Poster.title_id, blob, updated)
+                    .filter(Poster.title_id.in_(ids), blob.isnot(None))
+                    .all()
+                )
+                return {title_id: (data, ts) for title_id, data, ts in rows}
+            except Exception as e:
+                self.logger.error(f"Ошибка при загрузке постеров пачкой: {e}")
+                return {}
+
+    def get_title_summaries(self, title_ids) -> list:
+        """Строки title_summary для списка id (страницы режимов-фильтров) в порядке title_id."""
+        ids = list({int(tid) for tid in (title_ids or []) if tid is not None})
+        if not ids:
+            return []
+        with self.Session as session:
+            try:
+                return (
+                    session.query(TitleSummary)
+                    .filter(TitleSummary.title_id.in_(ids))
+                    .order_by(TitleSummary.title_id)
+                    .all()
+                )
+            except Exception as e:
+                self.logger.error(f"Ошибка при загрузке title_summary для {len(ids)} тайтлов: {e}")
+                return []
+
+    def get_title_cards_context(self, title_ids) -> dict[int, dict]:
+        """
+        View-model страницы карточек: провайдер, студия, рейтинг и команда для всех title_ids
+        одним чтением title_summary; тайтлы без строки проекции — прежними JOIN'ами.
+        Статусы history — см. get_history_map.
+        :return: {title_id: {'provider', 'studio', 'rating_name', 'rating_value', 'team'}}
+        """
+        ids = list({int(tid) for tid in (title_ids or []) if tid is not None})
+        if not ids:
+            return {}
+        with self.Session as session:
+            try:
+                context: dict[int, dict] = {
+                    row.title_id: {
+                        'provider': row.provider_name,
+                        'studio': row.studio,
+                        'rating_name': row.rating_name,
+                        'rating_value': row.rating_value,
+                        'team': {'voice': row.team_voice, 'translator': row.team_translator,
+                                 'timing': row.team_timing},
+                    }
+                    for row in session.query(TitleSummary).filter(TitleSummary.title_id.in_(ids))
+                }
+                missing = [tid for tid in ids if tid not in context]
+                if missing:
+                    context.update(self._joined_cards_context(session, missing))
+
+                self.logger.debug(f"Title cards context loaded for {len(context)}/{len(ids)} titles "
+                                  f"({len(missing)} without summary)")
+                return context
+            except Exception as e:
+                self.logger.error(f"Error loading title cards context for {len(ids)} titles: {e}")
+                return {}
+
+    @staticmethod
+    def _joined_cards_context(session, ids) -> dict[int, dict]:
+        """Контекст карточек из исходных таблиц (провайдер, студия, рейтинг — два запроса на пачку)."""
+        rows = (
+            session.query(
+                Title.title_id,
+                Provider.name,
+                ProductionStudio.name,
+                Rating.rating_name,
+                Rating.rating_value,
+            )
+            .outerjoin(TitleProviderMap, TitleProviderMap.title_id == Title.title_id)
+            .outerjoin(Provider, Provider.provider_id == TitleProviderMap.provider_id)
+            .outerjoin(ProductionStudio, ProductionStudio.title_id == Title.title_id)
+            .outerjoin(Rating, Rating.title_id == Title.title_id)
+            .filter(Title.title_id.in_(ids))
+            .order_by(Title.title_id, TitleProviderMap.id, Rating.rating_id)
+            .all()
+        )
+
+        context: dict[int, dict] = {}
+        for title_id, provider, studio, rating_name, rating_value in rows:
+            # Несколько провайдеров/рейтингов дают дубли строк — как и раньше, берём первый
+            if title_id in context:
+                continue
+            context[title_id] = {
+                'provider': provider,
+                'studio': studio,
+                'rating_name': rating_name,
+                'rating_value': rating_value,
+                'team': {'voice': [], 'translator': [], 'timing': []},
+            }
+
+        team_rows = (
+            session.query(TitleTeamRelation.title_id, TeamMember.role, TeamMember.name)
+            .join(TeamMember, TeamMember.id == TitleTeamRelation.team_member_id)
+            .filter(TitleTeamRelation.title_id.in_(ids))
+            .order_by(TitleTeamRelation.id)
+            .all()
+        )
+        for title_id, role, name in team_rows:
+            ctx = context.get(title_id)
+            if ctx is None:
+                continue
+            role = (role or "").lower()
+            for key in ('voice', 'translator', 'timing'):
+                if key in role:
+                    ctx['team'][key].append(name)
+                    break
+
+        # Тот же формат, что отдаёт get_team_from_db
+        for ctx in context.values():
+            ctx['team'] = {key: json.dumps(members) for key, members in ctx['team'].items()}
+
+        return context
+
     def get_template(self, name=None):
         """
         Загружает темплейт из базы данных по имени.
@@ -332,10 +593,11 @@ class GetManager:
                 self.logger.error(f"Ошибка при загрузке списка шаблонов: {e}")
                 return []
 
-    def get_franchises_from_db(self, batch_size=None, offset=0, title_id=None):
+    def get_franchises_from_db(self, batch_size=None, offset=0, title_id=None, seek: Seek | None = None):
         """Получает все тайтлы вместе с информацией о франшизах."""
         with self.Session as session:
             try:
+                total_count = None
                 if title_id:
                     # New style
                     franchise_subquery = session.query(FranchiseRelease.ext_fr_id).filter(
@@ -362,20 +624,21 @@ class GetManager:
                         FranchiseRelease.franchise_id.isnot(None)
                     )
 
-                if offset >= total_count:
+                if total_count is not None and offset >= total_count:
                     offset = 0
 
+                load = selectinload(Title.franchises).selectinload(FranchiseRelease.franchise)
                 if batch_size:
-                    query = query.offset(offset).limit(batch_size)
+                    return self._load_page(session, query, batch_size, offset, seek, load)
 
-                titles = query.options(joinedload(Title.franchises).joinedload(FranchiseRelease.franchise)).all()
+                titles = query.options(load).all()
                 return titles
 
             except Exception as e:
                 self.logger.error(f"Ошибка при получении тайтлов с франшизами: {e}")
                 return []
 
-    def get_need_to_see_from_db(self, batch_size=None, offset=0, title_id=None):
+    def get_need_to_see_from_db(self, batch_size=None, offset=0, title_id=None, seek: Seek | None = None):
         """Need to see Titles without episodes"""
         with self.Session as session:
             try:
@@ -386,12 +649,12 @@ class GetManager:
                 else:
                     query = query.filter(History.need_to_see == True)
 
-                total_count = query.count()
-                if offset >= total_count:
-                    offset = 0
-
                 if batch_size:
-                    query = query.offset(offset).limit(batch_size)
+                    if not seek and offset:
+                        total_count = query.count()
+                        if offset >= total_count:
+                            offset = 0
+                    return self._load_page(session, query, batch_size, offset, seek)
 
                 titles = query.all()
                 return titles
@@ -400,18 +663,17 @@ class GetManager:
                 self.logger.error(f"Ошибка при загрузке тайтлов из базы данных: {e}")
                 return []
 
-    def get_titles_list_from_db(self, title_ids=None, batch_size=None, offset=0):
-        """Titles without episodes"""
+    def get_titles_list_from_db(self, title_ids=None, batch_size=None, offset=0, seek: Seek | None = None):
+        """Titles without episodes: строки title_summary (одна таблица, без связей)"""
         with self.Session as session:
             try:
-                query = session.query(Title)
+                query = session.query(TitleSummary)
                 if title_ids:
-                    query = query.filter(Title.title_id.in_(title_ids))
-                else:
-                    if batch_size:
-                        query = query.offset(offset).limit(batch_size)
+                    query = query.filter(TitleSummary.title_id.in_(title_ids))
+                elif batch_size:
+                    return self._seek_page(query, TitleSummary.title_id, batch_size, offset, seek)
 
-                titles = query.all()
+                titles = query.order_by(TitleSummary.title_id).all()
                 return titles
 
             except Exception as e:
@@ -421,12 +683,12 @@ class GetManager:
     def get_total_titles_count(self, show_mode=None):
         """Возвращает общее количество тайтлов с учетом фильтров."""
         query_strategies = {
-            'titles_list': lambda session: session.query(Title),
+            'titles_list': lambda session: session.query(TitleSummary),
             'franchise_list': lambda session: session.query(Title).join(FranchiseRelease).join(Franchise).filter(
                 FranchiseRelease.franchise_id.isnot(None)
             ),
             'need_to_see_list': lambda session: session.query(Title).join(History).filter(History.need_to_see == True),
-            'ongoing_list': lambda session: session.query(Title).filter(Title.status_code.in_([1, 3])),
+            'ongoing_list': lambda session: session.query(TitleSummary).filter(TitleSummary.status_code.in_([1, 3])),
         }
 
         with self.Session as session:
@@ -446,22 +708,65 @@ class GetManager:
                 self.logger.error(f"Ошибка при загрузке тайтлов из базы данных: {e}")
                 return 0
 
-    def get_titles_from_db(self, show_all=False, day_of_week=None, batch_size=None, title_id=None, title_ids=None, offset=0):
+    @staticmethod
+    def _seek_page(query, key, batch_size, offset=0, seek: Seek | None = None) -> list:
+        """
+        Строки страницы в порядке key (title_id): seek.after_id / seek.before_id — keyset
+        (key > / < курсора), глубина страницы не важна; без seek — OFFSET.
+        """
+        backwards = bool(seek) and seek.after_id is None
+        if seek and seek.after_id is not None:
+            query = query.filter(key > seek.after_id).order_by(key)
+        elif backwards:
+            query = query.filter(key < seek.before_id).order_by(key.desc())
+        else:
+            query = query.order_by(key).offset(max(0, offset or 0))
+        rows = query.limit(batch_size).all()
+        if backwards:
+            rows.reverse()
+        return rows
+
+    def _page_ids(self, query, batch_size, offset=0, seek: Seek | None = None) -> list[int]:
+        """
+        Фаза 1 постраничной загрузки: только title_id страницы, по индексу первичного ключа,
+        по узкому запросу без JOIN'ов коллекций.
+        """
+        ids_query = query.with_entities(Title.title_id).distinct()
+        return [row[0] for row in self._seek_page(ids_query, Title.title_id, batch_size, offset, seek)]
+
+    def _load_page(self, session, query, batch_size, offset=0, seek: Seek | None = None, *loaders) -> list:
+        """Фаза 2: тайтлы страницы по id + связи через selectinload, в порядке title_id."""
+        ids = self._page_ids(query, batch_size, offset, seek)
+        if not ids:
+            return []
+        return (
+            session.query(Title)
+            .options(*loaders)
+            .filter(Title.title_id.in_(ids))
+            .order_by(Title.title_id)
+            .all()
+        )
+
+    def get_titles_from_db(self, show_all=False, day_of_week=None, batch_size=None, title_id=None, title_ids=None,
+                           offset=0, seek: Seek | None = None):
         """Получает список тайтлов из базы данных через DatabaseManager."""
         """
         Returns a SQLAlchemy query for fetching titles based on given conditions.
         :param day_of_week: Specific day of the week to filter by.
         :param show_all: If true, returns all titles.
         :param title_id: If specified, returns a title with the given title_id.
+        :param seek: keyset-позиция страницы (вместо offset), см. _load_page
         :return: SQLAlchemy Query object
         """
         with self.Session as session:
             try:
-                query = session.query(Title).options(
-                    joinedload(Title.genres).joinedload(TitleGenreRelation.genre),
-                    joinedload(Title.episodes),
-                    joinedload(Title.schedules).joinedload(Schedule.day),  # <-- сразу тянем day
+                # selectinload: коллекции догружаются отдельными IN-запросами, LIMIT режет тайтлы, а не JOIN-строки
+                loaders = (
+                    selectinload(Title.genres).selectinload(TitleGenreRelation.genre),
+                    selectinload(Title.episodes),
+                    selectinload(Title.schedules).selectinload(Schedule.day),  # <-- сразу тянем day
                 )
+                query = session.query(Title)
 
                 # Фильтры по ID/списку ID
                 if title_id:
@@ -479,9 +784,9 @@ class GetManager:
                     query = query.join(Schedule).filter(Schedule.day_of_week == wd)
 
                 if batch_size:
-                    query = query.offset(offset).limit(batch_size)
-
-                titles = query.all()
+                    titles = self._load_page(session, query, batch_size, offset, seek, *loaders)
+                else:
+                    titles = query.options(*loaders).all()
 
                 for t in titles:
                     # жанры
@@ -509,10 +814,8 @@ class GetManager:
         """Получает список title_id по году выпуска."""
         with self.Session as session:
             try:
-                query = session.query(Title).filter(Title.season_year == year)
-                titles = query.all()
-                title_ids = [title.title_id for title in titles]
-                return title_ids
+                query = session.query(Title.title_id).filter(Title.season_year == year)
+                return [title_id for (title_id,) in query]
 
             except Exception as e:
                 self.logger.error(f"Ошибка при поиске тайтлов по year {year}: {e}")
@@ -522,23 +825,21 @@ class GetManager:
         """Получает список title_id по status_code."""
         with self.Session as session:
             try:
-                query = session.query(Title).filter(Title.status_code == status_code)
-                titles = query.all()
-                title_ids = [title.title_id for title in titles]
-                return title_ids
+                query = session.query(Title.title_id).filter(Title.status_code == status_code)
+                return [title_id for (title_id,) in query]
 
             except Exception as e:
                 self.logger.error(f"Ошибка при поиске тайтлов по status {status_code}: {e}")
                 return []
 
-    def get_ongoing_titles(self, batch_size=None, offset=0):
-        """Получает список ongoing titles."""
+    def get_ongoing_titles(self, batch_size=None, offset=0, seek: Seek | None = None):
+        """Получает список ongoing titles (строки title_summary, индекс по status_code)."""
         with self.Session as session:
             try:
-                query = session.query(Title).filter(Title.status_code.in_([1, 3]))
+                query = session.query(TitleSummary).filter(TitleSummary.status_code.in_([1, 3]))
                 if batch_size:
-                    query = query.offset(offset).limit(batch_size)
-                titles = query.all()
+                    return self._seek_page(query, TitleSummary.title_id, batch_size, offset, seek)
+                titles = query.order_by(TitleSummary.title_id).all()
 
                 return titles
 
@@ -546,6 +847,40 @@ class GetManager:
                 self.logger.error(f"Ошибка при поиске тайтлов по status 1, 3: {e}")
                 return []
 
+    def get_filtered_titles(self, title_filter: TitleFilter, user_id=None, batch_size=None, offset=0,
+                            seek: Seek | None = None):
+        """Строки title_summary под комбинацию фильтров (core/title_filter.py), страница — keyset по title_id."""
+        with self.Session as session:
+            try:
+                query = filtered_query(session, title_filter, user_id)
+                if batch_size:
+                    return self._seek_page(query, TitleSummary.title_id, batch_size, offset, seek)
+                return query.order_by(TitleSummary.title_id).all()
+
+            except Exception as e:
+                self.logger.error(f"Ошибка при загрузке тайтлов по фильтру {title_filter}: {e}")
+                return []
+
+    def get_filtered_count(self, title_filter: TitleFilter, user_id=None) -> int:
+        with self.Session as session:
+            try:
+                query = filtered_query(session, title_filter, user_id).with_entities(TitleSummary.title_id)
+                return query.count()
+
+            except Exception as e:
+                self.logger.error(f"Ошибка при подсчёте тайтлов по фильтру {title_filter}: {e}")
+                return 0
+
+    def get_facet_counts(self, title_filter: TitleFilter | None = None, user_id=None) -> dict[str, list[tuple]]:
+        """{facet: [(value, label, count)]} для панели фильтров."""
+        with self.Session as session:
+            try:
+                return facet_counts(session, title_filter, user_id)
+
+            except Exception as e:
+                self.logger.error(f"Ошибка при подсчёте фасетов для фильтра {title_filter}: {e}")
+                return {}
+
     def get_titles_by_genre(self, genre_id):
         """Получает список title_id, связанных с указанным жанром по его ID."""
         with self.Session as session:
@@ -759,6 +1094,119 @@ class GetManager:
             )
             return title
 
+    @staticmethod
+    def _as_timestamp(value) -> int | None:
+        """titles.updated/last_change: save_title пишет datetime в INTEGER-колонку, SQLite отдаёт строку."""
+        if value is None or isinstance(value, int):
+            return value
+        try:
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return int(value.timestamp())
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    def get_title_change_markers(self, provider_code: str, external_ids) -> dict[str, tuple]:
+        """
+        Маркеры изменений для инкрементальной загрузки одним запросом.
+        :return: {external_id (str): (title_id, updated, last_change, has_episodes)} только для известных тайтлов
+        """
+        ext_ids = list({str(x) for x in (external_ids or []) if x is not None})
+        if not ext_ids:
+            return {}
+        with self.Session as session:
+            try:
+                has_episodes = sqlalchemy.exists().where(Episode.title_id == Title.title_id)
+                rows = (
+                    session.query(
+                        TitleProviderMap.external_title_id,
+                        Title.title_id,
+                        Title.updated,
+                        Title.last_change,
+                        has_episodes,
+                    )
+                    .join(Title, Title.title_id == TitleProviderMap.title_id)
+                    .join(Provider, Provider.provider_id == TitleProviderMap.provider_id)
+                    .filter(
+                        Provider.code == provider_code,
+                        TitleProviderMap.external_title_id.in_(ext_ids),
+                    )
+                    .all()
+                )
+                return {ext: (title_id, self._as_timestamp(updated), self._as_timestamp(last_change), bool(eps))
+                        for ext, title_id, updated, last_change, eps in rows}
+            except Exception as e:
+                self.logger.error(f"Error fetching change markers for {len(ext_ids)} '{provider_code}' titles: {e}")
+                return {}
+
+    def get_stale_title_markers(self, provider_code: str, updated_before=None, limit=None,
+                                status_code=None) -> dict[str, tuple]:
+        """
+        Кандидаты на массовое обновление: тайтлы провайдера, не обновлявшиеся с updated_before
+        (None — все), от самых старых к свежим. status_code — только тайтлы с этим статусом (1 — онгоинги).
+        :return: {external_id (str): (title_id, updated, last_change, has_episodes)} — как get_title_change_markers
+        """
+        with self.Session as session:
+            try:
+                has_episodes = sqlalchemy.exists().where(Episode.title_id == Title.title_id)
+                query = (
+                    session.query(
+                        TitleProviderMap.external_title_id,
+                        Title.title_id,
+                        Title.updated,
+                        Title.last_change,
+                        has_episodes,
+                    )
+                    .join(Title, Title.title_id == TitleProviderMap.title_id)
+                    .join(Provider, Provider.provider_id == TitleProviderMap.provider_id)
+                    .filter(Provider.code == provider_code)
+                )
+                if updated_before is not None:
+                    query = query.filter(sqlalchemy.or_(Title.last_updated.is_(None),
+                                                        Title.last_updated < updated_before))
+                if status_code is not None:
+                    query = query.filter(Title.status_code == status_code)
+                query = query.order_by(Title.last_updated.is_(None).desc(), Title.last_updated, Title.title_id)
+                if limit:
+                    query = query.limit(limit)
+                return {ext: (title_id, self._as_timestamp(updated), self._as_timestamp(last_change), bool(eps))
+                        for ext, title_id, updated, last_change, eps in query.all()}
+            except Exception as e:
+                self.logger.error(f"Error fetching stale '{provider_code}' titles: {e}")
+                return {}
+
+    def get_stale_poster_links(self, size_key: PosterSize, refresh_before, final_before, limit=None) -> list[tuple]:
+        """
+        Постеры к скачиванию одним запросом (правила как в get_poster_or_placeholder приложения):
+        blob нет — качаем; обновлён между final_before и refresh_before — перекачиваем; старше final_before — финальный.
+        :return: [(title_id, poster_link)]
+        """
+        fields = POSTER_FIELDS[size_key]
+        link_col = {"small": Title.poster_path_small, "medium": Title.poster_path_medium}.get(
+            size_key, Title.poster_path_original)
+        blob_col, updated_col = getattr(Poster, fields.blob), getattr(Poster, fields.updated)
+        with self.Session as session:
+            try:
+                query = (
+                    session.query(Title.title_id, link_col)
+                    .outerjoin(Poster, Poster.title_id == Title.title_id)
+                    .filter(link_col.isnot(None), link_col != "")
+                    .filter(or_(
+                        blob_col.is_(None),
+                        and_(updated_col < refresh_before, updated_col >= final_before),
+                    ))
+                    .distinct()
+                    .order_by(Title.title_id)
+                )
+                if limit:
+                    query = query.limit(limit)
+                return [(title_id, link) for title_id, link in query.all()]
+            except Exception as e:
+                self.logger.error(f"Error fetching stale {size_key} posters: {e}")
+                return []
+
     def get_title_ids_by_provider(self, provider_code: str) -> list[int]:
         with self.Session as session:
             rows = (
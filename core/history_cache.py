@@ -0,0 +1,110 @@
+# history_cache.py
+import threading
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+
+# Ключ строки history внутри тайтла: (episode_id, torrent_id); (None, None) — запись уровня тайтла
+RowKey = tuple[Optional[int], Optional[int]]
+
+# Тайтлов в памяти; вытесненные перечитываются GetManager.get_history_map одним запросом
+MAX_TITLES = 4096
+
+
+@dataclass
+class HistoryRow:
+    is_watched: bool = False
+    is_download: bool = False
+    need_to_see: bool = False
+
+
+@dataclass
+class TitleHistoryState:
+    """Все записи history одного пользователя по одному тайтлу."""
+    rows: dict[RowKey, HistoryRow] = field(default_factory=dict)
+
+    def status(self, episode_id=None, torrent_id=None) -> tuple[bool, bool]:
+        """Аналог GetManager.get_history_status: (is_watched, is_download)."""
+        row = self.rows.get((episode_id, torrent_id))
+        if row is None:
+            return False, False
+        return row.is_watched, row.is_download
+
+    @property
+    def need_to_see(self) -> bool:
+        return any(row.need_to_see for row in self.rows.values())
+
+    @property
+    def all_episodes_watched(self) -> bool:
+        episodes = [row for (episode_id, _), row in self.rows.items() if episode_id is not None]
+        return bool(episodes) and all(row.is_watched for row in episodes)
+
+
+class HistoryCache:
+    """
+    In-memory карта history по (user_id, title_id), общая для GetManager и SaveManager.
+    GetManager заполняет её батчем, SaveManager применяет свои записи после commit,
+    так что переключение статуса не требует повторного чтения.
+    LRU на max_titles тайтлов: update_row/set_need_to_see вытесненные тайтлы не трогают,
+    а следующее чтение загрузит их из БД заново.
+    """
+
+    def __init__(self, max_titles: int = MAX_TITLES):
+        self._states: OrderedDict[tuple[int, int], TitleHistoryState] = OrderedDict()
+        self._max_titles = max(1, int(max_titles))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._states)
+
+    def get(self, user_id, title_id) -> Optional[TitleHistoryState]:
+        with self._lock:
+            state = self._states.get((user_id, title_id))
+            if state is not None:
+                self._states.move_to_end((user_id, title_id))
+            return state
+
+    def missing(self, user_id, title_ids: Iterable[int]) -> list[int]:
+        with self._lock:
+            return [tid for tid in title_ids if (user_id, tid) not in self._states]
+
+    def put(self, user_id, title_id, state: TitleHistoryState) -> None:
+        with self._lock:
+            self._states[(user_id, title_id)] = state
+            self._states.move_to_end((user_id, title_id))
+            while len(self._states) > self._max_titles:
+                self._states.popitem(last=False)
+
+    def update_row(self, user_id, title_id, episode_id=None, torrent_id=None, **values) -> None:
+        """Обновляет (или создаёт) строку в уже загруженном состоянии; незагруженные тайтлы не трогает."""
+        with self._lock:
+            state = self._states.get((user_id, title_id))
+            if state is None:
+                return
+            row = state.rows.setdefault((episode_id, torrent_id), HistoryRow())
+            for name, value in values.items():
+                setattr(row, name, bool(value))
+
+    def set_need_to_see(self, user_id, title_id, need_to_see) -> None:
+        """Зеркало SaveManager.save_need_to_see: флаг на всех строках тайтла либо новая строка уровня тайтла."""
+        with self._lock:
+            state = self._states.get((user_id, title_id))
+            if state is None:
+                return
+            if state.rows:
+                for row in state.rows.values():
+                    row.need_to_see = bool(need_to_see)
+            else:
+                state.rows[(None, None)] = HistoryRow(need_to_see=True)
+
+    def invalidate(self, user_id=None, title_id=None) -> None:
+        with self._lock:
+            if user_id is None and title_id is None:
+                self._states.clear()
+                return
+            for key in [k for k in self._states
+                        if (user_id is None or k[0] == user_id) and (title_id is None or k[1] == title_id)]:
+                del self._states[key]
@@ -308,6 +308,7 @@ class ProcessManager:
 
     def process_torrents(self, title_data):
         if "torrents" in title_data and "list" in title_data["torrents"]:
+            batch = []
             for torrent in title_data["torrents"]["list"]:
                 url = torrent.get("url")
                 if url:
@@ -350,9 +351,16 @@ class ProcessManager:
                             'raw_base64_file': torrent.get('raw_base64_file')
                         }
 
-                        self.save_manager.save_torrent(torrent_data)
+                        batch.append(torrent_data)
                     except Exception as e:
-                        self.logger.error(f"Ошибка при сохранении торрента в базе данных: {e}")
+                        self.logger.error(f"Ошибка при подготовке торрента: {e}")
+
+            if batch:
+                try:
+                    self.save_manager.save_torrents(title_data.get('title_id'), batch)
+                except Exception as e:
+                    self.logger.error(f"Ошибка при сохранении торрентов в базе данных: {e}")
+                    return False
         return True
 
     def process_animedia_titles(self, data):
@@ -1,24 +1,35 @@
 # save.py
+import ast
+import base64
+import binascii
 import json
 import logging
 import re
 import uuid
 
 from typing import Optional
-from sqlalchemy import or_, and_, nullslast, select, func, update, delete, Integer, case, exists
+from sqlalchemy import or_, and_, nullslast, select, func, update, delete, Integer, case, exists, text
 from datetime import datetime, timezone
 from sqlalchemy.orm import sessionmaker, aliased
 from core.tables import Title, Schedule, History, Rating, FranchiseRelease, Franchise, Poster, Torrent, \
     TitleGenreRelation, \
-    Template, Genre, TeamMember, TitleTeamRelation, Episode, ProductionStudio, Provider, TitleProviderMap
-from core.types import PosterSize, POSTER_FIELDS
+    Template, Genre, TeamMember, TitleTeamRelation, Episode, ProductionStudio, Provider, TitleProviderMap, TorrentFile, \
+    PosterValidator
+from core.types import PosterSize, POSTER_FIELDS, PosterValidators
+from core.torrent_prune import TorrentPruneRow, select_torrents_to_prune
+from core.history_cache import HistoryCache
+from core.title_summary import refresh_title_summary
 from utils.media.image_manager import normalize_poster_blob_if_needed, sha256, make_small_poster
 
+# PRAGMA user_version после переноса inline-payload в torrent_files: дальше migrate_torrent_payloads не сканирует torrents
+TORRENT_PAYLOADS_MIGRATED = 1
+
 
 class SaveManager:
-    def __init__(self, engine):
+    def __init__(self, engine, history_cache: HistoryCache | None = None):
         self.logger = logging.getLogger(__name__)
         self.Session = sessionmaker(bind=engine)()
+        self.history_cache = history_cache
 
     def save_poster(
             self,
@@ -26,15 +37,19 @@ class SaveManager:
             poster_blob: bytes,
             hash_value: str | None,
             size_key: PosterSize = "original",
+            validators: PosterValidators | None = None,
     ) -> None:
         """
         Save poster blob/hash/updated for the given size_key into posters table.
         Creates Poster row if missing.
+        validators: ETag/Last-Modified ответа — для следующей условной проверки (см. touch_poster);
+        заменяют прежние целиком, без них валидаторы очищаются: к новому blob старые не относятся.
         """
         with self.Session as session:
             try:
                 now = datetime.now(timezone.utc)
                 fields = POSTER_FIELDS[size_key]
+                self._store_poster_validators(session, title_id, size_key, validators or PosterValidators(), now)
 
                 # original < w=455px
                 try:
@@ -94,6 +109,57 @@ class SaveManager:
                 self.logger.error(f"Ошибка при сохранении постера в базу данных: {e}", exc_info=True)
                 raise
 
+    def touch_poster(
+            self,
+            title_id: int,
+            size_key: PosterSize = "original",
+            validators: PosterValidators | None = None,
+    ) -> bool:
+        """
+        Сервер ответил 304: постер не менялся — обновляем только дату (и валидаторы, если сервер прислал новые),
+        blob не трогаем. Returns: False, если постера нет.
+        """
+        with self.Session as session:
+            try:
+                now = datetime.now(timezone.utc)
+                fields = POSTER_FIELDS[size_key]
+                updated = session.query(Poster).filter(Poster.title_id == title_id).update(
+                    {getattr(Poster, fields.updated): now}, synchronize_session=False)
+                if not updated:
+                    session.rollback()
+                    return False
+                self._store_poster_validators(session, title_id, size_key, validators or PosterValidators(), now,
+                                              merge=True)
+                session.commit()
+                self.logger.debug(f"Poster not modified, timestamp updated. title_id={title_id} size={size_key}")
+                return True
+            except Exception as e:
+                session.rollback()
+                self.logger.error(f"Ошибка при обновлении даты постера: {e}", exc_info=True)
+                raise
+
+    @staticmethod
+    def _store_poster_validators(session, title_id, size_key, validators: PosterValidators, now,
+                                 merge: bool = False) -> None:
+        row = session.get(PosterValidator, (title_id, size_key))
+        if row is None:
+            row = PosterValidator(title_id=title_id, size_key=size_key)
+            session.add(row)
+        if merge:
+            # 304: пустые поля не затирают сохранённые — ответ часто приходит без Last-Modified
+            if validators.etag:
+                row.etag = validators.etag
+            if validators.last_modified:
+                row.last_modified = validators.last_modified
+            if validators.content_length:
+                row.content_length = validators.content_length
+        else:
+            # 200: новая картинка, валидаторы прежней к ней не относятся
+            row.etag = validators.etag
+            row.last_modified = validators.last_modified
+            row.content_length = validators.content_length
+        row.checked_at = now
+
     def save_need_to_see(self, user_id, title_id, need_to_see=True):
         with self.Session as session:
             try:
@@ -114,6 +180,8 @@ class SaveManager:
                     )
                     session.add(new_add)
                 session.commit()
+                if self.history_cache is not None:
+                    self.history_cache.set_need_to_see(user_id, title_id, need_to_see)
             except Exception as e:
                 session.rollback()
                 self.logger.error(
@@ -157,6 +225,9 @@ class SaveManager:
                     self.logger.debug(f"BULK Added new watch status for user_id: {user_id}, title_id: {title_id}, episode_id: {episode_id}, STATUS: {is_watched}")
                 session.bulk_save_objects(new_adds)
                 session.commit()
+                if self.history_cache is not None:
+                    for episode_id in episode_ids:
+                        self.history_cache.update_row(user_id, title_id, episode_id=episode_id, is_watched=is_watched)
             except Exception as e:
                 session.rollback()
                 self.logger.error(f"BULK Error saving watch status for user_id {user_id}, title_id {title_id}, episode_ids {episode_ids}: {e}")
@@ -218,6 +289,13 @@ class SaveManager:
                     session.add(new_add)
 
                 session.commit()
+                if self.history_cache is not None:
+                    if episode_id is not None:
+                        self.history_cache.update_row(user_id, title_id, episode_id=episode_id, is_watched=is_watched)
+                    elif torrent_id is not None:
+                        self.history_cache.update_row(user_id, title_id, torrent_id=torrent_id, is_download=is_download)
+                    else:
+                        self.history_cache.update_row(user_id, title_id, is_watched=is_watched)
 
             except Exception as e:
                 session.rollback()
@@ -284,6 +362,7 @@ class SaveManager:
                         f"Updated rating title_id={title_id} source={rating_name}"
                     )
 
+                refresh_title_summary(session, [title_id])
                 session.commit()
             except Exception as exc:
                 session.rollback()
@@ -379,6 +458,7 @@ class SaveManager:
                             setattr(title, key, value)
                             is_updated = True
                     if is_updated:
+                        refresh_title_summary(session, [title.title_id])
                         session.commit()
                         self.logger.debug(f"Updated title_id: {title.title_id} for {provider_code}:{external_id}")
                 else:
@@ -391,6 +471,7 @@ class SaveManager:
                         external_title_id=external_id_str,
                     )
                     session.add(link)
+                    refresh_title_summary(session, [title.title_id])
                     session.commit()
                     self.logger.debug(f"Created title_id: {title.title_id} for {provider_code}:{external_id}")
                 return title.title_id
@@ -478,6 +559,7 @@ class SaveManager:
                     if not existing_relation:
                         new_relation = TitleGenreRelation(title_id=title_id, genre_id=genre_id, last_updated=datetime.now(timezone.utc))
                         session.add(new_relation)
+                refresh_title_summary(session, [title_id])
                 session.commit()
                 self.logger.debug(f"Successfully saved genres for title_id: {title_id}")
             except Exception as e:
@@ -519,6 +601,7 @@ class SaveManager:
                 for relation in existing_relations:
                     if relation.team_member_id not in processed_team_member_ids:
                         session.delete(relation)
+                refresh_title_summary(session, [title_id])
                 session.commit()
                 self.logger.debug(f"Successfully saved team members for title_id: {title_id}")
                 return True
@@ -605,11 +688,184 @@ class SaveManager:
                     schedule_entry = Schedule(day_of_week=day_of_week, title_id=title_id, last_updated=last_updated)
                     session.add(schedule_entry)
                     self.logger.debug(f"Adding new schedule entry for day {day_of_week} and title_id {title_id}.")
+                refresh_title_summary(session, [title_id])
                 session.commit()
             except Exception as e:
                 session.rollback()
                 self.logger.error(f"Ошибка при сохранении расписания: {e}")
 
+    @staticmethod
+    def _torrent_size_to_bytes(size_string: str) -> int:
+        if not size_string:
+            return 0
+        s = str(size_string).strip().upper().replace(',', '.')
+        try:
+            num = float(s.split()[0])
+        except Exception:
+            return 0
+        mult = {'TB': 1024 ** 4, 'GB': 1024 ** 3, 'MB': 1024 ** 2, 'KB': 1024, 'B': 1}
+        for u in ('TB', 'GB', 'MB', 'KB', 'B'):
+            if u in s:
+                return int(num * mult[u])
+        return int(num)
+
+    @classmethod
+    def _prepare_torrent(cls, p: dict) -> dict:
+        q = dict(p)
+        if isinstance(q.get('torrent_metadata'), dict):
+            q['torrent_metadata'] = json.dumps(q['torrent_metadata'], ensure_ascii=False)
+        if not isinstance(q.get('uploaded_timestamp'), datetime):
+            q['uploaded_timestamp'] = datetime.now(timezone.utc)
+        if q.get('total_size') is None:
+            q['total_size'] = cls._torrent_size_to_bytes(q.get('size_string') or "")
+        else:
+            try:
+                q['total_size'] = int(q['total_size'])
+            except Exception:
+                q['total_size'] = cls._torrent_size_to_bytes(q.get('size_string') or "")
+        if not q.get('resolution'):
+            m = re.search(r'(\d{3,4})p', ((q.get('quality') or '') + ' ' + (q.get('resolution') or '')), re.I)
+            if m:
+                q['resolution'] = f"{m.group(1)}p"
+        q['resolution'] = (q.get('resolution') or "").strip().lower()
+        q['quality'] = (q.get('quality') or "").strip().lower()
+        q['encoder'] = (q.get('encoder') or "").strip().lower()
+        if not q.get('episodes_range'):
+            for source in (q.get('episodes_range'), q.get('description'), q.get('label')):
+                if source:
+                    m = re.search(r'(\d+)\s*[-–—]\s*(\d+)', str(source))
+                    if m:
+                        q['episodes_range'] = f"{m.group(1)}-{m.group(2)}"
+                        break
+        q['episodes_range'] = (q.get('episodes_range') or "").strip()
+        q['label'] = (q.get('label') or "").strip()
+        q['filename'] = (q.get('filename') or "").strip()
+        q['api_updated_at'] = q.get('api_updated_at') or q.get('updated_at') or datetime.now(timezone.utc)
+        q['is_in_production'] = int(bool(q.get('is_in_production')))
+        q['episodes_total'] = int(q.get('episodes_total') or 0)
+        rng = (q.get('episodes_range') or "").strip()
+        if rng:
+            m = re.search(r'(\d+)\s*[-–—]\s*(\d+)', rng)
+            if m:
+                q['range_first'] = int(m.group(1))
+                q['range_last'] = int(m.group(2))
+            else:
+                m1 = re.fullmatch(r'\s*(\d+)\s*', rng)
+                if m1:
+                    q['range_first'] = q['range_last'] = int(m1.group(1))
+                else:
+                    if re.search(r'(фильм|movie|ova|special|ona)', rng, re.I):
+                        q['range_first'] = q['range_last'] = 1
+                    else:
+                        q['range_first'] = q['range_last'] = None
+        else:
+            q['range_first'] = q['range_last'] = None
+
+        return q
+
+    def _split_torrent_payload(self, q: dict) -> tuple[dict, dict | None]:
+        """
+        Отделяет тяжёлый payload (.torrent в base64 и metadata) от строки torrents.
+        Файл декодируется в сырые байты для torrent_files.
+        """
+        fields = dict(q)
+        raw_b64 = fields.pop('raw_base64_file', None)
+        metadata = fields.pop('torrent_metadata', None)
+        blob = None
+        if raw_b64:
+            try:
+                blob = base64.b64decode(raw_b64)
+            except (binascii.Error, ValueError, TypeError) as e:
+                self.logger.warning(f"Invalid base64 torrent file for torrent_id={fields.get('torrent_id')}: {e}")
+        if blob is None and not metadata:
+            return fields, None
+        return fields, {'file_blob': blob, 'file_size': len(blob) if blob is not None else None,
+                        'torrent_metadata': metadata}
+
+    @staticmethod
+    def _merge_torrent_file(session, torrent_id: int, title_id: int, payload: dict) -> None:
+        existing = session.get(TorrentFile, torrent_id)
+        if existing is None:
+            session.add(TorrentFile(torrent_id=torrent_id, title_id=title_id, **payload))
+            return
+        existing.title_id = title_id
+        for key, value in payload.items():
+            if value is not None:
+                setattr(existing, key, value)
+        existing.last_updated = datetime.now(timezone.utc)
+
+    @staticmethod
+    def _delete_orphan_torrent_files(session, title_id: int) -> None:
+        session.execute(
+            delete(TorrentFile)
+            .where(TorrentFile.title_id == title_id)
+            .where(~TorrentFile.torrent_id.in_(select(Torrent.torrent_id).where(Torrent.title_id == title_id)))
+            .execution_options(synchronize_session=False)
+        )
+
+    def save_torrent_file_blob(self, torrent_id: int, file_blob: bytes) -> bool:
+        """Кэширует скачанный .torrent в torrent_files (сырые байты)."""
+        with self.Session as session:
+            try:
+                title_id = session.execute(
+                    select(Torrent.title_id).where(Torrent.torrent_id == torrent_id)
+                ).scalar_one_or_none()
+                if title_id is None:
+                    self.logger.warning(f"torrent_id={torrent_id} not found, torrent file not cached")
+                    return False
+                self._merge_torrent_file(session, torrent_id, title_id,
+                                         {'file_blob': file_blob, 'file_size': len(file_blob)})
+                session.commit()
+                return True
+            except Exception as e:
+                session.rollback()
+                self.logger.error(f"Error saving torrent file for torrent_id={torrent_id}: {e}")
+                return False
+
+    def migrate_torrent_payloads(self, batch_size: int = 200) -> int:
+        """
+        Переносит legacy payload (torrents.raw_base64_file / torrent_metadata) в torrent_files
+        и очищает inline-колонки. Идемпотентно, выполняется пачками.
+        После полного прохода помечает базу через PRAGMA user_version, и следующие старты не сканируют torrents.
+        """
+        moved = 0
+        T = Torrent
+        with self.Session as session:
+            try:
+                if (session.execute(text("PRAGMA user_version")).scalar() or 0) >= TORRENT_PAYLOADS_MIGRATED:
+                    return 0
+                while True:
+                    rows = session.execute(
+                        select(T.torrent_id, T.title_id, T.raw_base64_file, T.torrent_metadata)
+                        .where(or_(T.raw_base64_file.isnot(None), T.torrent_metadata.isnot(None)))
+                        .limit(batch_size)
+                    ).all()
+                    if not rows:
+                        break
+                    for torrent_id, title_id, raw_b64, metadata in rows:
+                        _, payload = self._split_torrent_payload(
+                            {'torrent_id': torrent_id, 'raw_base64_file': raw_b64, 'torrent_metadata': metadata}
+                        )
+                        if payload:
+                            self._merge_torrent_file(session, torrent_id, title_id, payload)
+                    session.execute(
+                        update(T)
+                        .where(T.torrent_id.in_([r[0] for r in rows]))
+                        .values(raw_base64_file=None, torrent_metadata=None)
+                        .execution_options(synchronize_session=False)
+                    )
+                    session.commit()
+                    moved += len(rows)
+                session.execute(text(f"PRAGMA user_version = {TORRENT_PAYLOADS_MIGRATED}"))
+                session.commit()
+                if moved:
+                    self.logger.info(f"Migrated {moved} torrent payloads to torrent_files")
+                return moved
+            except Exception as e:
+                session.rollback()
+                self.logger.error(f"Error migrating torrent payloads: {e}")
+                return moved
+
     def save_torrent(self, torrent_data):
         """
         list[dict]: ПОЛНАЯ замена по title_id (доверяем API, атомарно)
@@ -617,72 +873,7 @@ class SaveManager:
                     чтобы 1–4 сразу чистил 1–3 даже "в производстве"
         """
         T = Torrent
-        def _to_bytes(size_string: str) -> int:
-            if not size_string:
-                return 0
-            s = str(size_string).strip().upper().replace(',', '.')
-            try:
-                num = float(s.split()[0])
-            except Exception:
-                return 0
-            mult = {'TB': 1024 ** 4, 'GB': 1024 ** 3, 'MB': 1024 ** 2, 'KB': 1024, 'B': 1}
-            for u in ('TB', 'GB', 'MB', 'KB', 'B'):
-                if u in s:
-                    return int(num * mult[u])
-            return int(num)
-
-        def _prep_one(p: dict) -> dict:
-            q = dict(p)
-            if isinstance(q.get('torrent_metadata'), dict):
-                q['torrent_metadata'] = json.dumps(q['torrent_metadata'], ensure_ascii=False)
-            if not isinstance(q.get('uploaded_timestamp'), datetime):
-                q['uploaded_timestamp'] = datetime.now(timezone.utc)
-            if q.get('total_size') is None:
-                q['total_size'] = _to_bytes(q.get('size_string') or "")
-            else:
-                try:
-                    q['total_size'] = int(q['total_size'])
-                except Exception:
-                    q['total_size'] = _to_bytes(q.get('size_string') or "")
-            if not q.get('resolution'):
-                m = re.search(r'(\d{3,4})p', ((q.get('quality') or '') + ' ' + (q.get('resolution') or '')), re.I)
-                if m:
-                    q['resolution'] = f"{m.group(1)}p"
-            q['resolution'] = (q.get('resolution') or "").strip().lower()
-            q['quality'] = (q.get('quality') or "").strip().lower()
-            q['encoder'] = (q.get('encoder') or "").strip().lower()
-            if not q.get('episodes_range'):
-                for source in (q.get('episodes_range'), q.get('description'), q.get('label')):
-                    if source:
-                        m = re.search(r'(\d+)\s*[-–—]\s*(\d+)', str(source))
-                        if m:
-                            q['episodes_range'] = f"{m.group(1)}-{m.group(2)}"
-                            break
-            q['episodes_range'] = (q.get('episodes_range') or "").strip()
-            q['label'] = (q.get('label') or "").strip()
-            q['filename'] = (q.get('filename') or "").strip()
-            q['api_updated_at'] = q.get('api_updated_at') or q.get('updated_at') or datetime.now(timezone.utc)
-            q['is_in_production'] = int(bool(q.get('is_in_production')))
-            q['episodes_total'] = int(q.get('episodes_total') or 0)
-            rng = (q.get('episodes_range') or "").strip()
-            if rng:
-                m = re.search(r'(\d+)\s*[-–—]\s*(\d+)', rng)
-                if m:
-                    q['range_first'] = int(m.group(1))
-                    q['range_last'] = int(m.group(2))
-                else:
-                    m1 = re.fullmatch(r'\s*(\d+)\s*', rng)
-                    if m1:
-                        q['range_first'] = q['range_last'] = int(m1.group(1))
-                    else:
-                        if re.search(r'(фильм|movie|ova|special|ona)', rng, re.I):
-                            q['range_first'] = q['range_last'] = 1
-                        else:
-                            q['range_first'] = q['range_last'] = None
-            else:
-                q['range_first'] = q['range_last'] = None
-
-            return q
+        _prep_one = self._prepare_torrent
 
         def _codec_family_sql(expr):
             expr_lc = func.lower(func.trim(func.coalesce(expr, '')))
@@ -803,12 +994,19 @@ class SaveManager:
             title_id = prepared[0]['title_id']
             if any(t['title_id'] != title_id for t in prepared):
                 raise ValueError("В батче обнаружены разные title_id — replace невозможен")
+            split = [self._split_torrent_payload(t) for t in prepared]
             with self.Session as session, session.begin():
+                session.query(TorrentFile).filter(TorrentFile.title_id == title_id).delete(synchronize_session=False)
                 session.query(T).filter(T.title_id == title_id).delete(synchronize_session=False)
-                session.bulk_save_objects([T(**t) for t in prepared])
+                session.bulk_save_objects([T(**fields) for fields, _ in split])
+                session.bulk_save_objects([
+                    TorrentFile(torrent_id=fields['torrent_id'], title_id=title_id, **payload)
+                    for fields, payload in split if payload and fields.get('torrent_id') is not None
+                ])
                 _prune_triplet(session, title_id)
                 _prune_covered_ranges(session, title_id)
                 _prune_res_codec(session, title_id)
+                self._delete_orphan_torrent_files(session, title_id)
             self.logger.info(f"[replace] title_id={title_id}: inserted {len(prepared)}")
             return
 
@@ -817,14 +1015,19 @@ class SaveManager:
             if p.get('torrent_id') is None:
                 raise ValueError("torrent_id обязателен для одиночного save")
 
+            fields, payload = self._split_torrent_payload(p)
             with self.Session as session, session.begin():
-                session.merge(T(**p))
+                session.merge(T(**fields))
+                if payload:
+                    session.flush()
+                    self._merge_torrent_file(session, p['torrent_id'], p['title_id'], payload)
 
             with self.Session as session, session.begin():
                 _prune_covered_ranges(session, p['title_id'])
                 if not p.get('is_in_production'):
                     _prune_triplet(session, p['title_id'])
                     _prune_res_codec(session, p['title_id'])
+                self._delete_orphan_torrent_files(session, p['title_id'])
 
             self.logger.debug(
                 f"[dict] title={p['title_id']} q='{p.get('quality') or ''}' "
@@ -834,6 +1037,99 @@ class SaveManager:
 
         raise TypeError("save_torrent ожидает dict или list[dict]")
 
+    def save_torrents(self, title_id: int, torrents: list[dict]) -> int:
+        """
+        Пакетный upsert торрентов ОДНОГО тайтла + одно отсечение в Python, всё в одной транзакции.
+        В отличие от save_torrent(list) существующие торренты тайтла не удаляются — только вытесняются
+        по тем же правилам, что и в save_torrent(dict):
+          - покрытые диапазоны чистятся всегда (1–4 сразу чистит 1–3 даже "в производстве");
+          - дедупликация (quality, encoder, range) / (resolution, codec, range) — если в пакете есть
+            хотя бы один завершённый торрент.
+        :return: количество удалённых торрентов.
+        """
+        T = Torrent
+        prepared = []
+        payloads = {}
+        for t in torrents:
+            p = self._prepare_torrent({**t, 'title_id': title_id})
+            if p.get('torrent_id') is None:
+                self.logger.warning(f"[batch] title_id={title_id}: torrent без torrent_id пропущен")
+                continue
+            p, payload = self._split_torrent_payload(p)
+            if payload:
+                payloads[p['torrent_id']] = payload
+            prepared.append(p)
+        if not prepared:
+            return 0
+
+        with self.Session as session, session.begin():
+            # Прогреваем identity map одним SELECT, чтобы merge не ходил в БД за каждой строкой
+            incoming_ids = [p['torrent_id'] for p in prepared]
+            session.query(T).filter(T.torrent_id.in_(incoming_ids)).all()
+            for p in prepared:
+                session.merge(T(**p))
+            session.flush()
+            for torrent_id, payload in payloads.items():
+                self._merge_torrent_file(session, torrent_id, title_id, payload)
+
+            rows = [
+                TorrentPruneRow(
+                    torrent_id=r.torrent_id,
+                    quality=r.quality or "",
+                    encoder=r.encoder or "",
+                    resolution=r.resolution or "",
+                    episodes_range=r.episodes_range or "",
+                    range_first=r.range_first,
+                    range_last=r.range_last,
+                    total_size=r.total_size or 0,
+                    uploaded_timestamp=r.uploaded_timestamp,
+                )
+                for r in session.execute(
+                    select(
+                        T.torrent_id, T.quality, T.encoder, T.resolution, T.episodes_range,
+                        T.range_first, T.range_last, T.total_size, T.uploaded_timestamp,
+                    ).where(T.title_id == title_id)
+                )
+            ]
+            dedupe = any(not p.get('is_in_production') for p in prepared)
+            to_delete = select_torrents_to_prune(rows, dedupe=dedupe)
+            if to_delete:
+                session.execute(
+                    delete(TorrentFile)
+                    .where(TorrentFile.torrent_id.in_(to_delete))
+                    .execution_options(synchronize_session=False)
+                )
+                session.execute(
+                    delete(T)
+                    .where(T.title_id == title_id)
+                    .where(T.torrent_id.in_(to_delete))
+                    .execution_options(synchronize_session=False)
+                )
+
+        self.logger.debug(
+            f"[batch] title_id={title_id}: upsert {len(prepared)}, pruned {len(to_delete)}"
+        )
+        return len(to_delete)
+
+    def mark_titles_checked(self, title_ids, checked_at=None) -> int:
+        """Одним UPDATE сдвигает last_updated у тайтлов, которые сверены с API и не изменились."""
+        ids = list({int(t) for t in title_ids or []})
+        if not ids:
+            return 0
+        with self.Session as session:
+            try:
+                result = session.execute(
+                    update(Title)
+                    .where(Title.title_id.in_(ids))
+                    .values(last_updated=checked_at or datetime.now(timezone.utc))
+                )
+                session.commit()
+                return result.rowcount or 0
+            except Exception as e:
+                session.rollback()
+                self.logger.error(f"Error marking {len(ids)} titles as checked: {e}")
+                return 0
+
     def remove_schedule_day(self, title_ids, day_of_week):
         with self.Session as session:
             try:
@@ -858,6 +1154,7 @@ class SaveManager:
                         .filter(Schedule.title_id.in_(title_ids), Schedule.day_of_week == day_of_week)
                         .delete(synchronize_session=False)
                     )
+                    refresh_title_summary(session, title_ids)
                     session.commit()
                     self.logger.debug(
                         f"Removed {deleted_count} schedules for day {day_of_week} and titles {title_ids}"
@@ -891,6 +1188,7 @@ class SaveManager:
                     new_studio = ProductionStudio(title_id=title_id, name=studio_name)
                     session.add(new_studio)
                     self.logger.debug(f"Новая студия добавлена: {studio_name} для title_id: {title_id}")
+                refresh_title_summary(session, title_ids)
                 session.commit()
 
             except Exception as e:
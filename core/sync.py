@@ -0,0 +1,358 @@
+# sync.py
+"""
+Headless синхронизация библиотеки без Qt: прогрев БД на сервере перед раздачей клиентам (app/sync).
+
+    python -m core.sync --db db/anime_player.db
+    python -m core.sync --db db/anime_player.db --jobs schedule,posters --workers 8
+    python -m core.sync --db db/anime_player.db --jobs ongoing --ongoing-older-than-hours 6
+
+Задачи:
+  schedule — расписание недели; полные бандлы только изменившихся тайтлов, выпавшие снимаются с расписания;
+  ongoing  — онгоинги, не обновлявшиеся дольше N часов, пачками через list-эндпоинт (core.bulk_refresh);
+  posters  — отсутствующие и устаревшие постеры (правила как в приложении: 7 дней — обновить, 90 — финальный).
+
+Все задачи идут одновременно через общий пул из --workers потоков: в пуле только сеть,
+колбэки с записью в БД выполняются в главном потоке (Session менеджеров не потокобезопасна).
+"""
+import argparse
+import logging
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from core.bulk_refresh import PROVIDER_ANILIBERTY, BulkTitleRefresher, build_aniliberty_adapter, release_changed
+from core.types import POSTER_SIZES, PosterSize
+
+
+SYNC_SCHEDULE = "schedule"
+SYNC_ONGOING = "ongoing"
+SYNC_POSTERS = "posters"
+ALL_JOBS = (SYNC_SCHEDULE, SYNC_ONGOING, SYNC_POSTERS)
+
+STATUS_ONGOING = 1  # status.code: 1 = В работе
+POSTER_REFRESH_AGE = timedelta(days=7)  # как DOWNLOAD_AFTER_AGE в app/qt/app.py
+POSTER_FINAL_AGE = timedelta(days=90)   # как FINAL_AGE
+
+
+@dataclass
+class HeadlessServices:
+    """То же, что собирает AnimePlayerAppVer3, но без Qt."""
+    db_manager: Any
+    api_client: Any
+    api_adapter: Any
+    animedia_adapter: Any
+    poster_manager: Any
+    base_al_url: str
+
+    def close(self) -> None:
+        self.api_client.close()
+
+
+def build_services(db_path: str, config_path: str = "config/config.ini", temp_dir: str = "temp") -> HeadlessServices:
+    from core.database_manager import DatabaseManager
+    from providers.animedia.v0 import create_adapter
+    from utils.config.config_manager import ConfigManager
+    from utils.downloads.poster_manager import PosterManager
+    from utils.net.net_client import NetClient
+
+    logger = logging.getLogger(__name__)
+    db_manager = DatabaseManager(db_path)
+    db_manager.initialize_tables()
+
+    config_manager = ConfigManager(config_path)
+    net_client = NetClient(config_manager.network)
+    api_client, api_adapter = build_aniliberty_adapter(config_path, logger, net_client=net_client)
+    animedia_adapter = create_adapter(
+        base_url=config_manager.get_setting('Settings', 'base_am_url'),
+        net_client=net_client,
+        cache_dir=Path(temp_dir),
+        logger=logger,
+    )
+    # save_callback не нужен: постеры сохраняет LibrarySync в главном потоке
+    poster_manager = PosterManager(net_client=net_client)
+    return HeadlessServices(
+        db_manager=db_manager,
+        api_client=api_client,
+        api_adapter=api_adapter,
+        animedia_adapter=animedia_adapter,
+        poster_manager=poster_manager,
+        base_al_url=config_manager.get_setting('Settings', 'base_al_url'),
+    )
+
+
+@dataclass
+class SyncReport:
+    schedule_days: int = 0
+    schedule_titles: int = 0
+    schedule_removed: int = 0
+    titles_saved: int = 0
+    titles_checked: int = 0
+    posters_saved: int = 0
+    posters_not_modified: int = 0
+    posters_failed: int = 0
+    poster_bytes_saved: int = 0
+    errors: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        return (f"schedule_days={self.schedule_days} schedule_titles={self.schedule_titles} "
+                f"schedule_removed={self.schedule_removed} titles_saved={self.titles_saved} "
+                f"titles_checked={self.titles_checked} posters_saved={self.posters_saved} "
+                f"posters_not_modified={self.posters_not_modified} "
+                f"poster_kb_saved={self.poster_bytes_saved / 1024:.1f} "
+                f"posters_failed={self.posters_failed} errors={len(self.errors)} elapsed={self.elapsed:.1f}s")
+
+
+@dataclass
+class _ScheduleDay:
+    day: int
+    title_ids: set = field(default_factory=set)
+    pending: int = 0
+
+
+class LibrarySync:
+    """
+    Одновременный прогон задач синхронизации с ограниченным параллелизмом.
+    Сетевые функции уходят в ThreadPoolExecutor(workers); колбэк каждой (запись в БД и постановка
+    следующих запросов) выполняется в потоке, вызвавшем run().
+    """
+
+    def __init__(self, services: HeadlessServices, *, workers: int = 4,
+                 ongoing_older_than: timedelta = timedelta(hours=12),
+                 poster_sizes: tuple[PosterSize, ...] = ("original",), limit: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.services = services
+        self.db_manager = services.db_manager
+        self.api_adapter = services.api_adapter
+        self.workers = max(1, int(workers))
+        self.ongoing_older_than = ongoing_older_than
+        self.poster_sizes = poster_sizes
+        self.limit = limit
+        # Бандлы качаются по одному внутри воркера пула — общий параллелизм ограничен workers
+        self.bulk_refresher = BulkTitleRefresher(self.db_manager, self.api_adapter, max_workers=1)
+
+        self.report = SyncReport()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: dict = {}
+        self._schedule_external_ids: set[str] = set()
+
+    def run(self, jobs=ALL_JOBS) -> SyncReport:
+        started = time.monotonic()
+        self.report = SyncReport()
+        starters = {SYNC_SCHEDULE: self._start_schedule, SYNC_ONGOING: self._start_ongoing,
+                    SYNC_POSTERS: self._start_posters}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sync") as pool:
+            self._pool = pool
+            try:
+                for job in jobs:
+                    self._guard(job, starters[job])
+                self._drain()
+            except KeyboardInterrupt:
+                self.logger.warning("Sync interrupted, cancelling queued requests")
+                for future in self._pending:
+                    future.cancel()
+                raise
+            finally:
+                self._pending.clear()
+                self._pool = None
+
+        self.report.elapsed = time.monotonic() - started
+        return self.report
+
+    # =========================
+    # Pool plumbing
+    # =========================
+    def _submit(self, label: str, fn: Callable, *args, on_result: Callable[[Any], None],
+                on_error: Optional[Callable[[Exception], None]] = None, **kwargs) -> None:
+        future = self._pool.submit(fn, *args, **kwargs)
+        self._pending[future] = (label, on_result, on_error)
+
+    def _drain(self) -> None:
+        while self._pending:
+            done, _ = wait(list(self._pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                label, on_result, on_error = self._pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self._error(label, e)
+                    if on_error is not None:
+                        self._guard(label, on_error, e)
+                    continue
+                self._guard(label, on_result, result)
+
+    def _guard(self, label: str, fn: Callable, *args) -> None:
+        try:
+            fn(*args)
+        except Exception as e:
+            self._error(label, e)
+
+    def _error(self, label: str, error) -> None:
+        message = f"{label}: {error}"
+        self.logger.error(f"Sync error in {message}")
+        self.report.errors.append(message)
+
+    # =========================
+    # schedule
+    # =========================
+    def _start_schedule(self) -> None:
+        for day in range(1, 8):
+            self._submit(f"schedule:{day}", self.api_adapter.get_schedule, day, enrich=False,
+                         on_result=lambda data, day=day: self._on_schedule_day(day, data))
+
+    def _on_schedule_day(self, day: int, data) -> None:
+        if not isinstance(data, list):
+            error = data.get('error') if isinstance(data, dict) else f"unexpected {type(data).__name__}"
+            raise RuntimeError(error)
+
+        titles = [t for item in data for t in item.get("list", []) if t.get('external_id') is not None]
+        markers = self.db_manager.get_title_change_markers(PROVIDER_ANILIBERTY, [t['external_id'] for t in titles])
+        state = _ScheduleDay(day)
+        for light in titles:
+            ext = str(light['external_id'])
+            self._schedule_external_ids.add(ext)
+            marker = markers.get(ext)
+            if release_changed(light, marker):
+                state.pending += 1
+                self._submit(f"schedule:{day}:{ext}", self.api_adapter.get_release_full, light['external_id'],
+                             max_workers=1,
+                             on_result=lambda full, light=light: self._on_schedule_release(state, light, full),
+                             on_error=lambda e, light=light: self._on_schedule_release(state, light, None))
+            else:
+                self._add_to_schedule(state, [marker[0]])
+
+        self.report.schedule_days += 1
+        if not state.pending:
+            self._finish_schedule_day(state)
+
+    def _on_schedule_release(self, state: _ScheduleDay, light: dict, full) -> None:
+        try:
+            if not isinstance(full, dict) or 'error' in full:
+                self.logger.warning(f"Full bundle failed for {light.get('external_id')}, saving schedule entry")
+                full = None
+            saved = self.db_manager.ingest_titles([full or light])
+            self.report.titles_saved += len(saved)
+            self._add_to_schedule(state, saved)
+        finally:
+            state.pending -= 1
+            if not state.pending:
+                self._finish_schedule_day(state)
+
+    def _add_to_schedule(self, state: _ScheduleDay, title_ids) -> None:
+        now = datetime.now(timezone.utc)
+        for title_id in title_ids:
+            self.db_manager.save_schedule(state.day, title_id, last_updated=now)
+            state.title_ids.add(title_id)
+        self.report.schedule_titles += len(title_ids)
+
+    def _finish_schedule_day(self, state: _ScheduleDay) -> None:
+        """Снимает с расписания дня тайтлы, которых больше нет в ответе API."""
+        if not state.title_ids:
+            return  # пустой ответ — скорее сбой API, чем пустой день
+        current = {t.title_id for t in self.db_manager.get_titles_for_day(state.day) or []}
+        stale = current - state.title_ids
+        if stale:
+            self.db_manager.remove_schedule_day(stale, state.day)
+            self.report.schedule_removed += len(stale)
+        self.logger.info(f"Schedule day {state.day}: {len(state.title_ids)} titles, {len(stale)} removed")
+
+    # =========================
+    # ongoing
+    # =========================
+    def _start_ongoing(self) -> None:
+        markers = self.bulk_refresher.stale_markers(self.ongoing_older_than, self.limit, status_code=STATUS_ONGOING)
+        batches = self.bulk_refresher.batches(markers)
+        self.logger.info(f"Ongoing refresh: {len(markers)} titles in {len(batches)} batches")
+        for i, chunk in enumerate(batches, 1):
+            self._submit(f"ongoing:{i}", self.bulk_refresher.fetch_batch, chunk, on_result=self._on_ongoing_batch)
+
+    def _on_ongoing_batch(self, batch) -> None:
+        if batch.error:
+            raise RuntimeError(batch.error)
+        # тайтлы из расписания уже сохранены задачей schedule
+        batch.releases = [r for r in batch.releases if str(r.get('external_id')) not in self._schedule_external_ids]
+        saved = self.bulk_refresher.apply_batch(batch)
+        self.report.titles_saved += len(saved)
+        self.report.titles_checked += len(batch.unchanged_ids)
+
+    # =========================
+    # posters
+    # =========================
+    def _start_posters(self) -> None:
+        now = datetime.now(timezone.utc)
+        poster_manager = self.services.poster_manager
+        for size_key in self.poster_sizes:
+            links = self.db_manager.get_stale_poster_links(size_key, now - POSTER_REFRESH_AGE,
+                                                           now - POSTER_FINAL_AGE, self.limit)
+            self.logger.info(f"Posters ({size_key}): {len(links)} to download")
+            for title_id, link in links:
+                url = self.poster_url(link)
+                if not url:
+                    continue
+                # условный GET: на 304 постер не качается, только сдвигается дата
+                validators = self.db_manager.get_poster_validators(title_id, size_key)
+                self._submit(f"poster:{title_id}:{size_key}", poster_manager.download_poster, title_id, url,
+                             validators=validators,
+                             on_result=lambda res, tid=title_id, sk=size_key: self._on_poster(tid, sk, res))
+
+    def _on_poster(self, title_id: int, size_key: PosterSize, result) -> None:
+        if result is None:
+            self.report.posters_failed += 1
+            return
+        if result.not_modified:
+            self.db_manager.touch_poster(title_id, size_key, result.validators)
+            self.report.posters_not_modified += 1
+            self.report.poster_bytes_saved += result.validators.content_length or 0
+            return
+        self.db_manager.save_poster(title_id, result.content, result.hash_value, size_key, result.validators)
+        self.report.posters_saved += 1
+
+    def poster_url(self, poster_link: str) -> Optional[str]:
+        """Полный URL постера без query (как perform_poster_link приложения)."""
+        link = (poster_link or "").strip()
+        if link.startswith(("http://", "https://")):
+            return link.split('?')[0]
+        if link.startswith("/"):
+            return f"https://{self.services.base_al_url}{link}".split('?')[0]
+        return None
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Headless library sync: schedule, ongoing titles and posters.")
+    ap.add_argument("--db", default="db/anime_player.db", help="Путь к SQLite базе приложения.")
+    ap.add_argument("--config", default="config/config.ini")
+    ap.add_argument("--jobs", default=",".join(ALL_JOBS),
+                    help=f"Задачи через запятую: {', '.join(ALL_JOBS)}.")
+    ap.add_argument("--workers", type=int, default=4, help="Одновременных сетевых запросов.")
+    ap.add_argument("--ongoing-older-than-hours", type=float, default=12.0)
+    ap.add_argument("--poster-sizes", default="original", help=f"Через запятую: {', '.join(POSTER_SIZES)}.")
+    ap.add_argument("--limit", type=int, default=None, help="Не больше N тайтлов/постеров на задачу.")
+    args = ap.parse_args(argv)
+
+    jobs = [j.strip() for j in args.jobs.split(",") if j.strip()]
+    sizes = tuple(s.strip() for s in args.poster_sizes.split(",") if s.strip())
+    unknown = [j for j in jobs if j not in ALL_JOBS] + [s for s in sizes if s not in POSTER_SIZES]
+    if unknown:
+        ap.error(f"unknown jobs/poster sizes: {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    services = build_services(args.db, args.config)
+    try:
+        sync = LibrarySync(services, workers=args.workers,
+                           ongoing_older_than=timedelta(hours=args.ongoing_older_than_hours),
+                           poster_sizes=sizes, limit=args.limit)
+        report = sync.run(jobs)
+    finally:
+        services.close()
+
+    print(report.summary())
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,7 @@
 # tables.py
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, LargeBinary, ForeignKey, Text, \
-    SmallInteger, PrimaryKeyConstraint, Float, UniqueConstraint
-from sqlalchemy.orm import relationship, validates
+    SmallInteger, PrimaryKeyConstraint, Float, UniqueConstraint, Index
+from sqlalchemy.orm import relationship, validates, deferred
 from datetime import datetime, timezone
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -58,6 +58,7 @@ class Title(Base):
     history = relationship("History",back_populates="title",cascade="all, delete-orphan",)
     production_studio = relationship("ProductionStudio",uselist=False,back_populates="title",cascade="all, delete-orphan",)
     provider_links = relationship("TitleProviderMap",back_populates="title",cascade="all, delete-orphan",)
+    summary = relationship("TitleSummary",uselist=False,cascade="all, delete-orphan",)
 
 class Provider(Base):
     __tablename__ = "providers"
@@ -120,6 +121,8 @@ class History(Base):
     download_change_count = Column(Integer, default=0)
     need_to_see = Column(Boolean, default=False)
 
+    __table_args__ = (Index('ix_history_user_title', 'user_id', 'title_id'),)
+
     title = relationship("Title", back_populates="history")
     episode = relationship("Episode", back_populates="history")
     torrent = relationship("Torrent", back_populates="history")
@@ -181,6 +184,8 @@ class TitleGenreRelation(Base):
     genre_id = Column(Integer, ForeignKey('genres.genre_id'), nullable=False)
     last_updated = Column(DateTime, default=datetime.now(timezone.utc))
 
+    __table_args__ = (Index('ix_title_genre_genre_title', 'genre_id', 'title_id'),)
+
     title = relationship("Title", back_populates="genres")
     genre = relationship("Genre", back_populates="titles")
 
@@ -201,6 +206,8 @@ class TitleTeamRelation(Base):
     team_member_id = Column(Integer, ForeignKey('team_members.id'), nullable=False)
     last_updated = Column(DateTime, default=datetime.now(timezone.utc))
 
+    __table_args__ = (Index('ix_title_team_member_title', 'team_member_id', 'title_id'),)
+
     title = relationship("Title", back_populates="team_members")
     team_member = relationship("TeamMember", back_populates="titles")
 
@@ -247,11 +254,24 @@ class Torrent(Base):
     label = Column(String)
     filename = Column(String)
     hash = Column(String)
-    torrent_metadata = Column(Text, nullable=True)
-    raw_base64_file = Column(Text, nullable=True)
+    # Legacy inline payload: новые записи хранятся в torrent_files, колонки не грузятся без явного запроса
+    torrent_metadata = deferred(Column(Text, nullable=True), group="payload")
+    raw_base64_file = deferred(Column(Text, nullable=True), group="payload")
 
     title = relationship("Title", back_populates="torrents")
     history = relationship("History", back_populates="torrent")
+    file = relationship("TorrentFile", uselist=False, back_populates="torrent", cascade="all, delete-orphan")
+
+class TorrentFile(Base):
+    __tablename__ = 'torrent_files'
+    torrent_id = Column(Integer, ForeignKey('torrents.torrent_id'), primary_key=True)
+    title_id = Column(Integer, index=True, nullable=False)
+    file_blob = Column(LargeBinary, nullable=True)  # сырые байты .torrent (без base64)
+    file_size = Column(Integer, nullable=True)
+    torrent_metadata = Column(Text, nullable=True)
+    last_updated = Column(DateTime, default=datetime.now(timezone.utc))
+
+    torrent = relationship("Torrent", back_populates="file")
 
 class Poster(Base):
     __tablename__ = 'posters'
@@ -272,6 +292,60 @@ class Poster(Base):
 
     title = relationship("Title", back_populates="posters")
 
+class PosterValidator(Base):
+    """HTTP-валидаторы скачанного постера для условного обновления (If-None-Match / If-Modified-Since)."""
+    __tablename__ = 'poster_validators'
+    title_id = Column(Integer, ForeignKey('titles.title_id'), primary_key=True)
+    size_key = Column(String(16), primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_length = Column(Integer, nullable=True)  # байты последнего 200 — для статистики сэкономленного
+    checked_at = Column(DateTime, nullable=True)
+
+class TitleSummary(Base):
+    """
+    Денормализованная строка тайтла для списков и сетки постеров (core/title_summary.py).
+    Пересчитывается SaveManager'ом в той же транзакции, что и исходные таблицы.
+    """
+    __tablename__ = 'title_summary'
+    title_id = Column(Integer, ForeignKey('titles.title_id'), primary_key=True)
+    code = Column(String)
+    name_ru = Column(String)
+    name_en = Column(String)
+    status_code = Column(Integer)
+    status_string = Column(String)
+    season_year = Column(Integer)
+    season_string = Column(String)
+    type_string = Column(String)
+    poster_path = Column(String)
+    genres = Column(String)  # JSON-список названий, как titles.title_genres
+    day_of_week = Column(Integer)  # первый день из schedule
+    day_name = Column(String)
+    provider_code = Column(String)
+    provider_name = Column(String)
+    studio = Column(String)
+    rating_name = Column(String)
+    rating_value = Column(SmallInteger)
+    team_voice = Column(String)  # JSON-список имён из title_team_relation
+    team_translator = Column(String)
+    team_timing = Column(String)
+    last_updated = Column(DateTime)
+
+    __table_args__ = (
+        Index('ix_title_summary_status', 'status_code', 'title_id'),
+        Index('ix_title_summary_year', 'season_year', 'title_id'),
+        Index('ix_title_summary_day', 'day_of_week', 'title_id'),
+        Index('ix_title_summary_provider', 'provider_code', 'title_id'),
+    )
+
+class TitleFacetCount(Base):
+    """Число тайтлов на значение фасета (genre/year/status) для боковой панели фильтров; ведётся вместе с title_summary."""
+    __tablename__ = 'title_facet_counts'
+    facet = Column(String(16), primary_key=True)
+    value = Column(Integer, primary_key=True)  # genre_id / season_year / status_code
+    label = Column(String)
+    count = Column(Integer, nullable=False, default=0)
+
 class Template(Base):
     __tablename__ = 'templates'
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -0,0 +1,93 @@
+# title_filter.py
+"""
+Комбинированный фильтр списка тайтлов (core.types.TitleFilter) одним SQL-запросом.
+
+Раньше каждый фильтр (get_titles_by_genre/year/status/team_member) отдавал полный список title_id,
+который потом уходил в IN (...) и не комбинировался с другими. Здесь всё строится на title_summary:
+годы/статусы — колонки проекции с индексами (col, title_id), жанры/провайдер/команда — IN-подзапросы
+по индексам (genre_id, title_id) / (team_member_id, title_id), «не просмотрено» — NOT EXISTS по history.
+Порядок — title_id, поэтому страницы читаются keyset'ом (GetManager._seek_page).
+
+facet_counts — числа для панели фильтров: без фильтра берутся из title_facet_counts (ведёт
+core/title_summary.py), с фильтром — GROUP BY по отфильтрованному множеству.
+"""
+from sqlalchemy import and_, exists, func, select
+
+from core.tables import TitleSummary, TitleGenreRelation, Genre, TitleProviderMap, Provider, TitleTeamRelation, \
+    TeamMember, History, TitleFacetCount
+from core.types import TitleFilter, COUNTED_FACETS
+
+
+def _filter_conditions(flt: TitleFilter, user_id=None) -> list:
+    conditions = []
+    if flt.years:
+        conditions.append(TitleSummary.season_year.in_(flt.years))
+    if flt.status_codes:
+        conditions.append(TitleSummary.status_code.in_(flt.status_codes))
+    for genre_id in flt.genre_ids:
+        conditions.append(TitleSummary.title_id.in_(
+            select(TitleGenreRelation.title_id).where(TitleGenreRelation.genre_id == genre_id)))
+    if flt.provider_code:
+        conditions.append(TitleSummary.title_id.in_(
+            select(TitleProviderMap.title_id)
+            .join(Provider, Provider.provider_id == TitleProviderMap.provider_id)
+            .where(Provider.code == flt.provider_code)))
+    if flt.team_member:
+        conditions.append(TitleSummary.title_id.in_(
+            select(TitleTeamRelation.title_id)
+            .join(TeamMember, TeamMember.id == TitleTeamRelation.team_member_id)
+            .where(TeamMember.name == flt.team_member)))
+    if flt.not_watched and user_id is not None:
+        conditions.append(~exists().where(and_(
+            History.user_id == user_id,
+            History.title_id == TitleSummary.title_id,
+            History.episode_id.is_(None),
+            History.torrent_id.is_(None),
+            History.is_watched == True,
+        )))
+    return conditions
+
+
+def filtered_query(session, flt: TitleFilter, user_id=None):
+    """Query строк title_summary, подходящих под все фасеты фильтра (без порядка и LIMIT)."""
+    query = session.query(TitleSummary)
+    conditions = _filter_conditions(flt or TitleFilter(), user_id)
+    return query.filter(*conditions) if conditions else query
+
+
+def facet_counts(session, flt: TitleFilter | None = None, user_id=None) -> dict[str, list[tuple]]:
+    """
+    {facet: [(value, label, count), ...]} для жанров, годов и статусов.
+    Год и статус считаются по фильтру без своего фасета (их значения — «или», видно, сколько даст
+    ещё одно), жанр — по полному фильтру (жанры — «и», число — сколько останется при добавлении).
+    """
+    flt = flt or TitleFilter()
+    if not flt:
+        counts = {facet: [] for facet in COUNTED_FACETS}
+        for row in session.query(TitleFacetCount).order_by(TitleFacetCount.facet, TitleFacetCount.value):
+            counts.setdefault(row.facet, []).append((row.value, row.label, row.count))
+        return counts
+
+    def subset(facet):
+        return filtered_query(session, flt.without(facet) if facet != 'genre' else flt, user_id) \
+            .with_entities(TitleSummary.title_id)
+
+    counts = {'year': [], 'status': [], 'genre': []}
+    for year, count in (session.query(TitleSummary.season_year, func.count(TitleSummary.title_id))
+                        .filter(TitleSummary.title_id.in_(subset('year').scalar_subquery()),
+                                TitleSummary.season_year.isnot(None))
+                        .group_by(TitleSummary.season_year).order_by(TitleSummary.season_year)):
+        counts['year'].append((year, str(year), count))
+    for status, label, count in (session.query(TitleSummary.status_code, func.max(TitleSummary.status_string),
+                                               func.count(TitleSummary.title_id))
+                                 .filter(TitleSummary.title_id.in_(subset('status').scalar_subquery()),
+                                         TitleSummary.status_code.isnot(None))
+                                 .group_by(TitleSummary.status_code).order_by(TitleSummary.status_code)):
+        counts['status'].append((status, label, count))
+    for genre_id, name, count in (session.query(Genre.genre_id, Genre.name,
+                                                func.count(func.distinct(TitleGenreRelation.title_id)))
+                                  .join(TitleGenreRelation, TitleGenreRelation.genre_id == Genre.genre_id)
+                                  .filter(TitleGenreRelation.title_id.in_(subset('genre').scalar_subquery()))
+                                  .group_by(Genre.genre_id, Genre.name).order_by(Genre.genre_id)):
+        counts['genre'].append((genre_id, name, count))
+    return counts
@@ -0,0 +1,372 @@
+# title_summary.py
+"""
+Проекция title_summary: всё, что нужно спискам и сетке постеров, одной строкой на тайтл.
+
+    python -m core.title_summary --db db/anime_player.db check
+    python -m core.title_summary --db db/anime_player.db check --fix
+    python -m core.title_summary --db db/anime_player.db rebuild
+
+Строка собирается из titles + title_genre_relation/genres, schedule/days_of_week,
+title_provider_map/providers, production_studios, ratings и title_team_relation/team_members.
+SaveManager вызывает refresh_title_summary в той же сессии перед commit (save_title, save_genre,
+save_schedule, save_ratings, команда, студия, снятие с расписания) — проекция меняется атомарно
+вместе с исходными таблицами. app/sync/db_merge удаляет строки слитых тайтлов — их пересоберёт ensure
+на старте; прочие записи в обход SaveManager (ручной SQL) ловит check.
+
+title_facet_counts (число тайтлов на жанр/год/статус для панели фильтров, core/title_filter.py)
+ведётся тут же: refresh сравнивает фасеты старой и новой строки и сдвигает счётчики на разницу.
+"""
+import argparse
+import json
+import logging
+import time
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from core.tables import Title, TitleSummary, TitleGenreRelation, Genre, Schedule, DaysOfWeek, TitleProviderMap, \
+    Provider, ProductionStudio, Rating, TitleTeamRelation, TeamMember, TitleFacetCount
+
+
+CHUNK_SIZE = 500  # id в одном IN: ниже лимита переменных SQLite
+TEAM_ROLES = ('voice', 'translator', 'timing')
+# Колонки, которые сравнивает check (last_updated — служебная)
+SUMMARY_COLUMNS = tuple(c.name for c in TitleSummary.__table__.columns if c.name != 'last_updated')
+
+
+def _chunks(ids, size=CHUNK_SIZE):
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def compute_summaries(session, title_ids) -> dict[int, dict]:
+    """Строки title_summary для title_ids из исходных таблиц; несуществующие тайтлы в ответ не попадают."""
+    ids = sorted({int(tid) for tid in title_ids or [] if tid is not None})
+    rows: dict[int, dict] = {}
+    for chunk in _chunks(ids):
+        for t in session.query(Title.title_id, Title.code, Title.name_ru, Title.name_en, Title.status_code,
+                               Title.status_string, Title.season_year, Title.season_string, Title.type_string,
+                               Title.poster_path_original).filter(Title.title_id.in_(chunk)):
+            rows[t.title_id] = {
+                'title_id': t.title_id, 'code': t.code, 'name_ru': t.name_ru, 'name_en': t.name_en,
+                'status_code': t.status_code, 'status_string': t.status_string, 'season_year': t.season_year,
+                'season_string': t.season_string, 'type_string': t.type_string,
+                'poster_path': t.poster_path_original,
+                'genres': [], 'day_of_week': None, 'day_name': None,
+                'provider_code': None, 'provider_name': None, 'studio': None,
+                'rating_name': None, 'rating_value': None,
+                'team': {role: [] for role in TEAM_ROLES},
+            }
+        chunk = [tid for tid in chunk if tid in rows]
+        if not chunk:
+            continue
+
+        for title_id, name in (session.query(TitleGenreRelation.title_id, Genre.name)
+                               .join(Genre, Genre.genre_id == TitleGenreRelation.genre_id)
+                               .filter(TitleGenreRelation.title_id.in_(chunk))
+                               .order_by(TitleGenreRelation.id)):
+            if name not in rows[title_id]['genres']:
+                rows[title_id]['genres'].append(name)
+
+        for title_id, day, day_name in (session.query(Schedule.title_id, Schedule.day_of_week, DaysOfWeek.day_name)
+                                        .outerjoin(DaysOfWeek, DaysOfWeek.day_of_week == Schedule.day_of_week)
+                                        .filter(Schedule.title_id.in_(chunk))
+                                        .order_by(Schedule.title_id, Schedule.day_of_week)):
+            if rows[title_id]['day_of_week'] is None:
+                rows[title_id].update(day_of_week=day, day_name=day_name)
+
+        # Первые по id провайдер и рейтинг — как в get_title_cards_context
+        for title_id, code, name in (session.query(TitleProviderMap.title_id, Provider.code, Provider.name)
+                                     .join(Provider, Provider.provider_id == TitleProviderMap.provider_id)
+                                     .filter(TitleProviderMap.title_id.in_(chunk))
+                                     .order_by(TitleProviderMap.id)):
+            if rows[title_id]['provider_code'] is None:
+                rows[title_id].update(provider_code=code, provider_name=name)
+
+        for title_id, name in (session.query(ProductionStudio.title_id, ProductionStudio.name)
+                               .filter(ProductionStudio.title_id.in_(chunk))):
+            rows[title_id]['studio'] = name
+
+        for title_id, name, value in (session.query(Rating.title_id, Rating.rating_name, Rating.rating_value)
+                                      .filter(Rating.title_id.in_(chunk))
+                                      .order_by(Rating.rating_id)):
+            if rows[title_id]['rating_name'] is None:
+                rows[title_id].update(rating_name=name, rating_value=value)
+
+        for title_id, role, name in (session.query(TitleTeamRelation.title_id, TeamMember.role, TeamMember.name)
+                                     .join(TeamMember, TeamMember.id == TitleTeamRelation.team_member_id)
+                                     .filter(TitleTeamRelation.title_id.in_(chunk))
+                                     .order_by(TitleTeamRelation.id)):
+            role = (role or "").lower()
+            for key in TEAM_ROLES:
+                if key in role:
+                    rows[title_id]['team'][key].append(name)
+                    break
+
+    for row in rows.values():
+        row['genres'] = json.dumps(row['genres'], ensure_ascii=False)
+        team = row.pop('team')
+        for key in TEAM_ROLES:
+            # Тот же формат, что отдаёт get_team_from_db / get_title_cards_context
+            row[f'team_{key}'] = json.dumps(team[key])
+    return rows
+
+
+def _facet_counter(session, rows) -> tuple[Counter, dict]:
+    """(facet, value) -> число тайтлов среди rows и подписи значений; жанры — по genre_id."""
+    counter, labels, genre_names = Counter(), {}, []
+    rows = list(rows)
+    for row in rows:
+        if row['season_year'] is not None:
+            counter['year', row['season_year']] += 1
+            labels['year', row['season_year']] = str(row['season_year'])
+        if row['status_code'] is not None:
+            counter['status', row['status_code']] += 1
+            labels['status', row['status_code']] = row['status_string']
+        genre_names.append(json.loads(row['genres'] or "[]"))
+    names = {name for names in genre_names for name in names}
+    genre_ids = dict(session.query(Genre.name, Genre.genre_id).filter(Genre.name.in_(names))) if names else {}
+    for names in genre_names:
+        for name in names:
+            if name in genre_ids:
+                counter['genre', genre_ids[name]] += 1
+                labels['genre', genre_ids[name]] = name
+    return counter, labels
+
+
+def _apply_facet_delta(session, old_rows, new_rows) -> None:
+    before, _ = _facet_counter(session, old_rows)
+    after, labels = _facet_counter(session, new_rows)
+    delta = Counter(after)
+    delta.subtract(before)
+    changed = False
+    for (facet, value), diff in delta.items():
+        if not diff:
+            continue
+        changed = True
+        values = {'count': TitleFacetCount.count + diff}
+        if (facet, value) in labels:
+            values['label'] = labels[facet, value]
+        result = session.execute(update(TitleFacetCount)
+                                 .where(TitleFacetCount.facet == facet, TitleFacetCount.value == value)
+                                 .values(**values))
+        if not result.rowcount and diff > 0:
+            session.execute(insert(TitleFacetCount).values(facet=facet, value=value,
+                                                           label=labels.get((facet, value)), count=diff))
+    if changed:
+        session.execute(delete(TitleFacetCount).where(TitleFacetCount.count <= 0))
+
+
+def compute_facet_counts(session) -> dict[tuple, tuple]:
+    """Счётчики фасетов заново по title_summary: {(facet, value): (label, count)}."""
+    counts = {}
+    for year, count in (session.query(TitleSummary.season_year, func.count(TitleSummary.title_id))
+                        .filter(TitleSummary.season_year.isnot(None))
+                        .group_by(TitleSummary.season_year)):
+        counts['year', year] = (str(year), count)
+    for status, label, count in (session.query(TitleSummary.status_code, func.max(TitleSummary.status_string),
+                                               func.count(TitleSummary.title_id))
+                                 .filter(TitleSummary.status_code.isnot(None))
+                                 .group_by(TitleSummary.status_code)):
+        counts['status', status] = (label, count)
+    for genre_id, name, count in (session.query(Genre.genre_id, Genre.name,
+                                                func.count(func.distinct(TitleGenreRelation.title_id)))
+                                  .join(TitleGenreRelation, TitleGenreRelation.genre_id == Genre.genre_id)
+                                  .join(TitleSummary, TitleSummary.title_id == TitleGenreRelation.title_id)
+                                  .group_by(Genre.genre_id, Genre.name)):
+        counts['genre', genre_id] = (name, count)
+    return counts
+
+
+def rebuild_facet_counts(session) -> int:
+    counts = compute_facet_counts(session)
+    session.execute(delete(TitleFacetCount))
+    if counts:
+        session.execute(insert(TitleFacetCount), [
+            {'facet': facet, 'value': value, 'label': label, 'count': count}
+            for (facet, value), (label, count) in counts.items()
+        ])
+    return len(counts)
+
+
+def refresh_title_summary(session, title_ids, facets: bool = True) -> int:
+    """
+    Пересчитывает строки title_ids в текущей транзакции (commit — за вызывающим).
+    Тайтлов, которых больше нет, строки удаляются. facets — заодно сдвинуть title_facet_counts.
+    Возвращает число записанных строк.
+    """
+    ids = sorted({int(tid) for tid in title_ids or [] if tid is not None})
+    if not ids:
+        return 0
+    old_rows = []
+    if facets:
+        # до flush: удаление тайтла каскадом уносит и его строку, а счётчики надо уменьшить
+        with session.no_autoflush:
+            for chunk in _chunks(ids):
+                old_rows.extend(
+                    {'season_year': r.season_year, 'status_code': r.status_code, 'status_string': r.status_string,
+                     'genres': r.genres}
+                    for r in session.query(TitleSummary.season_year, TitleSummary.status_code,
+                                           TitleSummary.status_string, TitleSummary.genres)
+                    .filter(TitleSummary.title_id.in_(chunk))
+                )
+    session.flush()
+    rows = compute_summaries(session, ids)
+    now = datetime.now(timezone.utc)
+    for chunk in _chunks(ids):
+        session.execute(delete(TitleSummary).where(TitleSummary.title_id.in_(chunk)))
+    if rows:
+        session.execute(insert(TitleSummary), [{**row, 'last_updated': now} for row in rows.values()])
+    if facets:
+        _apply_facet_delta(session, old_rows, rows.values())
+    return len(rows)
+
+
+@dataclass
+class SummaryReport:
+    checked: int = 0
+    missing: list[int] = field(default_factory=list)   # тайтл есть, строки нет
+    stale: list[int] = field(default_factory=list)     # строка расходится с исходными таблицами
+    orphaned: list[int] = field(default_factory=list)  # строка без тайтла
+    facets_stale: list[tuple] = field(default_factory=list)  # (facet, value) с неверным счётчиком
+    fixed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.stale or self.orphaned or self.facets_stale)
+
+    def line(self) -> str:
+        return (f"checked={self.checked} missing={len(self.missing)} stale={len(self.stale)} "
+                f"orphaned={len(self.orphaned)} facets_stale={len(self.facets_stale)} fixed={self.fixed} "
+                f"elapsed={self.elapsed:.1f}s")
+
+
+class TitleSummaryManager:
+    def __init__(self, engine, batch_size: int = CHUNK_SIZE):
+        self.logger = logging.getLogger(__name__)
+        self.Session = sessionmaker(bind=engine)()
+        self.batch_size = batch_size
+
+    def refresh(self, title_ids) -> int:
+        with self.Session as session:
+            try:
+                count = refresh_title_summary(session, title_ids)
+                session.commit()
+                return count
+            except Exception as e:
+                session.rollback()
+                self.logger.error(f"Error refreshing title summary: {e}")
+                raise
+
+    def rebuild(self) -> int:
+        """Проекция заново для всей библиотеки пачками по batch_size; лишние строки удаляются."""
+        start = time.time()
+        with self.Session as session:
+            try:
+                ids = [tid for (tid,) in session.query(Title.title_id).order_by(Title.title_id)]
+                session.execute(delete(TitleSummary).where(~TitleSummary.title_id.in_(
+                    session.query(Title.title_id).scalar_subquery())))
+                count = 0
+                for chunk in _chunks(ids, self.batch_size):
+                    count += refresh_title_summary(session, chunk, facets=False)
+                rebuild_facet_counts(session)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                self.logger.error(f"Error rebuilding title summary: {e}")
+                raise
+        self.logger.info(f"Title summary rebuilt: {count} rows, {time.time() - start:.2f}s")
+        return count
+
+    def ensure(self) -> bool:
+        """Старт приложения: если число строк не сходится с titles (новая таблица, запись в обход), rebuild."""
+        with self.Session as session:
+            titles = session.query(func.count(Title.title_id)).scalar() or 0
+            summaries = session.query(func.count(TitleSummary.title_id)).scalar() or 0
+        if titles == summaries:
+            if summaries:
+                with self.Session as session:
+                    if not session.query(TitleFacetCount.facet).limit(1).first():
+                        # проекция есть, а счётчиков ещё нет (база до title_facet_counts)
+                        self.logger.info("Title facet counts are empty, rebuilding")
+                        rebuild_facet_counts(session)
+                        session.commit()
+            return False
+        self.logger.info(f"Title summary out of sync ({summaries}/{titles} rows), rebuilding")
+        self.rebuild()
+        return True
+
+    def check(self, fix: bool = False) -> SummaryReport:
+        """Сверяет каждую строку с исходными таблицами; fix=True пересчитывает расхождения."""
+        start = time.time()
+        report = SummaryReport()
+        with self.Session as session:
+            ids = [tid for (tid,) in session.query(Title.title_id).order_by(Title.title_id)]
+            report.orphaned = [tid for (tid,) in session.query(TitleSummary.title_id).filter(
+                ~TitleSummary.title_id.in_(session.query(Title.title_id).scalar_subquery()))]
+            for chunk in _chunks(ids, self.batch_size):
+                expected = compute_summaries(session, chunk)
+                stored = {
+                    row.title_id: row for row in
+                    session.query(TitleSummary).filter(TitleSummary.title_id.in_(chunk))
+                }
+                for title_id, row in expected.items():
+                    actual = stored.get(title_id)
+                    if actual is None:
+                        report.missing.append(title_id)
+                    elif any(getattr(actual, name) != row[name] for name in SUMMARY_COLUMNS):
+                        report.stale.append(title_id)
+                report.checked += len(expected)
+            expected_facets = compute_facet_counts(session)
+            stored_facets = {(r.facet, r.value): r.count for r in session.query(TitleFacetCount)}
+            report.facets_stale = sorted(
+                key for key in set(expected_facets) | set(stored_facets)
+                if stored_facets.get(key) != (expected_facets[key][1] if key in expected_facets else None)
+            )
+            session.rollback()
+
+        if fix and not report.ok:
+            report.fixed = self.refresh(report.missing + report.stale + report.orphaned)
+            # refresh удаляет строки orphaned, но в число записанных они не входят
+            report.fixed += len(report.orphaned)
+            # счётчики считаем заново целиком: дельты от разъехавшихся строк их не исправят
+            with self.Session as session:
+                rebuild_facet_counts(session)
+                session.commit()
+        report.elapsed = time.time() - start
+        level = logging.INFO if report.ok else logging.WARNING
+        self.logger.log(level, f"Title summary check: {report.line()}")
+        return report
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Rebuild or verify the title_summary projection.")
+    ap.add_argument("--db", default="db/anime_player.db", help="Путь к SQLite базе приложения.")
+    ap.add_argument("--batch-size", type=int, default=CHUNK_SIZE)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("rebuild", help="Пересобрать проекцию целиком.")
+    check = sub.add_parser("check", help="Найти отсутствующие, устаревшие и лишние строки.")
+    check.add_argument("--fix", action="store_true", help="Пересчитать найденные расхождения.")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    from core.database_manager import DatabaseManager
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.initialize_tables(ensure_summary=False)
+    manager = TitleSummaryManager(db_manager.engine, batch_size=args.batch_size)
+    if args.cmd == "rebuild":
+        print(f"rebuilt={manager.rebuild()}")
+        return 0
+    report = manager.check(fix=args.fix)
+    print(report.line())
+    return 0 if report.ok or args.fix else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+# torrent_prune.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def codec_family(encoder: Optional[str]) -> str:
+    """Python-аналог SaveManager._codec_family_sql: h264/h265/av1/vp9 либо сам encoder."""
+    enc = (encoder or "").strip().lower()
+    if "av1" in enc:
+        return "av1"
+    if "vp9" in enc:
+        return "vp9"
+    if "265" in enc or "hevc" in enc:
+        return "h265"
+    if "264" in enc or "avc" in enc:
+        return "h264"
+    return enc
+
+
+@dataclass(frozen=True)
+class TorrentPruneRow:
+    torrent_id: int
+    quality: str = ""
+    encoder: str = ""
+    resolution: str = ""
+    episodes_range: str = ""
+    range_first: Optional[int] = None
+    range_last: Optional[int] = None
+    total_size: int = 0
+    uploaded_timestamp: Optional[datetime] = None
+
+    @property
+    def res_norm(self) -> str:
+        return (self.resolution or "").strip().lower()
+
+    @property
+    def codec(self) -> str:
+        return codec_family(self.encoder)
+
+    @property
+    def has_range(self) -> bool:
+        return self.range_first is not None and self.range_last is not None
+
+    def rank_key(self) -> tuple:
+        """Лучший торрент: больше размер, новее загрузка, больше torrent_id."""
+        ts = self.uploaded_timestamp or _EPOCH
+        if ts.tzinfo is None:  # SQLite отдаёт naive datetime в UTC
+            ts = ts.replace(tzinfo=timezone.utc)
+        return self.total_size or 0, ts, self.torrent_id
+
+
+def _covered_ids(rows: list[TorrentPruneRow]) -> set[int]:
+    """Записи, чей диапазон полностью покрыт более широким в той же (resolution, codec_family)."""
+    groups: dict[tuple[str, str], list[TorrentPruneRow]] = {}
+    for r in rows:
+        if r.has_range:
+            groups.setdefault((r.res_norm, r.codec), []).append(r)
+
+    covered: set[int] = set()
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        # Сортируем по началу диапазона (шире — раньше) и идём с максимумом правой границы
+        group.sort(key=lambda r: (r.range_first, -r.range_last))
+        best_last: Optional[int] = None
+        best_first: Optional[int] = None
+        for r in group:
+            if best_last is not None and r.range_last <= best_last and \
+                    (r.range_last, r.range_first) != (best_last, best_first):
+                covered.add(r.torrent_id)
+            elif best_last is None or r.range_last > best_last:
+                best_first, best_last = r.range_first, r.range_last
+    return covered
+
+
+def _dominated_ids(rows: list[TorrentPruneRow], key) -> set[int]:
+    """Внутри группы key(row) оставить только лучший по rank_key."""
+    best: dict[tuple, TorrentPruneRow] = {}
+    for r in rows:
+        k = key(r)
+        cur = best.get(k)
+        if cur is None or r.rank_key() > cur.rank_key():
+            best[k] = r
+    keep = {r.torrent_id for r in best.values()}
+    return {r.torrent_id for r in rows if r.torrent_id not in keep}
+
+
+def select_torrents_to_prune(rows: Iterable[TorrentPruneRow], *, dedupe: bool = True) -> set[int]:
+    """
+    Один проход отсечения для торрентов ОДНОГО тайтла.
+      1. покрытые диапазоны (1–4 вытесняет 1–3) в рамках (resolution, codec_family);
+      2. dedupe=True: в (quality, encoder, episodes_range) и (resolution, codec_family, episodes_range)
+         оставить лучший (size desc, uploaded desc, id desc).
+    Одинаковые диапазоны друг друга не покрывают — их разрешает шаг 2.
+    :return: множество torrent_id для удаления.
+    """
+    alive = list(rows)
+    pruned = _covered_ids(alive)
+    if dedupe:
+        alive = [r for r in alive if r.torrent_id not in pruned]
+        triplet = _dominated_ids(alive, lambda r: (r.quality or "", r.encoder or "", r.episodes_range or ""))
+        pruned |= triplet
+        alive = [r for r in alive if r.torrent_id not in triplet]
+        pruned |= _dominated_ids(alive, lambda r: (r.res_norm, r.codec, r.episodes_range or ""))
+    return pruned
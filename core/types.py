@@ -1,5 +1,5 @@
-from typing import Literal, Final
-from dataclasses import dataclass
+from typing import ClassVar, Literal, Final
+from dataclasses import dataclass, replace
 
 
 PosterSize = Literal["original", "medium", "small"]
@@ -28,4 +28,129 @@ POSTER_FIELDS: dict[PosterSize, PosterFieldMap] = {
         hash="thumb_hash",
         updated="thumb_updated_at",
     ),
-}
\ No newline at end of file
+}
+
+
+@dataclass(frozen=True)
+class PosterValidators:
+    """ETag/Last-Modified последнего скачанного постера (таблица poster_validators)."""
+    etag: str | None = None
+    last_modified: str | None = None
+    content_length: int | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+@dataclass(frozen=True)
+class Seek:
+    """
+    Keyset-позиция страницы в порядке title_id: строки после after_id (вперёд)
+    или перед before_id (назад). Пустой Seek — первая страница / обычный offset.
+    """
+    after_id: int | None = None
+    before_id: int | None = None
+
+    def __bool__(self) -> bool:
+        return self.after_id is not None or self.before_id is not None
+
+    def to_state(self) -> dict:
+        return {"after_id": self.after_id, "before_id": self.before_id}
+
+    @classmethod
+    def from_state(cls, data) -> "Seek | None":
+        if not isinstance(data, dict):
+            return None
+        seek = cls(after_id=data.get("after_id"), before_id=data.get("before_id"))
+        return seek or None
+
+
+Facet = Literal["genre", "year", "status", "provider", "team_member", "not_watched"]
+FACETS: Final[tuple[Facet, ...]] = ("genre", "year", "status", "provider", "team_member", "not_watched")
+COUNTED_FACETS: Final[tuple[Facet, ...]] = ("genre", "year", "status")  # есть в title_facet_counts
+
+
+@dataclass(frozen=True)
+class TitleFilter:
+    """
+    Комбинация фильтров списка (core/title_filter.py): фасеты между собой — AND,
+    жанры — все выбранные сразу, годы и статусы — любой из выбранных.
+    """
+    genre_ids: tuple[int, ...] = ()
+    years: tuple[int, ...] = ()
+    status_codes: tuple[int, ...] = ()
+    provider_code: str | None = None
+    team_member: str | None = None
+    not_watched: bool = False
+
+    _MULTI: ClassVar[dict] = {"genre": "genre_ids", "year": "years", "status": "status_codes"}
+    _SINGLE: ClassVar[dict] = {"provider": "provider_code", "team_member": "team_member"}
+
+    def __bool__(self) -> bool:
+        return bool(self.genre_ids or self.years or self.status_codes or self.provider_code
+                    or self.team_member or self.not_watched)
+
+    def has(self, facet: Facet, value=None) -> bool:
+        if facet == "not_watched":
+            return self.not_watched
+        if facet in self._MULTI:
+            return self._coerce(facet, value) in getattr(self, self._MULTI[facet])
+        return getattr(self, self._SINGLE[facet]) == value
+
+    def with_value(self, facet: Facet, value=None) -> "TitleFilter":
+        """Ссылка «фильтр по …» из карточки: жанр добавляется к выбранным, остальное заменяется."""
+        if facet == "not_watched":
+            return replace(self, not_watched=True)
+        if facet == "genre":
+            value = self._coerce(facet, value)
+            return self if value in self.genre_ids else replace(self, genre_ids=tuple(sorted(self.genre_ids + (value,))))
+        if facet in self._MULTI:
+            return replace(self, **{self._MULTI[facet]: (self._coerce(facet, value),)})
+        return replace(self, **{self._SINGLE[facet]: value})
+
+    def toggle(self, facet: Facet, value=None) -> "TitleFilter":
+        """Клик в боковой панели: значение включается/выключается."""
+        if facet == "not_watched":
+            return replace(self, not_watched=not self.not_watched)
+        if facet in self._MULTI:
+            value = self._coerce(facet, value)
+            current = getattr(self, self._MULTI[facet])
+            values = tuple(v for v in current if v != value) if value in current else tuple(sorted(current + (value,)))
+            return replace(self, **{self._MULTI[facet]: values})
+        return replace(self, **{self._SINGLE[facet]: None if getattr(self, self._SINGLE[facet]) == value else value})
+
+    def without(self, facet: Facet) -> "TitleFilter":
+        """Тот же фильтр без фасета — для подсчёта «сколько станет, если выбрать ещё одно значение»."""
+        if facet == "not_watched":
+            return replace(self, not_watched=False)
+        if facet in self._MULTI:
+            return replace(self, **{self._MULTI[facet]: ()})
+        return replace(self, **{self._SINGLE[facet]: None})
+
+    @staticmethod
+    def _coerce(facet, value) -> int:
+        if facet not in ("genre", "year", "status"):
+            raise ValueError(f"Facet {facet} has no integer values")
+        return int(value)
+
+    def to_state(self) -> dict:
+        return {
+            "genre_ids": list(self.genre_ids), "years": list(self.years), "status_codes": list(self.status_codes),
+            "provider_code": self.provider_code, "team_member": self.team_member, "not_watched": self.not_watched,
+        }
+
+    @classmethod
+    def from_state(cls, data) -> "TitleFilter | None":
+        if not isinstance(data, dict):
+            return None
+        try:
+            return cls(
+                genre_ids=tuple(sorted(int(v) for v in data.get("genre_ids") or ())),
+                years=tuple(sorted(int(v) for v in data.get("years") or ())),
+                status_codes=tuple(sorted(int(v) for v in data.get("status_codes") or ())),
+                provider_code=data.get("provider_code") or None,
+                team_member=data.get("team_member") or None,
+                not_watched=bool(data.get("not_watched")),
+            )
+        except (TypeError, ValueError):
+            return None
@@ -35,20 +35,22 @@ class PlaceholderManager:
                     size_key: PosterSize = ph["size_key"]
                     fields = POSTER_FIELDS[size_key]
 
+                    with open(f'static/{ph["file_name"]}', "rb") as f:
+                        blob = f.read()
+                    hash_value = self.calc_hash(blob)
+
                     poster = session.query(Poster).filter_by(title_id=title_id).first()
+                    # Обычный старт: заглушка уже в БД и не менялась — без записи и commit
+                    if poster and getattr(poster, fields.hash) == hash_value and getattr(poster, fields.blob):
+                        continue
                     if not poster:
                         poster = Poster(title_id=title_id)
                         session.add(poster)
                         session.flush()
 
-                    with open(f'static/{ph["file_name"]}', "rb") as f:
-                        blob = f.read()
-                    hash_value = self.calc_hash(blob)
-                    now = datetime.now(timezone.utc)
-
                     setattr(poster, fields.blob, blob)
                     setattr(poster, fields.hash, hash_value)
-                    setattr(poster, fields.updated, now)
+                    setattr(poster, fields.updated, datetime.now(timezone.utc))
 
                     session.commit()
                     self.logger.info(f"Placeholder {ph['file_name']} saved for title_id={title_id} size={size_key}")
@@ -8,13 +8,18 @@ import traceback
 import faulthandler
 import logging.config
 
-from PyQt5 import QtCore
-from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import QApplication
-
-from app.qt.app import AnimePlayerAppVer3
-from app.qt.app_state_manager import AppStateManager
-from core.database_manager import DatabaseManager
+from utils.runtime.startup_profile import profiler, CLI_FLAG
+
+with profiler.stage("import PyQt5"):
+    from PyQt5 import QtCore
+    from PyQt5.QtGui import QIcon
+    from PyQt5.QtWidgets import QApplication
+
+with profiler.stage("import app.qt.app"):
+    from app.qt.app import AnimePlayerAppVer3
+with profiler.stage("import core"):
+    from core.app_state_manager import AppStateManager
+    from core.database_manager import DatabaseManager
 from utils.security.library_loader import verify_library, load_library
 from utils.runtime.runtime_manager import test_exception
 from utils.config.config_manager import ConfigManager
@@ -177,10 +182,11 @@ if __name__ == "__main__":
     db_path = os.path.join(db_dir, 'anime_player.db')
 
     # Create database on first start
-    db_manager = DatabaseManager(db_path)
-    db_manager.initialize_tables()
-    db_manager.initialize_templates()
-    db_manager.save_placeholders()
+    with profiler.stage("DatabaseManager"):
+        db_manager = DatabaseManager(db_path)
+        db_manager.initialize_tables()
+        db_manager.initialize_templates()
+        db_manager.save_placeholders()
 
     # Check version
     version_thread = threading.Thread(target=fetch_version)
@@ -188,32 +194,40 @@ if __name__ == "__main__":
     # finishing version check
     version_thread.join()
     # Starting application window
-    app_pyqt = QApplication(sys.argv)
+    app_pyqt = QApplication([arg for arg in sys.argv if arg != CLI_FLAG])
 
     QtCore.qInstallMessageHandler(qt_message_handler)
 
     state_manager = AppStateManager(db_manager)
 
-    app_state = state_manager.load_state()
+    with profiler.stage("load_state"):
+        app_state = state_manager.load_state()
     template_name = app_state.get("template_name", "default")
 
     icon_path = os.path.join(icon_dir, 'icon.png')
     app_pyqt.setWindowIcon(QIcon(icon_path))
 
-    if not DEVELOPMENT_MODE:
-        window_pyqt = AnimePlayerAppVer3(db_manager, version, template_name, prod_key)
-    else:
-        logging.getLogger(__name__).info("Development mode: single instance check disabled.")
-        window_pyqt = AnimePlayerAppVer3(db_manager, version, template_name)
+    with profiler.stage("AnimePlayerAppVer3"):
+        if not DEVELOPMENT_MODE:
+            window_pyqt = AnimePlayerAppVer3(db_manager, version, template_name, prod_key)
+        else:
+            logging.getLogger(__name__).info("Development mode: single instance check disabled.")
+            window_pyqt = AnimePlayerAppVer3(db_manager, version, template_name)
 
-    if app_state:
-        window_pyqt.restore_state(app_state)
-        state_manager.clear_state_in_db()
-    else:
-        # Load 2 titles on start from DB
-        window_pyqt.display_titles(start=True)
+    with profiler.stage("restore view"):
+        if app_state:
+            window_pyqt.restore_state(app_state)
+            state_manager.clear_state_in_db()
+        else:
+            # Load 2 titles on start from DB
+            window_pyqt.display_titles(start=True)
 
     window_pyqt.show()
+    profiler.mark("window shown")
+    if profiler.enabled:
+        # первый оборот цикла событий — окно с сохранённым видом отрисовано
+        QtCore.QTimer.singleShot(0, lambda: (profiler.mark("first view"),
+                                             profiler.report(logger, budget_mark="first view")))
 
     app_pyqt.aboutToQuit.connect(on_app_quit)
     # Test handling critical & fatal error
@@ -116,6 +116,7 @@ VLC_HIDDENIMPORTS = [
     'utils',
     'utils.runtime',
     'utils.runtime.runtime_manager',
+    'utils.runtime.log_tail',
     'utils.logging',
     'utils.logging.logging_handlers',
 ]
@@ -136,6 +137,7 @@ MPV_HIDDENIMPORTS = [
     'utils',
     'utils.runtime',
     'utils.runtime.runtime_manager',
+    'utils.runtime.log_tail',
     'utils.security',
     'utils.security.library_loader',
     'utils.logging',
@@ -0,0 +1,99 @@
+"""
+Micro-benchmark: LegacyMapper.adapt_bundle serial vs thread pool vs process pool.
+
+    python midnight/bench_legacy_mapper.py --releases 50 --episodes 24
+    python midnight/bench_legacy_mapper.py --releases 500 --workers 8 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from providers.aniliberty.v1.legacy_mapper import adapt_bundles  # noqa: E402
+
+
+def make_release(release_id: int, episodes: int, torrents: int) -> dict:
+    host = f"cache-{release_id % 3}.libria.fun"
+    return {
+        'id': release_id,
+        'alias': f"release-{release_id}",
+        'name': {'main': f"Релиз {release_id}", 'english': f"Release {release_id}", 'alternative': None},
+        'poster': {'src': f"/p/{release_id}.jpg", 'preview': f"/p/{release_id}p.jpg",
+                   'thumbnail': f"/p/{release_id}t.jpg"},
+        'type': {'value': "TV", 'description': "ТВ"},
+        'season': {'value': "autumn", 'description': "Осень"},
+        'publish_day': {'value': release_id % 7 + 1},
+        'year': 2024,
+        'is_ongoing': True,
+        'updated_at': "2024-10-01T12:00:00+00:00",
+        'genres': [{'name': "Драма"}, {'name': "Комедия"}],
+        'episodes': [{
+            'id': f"{release_id}-{n}",
+            'ordinal': n,
+            'name': f"Серия {n}",
+            'hls_1080': f"https://{host}/videos/{release_id}/{n}/1080/index.m3u8?expires=1&sig=x",
+            'hls_720': f"https://{host}/videos/{release_id}/{n}/720/index.m3u8?expires=1&sig=x",
+            'hls_480': f"https://{host}/videos/{release_id}/{n}/480/index.m3u8?expires=1&sig=x",
+            'opening': {'start': 30, 'stop': 120},
+            'ending': {'start': 1300, 'stop': 1390},
+            'preview': {'src': f"/e/{release_id}/{n}.jpg"},
+            'updated_at': "2024-10-01T12:00:00Z",
+        } for n in range(1, episodes + 1)],
+        'torrents': [{
+            'id': release_id * 100 + i,
+            'hash': f"{release_id:032x}",
+            'description': f"1-{episodes}",
+            'quality': {'value': "1080p", 'description': "WEBRip 1080p"},
+            'type': {'value': "WEBRip"},
+            'codec': {'value': "h264"},
+            'size': 1024 ** 3 * (i + 1),
+            'magnet': "magnet:?xt=urn:btih:x",
+            'updated_at': "2024-10-01T12:00:00Z",
+        } for i in range(torrents)],
+        'members': [],
+        'franchises': [],
+    }
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--releases", type=int, default=50)
+    parser.add_argument("--episodes", type=int, default=24, help="episodes per release")
+    parser.add_argument("--torrents", type=int, default=4, help="torrents per release")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args()
+
+    raws = [make_release(i, args.episodes, args.torrents) for i in range(1, args.releases + 1)]
+    expected = adapt_bundles(raws)
+    assert [r['player']['host'] for r in expected] == [f"cache-{i % 3}.libria.fun" for i in range(1, args.releases + 1)]
+
+    results = {'serial': timed(lambda: adapt_bundles(raws), args.repeat)}
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        assert adapt_bundles(raws, executor=pool) == expected
+        results['threads'] = timed(lambda: adapt_bundles(raws, executor=pool), args.repeat)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        assert adapt_bundles(raws, executor=pool) == expected  # прогрев пула + проверка
+        results['processes'] = timed(lambda: adapt_bundles(raws, executor=pool), args.repeat)
+
+    total = args.releases * args.episodes
+    for mode, elapsed in results.items():
+        print(f"{mode:10s}: {elapsed * 1000:8.1f}ms  {total / elapsed:10.0f} episodes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: per-torrent save_torrent(dict) vs batched save_torrents(title_id, list).
+
+    python midnight/bench_torrent_prune.py --titles 1000 --torrents 20
+    python midnight/bench_torrent_prune.py --batch-only   # legacy mode takes minutes on 1000 titles
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from datetime import datetime, timezone, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import create_engine, func, select  # noqa: E402
+from core.tables import Base, Torrent  # noqa: E402
+from core.save import SaveManager  # noqa: E402
+
+
+RESOLUTIONS = ("1080p", "720p", "480p")
+ENCODERS = ("h264", "hevc", "av1")
+
+
+def make_torrents(title_id: int, count: int, rnd: random.Random) -> list[dict]:
+    base_ts = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    torrents = []
+    for i in range(count):
+        first = rnd.choice((1, 1, 1, 13))
+        last = first + rnd.randint(0, 11)
+        res = rnd.choice(RESOLUTIONS)
+        torrents.append({
+            'torrent_id': title_id * 1000 + i,
+            'title_id': title_id,
+            'episodes_range': f"{first}-{last}",
+            'quality': f"WEBRip {res}",
+            'resolution': res,
+            'encoder': rnd.choice(ENCODERS),
+            'total_size': rnd.randint(100, 5000) * 1024 ** 2,
+            'size_string': "",
+            'uploaded_timestamp': base_ts + timedelta(hours=i),
+            'is_in_production': rnd.random() < 0.2,
+            'url': f"/torrent/{title_id}/{i}",
+        })
+    return torrents
+
+
+def run(mode: str, titles: int, per_title: int, seed: int) -> tuple[float, int]:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        engine = create_engine(f"sqlite:///{path}", echo=False)
+        Base.metadata.create_all(engine)
+        save_manager = SaveManager(engine)
+        rnd = random.Random(seed)
+        dataset = [(tid, make_torrents(tid, per_title, rnd)) for tid in range(1, titles + 1)]
+
+        started = time.perf_counter()
+        for title_id, torrents in dataset:
+            if mode == "per-torrent":
+                for t in torrents:
+                    save_manager.save_torrent(t)
+            else:
+                save_manager.save_torrents(title_id, torrents)
+        elapsed = time.perf_counter() - started
+
+        with engine.connect() as conn:
+            remaining = conn.execute(select(func.count()).select_from(Torrent)).scalar()
+        engine.dispose()
+        return elapsed, remaining
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=1000)
+    parser.add_argument("--torrents", type=int, default=20, help="torrents per title")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-only", action="store_true", help="skip the per-torrent baseline")
+    args = parser.parse_args()
+
+    modes = ("batch",) if args.batch_only else ("per-torrent", "batch")
+    for mode in modes:
+        elapsed, remaining = run(mode, args.titles, args.torrents, args.seed)
+        total = args.titles * args.torrents
+        print(f"{mode:12s}: {elapsed:8.2f}s  {total / elapsed:10.0f} torrents/s  kept={remaining}")
+
+
+if __name__ == "__main__":
+    main()
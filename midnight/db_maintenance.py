@@ -0,0 +1,276 @@
+"""
+Maintenance engine for anime_player.db: set-based duplicate cleanup and parallel poster hashing.
+
+Each duplicate check is one windowed query (ROW_NUMBER() OVER (PARTITION BY <key>)),
+extra rows are deleted by rowid in short batches (the app can keep writing between them),
+poster blobs are hashed in a process pool, each worker reading its own rowid range.
+
+    python midnight/db_maintenance.py --db 2 --dry-run
+    python midnight/db_maintenance.py --db-path db/anime_player.db --tables schedule,posters
+    python midnight/db_maintenance.py --db 2 --update-poster-hashes --workers 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DELETE_BATCH = 2000
+HASH_RANGE_ROWS = 200
+# (колонка blob, колонка хеша) в posters — original/medium/thumb
+POSTER_HASH_COLUMNS = (
+    ("poster_blob", "hash_value"),
+    ("medium_blob", "medium_hash"),
+    ("thumb_blob", "thumb_hash"),
+)
+
+
+@dataclass(frozen=True)
+class DuplicateRule:
+    table: str
+    key: tuple[str, ...]
+    order_column: str  # «последняя» запись — максимальная по этой колонке, «старейшая» — минимальная
+    # (таблица, колонка): строки, которые ссылаются на удаляемые по этой колонке, удаляются вместе с ними
+    cascade: tuple[tuple[str, str], ...] = ()
+
+
+# Те же ключи, что у find_duplicates_in_* в enhanced_db_manager.py
+DUPLICATE_RULES = {rule.table: rule for rule in (
+    DuplicateRule("title_team_relation", ("title_id", "team_member_id"), "last_updated"),
+    DuplicateRule("title_genre_relation", ("title_id", "genre_id"), "last_updated"),
+    DuplicateRule("franchise_releases", ("franchise_id", "title_id", "ordinal"), "last_updated"),
+    DuplicateRule("schedule", ("day_of_week", "title_id"), "last_updated"),
+    DuplicateRule("ratings", ("title_id", "rating_name"), "last_updated"),
+    DuplicateRule("history", ("user_id", "title_id", "episode_id", "torrent_id"), "last_watched_at"),
+    DuplicateRule("posters", ("title_id",), "last_updated"),
+    DuplicateRule("episodes", ("title_id", "episode_number"), "created_timestamp"),
+    DuplicateRule("torrents", ("title_id", "hash"), "uploaded_timestamp", cascade=(("torrent_files", "torrent_id"),)),
+    DuplicateRule("franchises", ("title_id", "franchise_id"), "last_updated"),
+    DuplicateRule("production_studios", ("title_id",), "last_updated"),
+    DuplicateRule("templates", ("name",), "created_at"),
+    DuplicateRule("app_state", ("key",), "created_at"),
+)}
+
+
+@dataclass
+class TableReport:
+    table: str
+    groups: int = 0
+    extra_rows: int = 0
+    deleted: int = 0
+    find_ms: float = 0.0
+    fix_ms: float = 0.0
+    error: Optional[str] = None
+
+    def line(self) -> str:
+        if self.error:
+            return f"{self.table:<22} error: {self.error}"
+        return (f"{self.table:<22} groups={self.groups:<6} extra={self.extra_rows:<7} deleted={self.deleted:<7} "
+                f"find={self.find_ms:8.1f} ms  fix={self.fix_ms:8.1f} ms")
+
+
+@dataclass
+class MaintenanceReport:
+    tables: list[TableReport] = field(default_factory=list)
+    posters_hashed: int = 0
+    hash_ms: float = 0.0
+    dry_run: bool = False
+
+    def summary(self) -> str:
+        lines = [f"=== DB MAINTENANCE {'(dry run) ' if self.dry_run else ''}==="]
+        lines += [t.line() for t in self.tables]
+        if self.posters_hashed or self.hash_ms:
+            lines.append(f"{'poster hashes':<22} updated={self.posters_hashed:<6} {self.hash_ms:8.1f} ms")
+        return "\n".join(lines)
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    con = sqlite3.connect(db_path, timeout=30)
+    con.execute("PRAGMA busy_timeout = 30000")
+    return con
+
+
+def _duplicate_query(rule: DuplicateRule, keep_latest: bool) -> str:
+    # keep_latest: новейшая по order_column (при равенстве — последняя вставленная),
+    # иначе старейшая по order_column (при равенстве — первая вставленная), как в прежних fix_duplicates_in_*
+    order = f"{rule.order_column} DESC, rowid DESC" if keep_latest else f"{rule.order_column} ASC, rowid ASC"
+    return (f"SELECT rid, rn FROM ("
+            f"SELECT rowid AS rid, ROW_NUMBER() OVER (PARTITION BY {', '.join(rule.key)} ORDER BY {order}) AS rn "
+            f"FROM {rule.table}) WHERE rn > 1")
+
+
+def find_duplicate_rowids(con: sqlite3.Connection, rule: DuplicateRule, keep_latest: bool = True) -> tuple[int, list[int]]:
+    """(число групп дубликатов, rowid лишних строк) одним оконным запросом."""
+    groups, rowids = 0, []
+    for rid, rn in con.execute(_duplicate_query(rule, keep_latest)):
+        rowids.append(rid)
+        if rn == 2:
+            groups += 1
+    return groups, rowids
+
+
+def _table_exists(con: sqlite3.Connection, table: str) -> bool:
+    return con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def delete_rowids(con: sqlite3.Connection, table: str, rowids: list[int], batch: int = DELETE_BATCH,
+                  cascade: tuple[tuple[str, str], ...] = ()) -> int:
+    """
+    Удаление пачками, одна короткая транзакция на пачку.
+    cascade — (таблица, колонка) зависимых строк (torrent_files у torrents): уходят в той же транзакции.
+    """
+    cascade = [(child, column) for child, column in cascade if _table_exists(con, child)]
+    deleted = 0
+    for i in range(0, len(rowids), batch):
+        chunk = json.dumps(rowids[i:i + batch])
+        with con:
+            for child, column in cascade:
+                con.execute(f"DELETE FROM {child} WHERE {column} IN "
+                            f"(SELECT {column} FROM {table} WHERE rowid IN (SELECT value FROM json_each(?)))", (chunk,))
+            cur = con.execute(f"DELETE FROM {table} WHERE rowid IN (SELECT value FROM json_each(?))", (chunk,))
+        deleted += cur.rowcount
+    return deleted
+
+
+def run_duplicates(db_path: str, tables=None, keep_latest: bool = True, dry_run: bool = False,
+                   batch: int = DELETE_BATCH) -> list[TableReport]:
+    rules = [DUPLICATE_RULES[t] for t in (tables or DUPLICATE_RULES) if t in DUPLICATE_RULES]
+    reports = []
+    con = connect(db_path)
+    try:
+        for rule in rules:
+            report = TableReport(rule.table)
+            reports.append(report)
+            try:
+                start = time.perf_counter()
+                report.groups, rowids = find_duplicate_rowids(con, rule, keep_latest)
+                report.extra_rows = len(rowids)
+                report.find_ms = (time.perf_counter() - start) * 1000
+                if rowids and not dry_run:
+                    start = time.perf_counter()
+                    report.deleted = delete_rowids(con, rule.table, rowids, batch, rule.cascade)
+                    report.fix_ms = (time.perf_counter() - start) * 1000
+            except sqlite3.Error as e:  # таблицы/колонки нет в старой схеме
+                report.error = str(e)
+    finally:
+        con.close()
+    return reports
+
+
+def _hash_poster_range(db_path: str, lo: int, hi: int,
+                       pairs=POSTER_HASH_COLUMNS) -> list[tuple[str, str, int]]:
+    """
+    Worker: хеши пустых колонок для rowid в [lo, hi]; своё read-only соединение.
+    pairs — (blob, hash) колонки, которые есть в схеме (_poster_hash_columns): в старых базах части нет.
+    """
+    con = sqlite3.connect(Path(os.path.abspath(db_path)).as_uri() + "?mode=ro", uri=True)
+    out = []
+    try:
+        for blob_col, hash_col in pairs:
+            rows = con.execute(
+                f"SELECT rowid, {blob_col} FROM posters "
+                f"WHERE rowid BETWEEN ? AND ? AND {hash_col} IS NULL AND {blob_col} IS NOT NULL", (lo, hi))
+            for rid, blob in rows:
+                out.append((hash_col, hashlib.md5(blob).hexdigest(), rid))
+    finally:
+        con.close()
+    return out
+
+
+def _poster_hash_columns(con: sqlite3.Connection):
+    columns = {row[1] for row in con.execute("PRAGMA table_info(posters)")}
+    return [(b, h) for b, h in POSTER_HASH_COLUMNS if b in columns and h in columns]
+
+
+def hash_posters(db_path: str, workers: Optional[int] = None, range_rows: int = HASH_RANGE_ROWS,
+                 log=print) -> int:
+    """MD5 всех постеров без хеша; blob читают процессы пула, UPDATE — одна транзакция на диапазон."""
+    con = connect(db_path)
+    try:
+        pairs = _poster_hash_columns(con)
+        if not pairs:
+            log("posters: no blob/hash columns")
+            return 0
+        missing = " OR ".join(f"({h} IS NULL AND {b} IS NOT NULL)" for b, h in pairs)
+        lo, hi, total = con.execute(f"SELECT MIN(rowid), MAX(rowid), COUNT(*) FROM posters WHERE {missing}").fetchone()
+        if not total:
+            log("Все постеры уже имеют хеши или в базе нет постеров.")
+            return 0
+        log(f"Hashing {total} posters with {workers or os.cpu_count()} workers...")
+
+        updated = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_hash_poster_range, db_path, start, min(start + range_rows - 1, hi), pairs)
+                       for start in range(lo, hi + 1, range_rows)]
+            for fut in as_completed(futures):
+                rows = fut.result()
+                if not rows:
+                    continue
+                with con:
+                    for _, hash_col in pairs:
+                        params = [(h, rid) for col, h, rid in rows if col == hash_col]
+                        if params:
+                            con.executemany(f"UPDATE posters SET {hash_col} = ? WHERE rowid = ?", params)
+                updated += len({rid for _, _, rid in rows})
+        log(f"✅ Успешно обновлено {updated} постеров.")
+        return updated
+    finally:
+        con.close()
+
+
+def run_maintenance(db_path: str, tables=None, keep_latest: bool = True, dry_run: bool = False,
+                    update_hashes: bool = False, workers: Optional[int] = None,
+                    batch: int = DELETE_BATCH) -> MaintenanceReport:
+    report = MaintenanceReport(dry_run=dry_run)
+    report.tables = run_duplicates(db_path, tables, keep_latest, dry_run, batch)
+    if update_hashes and not dry_run:
+        start = time.perf_counter()
+        report.posters_hashed = hash_posters(db_path, workers)
+        report.hash_ms = (time.perf_counter() - start) * 1000
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Set-based duplicate cleanup and poster hashing for anime_player.db")
+    parser.add_argument("--db", choices=["1", "2"], help="1=Development, 2=Production (as enhanced_db_manager)")
+    parser.add_argument("--db-path", help="Explicit database path")
+    parser.add_argument("--tables", help=f"Comma-separated tables (default: all): {','.join(DUPLICATE_RULES)}")
+    parser.add_argument("--keep-oldest", action="store_true", help="Keep the oldest row (by its date column) instead of the latest")
+    parser.add_argument("--dry-run", action="store_true", help="Only report duplicates and timings, change nothing")
+    parser.add_argument("--update-poster-hashes", action="store_true", help="Fill missing poster hashes")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for poster hashing")
+    parser.add_argument("--batch", type=int, default=DELETE_BATCH, help="Rows per DELETE transaction")
+    parser.add_argument("--no-backup", action="store_true", help="Skip database backup")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT_DIR)
+    from midnight.enhanced_db_manager import backup_database, select_database
+
+    db_path = args.db_path or select_database(args.db)
+    if not args.dry_run and not args.no_backup and not backup_database(db_path):
+        print("Error creating backup. Aborting.")
+        return 1
+
+    tables = [t.strip() for t in args.tables.split(",")] if args.tables else None
+    unknown = [t for t in tables or () if t not in DUPLICATE_RULES]
+    if unknown:
+        print(f"Unknown tables: {', '.join(unknown)}")
+        return 2
+
+    report = run_maintenance(db_path, tables, keep_latest=not args.keep_oldest, dry_run=args.dry_run,
+                             update_hashes=args.update_poster_hashes, workers=args.workers, batch=args.batch)
+    print(report.summary())
+    return 1 if any(t.error for t in report.tables) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,15 +2,13 @@ import os
 import io
 import sys
 import shutil
-import hashlib
 import argparse
 
 from datetime import datetime
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
-from core.tables import Base, TitleTeamRelation, TeamMember, TitleGenreRelation, \
-    Genre, FranchiseRelease, Franchise, Schedule, Rating, History, Poster, \
-    Episode, Torrent, ProductionStudio, Template, AppState
+from core.tables import TeamMember, Genre, Franchise, Torrent
+from midnight.db_maintenance import DUPLICATE_RULES, run_duplicates, hash_posters
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 base_dir = os.path.join(ROOT_DIR, "midnight")
@@ -158,52 +156,6 @@ def find_duplicates_in_title_team_relation(session):
     return duplicates
 
 
-def fix_duplicates_in_title_team_relation(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the title_team_relation table."""
-    if not duplicates:
-        print("No duplicates to fix in title_team_relation.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Convert string IDs to integers
-            relation_ids = [int(id_str) for id_str in dup['relation_ids']]
-
-            # Determine which records to delete
-            if keep_latest:
-                # Get all relations and sort by date to find the newest
-                relations = session.query(TitleTeamRelation).filter(
-                    TitleTeamRelation.id.in_(relation_ids)
-                ).order_by(TitleTeamRelation.last_updated.desc()).all()
-
-                # Keep the newest record, delete the rest
-                keep_id = relations[0].id
-                delete_ids = [rel.id for rel in relations[1:]]
-            else:
-                # Keep the first record, delete the rest
-                keep_id = relation_ids[0]
-                delete_ids = relation_ids[1:]
-
-            # Delete duplicates
-            if delete_ids:
-                session.query(TitleTeamRelation).filter(
-                    TitleTeamRelation.id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-
-                session.commit()
-                fixed_count += len(delete_ids)
-                print(
-                    f"Fixed {len(delete_ids)} duplicates for title_id: {dup['title_id']}, team_member: {dup['team_member_name']}")
-
-        except Exception as e:
-            session.rollback()
-            print(
-                f"Error fixing duplicates for title_id: {dup['title_id']}, team_member: {dup['team_member_name']}: {e}")
-
-    print(f"Total fixed duplicates in title_team_relation: {fixed_count}")
-
-
 # TITLE GENRE RELATION TABLE
 
 def find_duplicates_in_title_genre_relation(session):
@@ -244,52 +196,6 @@ def find_duplicates_in_title_genre_relation(session):
     return duplicates
 
 
-def fix_duplicates_in_title_genre_relation(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the title_genre_relation table."""
-    if not duplicates:
-        print("No duplicates to fix in title_genre_relation.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Convert string IDs to integers
-            relation_ids = [int(id_str) for id_str in dup['relation_ids']]
-
-            # Determine which records to delete
-            if keep_latest:
-                # Get all relations and sort by date to find the newest
-                relations = session.query(TitleGenreRelation).filter(
-                    TitleGenreRelation.id.in_(relation_ids)
-                ).order_by(TitleGenreRelation.last_updated.desc()).all()
-
-                # Keep the newest record, delete the rest
-                keep_id = relations[0].id
-                delete_ids = [rel.id for rel in relations[1:]]
-            else:
-                # Keep the first record, delete the rest
-                keep_id = relation_ids[0]
-                delete_ids = relation_ids[1:]
-
-            # Delete duplicates
-            if delete_ids:
-                session.query(TitleGenreRelation).filter(
-                    TitleGenreRelation.id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-
-                session.commit()
-                fixed_count += len(delete_ids)
-                print(
-                    f"Fixed {len(delete_ids)} duplicates for title_id: {dup['title_id']}, genre: {dup['genre_name']}")
-
-        except Exception as e:
-            session.rollback()
-            print(
-                f"Error fixing duplicates for title_id: {dup['title_id']}, genre: {dup['genre_name']}: {e}")
-
-    print(f"Total fixed duplicates in title_genre_relation: {fixed_count}")
-
-
 # FRANCHISE RELEASES TABLE
 
 def find_duplicates_in_franchise_releases(session):
@@ -332,52 +238,6 @@ def find_duplicates_in_franchise_releases(session):
     return duplicates
 
 
-def fix_duplicates_in_franchise_releases(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the franchise_releases table."""
-    if not duplicates:
-        print("No duplicates to fix in franchise_releases.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Convert string IDs to integers
-            relation_ids = [int(id_str) for id_str in dup['relation_ids']]
-
-            # Determine which records to delete
-            if keep_latest:
-                # Get all relations and sort by date to find the newest
-                relations = session.query(FranchiseRelease).filter(
-                    FranchiseRelease.id.in_(relation_ids)
-                ).order_by(FranchiseRelease.last_updated.desc()).all()
-
-                # Keep the newest record, delete the rest
-                keep_id = relations[0].id
-                delete_ids = [rel.id for rel in relations[1:]]
-            else:
-                # Keep the first record, delete the rest
-                keep_id = relation_ids[0]
-                delete_ids = relation_ids[1:]
-
-            # Delete duplicates
-            if delete_ids:
-                session.query(FranchiseRelease).filter(
-                    FranchiseRelease.id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-
-                session.commit()
-                fixed_count += len(delete_ids)
-                print(
-                    f"Fixed {len(delete_ids)} duplicates for franchise: {dup['franchise_name']}, title_id: {dup['title_id']}")
-
-        except Exception as e:
-            session.rollback()
-            print(
-                f"Error fixing duplicates for franchise: {dup['franchise_name']}, title_id: {dup['title_id']}: {e}")
-
-    print(f"Total fixed duplicates in franchise_releases: {fixed_count}")
-
-
 # SCHEDULE TABLE
 
 def find_duplicates_in_schedule(session):
@@ -407,40 +267,6 @@ def find_duplicates_in_schedule(session):
     return duplicates
 
 
-def fix_duplicates_in_schedule(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the schedule table."""
-    if not duplicates:
-        print("No duplicates to fix in schedule.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Keep only one record for each day_of_week and title_id combination
-            # Since schedule uses a composite primary key (day_of_week, title_id),
-            # we can't directly delete by ID. We need to fetch all duplicates first.
-            schedules = session.query(Schedule).filter_by(
-                day_of_week=dup['day_of_week'],
-                title_id=dup['title_id']
-            ).order_by(Schedule.last_updated.desc() if keep_latest else Schedule.last_updated.asc()).all()
-
-            # Keep the first record (either newest or oldest based on keep_latest)
-            # Delete the rest
-            for schedule in schedules[1:]:
-                session.delete(schedule)
-
-            session.commit()
-            fixed_count += len(schedules) - 1
-            print(
-                f"Fixed {len(schedules) - 1} duplicates for day_of_week: {dup['day_of_week']}, title_id: {dup['title_id']}")
-
-        except Exception as e:
-            session.rollback()
-            print(f"Error fixing duplicates for day_of_week: {dup['day_of_week']}, title_id: {dup['title_id']}: {e}")
-
-    print(f"Total fixed duplicates in schedule: {fixed_count}")
-
-
 # RATINGS TABLE
 
 def find_duplicates_in_ratings(session):
@@ -476,52 +302,6 @@ def find_duplicates_in_ratings(session):
     return duplicates
 
 
-def fix_duplicates_in_ratings(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the ratings table."""
-    if not duplicates:
-        print("No duplicates to fix in ratings.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Convert string IDs to integers
-            rating_ids = [int(id_str) for id_str in dup['rating_ids']]
-
-            # Determine which records to delete
-            if keep_latest:
-                # Get all ratings and sort by date to find the newest
-                ratings = session.query(Rating).filter(
-                    Rating.rating_id.in_(rating_ids)
-                ).order_by(Rating.last_updated.desc()).all()
-
-                # Keep the newest record, delete the rest
-                keep_id = ratings[0].rating_id
-                delete_ids = [rating.rating_id for rating in ratings[1:]]
-            else:
-                # Keep the first record, delete the rest
-                keep_id = rating_ids[0]
-                delete_ids = rating_ids[1:]
-
-            # Delete duplicates
-            if delete_ids:
-                session.query(Rating).filter(
-                    Rating.rating_id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-
-                session.commit()
-                fixed_count += len(delete_ids)
-                print(
-                    f"Fixed {len(delete_ids)} duplicates for title_id: {dup['title_id']}, rating_name: {dup['rating_name']}")
-
-        except Exception as e:
-            session.rollback()
-            print(
-                f"Error fixing duplicates for title_id: {dup['title_id']}, rating_name: {dup['rating_name']}: {e}")
-
-    print(f"Total fixed duplicates in ratings: {fixed_count}")
-
-
 # HISTORY TABLE
 
 def find_duplicates_in_history(session):
@@ -561,52 +341,6 @@ def find_duplicates_in_history(session):
     return duplicates
 
 
-def fix_duplicates_in_history(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the history table."""
-    if not duplicates:
-        print("No duplicates to fix in history.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Convert string IDs to integers
-            history_ids = [int(id_str) for id_str in dup['history_ids']]
-
-            # Determine which records to delete
-            if keep_latest:
-                # Get all history records and sort by date to find the newest
-                histories = session.query(History).filter(
-                    History.id.in_(history_ids)
-                ).order_by(History.last_watched_at.desc()).all()
-
-                # Keep the newest record, delete the rest
-                keep_id = histories[0].id
-                delete_ids = [h.id for h in histories[1:]]
-            else:
-                # Keep the first record, delete the rest
-                keep_id = history_ids[0]
-                delete_ids = history_ids[1:]
-
-            # Delete duplicates
-            if delete_ids:
-                session.query(History).filter(
-                    History.id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-
-                session.commit()
-                fixed_count += len(delete_ids)
-                print(
-                    f"Fixed {len(delete_ids)} duplicates for user_id: {dup['user_id']}, title_id: {dup['title_id']}")
-
-        except Exception as e:
-            session.rollback()
-            print(
-                f"Error fixing duplicates for user_id: {dup['user_id']}, title_id: {dup['title_id']}: {e}")
-
-    print(f"Total fixed duplicates in history: {fixed_count}")
-
-
 # POSTERS TABLE
 
 def find_duplicates_in_posters(session):
@@ -640,52 +374,6 @@ def find_duplicates_in_posters(session):
     return duplicates
 
 
-def fix_duplicates_in_posters(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the posters table."""
-    if not duplicates:
-        print("No duplicates to fix in posters.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Convert string IDs to integers
-            poster_ids = [int(id_str) for id_str in dup['poster_ids']]
-
-            # Determine which records to delete
-            if keep_latest:
-                # Get all posters and sort by date to find the newest
-                posters = session.query(Poster).filter(
-                    Poster.poster_id.in_(poster_ids)
-                ).order_by(Poster.last_updated.desc()).all()
-
-                # Keep the newest record, delete the rest
-                keep_id = posters[0].poster_id
-                delete_ids = [poster.poster_id for poster in posters[1:]]
-            else:
-                # Keep the first record, delete the rest
-                keep_id = poster_ids[0]
-                delete_ids = poster_ids[1:]
-
-            # Delete duplicates
-            if delete_ids:
-                session.query(Poster).filter(
-                    Poster.poster_id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-
-                session.commit()
-                fixed_count += len(delete_ids)
-                print(
-                    f"Fixed {len(delete_ids)} duplicates for title_id: {dup['title_id']}")
-
-        except Exception as e:
-            session.rollback()
-            print(
-                f"Error fixing duplicates for title_id: {dup['title_id']}: {e}")
-
-    print(f"Total fixed duplicates in posters: {fixed_count}")
-
-
 # EPISODES TABLE
 
 def find_duplicates_in_episodes(session):
@@ -721,52 +409,6 @@ def find_duplicates_in_episodes(session):
     return duplicates
 
 
-def fix_duplicates_in_episodes(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the episodes table."""
-    if not duplicates:
-        print("No duplicates to fix in episodes.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Convert string IDs to integers
-            episode_ids = [int(id_str) for id_str in dup['episode_ids']]
-
-            # Determine which records to delete
-            if keep_latest:
-                # Get all episodes and sort by date to find the newest
-                episodes = session.query(Episode).filter(
-                    Episode.episode_id.in_(episode_ids)
-                ).order_by(Episode.created_timestamp.desc()).all()
-
-                # Keep the newest record, delete the rest
-                keep_id = episodes[0].episode_id
-                delete_ids = [ep.episode_id for ep in episodes[1:]]
-            else:
-                # Keep the first record, delete the rest
-                keep_id = episode_ids[0]
-                delete_ids = episode_ids[1:]
-
-            # Delete duplicates
-            if delete_ids:
-                session.query(Episode).filter(
-                    Episode.episode_id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-
-                session.commit()
-                fixed_count += len(delete_ids)
-                print(
-                    f"Fixed {len(delete_ids)} duplicates for title_id: {dup['title_id']}, episode: {dup['episode_number']}")
-
-        except Exception as e:
-            session.rollback()
-            print(
-                f"Error fixing duplicates for title_id: {dup['title_id']}, episode: {dup['episode_number']}: {e}")
-
-    print(f"Total fixed duplicates in episodes: {fixed_count}")
-
-
 # TORRENTS TABLE
 
 def find_duplicates_in_torrents(session):
@@ -808,52 +450,6 @@ def find_duplicates_in_torrents(session):
     return duplicates
 
 
-def fix_duplicates_in_torrents(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the torrents table."""
-    if not duplicates:
-        print("No duplicates to fix in torrents.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Convert string IDs to integers
-            torrent_ids = [int(id_str) for id_str in dup['torrent_ids']]
-
-            # Determine which records to delete
-            if keep_latest:
-                # Get all torrents and sort by date to find the newest
-                torrents = session.query(Torrent).filter(
-                    Torrent.torrent_id.in_(torrent_ids)
-                ).order_by(Torrent.uploaded_timestamp.desc()).all()
-
-                # Keep the newest record, delete the rest
-                keep_id = torrents[0].torrent_id
-                delete_ids = [t.torrent_id for t in torrents[1:]]
-            else:
-                # Keep the first record, delete the rest
-                keep_id = torrent_ids[0]
-                delete_ids = torrent_ids[1:]
-
-            # Delete duplicates
-            if delete_ids:
-                session.query(Torrent).filter(
-                    Torrent.torrent_id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-
-                session.commit()
-                fixed_count += len(delete_ids)
-                print(
-                    f"Fixed {len(delete_ids)} duplicates for title_id: {dup['title_id']}, hash: {dup['hash']}")
-
-        except Exception as e:
-            session.rollback()
-            print(
-                f"Error fixing duplicates for title_id: {dup['title_id']}, hash: {dup['hash']}: {e}")
-
-    print(f"Total fixed duplicates in torrents: {fixed_count}")
-
-
 def clean_torrents_by_title(session, n=1):
     """
     Для каждого title_id оставляет только N самых больших по весу торрентов
@@ -935,52 +531,6 @@ def find_duplicates_in_franchises(session):
     return duplicates
 
 
-def fix_duplicates_in_franchises(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the franchises table."""
-    if not duplicates:
-        print("No duplicates to fix in franchises.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Convert string IDs to integers
-            franchise_ids = [int(id_str) for id_str in dup['franchise_ids']]
-
-            # Determine which records to delete
-            if keep_latest:
-                # Get all franchises and sort by date to find the newest
-                franchises = session.query(Franchise).filter(
-                    Franchise.id.in_(franchise_ids)
-                ).order_by(Franchise.last_updated.desc()).all()
-
-                # Keep the newest record, delete the rest
-                keep_id = franchises[0].id
-                delete_ids = [f.id for f in franchises[1:]]
-            else:
-                # Keep the first record, delete the rest
-                keep_id = franchise_ids[0]
-                delete_ids = franchise_ids[1:]
-
-            # Delete duplicates
-            if delete_ids:
-                session.query(Franchise).filter(
-                    Franchise.id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-
-                session.commit()
-                fixed_count += len(delete_ids)
-                print(
-                    f"Fixed {len(delete_ids)} duplicates for title_id: {dup['title_id']}, franchise_id: {dup['franchise_id']}")
-
-        except Exception as e:
-            session.rollback()
-            print(
-                f"Error fixing duplicates for title_id: {dup['title_id']}, franchise_id: {dup['franchise_id']}: {e}")
-
-    print(f"Total fixed duplicates in franchises: {fixed_count}")
-
-
 # PRODUCTION STUDIOS TABLE
 
 def find_duplicates_in_production_studios(session):
@@ -1014,37 +564,6 @@ def find_duplicates_in_production_studios(session):
     return duplicates
 
 
-def fix_duplicates_in_production_studios(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the production_studios table."""
-    if not duplicates:
-        print("No duplicates to fix in production_studios.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Since title_id is the primary key, we need to handle this differently
-            # Get all studios with this title_id
-            studios = session.query(ProductionStudio).filter_by(
-                title_id=dup['title_id']
-            ).order_by(ProductionStudio.last_updated.desc() if keep_latest else ProductionStudio.last_updated.asc()).all()
-
-            # Keep the first studio (either newest or oldest based on keep_latest)
-            # Delete the rest
-            for studio in studios[1:]:
-                session.delete(studio)
-
-            session.commit()
-            fixed_count += len(studios) - 1
-            print(f"Fixed {len(studios) - 1} duplicates for title_id: {dup['title_id']}")
-
-        except Exception as e:
-            session.rollback()
-            print(f"Error fixing duplicates for title_id: {dup['title_id']}: {e}")
-
-    print(f"Total fixed duplicates in production_studios: {fixed_count}")
-
-
 # TEMPLATES TABLE
 
 def find_duplicates_in_templates(session):
@@ -1078,52 +597,6 @@ def find_duplicates_in_templates(session):
     return duplicates
 
 
-def fix_duplicates_in_templates(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the templates table."""
-    if not duplicates:
-        print("No duplicates to fix in templates.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Convert string IDs to integers
-            template_ids = [int(id_str) for id_str in dup['template_ids']]
-
-            # Determine which records to delete
-            if keep_latest:
-                # Get all templates and sort by date to find the newest
-                templates = session.query(Template).filter(
-                    Template.id.in_(template_ids)
-                ).order_by(Template.created_at.desc()).all()
-
-                # Keep the newest record, delete the rest
-                keep_id = templates[0].id
-                delete_ids = [t.id for t in templates[1:]]
-            else:
-                # Keep the first record, delete the rest
-                keep_id = template_ids[0]
-                delete_ids = template_ids[1:]
-
-            # Delete duplicates
-            if delete_ids:
-                session.query(Template).filter(
-                    Template.id.in_(delete_ids)
-                ).delete(synchronize_session=False)
-
-                session.commit()
-                fixed_count += len(delete_ids)
-                print(
-                    f"Fixed {len(delete_ids)} duplicates for template name: {dup['name']}")
-
-        except Exception as e:
-            session.rollback()
-            print(
-                f"Error fixing duplicates for template name: {dup['name']}: {e}")
-
-    print(f"Total fixed duplicates in templates: {fixed_count}")
-
-
 # APP_STATE TABLE
 
 def find_duplicates_in_app_state(session):
@@ -1154,37 +627,6 @@ def find_duplicates_in_app_state(session):
     return duplicates
 
 
-def fix_duplicates_in_app_state(session, duplicates, keep_latest=True):
-    """Fixes duplicates in the app_state table."""
-    if not duplicates:
-        print("No duplicates to fix in app_state.")
-        return
-
-    fixed_count = 0
-    for dup in duplicates:
-        try:
-            # Since key is the primary key, handle this case differently
-            # Get all app_state entries with this key
-            app_states = session.query(AppState).filter_by(
-                key=dup['key']
-            ).order_by(AppState.created_at.desc() if keep_latest else AppState.created_at.asc()).all()
-
-            # Keep the first entry (either newest or oldest based on keep_latest)
-            # Delete the rest
-            for app_state in app_states[1:]:
-                session.delete(app_state)
-
-            session.commit()
-            fixed_count += len(app_states) - 1
-            print(f"Fixed {len(app_states) - 1} duplicates for key: {dup['key']}")
-
-        except Exception as e:
-            session.rollback()
-            print(f"Error fixing duplicates for key: {dup['key']}: {e}")
-
-    print(f"Total fixed duplicates in app_state: {fixed_count}")
-
-
 def run_table_check(session, table_name, find_function, output_file=None):
     """Helper function to run a specific table check and return detailed results."""
     duplicates = find_function(session)
@@ -1216,52 +658,10 @@ def add_hash_column_if_not_exists(session):
 
 
 def update_poster_hashes(session):
-    """Обновляет хеши для всех постеров, у которых они отсутствуют"""
+    """Обновляет хеши для всех постеров, у которых они отсутствуют (пул процессов, см. db_maintenance)"""
     try:
-        # Получаем все постеры без хеша
-        result = session.execute(text("SELECT poster_id, title_id FROM posters WHERE hash_value IS NULL"))
-        poster_data = result.fetchall()
-
-        if not poster_data:
-            print("Все постеры уже имеют хеши или в базе нет постеров.")
-            return
-
-        print(f"Начинаем обновление хешей для {len(poster_data)} постеров...")
-
-        updated_count = 0
-        for row in poster_data:
-            poster_id = row[0]
-            title_id = row[1]
-
-            # Получаем бинарные данные постера
-            blob_result = session.execute(
-                text("SELECT poster_blob FROM posters WHERE poster_id = :pid"),
-                {"pid": poster_id}
-            )
-            blob_data = blob_result.scalar()
-
-            if blob_data:
-                # Вычисляем MD5-хеш из бинарных данных постера
-                hash_value = hashlib.md5(blob_data).hexdigest()
-
-                # Обновляем запись
-                session.execute(
-                    text("UPDATE posters SET hash_value = :hash WHERE poster_id = :pid"),
-                    {"hash": hash_value, "pid": poster_id}
-                )
-
-                updated_count += 1
-
-                if updated_count % 100 == 0:  # Выводим прогресс каждые 100 записей
-                    session.commit()  # Коммитим изменения каждые 100 записей
-                    print(f"Обработано {updated_count}/{len(poster_data)} постеров...")
-
-        # Финальный коммит для оставшихся изменений
-        session.commit()
-        print(f"✅ Успешно обновлено {updated_count} постеров.")
-
+        hash_posters(session.get_bind().url.database)
     except Exception as e:
-        session.rollback()
         print(f"❌ Ошибка при обновлении хешей постеров: {e}")
 
 
@@ -1311,49 +711,8 @@ def main(auto_fix=False, keep_latest=True, selected_tables=None, db_choice=None,
             else:
                 print("Столбец hash_value уже существует в таблице posters.")
 
-            # Получаем все постеры без хеша
-            result = session.execute(text("SELECT poster_id, title_id FROM posters WHERE hash_value IS NULL"))
-            poster_data = result.fetchall()
-
-            if not poster_data:
-                print("Все постеры уже имеют хеши или в базе нет постеров.")
-                session.close()
-                return
-
-            print(f"Начинаем обновление хешей для {len(poster_data)} постеров...")
-
-            updated_count = 0
-            for row in poster_data:
-                poster_id = row[0]
-                title_id = row[1]
-
-                # Получаем бинарные данные постера
-                blob_result = session.execute(
-                    text("SELECT poster_blob FROM posters WHERE poster_id = :pid"),
-                    {"pid": poster_id}
-                )
-                blob_data = blob_result.scalar()
-
-                if blob_data:
-                    # Вычисляем MD5-хеш из бинарных данных постера
-                    hash_value = hashlib.md5(blob_data).hexdigest()
-
-                    # Обновляем запись
-                    session.execute(
-                        text("UPDATE posters SET hash_value = :hash WHERE poster_id = :pid"),
-                        {"hash": hash_value, "pid": poster_id}
-                    )
-
-                    updated_count += 1
-
-                    if updated_count % 100 == 0:  # Выводим прогресс каждые 100 записей
-                        session.commit()  # Коммитим изменения каждые 100 записей
-                        print(f"Обработано {updated_count}/{len(poster_data)} постеров...")
-
-            # Финальный коммит для оставшихся изменений
-            session.commit()
-            print(f"✅ Успешно обновлено {updated_count} постеров.")
             session.close()
+            hash_posters(db_path)
             print("Обновление хешей постеров завершено.")
             sys.exit(0)
     except Exception as e:
@@ -1455,34 +814,15 @@ def main(auto_fix=False, keep_latest=True, selected_tables=None, db_choice=None,
                     "Keep the latest record for each duplicate? (y/n, default: y): ").strip().lower()
                 keep_latest = keep_latest_input != 'n'  # If not 'n', then True
                 sys.stdout = output
-            print(f"Will keep {'latest' if keep_latest else 'first'} records.")
-
-            # Map table names to fix functions
-            fix_functions = {
-                'title_team_relation': fix_duplicates_in_title_team_relation,
-                'title_genre_relation': fix_duplicates_in_title_genre_relation,
-                'franchise_releases': fix_duplicates_in_franchise_releases,
-                'schedule': fix_duplicates_in_schedule,
-                'ratings': fix_duplicates_in_ratings,
-                'history': fix_duplicates_in_history,
-                'posters': fix_duplicates_in_posters,
-                'episodes': fix_duplicates_in_episodes,
-                'torrents': fix_duplicates_in_torrents,
-                'franchises': fix_duplicates_in_franchises,
-                'production_studios': fix_duplicates_in_production_studios,
-                'templates': fix_duplicates_in_templates,
-                'app_state': fix_duplicates_in_app_state
-            }
-
-            # Fix duplicates in each table
+            print(f"Will keep {'latest' if keep_latest else 'oldest'} records.")
+
+            # Fix duplicates in each table: one windowed query + batched DELETE per table (db_maintenance)
             print("\n=== FIXING DUPLICATES ===")
 
-            fixed_count = 0
-            for table_name, duplicates in all_duplicates.items():
-                if duplicates and table_name in fix_functions:
-                    print(f"\n--- Fixing {table_name} duplicates ---")
-                    fix_functions[table_name](session, duplicates, keep_latest)
-                    fixed_count += len(duplicates)
+            session.close()  # освобождаем соединение — удаление идёт своими короткими транзакциями
+            tables_to_fix = [t for t, dups in all_duplicates.items() if dups and t in DUPLICATE_RULES]
+            for report in run_duplicates(db_path, tables_to_fix, keep_latest=keep_latest):
+                print(report.line())
 
 
             print("\nDuplicate fixing completed for all tables.")
@@ -1524,7 +864,7 @@ def main(auto_fix=False, keep_latest=True, selected_tables=None, db_choice=None,
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Find and fix duplicate records in the anime_player database.')
     parser.add_argument('--auto-fix', action='store_true', help='Automatically fix duplicates without confirmation')
-    parser.add_argument('--keep-oldest', action='store_true', help='Keep oldest records instead of latest')
+    parser.add_argument('--keep-oldest', action='store_true', help='Keep the oldest record (by its date column) instead of the latest')
     parser.add_argument('--output', type=str, help='Custom output file path')
     parser.add_argument('--tables', type=str, help='Comma-separated list of tables to check (default: all)')
     parser.add_argument('--no-backup', action='store_true', help='Skip database backup')
@@ -57,22 +57,26 @@ class APIAdapter:
     # SCHEDULE
     # ============================================
 
-    def get_schedule(self, day):
-        """Получает расписание для конкретного дня."""
+    def get_schedule(self, day, *, enrich: bool = True):
+        """
+        Получает расписание для конкретного дня.
+        enrich=False — маппим только то, что пришло в ответе расписания (один HTTP-запрос);
+        полные бандлы изменившихся релизов вызывающий код догружает сам через get_releases_full.
+        """
         try:
             today = datetime.now().isoweekday()
             day = int(day)
             if day == today:
                 self.logger.info(f"Requesting TODAY's schedule (day={day}) via /schedule/now")
-                return self._get_schedule_now(day)
+                return self._get_schedule_now(day, enrich=enrich)
             else:
                 self.logger.info(f"Requesting schedule for day={day} (today={today}) via /schedule/week")
-                return self._get_schedule_week(day)
+                return self._get_schedule_week(day, enrich=enrich)
         except Exception as e:
             self.logger.error(f"Error in get_schedule: {e}")
             return {'error': str(e)}
 
-    def _process_schedule_releases(self, day, releases):
+    def _process_schedule_releases(self, day, releases, enrich: bool = True):
         filtered = []
         for release in releases:
             try:
@@ -95,12 +99,12 @@ class APIAdapter:
                 fetch_torrents=True,
                 fetch_team=True,
                 fetch_franchises=True,
-                allow_network=True,
+                allow_network=enrich,
             )
             adapted_releases.append(adapted)
         return adapted_releases
 
-    def _get_schedule_now(self, day):
+    def _get_schedule_now(self, day, enrich: bool = True):
         """Загружает расписание на СЕГОДНЯ."""
         try:
             now_data = self.client.get_schedule_now()
@@ -108,7 +112,7 @@ class APIAdapter:
                 return now_data
 
             releases = self._extract_releases(now_data)
-            adapted_releases = self._process_schedule_releases(day, releases)
+            adapted_releases = self._process_schedule_releases(day, releases, enrich=enrich)
 
             return [{'day': day, 'list': adapted_releases}]
 
@@ -116,7 +120,7 @@ class APIAdapter:
             self.logger.error(f"Error in _get_schedule_now: {e}")
             return {'error': str(e)}
 
-    def _get_schedule_week(self, day):
+    def _get_schedule_week(self, day, enrich: bool = True):
         """Загружает расписание на неделю и отфильтровывает нужный день."""
         try:
             week_data = self.client.get_schedule_week()
@@ -124,7 +128,7 @@ class APIAdapter:
                 return week_data
 
             releases = self._extract_releases(week_data)
-            adapted_releases = self._process_schedule_releases(day, releases)
+            adapted_releases = self._process_schedule_releases(day, releases, enrich=enrich)
 
             return [{'day': day, 'list': adapted_releases}]
         except Exception as e:
@@ -247,6 +251,36 @@ class APIAdapter:
             self.logger.error(f"Error in get_latest_releases: {e}")
             return {"error": str(e)}
 
+    def get_releases_list(self, release_ids: Sequence[int]):
+        """
+        Облегчённые релизы по списку id одним запросом /anime/releases/list, без догрузки бандлов.
+        Хватает для сверки updated/last_change перед полной загрузкой изменившихся.
+        """
+        try:
+            ids = [int(x) for x in release_ids]
+            if not ids:
+                return {"list": []}
+            data = self.client.get_releases_list(ids=ids, page=1, limit=len(ids))
+            if isinstance(data, dict) and "error" in data:
+                return data
+
+            releases = self._extract_releases(data)
+            adapted = [
+                self._enrich_and_adapt(
+                    r,
+                    fetch_episodes=False,
+                    fetch_torrents=False,
+                    fetch_team=False,
+                    fetch_franchises=False,
+                    allow_network=False,
+                )
+                for r in releases
+            ]
+            return {"list": adapted}
+        except Exception as e:
+            self.logger.error(f"Error in get_releases_list: {e}")
+            return {"error": str(e)}
+
     def get_catalog_releases(self, *, page: int = 1, limit: int = 10, filters: Optional[Dict[str, Any]] = None, use_post: bool = False):
         try:
             data = self.client.get_catalog_releases(page=page, limit=limit, filters=filters, use_post=use_post)
@@ -323,23 +357,22 @@ class APIAdapter:
         """
         try:
             release_id = int(release.get('id') or 0)
-            lock = self._lock_for(release_id) if release_id else None
-
-            if lock:
-                lock.__enter__()
+            raw = release
 
-            try:
-                if allow_network and release_id:
-                    need = []
-                    if fetch_torrents:
-                        need.append("torrents")
-                    if fetch_team:
-                        need.append("members")
-                    if fetch_franchises:
-                        need.append("franchises")
-                    if fetch_episodes:
-                        need.append("episodes")
+            if allow_network and release_id:
+                need = []
+                if fetch_torrents:
+                    need.append("torrents")
+                if fetch_team:
+                    need.append("members")
+                if fetch_franchises:
+                    need.append("franchises")
+                if fetch_episodes:
+                    need.append("episodes")
 
+                # лок релиза держим только на время загрузки: mapper без состояния,
+                # маппинг параллельных бандлов друг другу не мешает
+                with self._lock_for(release_id):
                     raw = self.service.fetch_bundle(
                         release_id,
                         need=tuple(need) if need else (),
@@ -347,76 +380,21 @@ class APIAdapter:
                         prefer_embedded=True,
                         allow_network=True,
                     )
-                    if not raw or 'error' in raw:
-                        raw = release
-                else:
+                if not raw or 'error' in raw:
                     raw = release
 
-                # 2) Map base release
-                self.mapper.stream_video_host = None
-                adapted = self.mapper.adapt_structure(raw)
-
-                # 3) Episodes
-                if fetch_episodes:
-                    episodes_raw = raw.get("episodes")
-                    # episodes может быть list или dict{list:[]}
-                    eps_list = self.service._episodes_to_list(episodes_raw)
-                    if single_episode is not None:
-                        eps_list = [e for e in eps_list if int(e.get('ordinal') or 0) == int(single_episode)]
-
-                    if eps_list:
-                        adapted_episodes = [self.mapper.adapt_episode(ep) for ep in eps_list]
-                        adapted['player']['list'] = adapted_episodes
-                    else:
-                        adapted['player']['list'] = []
-
-                    adapted['player']['host'] = self.mapper.stream_video_host
-
-                # 4) Torrents
-                if fetch_torrents:
-                    torrents_raw = raw.get("torrents")
-                    t_list = []
-                    if isinstance(torrents_raw, dict):
-                        t_list = torrents_raw.get("list") or []
-                    elif isinstance(torrents_raw, list):
-                        t_list = torrents_raw
-                    if t_list:
-                        adapted['torrents']['list'] = [self.mapper.adapt_torrent(t) for t in t_list]
-                    else:
-                        adapted['torrents']['list'] = []
-
-                # 5) Team (members)
-                if fetch_team:
-                    members_raw = raw.get("members") or []
-                    adapted['team'] = self.mapper.adapt_team(members_raw)
-
-                # 6) Franchises
-                if fetch_franchises:
-                    fr_raw = raw.get("franchises")
-                    fr_list = []
-                    if isinstance(fr_raw, dict):
-                        fr_list = [fr_raw]
-                    elif isinstance(fr_raw, list):
-                        fr_list = fr_raw
-                    adapted_fr = []
-                    for fr in fr_list:
-                        if not isinstance(fr, dict):
-                            continue
-                        mapped = self.mapper.adapt_franchise(fr)
-                        if mapped:
-                            adapted_fr.append(mapped)
-                    adapted['franchises'] = adapted_fr
-
-                return adapted
-
-            finally:
-                if lock:
-                    lock.__exit__(None, None, None)
+            return self.mapper.adapt_bundle(
+                raw,
+                fetch_episodes=fetch_episodes,
+                fetch_torrents=fetch_torrents,
+                fetch_team=fetch_team,
+                fetch_franchises=fetch_franchises,
+                single_episode=single_episode,
+            )
 
         except Exception as e:
             self.logger.error(f"Error enriching release {release.get('id')}: {e}", exc_info=True)
             try:
-                self.mapper.stream_video_host = None
                 return self.mapper.adapt_structure(release)
             except Exception:
                 return {'error': str(e)}
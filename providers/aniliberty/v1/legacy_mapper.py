@@ -1,15 +1,32 @@
 # legacy_mapper.py
 from __future__ import annotations
 
+import logging
 import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional
 
 from providers.aniliberty.v1.xml_parser import parse_torrents_rss
 
 
+_EMPTY: Dict[str, Any] = {}
+_TZ_SUFFIX_RE = re.compile(r"[+-]\d{2}:\d{2}$")
+# scheme://host/path (query уже отрезан): group(1) — host, group(2) — путь
+_ABS_URL_RE = re.compile(r"^.*?://([^/]*)(/.*)?$", re.DOTALL)
+
+
 @dataclass
+class MappingContext:
+    """
+    Состояние ОДНОГО вызова адаптации релиза.
+    stream_video_host — host (без схемы) первой ссылки эпизода; раньше жил в самом mapper'е.
+    """
+    stream_video_host: Optional[str] = None
+
+
+@dataclass(frozen=True)
 class LegacyMapper:
     """
     Pure mapping layer: raw AniLibria v1 -> legacy структура.
@@ -17,60 +34,136 @@ class LegacyMapper:
     Принципы:
     - НИКАКОЙ сети здесь нет
     - Mapper принимает RAW структуры и превращает в то, что ждёт старый код.
-    - normalize_episode_url() сохраняет host (без схемы) в stream_video_host
+    - Состояния между вызовами нет: host стрима копится в MappingContext вызова,
+      поэтому один экземпляр можно звать из пула потоков или процессов (см. adapt_bundles).
+    - normalize_episode_url() сохраняет host (без схемы) в ctx.stream_video_host
       и возвращает ТОЛЬКО путь (как в старом API).
     """
     logger: Any
-    stream_video_host = "cache.libria.fun"
     api_version = "v1"
 
+    # =========================
+    # Full bundle mapping
+    # =========================
+    def adapt_bundle(
+        self,
+        raw: Dict[str, Any],
+        *,
+        fetch_episodes: bool = True,
+        fetch_torrents: bool = True,
+        fetch_team: bool = True,
+        fetch_franchises: bool = True,
+        single_episode: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """RAW релиз (с уже догруженными episodes/torrents/members/franchises) -> legacy."""
+        adapted = self.adapt_structure(raw)
+
+        if fetch_episodes:
+            eps_list = self.episodes_to_list(raw.get("episodes"))
+            if single_episode is not None:
+                eps_list = [e for e in eps_list if int(e.get('ordinal') or 0) == int(single_episode)]
+            ctx = MappingContext()
+            adapted['player']['list'] = [self.adapt_episode(ep, ctx) for ep in eps_list]
+            adapted['player']['host'] = ctx.stream_video_host
+
+        if fetch_torrents:
+            torrents_raw = raw.get("torrents")
+            if isinstance(torrents_raw, dict):
+                t_list = torrents_raw.get("list") or []
+            elif isinstance(torrents_raw, list):
+                t_list = torrents_raw
+            else:
+                t_list = []
+            adapted['torrents']['list'] = [self.adapt_torrent(t) for t in t_list]
+
+        if fetch_team:
+            adapted['team'] = self.adapt_team(raw.get("members") or [])
+
+        if fetch_franchises:
+            fr_raw = raw.get("franchises")
+            if isinstance(fr_raw, dict):
+                fr_list = [fr_raw]
+            elif isinstance(fr_raw, list):
+                fr_list = fr_raw
+            else:
+                fr_list = []
+            adapted_fr = []
+            for fr in fr_list:
+                if not isinstance(fr, dict):
+                    continue
+                mapped = self.adapt_franchise(fr)
+                if mapped:
+                    adapted_fr.append(mapped)
+            adapted['franchises'] = adapted_fr
+
+        return adapted
+
+    @staticmethod
+    def episodes_to_list(episodes: Any) -> list:
+        """None -> [], {"list": [...]} -> list, list -> list (как ReleaseBundleService._episodes_to_list)."""
+        if not episodes:
+            return []
+        if isinstance(episodes, list):
+            return episodes
+        if isinstance(episodes, dict):
+            lst = episodes.get("list")
+            if isinstance(lst, list):
+                return lst
+        return []
+
     # =========================
     # Base release mapping
     # =========================
     def adapt_structure(self, release: Dict[str, Any]) -> Dict[str, Any]:
         """Адаптирует базовую структуру релиза (максимально близко к твоему текущему адаптеру)."""
+        name = release.get('name') or _EMPTY
+        poster = release.get('poster') or _EMPTY
+        release_type = release.get('type') or _EMPTY
+        season = release.get('season') or _EMPTY
+        updated = self.to_timestamp(release.get('updated_at'))
+
         adapted = {
             'external_id': release.get('id'),
             'code': release.get('alias', ''),
             'provider': 'AniLiberty',
             'names': {
-                'ru': (release.get('name') or {}).get('main', ''),
-                'en': (release.get('name') or {}).get('english', ''),
-                'alternative': (release.get('name') or {}).get('alternative', '')
+                'ru': name.get('main', ''),
+                'en': name.get('english', ''),
+                'alternative': name.get('alternative', '')
             },
 
             'posters': {
                 'small': {
-                    'url': (release.get('poster') or {}).get('thumbnail', '')
+                    'url': poster.get('thumbnail', '')
                 },
                 'medium': {
-                    'url': (release.get('poster') or {}).get('preview', '')
+                    'url': poster.get('preview', '')
                 },
                 'original': {
-                    'url': (release.get('poster') or {}).get('src', '')
+                    'url': poster.get('src', '')
                 }
             },
 
             'status': self.map_status(release),
 
             'type': {
-                'description': (release.get('type') or {}).get('description', ''),
-                'string': (release.get('type') or {}).get('value', '')
+                'description': release_type.get('description', ''),
+                'string': release_type.get('value', '')
             },
 
             'season': {
                 'code': None,
-                'string': (release.get('season') or {}).get('value', ''),
-                'description': (release.get('season') or {}).get('description', ''),
+                'string': season.get('value', ''),
+                'description': season.get('description', ''),
                 'year': release.get('year'),
-                'week_day': (release.get('publish_day') or {}).get('value')
+                'week_day': (release.get('publish_day') or _EMPTY).get('value')
             },
 
             'description': release.get('description', '') or '',
             'announce': '',
 
-            'updated': self.to_timestamp(release.get('updated_at')),
-            'last_change': self.to_timestamp(release.get('updated_at')),
+            'updated': updated,
+            'last_change': updated,
 
             'in_favorites': release.get('added_in_users_favorites', 0),
 
@@ -165,25 +258,25 @@ class LegacyMapper:
     # =========================
     # Episode mapping
     # =========================
-    def adapt_episode(self, episode: Dict[str, Any]) -> Dict[str, Any]:
+    def adapt_episode(self, episode: Dict[str, Any], ctx: Optional[MappingContext] = None) -> Dict[str, Any]:
         episode_number = int(episode.get('ordinal') or 0)
         name = episode.get('name', '') or episode.get('name_english', '')
         if not name:
             name = f"Серия {episode_number}"
 
-        opening = episode.get('opening') or {}
-        ending = episode.get('ending') or {}
+        opening = episode.get('opening') or _EMPTY
+        ending = episode.get('ending') or _EMPTY
 
         skips = {
-            'opening': [opening.get('start', 0) if opening else 0, opening.get('stop', 0) if opening else 0],
-            'ending': [ending.get('start', 0) if ending else 0, ending.get('stop', 0) if ending else 0],
+            'opening': [opening.get('start', 0), opening.get('stop', 0)],
+            'ending': [ending.get('start', 0), ending.get('stop', 0)],
         }
 
-        hls_fhd = self.normalize_episode_url(episode.get('hls_1080', ''))
-        hls_hd = self.normalize_episode_url(episode.get('hls_720', ''))
-        hls_sd = self.normalize_episode_url(episode.get('hls_480', ''))
+        hls_fhd = self.normalize_episode_url(episode.get('hls_1080', ''), ctx)
+        hls_hd = self.normalize_episode_url(episode.get('hls_720', ''), ctx)
+        hls_sd = self.normalize_episode_url(episode.get('hls_480', ''), ctx)
 
-        preview_url = (episode.get('preview') or {}).get('src', '')
+        preview_url = (episode.get('preview') or _EMPTY).get('src', '')
 
         return {
             'episode': episode_number,
@@ -195,7 +288,8 @@ class LegacyMapper:
             'created_timestamp': self.to_timestamp(episode.get('updated_at'))
         }
 
-    def normalize_episode_url(self, url: str) -> str:
+    def normalize_episode_url(self, url: str, ctx: Optional[MappingContext] = None) -> str:
+        """Отрезает query и scheme://host; host запоминается в ctx (первый найденный)."""
         if not url:
             return ""
 
@@ -205,25 +299,17 @@ class LegacyMapper:
             if url_without_params.startswith("/"):
                 return url_without_params
 
-            scheme_split = url_without_params.split("://", 1)
-            if len(scheme_split) != 2:
+            match = _ABS_URL_RE.match(url_without_params)
+            if match is None:
                 return url_without_params
 
-            host_and_path = scheme_split[1]
+            host, normalized_path = match.group(1), match.group(2) or ""
 
-            if "/" in host_and_path:
-                host, path = host_and_path.split("/", 1)
-                normalized_path = "/" + path
-            else:
-                host, normalized_path = host_and_path, ""
-
-            if self.stream_video_host is None:
-                self.stream_video_host = host
-            elif self.stream_video_host != host and self.logger:
-                try:
-                    self.logger.warning(f"Different host detected: {host} (expected {self.stream_video_host})")
-                except Exception:
-                    pass
+            if ctx is not None:
+                if ctx.stream_video_host is None:
+                    ctx.stream_video_host = host
+                elif ctx.stream_video_host != host and self.logger:
+                    self.logger.warning(f"Different host detected: {host} (expected {ctx.stream_video_host})")
 
             return normalized_path
         except Exception as exc:
@@ -238,10 +324,14 @@ class LegacyMapper:
     # Torrent mapping
     # =========================
     def adapt_torrent(self, torrent: Dict[str, Any]) -> Dict[str, Any]:
-        self.logger.debug(f"Raw torrent data: {torrent}")
+        # ленивое форматирование: dict торрента не сериализуется, если DEBUG выключен
+        self.logger.debug("Raw torrent data: %s", torrent)
 
         description = torrent.get('description', '')
         torrent_hash = torrent.get('hash', '')
+        quality = torrent.get('quality', _EMPTY)
+        release = torrent.get('release')
+        size = torrent.get('size', 0)
 
         return {
             'torrent_id': torrent.get('id'),
@@ -251,16 +341,16 @@ class LegacyMapper:
                 'last': None
             },
             'quality': {
-                'string': torrent.get('quality', {}).get('description', ''),
-                'type': torrent.get('type', {}).get('value', ''),
-                'resolution': torrent.get('quality', {}).get('value', ''),
-                'encoder': torrent.get('codec', {}).get('value', '')
+                'string': quality.get('description', ''),
+                'type': torrent.get('type', _EMPTY).get('value', ''),
+                'resolution': quality.get('value', ''),
+                'encoder': torrent.get('codec', _EMPTY).get('value', '')
             },
             'leechers': torrent.get('leechers', 0),
             'seeders': torrent.get('seeders', 0),
             'downloads': torrent.get('completed_times', 0),
-            'total_size': torrent.get('size', 0),
-            'size_string': f"{torrent.get('size', 0) / (1024 ** 3):.2f} GB",
+            'total_size': size,
+            'size_string': f"{size / (1024 ** 3):.2f} GB",
             'url': f"/api/{self.api_version}/anime/torrents/{torrent_hash}/file",
             'magnet': torrent.get('magnet', ''),
             'uploaded_timestamp': self.to_timestamp(torrent.get('created_at')),
@@ -269,10 +359,10 @@ class LegacyMapper:
             'raw_base64_file': None,
             'label':  torrent.get('label', ''),
             'filename': torrent.get('filename', ''),
-            'episodes_total': torrent.get('release', {}).get('episodes_total', 0),
+            'episodes_total': (release if release is not None else _EMPTY).get('episodes_total', 0),
             'is_in_production': (
-                torrent.get('release', {}).get('is_in_production')
-                if isinstance(torrent.get('release'), dict)
+                release.get('is_in_production')
+                if isinstance(release, dict)
                 else torrent.get('is_in_production', False)
             ),
             'updated_at': self.to_timestamp(torrent.get('updated_at')),
@@ -311,22 +401,24 @@ class LegacyMapper:
             franchise_releases_list: list[dict] = []
 
             for item in franchise_releases:
-                rel = (item or {}).get('release', {}) or {}
+                rel = (item or _EMPTY).get('release', _EMPTY) or _EMPTY
+                rel_name = rel.get('name') or _EMPTY
+                rel_poster = rel.get('poster') or _EMPTY
                 release_dict = {
                     'id': rel.get('id'),
                     'code': rel.get('alias'),
                     'names': {
-                        'ru': (rel.get('name') or {}).get('main', ''),
-                        'en': (rel.get('name') or {}).get('english', ''),
-                        'alternative': (rel.get('name') or {}).get('alternative', '')
+                        'ru': rel_name.get('main', ''),
+                        'en': rel_name.get('english', ''),
+                        'alternative': rel_name.get('alternative', '')
                     },
                     'posters': {
-                        'small': {'url': (rel.get('poster') or {}).get('thumbnail', '')},
-                        'medium': {'url': (rel.get('poster') or {}).get('preview', '')},
-                        'original': {'url': (rel.get('poster') or {}).get('src', '')}
+                        'small': {'url': rel_poster.get('thumbnail', '')},
+                        'medium': {'url': rel_poster.get('preview', '')},
+                        'original': {'url': rel_poster.get('src', '')}
                     },
-                    'season': (rel.get('season') or {}).get('value'),
-                    'type': (rel.get('type') or {}).get('value'),
+                    'season': (rel.get('season') or _EMPTY).get('value'),
+                    'type': (rel.get('type') or _EMPTY).get('value'),
                     'year': rel.get('year'),
                     'updated': self.to_timestamp(rel.get('updated_at'))
                 }
@@ -361,7 +453,7 @@ class LegacyMapper:
             s = date_str
             if s.endswith('Z'):
                 s = s[:-1] + '+00:00'
-            if 'T' in s and not re.search(r"[+-]\d{2}:\d{2}$", s):
+            if 'T' in s and not _TZ_SUFFIX_RE.search(s):
                 # если нет явной TZ, добавим UTC
                 if not s.endswith('+00:00'):
                     s = s + '+00:00'
@@ -376,3 +468,23 @@ class LegacyMapper:
                 return int(dt.replace(tzinfo=timezone.utc).timestamp())
             except Exception:
                 return 0
+
+
+# Mapper без состояния — один экземпляр на процесс; для ProcessPoolExecutor нужен модульный callable
+_DEFAULT_MAPPER = LegacyMapper(logger=logging.getLogger(__name__))
+
+
+def _adapt_one(raw: Dict[str, Any], flags: Dict[str, Any]) -> Dict[str, Any]:
+    return _DEFAULT_MAPPER.adapt_bundle(raw, **flags)
+
+
+def adapt_bundles(raws: Iterable[Dict[str, Any]], *, executor=None, **flags) -> List[Dict[str, Any]]:
+    """
+    Адаптирует пачку RAW релизов, сохраняя порядок.
+    executor — любой concurrent.futures executor (пул бандлов или ProcessPoolExecutor); None — в текущем потоке.
+    flags — как у LegacyMapper.adapt_bundle.
+    """
+    raws = list(raws)
+    if executor is None:
+        return [_DEFAULT_MAPPER.adapt_bundle(raw, **flags) for raw in raws]
+    return list(executor.map(partial(_adapt_one, flags=flags), raws))
@@ -2,14 +2,23 @@
 """
 AniMedia provider package.
 """
+import importlib
 
-# Публичный API — полные пути
-from providers.animedia.v0.adapter import AniMediaAdapter
-from providers.animedia.v0.service import AniMediaService
-from providers.animedia.v0.repository import AniMediaRepository
-from providers.animedia.v0.client import AniMediaHttpClient
-from providers.animedia.v0.models import Title, Episode, TitleStatus, ScheduleItem
-from providers.animedia.v0.factory import create_animedia_adapter, create_adapter
+# Публичный API — полные пути. Импорт ленивый (PEP 562): адаптер тянет httpx и bs4,
+# а подмодулям вроде cache_manager пакет нужен без них (холодный старт приложения).
+_EXPORTS = {
+    "AniMediaAdapter": "providers.animedia.v0.adapter",
+    "AniMediaService": "providers.animedia.v0.service",
+    "AniMediaRepository": "providers.animedia.v0.repository",
+    "AniMediaHttpClient": "providers.animedia.v0.client",
+    "VlnkResolver": "providers.animedia.v0.vlnk_resolver",
+    "Title": "providers.animedia.v0.models",
+    "Episode": "providers.animedia.v0.models",
+    "TitleStatus": "providers.animedia.v0.models",
+    "ScheduleItem": "providers.animedia.v0.models",
+    "create_animedia_adapter": "providers.animedia.v0.factory",
+    "create_adapter": "providers.animedia.v0.factory",
+}
 
 __all__ = [
     # Public API
@@ -25,4 +34,18 @@ __all__ = [
     "AniMediaService",
     "AniMediaRepository",
     "AniMediaHttpClient",
-]
\ No newline at end of file
+    "VlnkResolver",
+]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,16 +1,21 @@
 # providers/animedia/v0/cache_manager.py
 import json
 import time
+import sqlite3
+import logging
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from enum import Enum, auto
-from typing import Any, Tuple, Optional, Generic, TypeVar
-from typing import Mapping, MutableMapping, Any
+from typing import Any, Tuple, Optional, Generic, TypeVar, Mapping
 
 
 ItemKey = str
 T = TypeVar("T")
 
+# Значение целиком (load/save) хранится как элемент с пустым item_id
+WHOLE_VALUE_ID = ""
+
 
 @dataclass(frozen=True)
 class AniMediaCacheConfig:
@@ -21,6 +26,14 @@ class AniMediaCacheConfig:
     vlink_ttl: int = 24 * 60 * 60   # 24h
     schedule_ttl: int = 1 * 60 * 60  # 1h
     all_titles_ttl: int = 24 * 60 * 60  # 24h
+    db_name: str = "am_cache.sqlite3"
+
+    def ttl_for(self, key: str) -> int:
+        return {
+            self.vlink_key: self.vlink_ttl,
+            self.schedule_key: self.schedule_ttl,
+            self.all_titles_key: self.all_titles_ttl,
+        }.get(key, 0)
 
 
 class AniMediaCacheStatus(Enum):
@@ -30,33 +43,98 @@ class AniMediaCacheStatus(Enum):
     SAVED = auto()
 
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_items (
+    key          TEXT    NOT NULL,
+    item_id      TEXT    NOT NULL,
+    last_updated INTEGER NOT NULL,
+    expires_at   INTEGER,              -- NULL: без срока
+    data         TEXT    NOT NULL,
+    PRIMARY KEY (key, item_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_cache_items_expires ON cache_items(expires_at) WHERE expires_at IS NOT NULL;
+"""
+
+
 class AniMediaCacheManager(Generic[T]):
-    """Файловый кэш с поддержкой произвольных TTL."""
+    """
+    Кэш AniMedia в SQLite (<base_dir>/am_cache.sqlite3): элемент читается и пишется по ключу
+    (key, item_id) без разбора всего файла, upsert не теряет параллельные записи.
+
+    Одно соединение на менеджер под Lock: вызовы приходят из event loop и пулов,
+    каждая операция — микросекунды (PK-lookup), блокировка не заметна.
+    Срок жизни хранится в expires_at (индекс), просроченное удаляет purge_expired().
+    Старые JSON-файлы кэша один раз импортируются при открытии.
+    """
 
-    def __init__(self, base_dir: Path):
+    def __init__(self, base_dir: Path, logger: logging.Logger | None = None):
         self.cfg = AniMediaCacheConfig(base_dir=base_dir)
         self.base_dir = base_dir
         self.base_dir.mkdir(parents=True, exist_ok=True)
-
-    def _file(self, key: str) -> Path:
-        safe = key.replace("/", "_")
-        return self.base_dir / f"{safe}.json"
-
-    def _serialize_items(self, items: Mapping[ItemKey, dict]) -> str:
-        return json.dumps({"items": items}, ensure_ascii=False, indent=2)
-
-    def _serialize(self, key: str | None, ts: int | None, data: T) -> str:
-        payload = {
-            "key": str(key) if key is not None else "",
-            "last_updated": int(time.time()) if ts is None else ts,
-            "data": data,
-        }
-        return json.dumps(payload, ensure_ascii=False, indent=2)
-
-    def _write_atomic(self, path: Path, content: str) -> None:
-        tmp_path = path.with_suffix(".tmp")
-        tmp_path.write_text(content, encoding="utf-8")
-        tmp_path.replace(path)
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.base_dir / self.cfg.db_name),
+            check_same_thread=False,
+            isolation_level=None,  # autocommit; пачки — явный BEGIN IMMEDIATE
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate_json_files()
+        self.purge_expired()
+
+    # ── internals ──────────────────────────────────────────────
+
+    def _expires_at(self, key: str, now: int, ttl: Optional[int]) -> Optional[int]:
+        ttl = self.cfg.ttl_for(key) if ttl is None else ttl
+        return now + ttl if ttl and ttl > 0 else None
+
+    def _put_many(self, key: str, items: Mapping[ItemKey, Any], ttl: Optional[int] = None,
+                  ts: Optional[int] = None) -> None:
+        now = int(time.time())
+        stamp = now if ts is None else ts
+        rows = [
+            (key, str(item_id), stamp, self._expires_at(key, stamp, ttl), json.dumps(data, ensure_ascii=False))
+            for item_id, data in items.items()
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO cache_items (key, item_id, last_updated, expires_at, data) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key, item_id) DO UPDATE SET "
+                    "last_updated = excluded.last_updated, expires_at = excluded.expires_at, data = excluded.data",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _get(self, key: str, item_id: ItemKey) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT last_updated, data FROM cache_items WHERE key = ? AND item_id = ?", (key, item_id)
+            ).fetchone()
+
+    def _migrate_json_files(self) -> None:
+        """Однократный импорт <key>.json прежнего файлового кэша; файл переименовывается в *.migrated."""
+        for path in self.base_dir.glob("am_*.json"):
+            key = path.stem
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8"))
+                if "items" in raw:
+                    for item_id, entry in raw["items"].items():
+                        self._put_many(key, {item_id: entry.get("data")}, ts=int(entry.get("last_updated", 0)))
+                elif "data" in raw:
+                    self._put_many(key, {WHOLE_VALUE_ID: raw["data"]}, ts=int(raw.get("last_updated", 0)))
+                path.replace(path.with_name(path.name + ".migrated"))
+                self.logger.info(f"AniMedia cache: imported {path.name} into {self.cfg.db_name}")
+            except Exception as exc:
+                self.logger.warning(f"AniMedia cache: failed to import {path.name}: {exc}")
+
+    # ── public API ─────────────────────────────────────────────
 
     def is_nonempty(self, data: Any) -> bool:
         if data is None:
@@ -81,17 +159,11 @@ class AniMediaCacheManager(Generic[T]):
         return None
 
     def load_item(self, key: str, item_id: ItemKey, ttl: int) -> Tuple[AniMediaCacheStatus, Optional[T]]:
-        p = self._file(key)
-        if not p.is_file():
-            return AniMediaCacheStatus.MISSING, None
-
         try:
-            raw = json.loads(p.read_text(encoding="utf-8"))
-            entry = raw.get("items", {}).get(item_id)
-            if entry is None:
+            row = self._get(key, item_id)
+            if row is None:
                 return AniMediaCacheStatus.MISSING, None
-            ts = entry.get("last_updated", 0)
-            data = entry.get("data")
+            ts, data = row[0], json.loads(row[1])
         except Exception:
             return AniMediaCacheStatus.MISSING, None
 
@@ -100,30 +172,20 @@ class AniMediaCacheManager(Generic[T]):
         return AniMediaCacheStatus.VALID, data
 
     def load(self, key: str, ttl: int) -> Tuple[AniMediaCacheStatus, Optional[T]]:
-        p = self._file(key)
-        if not p.is_file():
-            return AniMediaCacheStatus.MISSING, None
         try:
-            raw = json.loads(p.read_text(encoding="utf-8"))
-            if "last_updated" in raw and "data" in raw:
-                ts, data = raw["last_updated"], raw["data"]
-            elif "items" in raw:
-                ts = None
-                data = raw
-            else:
+            row = self._get(key, WHOLE_VALUE_ID)
+            if row is None:
                 return AniMediaCacheStatus.MISSING, None
+            ts, data = row[0], json.loads(row[1])
         except Exception:
             return AniMediaCacheStatus.MISSING, None
-        if ts is not None:
-            if 0 < ttl <= int(time.time()) - ts:
-                return AniMediaCacheStatus.EXPIRED, data
+        if 0 < ttl <= int(time.time()) - ts:
+            return AniMediaCacheStatus.EXPIRED, data
         return AniMediaCacheStatus.VALID, data
 
-    def save(self, key: str, data: T) -> AniMediaCacheStatus:
-        path = self._file(key)
+    def save(self, key: str, data: T, ttl: Optional[int] = None) -> AniMediaCacheStatus:
         try:
-            serialized = self._serialize(key=key, ts=None, data=data)
-            self._write_atomic(path, serialized)
+            self._put_many(key, {WHOLE_VALUE_ID: data}, ttl)
         except Exception as exc:
             raise IOError(f"Failed to write cache for key {key!r}") from exc
         return AniMediaCacheStatus.SAVED
@@ -134,43 +196,43 @@ class AniMediaCacheManager(Generic[T]):
         """
         return self.save_item(self.cfg.vlink_key, original_id, vlink_dict)
 
-    def save_item(self, key: str, item_id: ItemKey, data: T) -> AniMediaCacheStatus:
-        path = self._file(key)
+    def save_item(self, key: str, item_id: ItemKey, data: T, ttl: Optional[int] = None) -> AniMediaCacheStatus:
+        return self.save_items(key, {item_id: data}, ttl)
 
+    def save_items(self, key: str, items: Mapping[ItemKey, T], ttl: Optional[int] = None) -> AniMediaCacheStatus:
+        """Атомарная запись пачки элементов одной транзакцией."""
         try:
-            raw = json.loads(path.read_text(encoding="utf-8")) if path.is_file() else {}
-            items: MutableMapping[ItemKey, dict] = raw.get("items", {})
-        except Exception:
-            items = {}
-
-        items[item_id] = {"last_updated": int(time.time()), "data": data}
-
-        try:
-            self._write_atomic(path, self._serialize_items(items))
+            self._put_many(key, items, ttl)
         except Exception as exc:
             raise IOError(f"Failed to write cache for key {key!r}") from exc
         return AniMediaCacheStatus.SAVED
 
     def invalidate_item(self, key: str, item_id: ItemKey) -> AniMediaCacheStatus:
-        path = self._file(key)
         try:
-            raw = json.loads(path.read_text(encoding="utf-8")) if path.is_file() else {}
-            items: MutableMapping[ItemKey, dict] = raw.get("items", {})
-
-            if item_id not in items:
-                return AniMediaCacheStatus.EXPIRED
-
-            if item_id in items:
-                items.pop(item_id, None)
-                self._write_atomic(path, self._serialize_items(items))
+            with self._lock:
+                self._conn.execute("DELETE FROM cache_items WHERE key = ? AND item_id = ?", (key, item_id))
             return AniMediaCacheStatus.EXPIRED
         except Exception as exc:
             raise IOError(f"Failed to invalidate item {item_id!r} in key {key!r}") from exc
 
     def invalidate_cache(self, key: str) -> AniMediaCacheStatus:
-        path = self._file(key)
         try:
-            path.unlink(missing_ok=True)
+            with self._lock:
+                self._conn.execute("DELETE FROM cache_items WHERE key = ?", (key,))
             return AniMediaCacheStatus.EXPIRED
         except Exception as exc:
-            raise IOError(f"Failed to invalidate cache for key {key!r}: {exc}") from exc
\ No newline at end of file
+            raise IOError(f"Failed to invalidate cache for key {key!r}: {exc}") from exc
+
+    def purge_expired(self, now: Optional[int] = None) -> int:
+        """Удалить всё с истёкшим expires_at (range scan по индексу). Возвращает число строк."""
+        now = int(time.time()) if now is None else now
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM cache_items WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        if cur.rowcount:
+            self.logger.debug(f"AniMedia cache: purged {cur.rowcount} expired items")
+        return cur.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,195 @@
+# providers/animedia/v0/catalog_store.py
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Iterable
+
+# Тот же файл, что у AniMediaCacheManager: один SQLite на кэш провайдера
+DB_NAME = "am_cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_pages (
+    source      TEXT    NOT NULL,      -- 'catalog' | 'schedule'
+    page        INTEGER NOT NULL,
+    fingerprint TEXT    NOT NULL,      -- хеш всех строк страницы
+    first_key   TEXT,
+    last_key    TEXT,
+    title_count INTEGER NOT NULL,
+    fetched_at  INTEGER NOT NULL,
+    PRIMARY KEY (source, page)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS catalog_titles (
+    source     TEXT    NOT NULL,
+    title_key  TEXT    NOT NULL,       -- ссылка на тайтл (или хеш строки, если ссылки нет)
+    page       INTEGER NOT NULL,
+    position   INTEGER NOT NULL,
+    row_hash   TEXT    NOT NULL,
+    row        TEXT    NOT NULL,       -- строка парсера 'title·meta·…·link'
+    first_seen INTEGER NOT NULL,
+    seen_at    INTEGER NOT NULL,
+    PRIMARY KEY (source, title_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_catalog_titles_order ON catalog_titles(source, page, position);
+CREATE INDEX IF NOT EXISTS ix_catalog_titles_seen ON catalog_titles(source, seen_at);
+"""
+
+
+@dataclass(frozen=True)
+class PageState:
+    page: int
+    fingerprint: str
+    first_key: Optional[str]
+    last_key: Optional[str]
+    title_count: int
+    fetched_at: int
+
+
+class AniMediaCatalogStore:
+    """
+    Локальная индексированная копия каталога/расписания AniMedia для инкрементального обхода:
+    отпечатки страниц (catalog_pages) и строки тайтлов (catalog_titles) в порядке сайта.
+    """
+
+    def __init__(self, base_dir: Path):
+        base_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(base_dir / DB_NAME), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def page_state(self, source: str, page: int) -> Optional[PageState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page, fingerprint, first_key, last_key, title_count, fetched_at "
+                "FROM catalog_pages WHERE source = ? AND page = ?", (source, page)).fetchone()
+        return PageState(*row) if row else None
+
+    def max_page(self, source: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(page) FROM catalog_pages WHERE source = ?", (source,)).fetchone()
+        return row[0] or 0
+
+    def page_keys(self, source: str, first_page: int, last_page: int) -> list[str]:
+        with self._lock:
+            return [key for (key,) in self._conn.execute(
+                "SELECT title_key FROM catalog_titles WHERE source = ? AND page BETWEEN ? AND ?",
+                (source, first_page, last_page))]
+
+    def known_hashes(self, source: str, keys: Iterable[str]) -> dict[str, str]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT title_key, row_hash FROM catalog_titles WHERE source = ? "
+                f"AND title_key IN ({','.join('?' * len(keys))})", (source, *keys)).fetchall()
+        return dict(rows)
+
+    def save_page(self, source: str, state: PageState, rows: list[tuple[str, str, str]]) -> None:
+        """rows: (title_key, row_hash, row) в порядке страницы. Страница и её тайтлы — одна транзакция."""
+        now = state.fetched_at
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO catalog_pages "
+                    "(source, page, fingerprint, first_key, last_key, title_count, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (source, state.page, state.fingerprint, state.first_key, state.last_key,
+                     state.title_count, state.fetched_at))
+                self._conn.executemany(
+                    "INSERT INTO catalog_titles "
+                    "(source, title_key, page, position, row_hash, row, first_seen, seen_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(source, title_key) DO UPDATE SET page = excluded.page, "
+                    "position = excluded.position, row_hash = excluded.row_hash, row = excluded.row, "
+                    "seen_at = excluded.seen_at",
+                    [(source, key, state.page, pos, row_hash, row, now, now)
+                     for pos, (key, row_hash, row) in enumerate(rows)])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def touch_page(self, source: str, page: int, fetched_at: Optional[int] = None) -> None:
+        """Страница не изменилась: обновить только время проверки."""
+        with self._lock:
+            self._conn.execute("UPDATE catalog_pages SET fetched_at = ? WHERE source = ? AND page = ?",
+                               (fetched_at or int(time.time()), source, page))
+
+    def count(self, source: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM catalog_titles WHERE source = ?", (source,)).fetchone()[0]
+
+    def rows(self, source: str, limit: Optional[int] = None) -> list[tuple[int, str]]:
+        """(page, row) в порядке сайта — range scan по ix_catalog_titles_order."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT page, row FROM catalog_titles WHERE source = ? ORDER BY page, position LIMIT ?",
+                (source, -1 if limit is None else limit)).fetchall()
+
+    def settle_displaced(self, source: str, first_page: int, last_page: int, seen_keys: Iterable[str]) -> int:
+        """
+        Обход остановился на last_page: тайтлы перечитанных страниц, которых он не встретил, сдвинуты
+        вниз новыми — переносятся в начало страницы last_page + 1 (перед её строками, в прежнем порядке),
+        иначе их старые (page, position) совпали бы с только что записанными.
+        """
+        seen = json.dumps(list(seen_keys))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                displaced = [key for (key,) in self._conn.execute(
+                    "SELECT title_key FROM catalog_titles WHERE source = ? AND page BETWEEN ? AND ? "
+                    "AND title_key NOT IN (SELECT value FROM json_each(?)) ORDER BY page, position",
+                    (source, first_page, last_page, seen))]
+                if displaced:
+                    head = self._conn.execute(
+                        "SELECT MIN(position) FROM catalog_titles WHERE source = ? AND page = ?",
+                        (source, last_page + 1)).fetchone()[0]
+                    start = (head if head is not None else 0) - len(displaced)
+                    self._conn.executemany(
+                        "UPDATE catalog_titles SET page = ?, position = ? WHERE source = ? AND title_key = ?",
+                        [(last_page + 1, start + i, source, key) for i, key in enumerate(displaced)])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(displaced)
+
+    def prune_missing(self, source: str, seen_keys: Iterable[str], last_page: int) -> int:
+        """Полный обход: удалить тайтлы, которых на сайте больше нет, и страницы за концом списка."""
+        seen = json.dumps(list(seen_keys))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                pruned = self._conn.execute(
+                    "DELETE FROM catalog_titles WHERE source = ? "
+                    "AND title_key NOT IN (SELECT value FROM json_each(?))", (source, seen)).rowcount
+                self._conn.execute("DELETE FROM catalog_pages WHERE source = ? AND page > ?", (source, last_page))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return pruned
+
+    def prune_unseen(self, source: str, before: int) -> int:
+        """Удалить тайтлы, не встречавшиеся при обходе с момента `before` (пропали с сайта)."""
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM catalog_titles WHERE source = ? AND seen_at < ?", (source, before)).rowcount
+
+    def clear(self, source: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM catalog_pages WHERE source = ?", (source,))
+            self._conn.execute("DELETE FROM catalog_titles WHERE source = ?", (source,))
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
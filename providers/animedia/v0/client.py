@@ -1,16 +1,12 @@
 # providers/animedia/v0/client.py
-import asyncio
 import logging
 import re
 from typing import Optional
 from urllib.parse import urlparse
 
 from .transport import HttpxTransport
-from .retry_manager import retry_async
+from .vlnk_resolver import DeadVlnkError
 
-CONCURRENCY = 8
-BATCH_SIZE = 30
-INTER_BATCH_DELAY = 1.5
 IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".svg"}
 
 
@@ -44,6 +40,10 @@ class AniMediaHttpClient:
     # Basic HTTP operations
     # ══════════════════════════════════════════════════════════
 
+    def pooled(self):
+        """Контекст с общим пулом соединений для серии запросов (обход каталога)."""
+        return self._transport.pooled()
+
     async def get_page(self, url: str) -> str:
         """GET запрос, возвращает HTML."""
         return await self._transport.get(url)
@@ -74,68 +74,30 @@ class AniMediaHttpClient:
     # VLNK resolution
     # ══════════════════════════════════════════════════════════
 
-    async def resolve_vlnks(self, vlnk_urls: list[str]) -> list[str]:
-        """
-        Resolve multiple vlnk URLs to actual file URLs.
-        Handles concurrency, batching, and rate limiting.
-        """
-        # Filter and normalize URLs
-        valid_urls = [
+    def normalize_vlnks(self, vlnk_urls: list[str]) -> list[str]:
+        """Абсолютные URL без картинок-заглушек, порядок сохраняется."""
+        urls = [
             self._ensure_absolute_url(u)
             for u in vlnk_urls
             if u and not self._is_image_placeholder(u)
         ]
-        valid_urls = [u for u in valid_urls if u]
-
-        if not valid_urls:
-            return []
-
-        self._logger.info(f"Resolving {len(valid_urls)} vlnk URLs")
-
-        # Separate m3u8 (need resolution) from direct links
-        m3u8_urls = [u for u in valid_urls if "aser.pro" in u]
-        direct_urls = [u for u in valid_urls if "aser.pro" not in u]
-
-        results: list[str] = []
-
-        # Process m3u8 URLs with batching
-        semaphore = asyncio.Semaphore(CONCURRENCY)
-
-        async def limited_resolve(url: str) -> Optional[str]:
-            async with semaphore:
-                return await self._resolve_single_vlnk(url)
+        return [u for u in urls if u]
 
-        for i in range(0, len(m3u8_urls), BATCH_SIZE):
-            batch = m3u8_urls[i:i + BATCH_SIZE]
-            self._logger.debug(f"Processing batch {i // BATCH_SIZE + 1}")
-
-            batch_results = await asyncio.gather(
-                *(limited_resolve(u) for u in batch),
-                return_exceptions=True,
-            )
-
-            for result in batch_results:
-                if isinstance(result, str) and result:
-                    results.append(result)
-
-            if i + BATCH_SIZE < len(m3u8_urls):
-                await asyncio.sleep(INTER_BATCH_DELAY)
-
-        # Add direct URLs as-is
-        results.extend(direct_urls)
-
-        self._logger.info(f"Resolved {len(results)} file URLs")
-        return results
+    @staticmethod
+    def needs_resolution(url: str) -> bool:
+        """m3u8-плеер aser.pro отдаёт файл только через свою страницу, остальные ссылки прямые."""
+        return "aser.pro" in url
 
-    @retry_async(max_tries=5, base_delay=2.0)
-    async def _resolve_single_vlnk(self, vlnk_url: str) -> Optional[str]:
-        """Resolve single vlnk to actual file URL."""
+    async def fetch_vlnk_file(self, vlnk_url: str) -> str:
+        """
+        Один запрос: vlnk -> URL файла. Повторы, темп и кэш — в VlnkResolver.
+        Raises DeadVlnkError, если страница получена, но file в ней нет.
+        """
         html = await self._transport.get(vlnk_url)
 
-        # Extract file URL from response
         match = re.search(r'file\s*[:=]\s*["\']([^"\']+)["\']', html)
         if not match:
-            raise ValueError(f"file not found in response for {vlnk_url}")
+            raise DeadVlnkError(f"file not found in response for {vlnk_url}")
 
         return match.group(1)
 
@@ -0,0 +1,189 @@
+# providers/animedia/v0/crawler.py
+"""
+Инкрементальный обход постраничных списков AniMedia (каталог, расписание).
+
+Каталог отсортирован по обновлению: новые и обновлённые тайтлы появляются на первых страницах,
+остальные лишь сдвигаются. Поэтому страница считается изменённой, только если на ней есть
+незнакомый тайтл или строка известного тайтла поменялась (новая серия, рейтинг);
+сдвиг уже известных строк изменением не считается. После `stop_after_unchanged` неизменённых
+страниц подряд обход останавливается — ежедневное обновление трогает несколько первых страниц.
+Строки, вытесненные с перечитанных страниц, переносятся на следующую (settle_displaced);
+полный обход до конца списка удаляет тайтлы, которых на сайте больше нет (prune_missing).
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from .catalog_store import AniMediaCatalogStore, PageState
+
+SEPARATOR = "·"
+STOP_AFTER_UNCHANGED = 2
+WAVE_SIZE = 3
+
+FetchRows = Callable[[int], Awaitable[list[str]]]
+
+
+def row_key(row: str) -> str:
+    """Ключ тайтла: ссылка (последнее поле строки парсера), иначе хеш строки."""
+    last = row.rsplit(SEPARATOR, 1)[-1]
+    if last.startswith(("http://", "https://")):
+        return last
+    return _hash(row)
+
+
+def _hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+@dataclass
+class CrawlReport:
+    source: str
+    pages_fetched: int = 0
+    pages_changed: int = 0
+    new_titles: int = 0
+    updated_titles: int = 0
+    displaced_titles: int = 0
+    pruned_titles: int = 0
+    stopped_early: bool = False
+    elapsed_ms: float = 0.0
+
+    def line(self) -> str:
+        return (f"crawl {self.source}: pages={self.pages_fetched} changed={self.pages_changed} "
+                f"new={self.new_titles} updated={self.updated_titles} displaced={self.displaced_titles} "
+                f"pruned={self.pruned_titles} "
+                f"{'stopped early ' if self.stopped_early else ''}in {self.elapsed_ms:.0f} ms")
+
+
+class CatalogCrawler:
+    """Обход страниц волнами по `wave_size` (ограниченная конкурентность) с записью в AniMediaCatalogStore."""
+
+    def __init__(self, store: AniMediaCatalogStore, logger: logging.Logger | None = None,
+                 stop_after_unchanged: int = STOP_AFTER_UNCHANGED):
+        self.store = store
+        self.stop_after_unchanged = stop_after_unchanged
+        self._logger = logger or logging.getLogger(__name__)
+
+    def is_fresh(self, source: str, first_page: int, ttl: int, need: int) -> bool:
+        state = self.store.page_state(source, first_page)
+        return (state is not None and int(time.time()) - state.fetched_at < ttl
+                and self.store.count(source) >= need)
+
+    def grouped(self, source: str, limit: Optional[int] = None) -> list[dict]:
+        """Формат адаптера: [{"page": int, "titles": [row, ...]}, ...]."""
+        out: list[dict] = []
+        for page, row in self.store.rows(source, limit):
+            if not out or out[-1]["page"] != page:
+                out.append({"page": page, "titles": []})
+            out[-1]["titles"].append(row)
+        return out
+
+    async def crawl(
+            self,
+            source: str,
+            fetch_rows: FetchRows,
+            total_pages: int,
+            need: int,
+            *,
+            first_page: int = 1,
+            wave_size: int = WAVE_SIZE,
+            prefetched: Optional[dict[int, list[str]]] = None,
+    ) -> CrawlReport:
+        """
+        Страницы first_page..total_pages по порядку. Остановка, когда в хранилище >= need тайтлов и
+        либо подряд stop_after_unchanged неизменённых страниц, либо пройдена глубина прошлого обхода.
+        Если тайтлов меньше need, а первая страница не изменилась (ничего не сдвинулось), обход
+        продолжается со страницы после уже прочитанных, без повторного чтения известных.
+        """
+        start = time.perf_counter()
+        report = CrawlReport(source)
+        prefetched = dict(prefetched or {})
+        known_depth = self.store.max_page(source)
+        unchanged_run = 0
+        page = first_page
+        last_page = first_page - 1
+        seen: set[str] = set()
+
+        async def get(p: int) -> list[str]:
+            if p in prefetched:
+                return prefetched.pop(p)
+            return await fetch_rows(p)
+
+        if first_page < known_depth < total_pages and self.store.count(source) < need:
+            rows = await get(first_page)
+            report.pages_fetched += 1
+            last_page = first_page
+            page = first_page + 1
+            if self._apply(source, first_page, rows, report, seen):
+                report.pages_changed += 1
+            elif rows:
+                # голова та же — страницы до known_depth считаем прочитанными
+                seen.update(self.store.page_keys(source, first_page + 1, known_depth))
+                page = known_depth + 1
+                last_page = known_depth
+
+        while page <= total_pages:
+            wave = list(range(page, min(page + max(1, wave_size), total_pages + 1)))
+            results = await asyncio.gather(*(get(p) for p in wave))
+            report.pages_fetched += len(wave)
+
+            stop = False
+            for p, rows in zip(wave, results):
+                if not rows and p > first_page:  # пустая страница — конец списка
+                    stop = True
+                    break
+                last_page = p
+                if self._apply(source, p, rows, report, seen):
+                    report.pages_changed += 1
+                    unchanged_run = 0
+                else:
+                    unchanged_run += 1
+
+            page = wave[-1] + 1
+            if stop:
+                break
+            if self.store.count(source) >= need and (
+                    unchanged_run >= self.stop_after_unchanged or page > known_depth):
+                report.stopped_early = page <= total_pages
+                break
+
+        if report.stopped_early:
+            report.displaced_titles = self.store.settle_displaced(source, first_page, last_page, seen)
+        else:
+            report.pruned_titles = self.store.prune_missing(source, seen, last_page)
+        report.elapsed_ms = (time.perf_counter() - start) * 1000
+        self._logger.info(report.line())
+        return report
+
+    def _apply(self, source: str, page: int, rows: list[str], report: CrawlReport, seen: set[str]) -> bool:
+        """Сохранить страницу; True, если на ней есть новые или изменённые тайтлы. Ключи страницы — в seen."""
+        now = int(time.time())
+        keyed = list({row_key(r): r for r in rows}.items())
+        seen.update(k for k, _ in keyed)
+        fingerprint = _hash("\n".join(rows))
+
+        previous = self.store.page_state(source, page)
+        if previous is not None and previous.fingerprint == fingerprint:
+            self.store.touch_page(source, page, now)
+            return False
+
+        known = self.store.known_hashes(source, (k for k, _ in keyed))
+        entries = []
+        changed = False
+        for key, row in keyed:
+            row_hash = _hash(row)
+            old = known.get(key)
+            if old is None:
+                report.new_titles += 1
+                changed = True
+            elif old != row_hash:
+                report.updated_titles += 1
+                changed = True
+            entries.append((key, row_hash, row))
+
+        first_key, last_key = (keyed[0][0], keyed[-1][0]) if keyed else (None, None)
+        state = PageState(page, fingerprint, first_key, last_key, len(keyed), now)
+        self.store.save_page(source, state, entries)
+        return changed
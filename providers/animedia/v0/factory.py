@@ -10,6 +10,9 @@ from .client import AniMediaHttpClient
 from .transport import HttpxTransport
 from .parser import AniMediaParser
 from .cache_manager import AniMediaCacheManager, AniMediaCacheConfig
+from .vlnk_resolver import VlnkResolver, AdaptiveRateLimiter
+from .catalog_store import AniMediaCatalogStore
+from .crawler import CatalogCrawler
 
 
 def create_animedia_adapter(
@@ -54,6 +57,7 @@ def create_animedia_adapter(
 
     cache_cfg = AniMediaCacheConfig(base_dir=cache_dir)
     cache = AniMediaCacheManager(base_dir=cache_dir)
+    catalog_store = AniMediaCatalogStore(base_dir=cache_dir)
 
     # 2. Data layer
     http_client = AniMediaHttpClient(
@@ -67,18 +71,28 @@ def create_animedia_adapter(
         logger=log,
     )
 
+    resolver = VlnkResolver(
+        fetch=http_client.fetch_vlnk_file,
+        cache=cache,
+        limiter=AdaptiveRateLimiter(),
+        logger=log,
+    )
+
     repository = AniMediaRepository(
         http_client=http_client,
         cache=cache,
         parser=parser,
         cache_cfg=cache_cfg,
         logger=log,
+        resolver=resolver,
+        catalog_store=catalog_store,
     )
 
     # 3. Business layer
     service = AniMediaService(
         repository=repository,
         logger=log,
+        crawler=CatalogCrawler(catalog_store, logger=log),
     )
 
     # 4. API layer
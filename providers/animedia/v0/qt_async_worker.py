@@ -1,5 +1,4 @@
 # providers/animedia/v0/qt_async_worker.py
-import asyncio
 import logging
 from typing import Callable, Any
 from PyQt5.QtCore import QThread, pyqtSignal
@@ -39,6 +38,9 @@ class AsyncWorker(QThread):
         Выполняется в отдельном OS‑потоке. Здесь создаём собственный
         asyncio‑loop, запускаем корутину и передаём результат в сигналы.
         """
+        import asyncio  # не на старте приложения: модуль импортируется вместе с app.qt.app
+
+        loop = None
         try:
             self.logger.info("Animedia async worker started…")
             # каждый поток получает свой цикл
@@ -61,4 +63,5 @@ class AsyncWorker(QThread):
 
         finally:
             # важно закрыть цикл, иначе будет утечка ресурсов
-            loop.close()
+            if loop is not None:
+                loop.close()
@@ -2,10 +2,12 @@
 import logging
 from typing import Optional, Any
 
-from .cache_manager import AniMediaCacheManager, AniMediaCacheConfig, AniMediaCacheStatus
+from .cache_manager import AniMediaCacheManager, AniMediaCacheConfig
+from .catalog_store import AniMediaCatalogStore
 from .client import AniMediaHttpClient
 from .parser import AniMediaParser
 from .models import Title, Episode, TitleStatus
+from .vlnk_resolver import VlnkResolver
 from .legacy_mapper import (
     extract_id_from_url,
     extract_video_host,
@@ -28,12 +30,24 @@ class AniMediaRepository:
             parser: AniMediaParser,
             cache_cfg: AniMediaCacheConfig,
             logger: logging.Logger | None = None,
+            resolver: VlnkResolver | None = None,
+            catalog_store: AniMediaCatalogStore | None = None,
     ):
         self._http = http_client
         self._cache = cache
         self._parser = parser
         self._cfg = cache_cfg
         self._logger = logger or logging.getLogger(__name__)
+        self._resolver = resolver or VlnkResolver(http_client.fetch_vlnk_file, cache, logger=self._logger)
+        self.catalog_store = catalog_store or AniMediaCatalogStore(cache.base_dir)
+
+    @property
+    def cache_cfg(self) -> AniMediaCacheConfig:
+        return self._cfg
+
+    def pooled_http(self):
+        """Общий пул соединений на время обхода страниц (см. HttpxTransport.pooled)."""
+        return self._http.pooled()
 
     # ══════════════════════════════════════════════════════════
     # Title operations
@@ -67,17 +81,25 @@ class AniMediaRepository:
             file_urls = list(cached.values())
         else:
             # Fetch from network
-            vlnk_urls = self._parser.parse_episode_files(html)
+            vlnk_urls = self._http.normalize_vlnks(self._parser.parse_episode_files(html))
             if not vlnk_urls:
                 self._logger.warning("No vlnk URLs found on page")
                 return [], ""
 
-            file_urls = await self._http.resolve_vlnks(vlnk_urls)
+            resolved = await self._resolver.resolve(
+                [u for u in vlnk_urls if self._http.needs_resolution(u)], title_id=original_id
+            )
+            # прямые ссылки — как есть; мёртвые vlnk просто не попадают в список
+            vlink_map = {
+                v: resolved[v] if self._http.needs_resolution(v) else v
+                for v in vlnk_urls
+                if v in resolved or not self._http.needs_resolution(v)
+            }
+            file_urls = list(vlink_map.values())
 
             # Save to cache
-            if file_urls and original_id:
-                cache_dict = {v: f for v, f in zip(vlnk_urls, file_urls) if f}
-                self._cache.save_vlink(original_id, cache_dict)
+            if vlink_map and original_id:
+                self._cache.save_vlink(original_id, vlink_map)
 
         video_host = extract_video_host(file_urls)
         episodes = self._build_episodes(file_urls)
@@ -120,9 +142,10 @@ class AniMediaRepository:
         """Raw HTML страницы расписания через AJAX."""
         return await self._http.get_ajax_page(page)
 
-    async def get_total_ajax_pages(self) -> int:
-        """Количество страниц в AJAX-пагинации."""
-        html = await self.fetch_schedule_page(1)
+    async def get_total_ajax_pages(self, html: Optional[str] = None) -> int:
+        """Количество страниц в AJAX-пагинации (html — уже загруженная первая страница)."""
+        if html is None:
+            html = await self.fetch_schedule_page(1)
         pages = self._parser.parse_ajax_total_pages(html)
         return max(pages) if pages else 1
 
@@ -134,22 +157,6 @@ class AniMediaRepository:
         """Парсинг новых тайтлов со страницы расписания."""
         return await self._parser.parse_page_for_new_titles(html, max_titles)
 
-    def load_schedule_cache(self) -> Optional[list[dict]]:
-        """Загрузить расписание из кэша."""
-        status, data = self._cache.load(self._cfg.schedule_key, self._cfg.schedule_ttl)
-        if status == AniMediaCacheStatus.VALID and self._cache.is_nonempty(data):
-            return data
-        if status == AniMediaCacheStatus.EXPIRED:
-            self._logger.info("Schedule cache expired — will be refreshed")
-            self._cache.invalidate_cache(self._cfg.schedule_key)
-        return None
-
-    def save_schedule_cache(self, data: list[dict]) -> None:
-        """Сохранить расписание в кэш."""
-        status = self._cache.save(self._cfg.schedule_key, data)
-        if status == AniMediaCacheStatus.SAVED:
-            self._logger.debug("Schedule cache saved")
-
     # ══════════════════════════════════════════════════════════
     # All titles operations
     # ══════════════════════════════════════════════════════════
@@ -158,9 +165,10 @@ class AniMediaRepository:
         """Raw HTML страницы каталога."""
         return await self._http.get_catalog_page(page)
 
-    async def get_total_catalog_pages(self) -> int:
-        """Количество страниц в каталоге."""
-        html = await self.fetch_catalog_page(1)
+    async def get_total_catalog_pages(self, html: Optional[str] = None) -> int:
+        """Количество страниц в каталоге (html — уже загруженная первая страница)."""
+        if html is None:
+            html = await self.fetch_catalog_page(1)
         pages = self._parser.parse_total_pages(html)
         return max(pages) if pages else 1
 
@@ -168,37 +176,6 @@ class AniMediaRepository:
         """Парсинг тайтлов со страницы каталога."""
         return await self._parser.parse_all_titles_page(html, max_titles)
 
-    def load_all_titles_cache(self) -> Optional[list[dict]]:
-        """Загрузить каталог из кэша."""
-        status, data = self._cache.load(
-            self._cfg.all_titles_key, self._cfg.all_titles_ttl
-        )
-        if status == AniMediaCacheStatus.VALID and self._cache.is_nonempty(data):
-            return data
-        if status == AniMediaCacheStatus.EXPIRED:
-            self._logger.info("All titles cache expired — will be refreshed")
-            self._cache.invalidate_cache(self._cfg.all_titles_key)
-        return None
-
-    def save_all_titles_cache(self, data: list[dict]) -> None:
-        """Сохранить каталог в кэш."""
-        status = self._cache.save(self._cfg.all_titles_key, data)
-        if status == AniMediaCacheStatus.SAVED:
-            self._logger.debug("All titles cache saved")
-
-    def get_cached_all_titles_stats(self) -> tuple[int, int]:
-        """
-        Получить статистику кэшированного каталога.
-        Returns: (collected_count, last_page)
-        """
-        cached = self.load_all_titles_cache()
-        if not cached:
-            return 0, 0
-
-        collected = sum(len(e.get("titles", [])) for e in cached)
-        last_page = max((e.get("page", 0) for e in cached), default=0)
-        return collected, last_page
-
     # ══════════════════════════════════════════════════════════
     # Private helpers
     # ══════════════════════════════════════════════════════════
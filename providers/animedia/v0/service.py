@@ -1,12 +1,18 @@
 # providers/animedia/v0/service.py
 import asyncio
 import logging
+import time
 from typing import Any
 
 from .repository import AniMediaRepository
+from .crawler import CatalogCrawler
 from .models import Title
 
 MAX_CONCURRENT = 3
+CATALOG_SOURCE = "catalog"
+SCHEDULE_SOURCE = "schedule"
+PAGE_ROWS_LIMIT = 1000  # страница целиком: отпечаток считается по всем строкам
+SCHEDULE_KEEP_UNSEEN = 24 * 60 * 60
 
 
 class AniMediaService:
@@ -18,9 +24,11 @@ class AniMediaService:
             self,
             repository: AniMediaRepository,
             logger: logging.Logger | None = None,
+            crawler: CatalogCrawler | None = None,
     ):
         self._repo = repository
         self._logger = logger or logging.getLogger(__name__)
+        self._crawler = crawler or CatalogCrawler(repository.catalog_store, logger=self._logger)
 
     # ══════════════════════════════════════════════════════════
     # Title search
@@ -65,65 +73,36 @@ class AniMediaService:
     async def get_schedule(self, max_titles: int = 60) -> list[dict[str, Any]]:
         """
         Получить расписание (новые серии + анонсы).
-        Policy: cache-first, pagination with early exit.
+        Policy: локальная копия, пока свежая; иначе инкрементальный обход
+        (страница 0 — анонсы с главной, 1..N — AJAX) до первых неизменённых страниц.
         """
-        # 1. Cache check
-        cached = self._repo.load_schedule_cache()
-        if cached:
-            self._logger.info("Schedule loaded from cache")
-            return cached
-
-        # 2. Get total pages
-        total_pages = await self._repo.get_total_ajax_pages()
-        self._logger.info(f"Schedule has {total_pages} pages")
-
-        results: list[dict[str, Any]] = []
-        collected = 0
-
-        # 3. First page: announcements (page 0 = main page)
-        first_html = await self._repo.fetch_first_page()
-        announce = await self._repo.parse_announce_titles(first_html, max_titles)
-        if announce:
-            results.append({"page": 0, "titles": announce})
-            collected += len(announce)
-            self._logger.debug(f"Collected {len(announce)} announcements")
-
-        # 4. Early exit check
-        if collected >= max_titles:
-            return self._finalize_schedule(results)
-
-        # 5. Remaining pages with concurrency
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT)
-
-        async def fetch_page(page: int) -> tuple[int, list[str]]:
-            async with semaphore:
-                remaining = max_titles - collected
-                if remaining <= 0:
-                    return page, []
+        ttl = self._repo.cache_cfg.schedule_ttl
+        if self._crawler.is_fresh(SCHEDULE_SOURCE, 0, ttl, max_titles):
+            self._logger.info("Schedule loaded from local store")
+            return self._crawler.grouped(SCHEDULE_SOURCE, max_titles)
+
+        crawl_started = int(time.time())
+        async with self._repo.pooled_http():
+            first_ajax = await self._repo.fetch_schedule_page(1)
+            total_pages = await self._repo.get_total_ajax_pages(first_ajax)
+            self._logger.info(f"Schedule has {total_pages} pages")
+
+            async def fetch_rows(page: int) -> list[str]:
+                if page == 0:
+                    html = await self._repo.fetch_first_page()
+                    return await self._repo.parse_announce_titles(html, PAGE_ROWS_LIMIT)
                 html = await self._repo.fetch_schedule_page(page)
-                titles = await self._repo.parse_new_titles(html, remaining)
-                return page, titles
-
-        tasks = [fetch_page(p) for p in range(1, total_pages + 1)]
-
-        for coro in asyncio.as_completed(tasks):
-            page, titles = await coro
-            if titles:
-                results.append({"page": page, "titles": titles})
-                collected += len(titles)
-                self._logger.debug(f"Page {page}: collected {len(titles)} titles")
-                if collected >= max_titles:
-                    break
-
-        return self._finalize_schedule(results)
+                return await self._repo.parse_new_titles(html, PAGE_ROWS_LIMIT)
 
-    def _finalize_schedule(self, results: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        """Dedupe, sort, cache."""
-        for entry in results:
-            entry["titles"] = self._unique_preserve_order(entry["titles"])
-        results.sort(key=lambda x: x["page"])
+            await self._crawler.crawl(
+                SCHEDULE_SOURCE, fetch_rows, total_pages, max_titles,
+                first_page=0, wave_size=MAX_CONCURRENT,
+                prefetched={1: await self._repo.parse_new_titles(first_ajax, PAGE_ROWS_LIMIT)},
+            )
 
-        self._repo.save_schedule_cache(results)
+        # тайтлы, которых давно нет ни на одной просмотренной странице, ушли из расписания
+        self._crawler.store.prune_unseen(SCHEDULE_SOURCE, crawl_started - SCHEDULE_KEEP_UNSEEN)
+        results = self._crawler.grouped(SCHEDULE_SOURCE, max_titles)
         self._logger.info(f"Schedule finalized: {sum(len(e['titles']) for e in results)} titles")
         return results
 
@@ -138,67 +117,29 @@ class AniMediaService:
     ) -> list[dict[str, Any]]:
         """
         Получить каталог всех тайтлов.
-        Policy: incremental loading with cache, resume from last page.
+        Policy: локальная копия, пока свежая; иначе инкрементальный обход с первой страницы
+        волнами по pages_per_request страниц, остановка на неизменённых страницах.
         """
-        # 1. Load cached data
-        cached = self._repo.load_all_titles_cache() or []
-        collected, last_cached_page = self._repo.get_cached_all_titles_stats()
+        ttl = self._repo.cache_cfg.all_titles_ttl
+        if self._crawler.is_fresh(CATALOG_SOURCE, 1, ttl, max_titles):
+            self._logger.info("All titles loaded from local store")
+            return self._crawler.grouped(CATALOG_SOURCE, max_titles)
 
-        if collected >= max_titles:
-            self._logger.info("All titles loaded from cache")
-            return cached
+        async with self._repo.pooled_http():
+            first_html = await self._repo.fetch_catalog_page(1)
+            total_pages = await self._repo.get_total_catalog_pages(first_html)
+            self._logger.info(f"Catalog has {total_pages} pages (target: {max_titles} titles)")
 
-        # 2. Calculate pagination
-        total_pages = await self._repo.get_total_catalog_pages()
-        titles_per_page = max_titles // pages_per_request if pages_per_request else 12
-
-        start_page = (collected // titles_per_page) + 1 if titles_per_page else 1
-        end_page = min(start_page + pages_per_request - 1, total_pages)
-
-        self._logger.info(
-            f"Fetching catalog pages {start_page}-{end_page} "
-            f"(cached: {collected}, target: {max_titles})"
-        )
-
-        # 3. Fetch pages concurrently
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT)
-
-        async def fetch_page(page: int) -> dict[str, Any]:
-            async with semaphore:
+            async def fetch_rows(page: int) -> list[str]:
                 html = await self._repo.fetch_catalog_page(page)
-                remaining = max_titles - collected
-                titles = await self._repo.parse_catalog_titles(html, remaining)
-                return {"page": page, "titles": titles}
-
-        tasks = [fetch_page(p) for p in range(start_page, end_page + 1)]
-        new_results = await asyncio.gather(*tasks)
-
-        # 4. Merge with cache
-        all_results = cached + [r for r in new_results if r["titles"]]
-
-        # 5. Dedupe and sort
-        for entry in all_results:
-            entry["titles"] = self._unique_preserve_order(entry["titles"])
-        all_results.sort(key=lambda x: x["page"])
+                return await self._repo.parse_catalog_titles(html, PAGE_ROWS_LIMIT)
 
-        # 6. Save to cache
-        self._repo.save_all_titles_cache(all_results)
+            await self._crawler.crawl(
+                CATALOG_SOURCE, fetch_rows, total_pages, max_titles,
+                wave_size=pages_per_request,
+                prefetched={1: await self._repo.parse_catalog_titles(first_html, PAGE_ROWS_LIMIT)},
+            )
 
-        total_collected = sum(len(e["titles"]) for e in all_results)
-        self._logger.info(f"All titles finalized: {total_collected} titles")
-        return all_results
-
-    # ══════════════════════════════════════════════════════════
-    # Utilities
-    # ══════════════════════════════════════════════════════════
-
-    @staticmethod
-    def _unique_preserve_order(seq: list[str]) -> list[str]:
-        """Remove duplicates preserving order."""
-        seen: set[str] = set()
-        result: list[str] = []
-        for item in seq:
-            if item not in seen:
-                seen.add(item)
-                result.append(item)
-        return result
\ No newline at end of file
+        results = self._crawler.grouped(CATALOG_SOURCE, max_titles)
+        self._logger.info(f"All titles finalized: {sum(len(e['titles']) for e in results)} titles")
+        return results
@@ -1,10 +1,17 @@
 # transport.py
 import json
 import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import Any, Mapping, Optional
 
 import httpx
 
+# (transport, client) открытой сессии; задачи asyncio наследуют контекст, поэтому все запросы
+# внутри `async with transport.pooled()` (включая gather) идут через один пул соединений
+_POOLED: ContextVar[Optional[tuple["HttpxTransport", httpx.AsyncClient]]] = ContextVar(
+    "animedia_pooled_client", default=None)
+
 class HttpTransportError(RuntimeError):
     """Базовый тип ошибок транспортного уровня."""
 
@@ -40,14 +47,40 @@ class HttpxTransport:
         except json.JSONDecodeError:
             return resp.text
 
-    async def get(self, url: str) -> str:
+    def _pooled_client(self) -> Optional[httpx.AsyncClient]:
+        pooled = _POOLED.get()
+        return pooled[1] if pooled is not None and pooled[0] is self else None
+
+    @asynccontextmanager
+    async def pooled(self):
+        """Один httpx-клиент (keep-alive пул) на все запросы внутри блока. Вложенные вызовы переиспользуют его."""
+        if self._pooled_client() is not None:
+            yield
+            return
+        async with await self._make_client() as client:
+            token = _POOLED.set((self, client))
+            try:
+                yield
+            finally:
+                _POOLED.reset(token)
+
+    @asynccontextmanager
+    async def _client(self):
+        client = self._pooled_client()
+        if client is not None:
+            yield client
+            return
         async with await self._make_client() as client:
+            yield client
+
+    async def get(self, url: str) -> str:
+        async with self._client() as client:
             resp = await client.get(url)
             resp.raise_for_status()
             return await self.request_json(resp)
 
     async def post(self, url: str, data: Mapping[str, Any] | None = None) -> str:
-        async with await self._make_client() as client:
+        async with self._client() as client:
             resp = await client.post(url, data=data)
             resp.raise_for_status()
             return await self.request_json(resp)
@@ -0,0 +1,283 @@
+# providers/animedia/v0/vlnk_resolver.py
+"""
+Резолвинг vlnk (aser.pro) -> URL файла серии.
+
+- in-flight дедупликация: vlnk, который одновременно нужен нескольким тайтлам (или нескольким
+  AsyncWorker — у каждого свой event loop), уходит в сеть один раз; остальные ждут общий Future;
+- негативный кэш: мёртвые ссылки (404/410, ответ без file) помнятся DEAD_TTL,
+  сетевые сбои после всех попыток — FAILED_TTL; записи живут в AniMediaCacheManager;
+- AdaptiveRateLimiter вместо фиксированных пауз между пачками: на 429 ждём Retry-After
+  и увеличиваем интервал между запросами, на успешных ответах интервал снова сокращается.
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Iterable, Optional
+
+from .cache_manager import AniMediaCacheManager, AniMediaCacheStatus
+
+CONCURRENCY = 8
+MAX_TRIES = 4
+RETRY_DELAY = 0.5
+DEAD_TTL = 30 * 60      # 30m
+FAILED_TTL = 2 * 60     # 2m
+DEAD_STATUSES = {404, 410}
+NEGATIVE_KEY = "am_vlnk_negative_cache"
+NEGATIVE_MAX = 4096     # записей в памяти; остальное живёт в файловом кэше
+
+
+class DeadVlnkError(ValueError):
+    """Страница vlnk получена, но ссылки на файл в ней нет."""
+
+
+def _status_of(exc: BaseException) -> Optional[int]:
+    return getattr(getattr(exc, "response", None), "status_code", None)
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Темп запросов, общий для всех потоков: старт не чаще одного раза в `interval` секунд,
+    одновременно не больше `concurrency` запросов в каждом event loop.
+    429 -> пауза до Retry-After и удвоение интервала (не больше max_interval),
+    успех -> интервал уменьшается на `step` (не меньше min_interval).
+    """
+
+    def __init__(self, concurrency: int = CONCURRENCY, min_interval: float = 0.0,
+                 max_interval: float = 5.0, step: float = 0.05, throttle_floor: float = 0.25):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.step = step
+        self.throttle_floor = throttle_floor
+        self.interval = min_interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+        self._paused_until = 0.0
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sem = self._semaphores.get(loop)
+            if sem is None:
+                sem = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+            return sem
+
+    def _reserve(self) -> float:
+        """Занять ближайший свободный момент старта, вернуть сколько до него ждать."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at, self._paused_until)
+            self._next_at = start + self.interval
+            return start - now
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._semaphore():
+            delay = self._reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.interval = max(self.min_interval, self.interval - self.step)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.interval = min(self.max_interval, max(self.interval * 2, self.throttle_floor))
+            wait = retry_after if retry_after is not None else self.interval
+            self._paused_until = max(self._paused_until, time.monotonic() + wait)
+
+
+@dataclass
+class ResolveReport:
+    title_id: str
+    total: int = 0
+    resolved: int = 0
+    negative_hits: int = 0
+    dead: int = 0
+    failed: int = 0
+    coalesced: int = 0
+    elapsed_ms: float = 0.0
+
+    def line(self) -> str:
+        return (f"vlnk resolve [{self.title_id or '-'}]: {self.resolved}/{self.total} resolved, "
+                f"negative-cache={self.negative_hits} dead={self.dead} failed={self.failed} "
+                f"coalesced={self.coalesced} in {self.elapsed_ms:.0f} ms")
+
+
+class VlnkResolver:
+    """
+    resolve(urls) -> {vlnk: file_url} только для успешно разрешённых ссылок.
+    Один экземпляр на репозиторий: in-flight и негативный кэш общие для всех запросов.
+    """
+
+    def __init__(
+            self,
+            fetch: Callable[[str], Awaitable[str]],
+            cache: Optional[AniMediaCacheManager] = None,
+            limiter: Optional[AdaptiveRateLimiter] = None,
+            logger: logging.Logger | None = None,
+            *,
+            max_tries: int = MAX_TRIES,
+            retry_delay: float = RETRY_DELAY,
+            dead_ttl: int = DEAD_TTL,
+            failed_ttl: int = FAILED_TTL,
+            negative_max: int = NEGATIVE_MAX,
+    ):
+        self._fetch = fetch
+        self._cache = cache
+        self._limiter = limiter or AdaptiveRateLimiter()
+        self._logger = logger or logging.getLogger(__name__)
+        self._max_tries = max_tries
+        self._retry_delay = retry_delay
+        self._dead_ttl = dead_ttl
+        self._failed_ttl = failed_ttl
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        # vlnk -> time.time() до которого не пробуем; LRU, не больше negative_max записей
+        self._negative: OrderedDict[str, float] = OrderedDict()
+        self._negative_max = max(1, int(negative_max))
+        self.last_report: Optional[ResolveReport] = None
+
+    @property
+    def limiter(self) -> AdaptiveRateLimiter:
+        return self._limiter
+
+    async def resolve(self, vlnk_urls: Iterable[str], title_id: str = "") -> dict[str, str]:
+        start = time.perf_counter()
+        urls = list(dict.fromkeys(vlnk_urls))
+        report = ResolveReport(title_id=title_id, total=len(urls))
+
+        pending = []
+        for url in urls:
+            if self.is_negative(url):
+                report.negative_hits += 1
+            else:
+                pending.append(url)
+
+        results = await asyncio.gather(*(self._resolve_shared(u, report) for u in pending))
+        resolved = {u: f for u, f in zip(pending, results) if f}
+
+        report.resolved = len(resolved)
+        report.elapsed_ms = (time.perf_counter() - start) * 1000
+        self.last_report = report
+        self._logger.info(report.line())
+        return resolved
+
+    # ── negative cache ─────────────────────────────────────────
+
+    def is_negative(self, url: str) -> bool:
+        now = time.time()
+        with self._lock:
+            until = self._negative.get(url)
+            if until is not None:
+                if until > now:
+                    self._negative.move_to_end(url)
+                else:
+                    del self._negative[url]
+        if until is None and self._cache is not None:
+            status, entry = self._cache.load_item(NEGATIVE_KEY, url, ttl=0)
+            if status is AniMediaCacheStatus.VALID and isinstance(entry, dict):
+                until = float(entry.get("until", 0))
+                if until > now:
+                    self._remember_negative(url, until, now)
+        return until is not None and until > now
+
+    def _remember_negative(self, url: str, until: float, now: float) -> None:
+        """Кладёт запись в LRU: сначала выбрасывает истёкшие, потом самые старые сверх лимита."""
+        with self._lock:
+            self._negative[url] = until
+            self._negative.move_to_end(url)
+            if len(self._negative) > self._negative_max:
+                for key in [k for k, v in self._negative.items() if v <= now]:
+                    del self._negative[key]
+            while len(self._negative) > self._negative_max:
+                self._negative.popitem(last=False)
+
+    def _mark_negative(self, url: str, ttl: int, reason: str) -> None:
+        now = time.time()
+        until = now + ttl
+        self._remember_negative(url, until, now)
+        if self._cache is not None:
+            try:
+                self._cache.save_item(NEGATIVE_KEY, url, {"reason": reason, "until": until}, ttl=ttl)
+            except IOError as exc:
+                self._logger.warning(f"Failed to persist negative vlnk entry: {exc}")
+
+    # ── resolution ─────────────────────────────────────────────
+
+    async def _resolve_shared(self, url: str, report: ResolveReport) -> Optional[str]:
+        with self._lock:
+            fut = self._inflight.get(url)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[url] = Future()
+        if not owner:
+            report.coalesced += 1
+            return await asyncio.wrap_future(fut)
+
+        try:
+            result = await self._resolve_one(url, report)
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+            if not fut.done():  # отмена владельца: ожидающие получают None, без негативной записи
+                fut.set_result(None)
+
+    async def _resolve_one(self, url: str, report: ResolveReport) -> Optional[str]:
+        last_exc: Optional[BaseException] = None
+        for attempt in range(1, self._max_tries + 1):
+            try:
+                async with self._limiter.slot():
+                    file_url = await self._fetch(url)
+                self._limiter.on_success()
+                return file_url
+            except DeadVlnkError:
+                break
+            except Exception as exc:
+                status = _status_of(exc)
+                if status in DEAD_STATUSES:
+                    break
+                last_exc = exc
+                if status == 429:
+                    self._limiter.on_throttled(_retry_after(exc))
+                    self._logger.warning(f"429 on {url} – interval {self._limiter.interval:.2f}s")
+                elif attempt < self._max_tries:
+                    await asyncio.sleep(self._retry_delay * 2 ** (attempt - 1))
+        else:
+            self._logger.warning(f"vlnk failed after {self._max_tries} attempts: {url}: {last_exc}")
+            report.failed += 1
+            self._mark_negative(url, self._failed_ttl, "failed")
+            return None
+
+        self._logger.debug(f"dead vlnk: {url}")
+        report.dead += 1
+        self._mark_negative(url, self._dead_ttl, "dead")
+        return None
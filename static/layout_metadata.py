@@ -96,7 +96,9 @@ all_layout_metadata = [
     {"layout": "bottom", "type": "button", "text": "LOAD PREV", "callback_key": "load_previous_titles", "callback_type": "simple", "color_index": 1},
     {"layout": "bottom", "type": "button", "text": "LOAD MORE", "callback_key": "load_more_titles", "callback_type": "simple", "color_index": 4},
     {"layout": "bottom", "type": "button", "text": "ONGOING", "callback_key": "display_ongoing_list", "callback_type": "simple", "color_index": 6},
+    {"layout": "bottom", "type": "button", "text": "LIBRARY", "callback_key": "display_poster_grid", "callback_type": "simple", "color_index": 5},
     {"layout": "bottom", "type": "button", "text": "TITLES LIST", "callback_key": "display_titles_text_list", "callback_type": "simple", "color_index": 7},
+    {"layout": "bottom", "type": "button", "text": "FILTER", "callback_key": "display_title_filter", "callback_type": "simple", "color_index": 7},
     {"layout": "bottom", "type": "button", "text": "FRANCHISES", "callback_key": "display_franchises", "callback_type": "simple", "color_index": 8},
     {"layout": "bottom", "type": "button", "text": "NEED TO SEE", "callback_key": "toggle_need_to_see", "callback_type": "simple", "color_index": 1},
     {"layout": "bottom", "type": "button", "text": "SYSTEM", "callback_key": "display_system", "callback_type": "simple", "color_index": 2},
@@ -116,7 +118,9 @@ show_mode_metadata = {
     'titles_year_list': {"create_method": "create_list_widget", "description": "Titles by Year", "batch_size": 12, "columns": 4, "generator": "_generate_list_html", "data_fetcher": "titles_year_list"},
     'titles_status_list': {"create_method": "create_list_widget", "description": "Titles by Status", "batch_size": 12, "columns": 4, "generator": "_generate_list_html", "data_fetcher": "titles_status_list"},
     'titles_provider_list': {"create_method": "create_list_widget", "description": "Titles by Provider", "batch_size": 12, "columns": 4, "generator": "_generate_list_html", "data_fetcher": "titles_provider_list"},
+    'titles_filter_list': {"create_method": "create_list_widget", "description": "Filtered Titles", "batch_size": 12, "columns": 4, "generator": "_generate_list_html", "data_fetcher": "get_filtered_titles"},
     'need_to_see_list': {"create_method": "create_list_widget", "description": "Need to See List", "batch_size": 12, "columns": 4, "generator": "_generate_list_html", "data_fetcher": "get_need_to_see_from_db"},
+    'poster_grid': {"create_method": "create_poster_grid_widget", "description": "Library", "batch_size": None, "columns": None, "generator": None, "data_fetcher": ''},
     'one_title': {"create_method": "create_one_title_widget", "description": "One Title", "batch_size": None, "columns": None, "generator": "_generate_one_title_html", "data_fetcher": ''},
     'default': {"create_method": "create_default_widget", "description": "Default View", "batch_size": 2, "columns": 2, "generator": "_generate_default_html", "data_fetcher": ''}
 }
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from app.qt.html_cache import CardEntry, CardHtmlCache, TemplateCache
+
+
+def test_template_compiled_once_until_revision_changes():
+    calls = []
+    state = {"rev": 0}
+
+    def loader(name):
+        calls.append(name)
+        return "<b>{{ title }}</b>", "{{ title }}", None, "css"
+
+    cache = TemplateCache(loader, revision=lambda: state["rev"])
+    assert cache.get("default").titles.render(title="x") == "<b>x</b>"
+    cache.get("default")
+    assert calls == ["default"]
+
+    state["rev"] += 1
+    compiled = cache.get("default")
+    assert calls == ["default", "default"]
+    assert compiled.text_list is None and compiled.styles_css == "css"
+
+
+def test_missing_template_is_not_cached():
+    calls = []
+
+    def loader(name):
+        calls.append(name)
+        return None, None, None, None
+
+    cache = TemplateCache(loader)
+    cache.get("nope")
+    cache.get("nope")
+    assert len(calls) == 2
+
+
+def test_card_cache_key_and_lru():
+    cache = CardHtmlCache(max_entries=2)
+    t1 = SimpleNamespace(title_id=1, last_updated="a")
+    t2 = SimpleNamespace(title_id=2, last_updated="a")
+    k1 = cache.make_key(t1, "default", "fhd", "default", (0, 0, 0))
+    k2 = cache.make_key(t2, "default", "fhd", "default", (0, 0, 0))
+
+    cache.put(k1, CardEntry("one", playlist={"links": ["l"]}))
+    cache.put(k2, CardEntry("two"))
+    assert cache.get(k1).playlist == {"links": ["l"]}
+    # другое качество / ревизия — другой ключ
+    assert cache.get(cache.make_key(t1, "default", "hd", "default", (0, 0, 0))) is None
+    assert cache.get(cache.make_key(t1, "default", "fhd", "default", (0, 0, 1))) is None
+
+    cache.put(cache.make_key(SimpleNamespace(title_id=3), "default", "fhd", "default"), CardEntry("three"))
+    assert cache.get(k2) is None  # вытеснен как самый старый
+    assert cache.get(k1) is not None
+
+    cache.invalidate_title(1)
+    assert cache.get(k1) is None
+    cache.put(k1, CardEntry(""))
+    assert len(cache) == 1
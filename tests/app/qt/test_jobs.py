@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from app.qt.jobs import JobManager, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+@pytest.fixture
+def manager(qapp):
+    pool = QtCore.QThreadPool()
+    pool.setMaxThreadCount(2)
+    yield JobManager(pool)
+    pool.waitForDone(2000)
+
+
+def wait_for(qapp, predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timeout waiting for jobs")
+        qapp.processEvents()
+        time.sleep(0.005)
+
+
+def test_partials_arrive_before_finish_and_duplicates_coalesce(qapp, manager):
+    gate = threading.Event()
+    events = []
+
+    def fn(ctx):
+        gate.wait(2)
+        for i in range(3):
+            ctx.partial(i)
+            ctx.progress(i + 1, 3)
+        return "ok"
+
+    job = manager.submit("schedule", "schedule:1", fn, on_partial=events.append,
+                         on_finished=lambda r: events.append(r))
+    again = manager.submit("schedule", "schedule:1", lambda ctx: "second", on_finished=events.append)
+    assert again is job and job.coalesced == 1
+
+    observed = []
+    manager.when_done(again, lambda j: observed.append(j.state))
+    gate.set()
+    wait_for(qapp, lambda: not job.is_active)
+
+    assert events == [0, 1, 2, "ok"]
+    assert observed == [JOB_DONE]
+    assert (job.done, job.total) == (3, 3)
+    assert manager.active_job("schedule:1") is None
+
+
+def test_cancel_stops_partials_and_reports_state(qapp, manager):
+    started = threading.Event()
+    partials, done = [], []
+
+    def fn(ctx):
+        started.set()
+        while True:
+            ctx.check()
+            time.sleep(0.005)
+
+    job = manager.submit("title", "title:1", fn, on_partial=partials.append, on_done=done.append)
+    assert started.wait(2)
+    assert manager.cancel(job.job_id)
+    wait_for(qapp, lambda: not job.is_active)
+
+    assert job.state == JOB_CANCELLED and done == [job]
+    assert not manager.cancel(job.job_id)
+
+
+def test_failure_goes_to_on_error(qapp, manager):
+    errors = []
+
+    def fn(ctx):
+        raise RuntimeError("boom")
+
+    job = manager.submit("search", "search:x", fn, on_error=errors.append)
+    wait_for(qapp, lambda: not job.is_active)
+
+    assert job.state == JOB_FAILED and errors == ["boom"]
+    assert manager.jobs()[0] is job
@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from app.qt.page_prefetch import PageKey, PagePrefetcher, PrefetchedPage
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def _wait(qapp, predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_neighbour_pages_load_once_off_thread_and_hit_cache(qapp):
+    main_thread = QtCore.QThread.currentThread()
+    loads, threads = [], []
+
+    def load_page(key):
+        loads.append(key.offset)
+        threads.append(QtCore.QThread.currentThread())
+        ids = list(range(key.offset, key.offset + 3))
+        return PrefetchedPage(titles=ids, posters={i: (b"p", None) for i in ids}, revisions={i: (0, 0) for i in ids})
+
+    prefetcher = PagePrefetcher(load_page, capacity=2)
+    ready = []
+    prefetcher.pageReady.connect(lambda key: ready.append(key.offset))
+    base = PageKey("titles_list", None, 3, 3, revision=1)
+
+    prefetcher.prefetch([base.at(6), base.at(0), base.at(6)])
+    assert _wait(qapp, lambda: sorted(ready) == [0, 6])
+    assert sorted(loads) == [0, 6] and main_thread not in threads
+
+    assert prefetcher.take(base.at(6)).titles == [6, 7, 8]
+    assert prefetcher.take(base.at(3)) is None
+    assert prefetcher.take(PageKey("titles_list", None, 6, 3, revision=2)) is None  # после записи в БД — мимо
+    assert (prefetcher.hits, prefetcher.misses) == (1, 2)
+
+    # постер отдаётся, только если тайтл не менялся после предзагрузки
+    assert prefetcher.poster(7, (0, 0)) == (b"p", None)
+    assert prefetcher.poster(7, (0, 1)) is None
+
+    prefetcher.prefetch([base.at(9)])  # capacity=2: вытесняется давно не использованная страница 0
+    assert _wait(qapp, lambda: 9 in ready)
+    assert prefetcher.take(base.at(0)) is None and prefetcher.take(base.at(6)) is not None
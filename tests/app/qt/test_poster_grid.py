@@ -0,0 +1,106 @@
+import os
+import time
+
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+from PyQt5.QtCore import Qt, QBuffer, QByteArray, QThreadPool
+from PyQt5.QtGui import QImage, QColor
+
+from app.qt.app import AnimePlayerAppVer3
+from app.qt.poster_grid import PosterGridModel, POSTER_SIZE, TITLE_ID_ROLE
+from core.types import Seek
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def _png() -> bytes:
+    image = QImage(40, 60, QImage.Format_RGB32)
+    image.fill(QColor("red"))
+    data = QByteArray()
+    buf = QBuffer(data)
+    buf.open(QBuffer.WriteOnly)
+    image.save(buf, "PNG")
+    return bytes(data)
+
+
+ROWS = [(tid, f"Тайтл {tid}", f"Title {tid}", 2000 + tid) for tid in range(1, 8)]
+
+
+def _wait(qapp, predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_rows_are_loaded_in_windows_until_exhausted(qapp):
+    windows = []
+
+    def load_window(offset, limit, seek):
+        windows.append((offset, limit, seek))
+        start = next((i + 1 for i, r in enumerate(ROWS) if r[0] == seek.after_id), 0) if seek else 0
+        return ROWS[start:start + limit]
+
+    model = PosterGridModel(load_window, lambda ids: {}, window_size=3)
+    assert model.rowCount() == 0 and model.canFetchMore()
+    while model.canFetchMore():
+        model.fetchMore()
+
+    # окна дописываются keyset'ом после последнего загруженного title_id
+    assert windows == [(0, 3, None), (3, 3, Seek(after_id=3)), (6, 3, Seek(after_id=6))]
+    assert model.rowCount() == 7
+    assert model.index(4).data(TITLE_ID_ROLE) == 5
+    assert model.index(4).data(Qt.DisplayRole) == "Тайтл 5"
+
+
+def test_posters_requested_in_one_batch_and_decoded_off_thread(qapp):
+    requests = []
+    blob = _png()
+
+    def load_posters(ids):
+        requests.append(list(ids))
+        return {tid: blob for tid in ids if tid != 2}
+
+    pool = QThreadPool()
+    model = PosterGridModel(lambda o, n, seek: ROWS[o:o + n], load_posters, window_size=10, pool=pool)
+    model.fetchMore()
+    changed = []
+    model.dataChanged.connect(lambda a, b, roles: changed.append(a.row()))
+
+    assert [model.index(r).data(Qt.DecorationRole) for r in range(3)] == [None, None, None]
+    assert _wait(qapp, lambda: sorted(changed) == [0, 2])
+    assert requests == [[1, 2, 3]]
+
+    pixmap = model.index(0).data(Qt.DecorationRole)
+    assert pixmap.width() >= POSTER_SIZE.width() and pixmap.height() >= POSTER_SIZE.height()
+    # тайтл без постера больше не запрашивается при каждой отрисовке
+    assert model.index(1).data(Qt.DecorationRole) is None
+    qapp.processEvents()
+    assert requests == [[1, 2, 3]]
+
+
+def test_saved_poster_replaces_placeholder(qapp):
+    saved = {}
+    model = PosterGridModel(lambda o, n, seek: ROWS[o:o + n], lambda ids: {t: saved[t] for t in ids if t in saved},
+                            window_size=10, pool=QThreadPool())
+    model.fetchMore()
+    assert model.index(0).data(Qt.DecorationRole) is None
+    qapp.processEvents()  # постера нет — карточка остаётся заглушкой и больше не спрашивает
+    assert model.index(0).data(Qt.DecorationRole) is None
+
+    # постер скачан: PosterManager -> poster_saved -> _on_poster_saved в UI-потоке
+    saved[1] = _png()
+    changed = []
+    model.dataChanged.connect(lambda a, b, roles: changed.append(a.row()))
+    AnimePlayerAppVer3._on_poster_saved(SimpleNamespace(poster_grid_model=model), 1)
+    assert changed == [0]
+    assert model.index(0).data(Qt.DecorationRole) is None  # ушёл на декодирование
+    assert _wait(qapp, lambda: model.index(0).data(Qt.DecorationRole) is not None)
@@ -0,0 +1,105 @@
+import logging
+import os
+import time
+
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+from PyQt5.QtCore import QThreadPool
+
+from app.qt.app import AnimePlayerAppVer3
+from app.qt.jobs import JobManager
+from app.qt.ui_manger import UIManager
+
+STYLES = Path(__file__).resolve().parents[3] / "static" / "styles.qss"
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def _wait(qapp, predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    return predicate()
+
+
+def _app(qapp, fetch, fallback_started):
+    """Настоящие UIManager и JobManager; Animedia-воркер заменён флагом fallback_started."""
+    pool = QThreadPool()
+    widget = QtWidgets.QWidget()
+    app = SimpleNamespace(
+        logger=logging.getLogger(__name__),
+        ui_manager=UIManager(widget, STYLES.read_text(encoding="utf-8")),
+        job_manager=JobManager(pool),
+        title_search_entry=SimpleNamespace(text=lambda: "", clear=lambda: None),
+        db_manager=SimpleNamespace(get_titles_by_keywords=lambda text: ([], [])),
+        invoke_database_save=lambda titles: [t["id"] for t in titles],
+        show_error_notification=lambda *args: None,
+        fallbacks=[],
+        found=[],
+        widget=widget,
+        pool=pool,
+    )
+    app._fetch_titles_from_api = fetch
+    app._handle_get_titles_from_api = partial(AnimePlayerAppVer3._handle_get_titles_from_api, app)
+    app._handle_found_titles = lambda ids, text: app.found.extend(ids)
+    app._search_fallback = lambda provider, text: app.fallbacks.append(text) or fallback_started
+    app.job_manager.jobsChanged.connect(partial(AnimePlayerAppVer3._on_jobs_changed, app))
+    return app
+
+
+def _loader_visible(app):
+    return app.ui_manager.loading_dialog.isVisible()
+
+
+def test_loader_survives_search_job_until_animedia_fallback_finishes(qapp):
+    app = _app(qapp, lambda text: [], fallback_started=True)
+    assert AnimePlayerAppVer3._search_by_title(app, None, "frieren")
+    # индикатор фоновой задачи не подменяет модальный лоадер поиска
+    assert _loader_visible(app) and app.ui_manager.loading_dialog.isModal()
+
+    assert _wait(qapp, lambda: app.fallbacks and app.job_manager.active_count() == 0)
+    qapp.processEvents()
+    assert _loader_visible(app)  # задача закончилась, но Animedia ещё ищет
+
+    app.ui_manager.hide_loader()  # _on_animedia_result
+    assert not _loader_visible(app)
+    app.pool.waitForDone(2000)
+
+
+def test_loader_hidden_when_search_job_fails_without_fallback(qapp):
+    def fetch(text):
+        raise RuntimeError("API down")
+
+    app = _app(qapp, fetch, fallback_started=False)
+    assert AnimePlayerAppVer3._search_by_title(app, None, "frieren")
+    assert _loader_visible(app)
+    assert _wait(qapp, lambda: app.fallbacks)
+    assert _wait(qapp, lambda: not _loader_visible(app))
+    assert app.found == []
+    app.pool.waitForDone(2000)
+
+
+def test_background_progress_returns_after_modal_loader(qapp):
+    app = _app(qapp, lambda text: [{"id": 5}], fallback_started=False)
+    ui = app.ui_manager
+    ui.show_progress("Sync 1/3")
+    assert _loader_visible(app) and not ui.loading_dialog.isModal()
+
+    ui.show_loader("Loading titles...")
+    ui.show_progress("Sync 2/3")
+    assert ui.loading_dialog.isModal() and ui.loading_dialog.label.text() == "Loading titles..."
+
+    ui.hide_loader()  # задачи ещё идут — остаётся их индикатор
+    assert _loader_visible(app) and ui.loading_dialog.label.text() == "Sync 2/3"
+    ui.hide_progress()
+    assert not _loader_visible(app)
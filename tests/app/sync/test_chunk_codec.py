@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from app.sync import chunk_codec
+from app.sync.chunk_codec import (BLOCK_SIZE, CODEC_ZLIB, CODEC_ZSTD, SEG_PACKED, SEG_STORED, SEGMENT,
+                                  ChunkCodec, negotiate_codec)
+
+
+def segments(body):
+    out, pos = [], 0
+    while pos < len(body):
+        flag, length = SEGMENT.unpack_from(body, pos)
+        out.append((flag, length))
+        pos += SEGMENT.size + length
+    return out
+
+
+def sqlite_like_chunk():
+    # страницы со строками + «постер» (случайные байты не сжимаются, как jpeg/webp)
+    text = b"INSERT INTO titles VALUES ('Frieren', 'ongoing');" * 3000
+    return text[:2 * BLOCK_SIZE] + os.urandom(3 * BLOCK_SIZE) + text[:BLOCK_SIZE + 100]
+
+
+@pytest.mark.parametrize("name", [CODEC_ZLIB, CODEC_ZSTD])
+def test_chunk_roundtrip_stores_incompressible_blocks(name):
+    if name == CODEC_ZSTD:
+        pytest.importorskip("zstandard")
+    codec = ChunkCodec(name)
+    raw = sqlite_like_chunk()
+
+    body = codec.encode(raw)
+
+    assert codec.decode(body) == raw
+    flags = segments(body)
+    assert [f for f, _ in flags] == [SEG_PACKED, SEG_STORED, SEG_PACKED]
+    assert flags[1][1] == 3 * BLOCK_SIZE
+    assert len(body) < len(raw) * 0.7
+
+
+def test_empty_and_short_chunks():
+    codec = ChunkCodec(CODEC_ZLIB)
+    assert codec.decode(codec.encode(b"")) == b""
+    assert codec.decode(codec.encode(b"abc")) == b"abc"
+
+
+def test_receiver_without_zstd_negotiates_zlib(monkeypatch):
+    monkeypatch.setattr(chunk_codec, "zstandard", None)  # приёмник без пакета zstandard
+    assert negotiate_codec([CODEC_ZSTD, CODEC_ZLIB]) == CODEC_ZLIB
+    assert negotiate_codec([CODEC_ZSTD]) == CODEC_ZLIB  # общего нет — zlib есть у всех
+    assert negotiate_codec([]) is None  # отправитель без сжатия
@@ -0,0 +1,78 @@
+import base64
+
+from contextlib import closing
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.sync.db_merge import ensure_table_stats, merge_torrent_files, merge_torrents, open_db, run_merge
+from core.get import GetManager
+from core.save import SaveManager
+from core.tables import Base, Title, Torrent, TorrentFile
+from core.title_summary import TitleSummaryManager
+
+
+def _db(path, torrents, files=()):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Title(title_id=5, name_ru="t5"))
+        session.add_all(torrents)
+        session.add_all(files)
+        session.commit()
+    engine.dispose()
+    return str(path)
+
+
+def test_merge_torrent_files_matches_by_hash(tmp_path):
+    src = _db(tmp_path / "src.db", [
+        # legacy: .torrent в base64 прямо в torrents
+        Torrent(torrent_id=10, title_id=5, hash="h1", raw_base64_file=base64.b64encode(b"legacy").decode()),
+        Torrent(torrent_id=11, title_id=5, hash="h2"),
+        Torrent(torrent_id=12, title_id=5, hash="h3"),
+    ], [TorrentFile(torrent_id=11, title_id=5, file_blob=b"new", file_size=3)])
+    dst = _db(tmp_path / "dst.db", [
+        Torrent(torrent_id=1, title_id=5, hash="h1"),
+        Torrent(torrent_id=2, title_id=5, hash="h2"),
+    ], [TorrentFile(torrent_id=2, title_id=5, file_blob=b"kept", file_size=4)])
+
+    stats = {}
+    for table in ("torrents", "torrent_files"):
+        ensure_table_stats(stats, table)
+    with closing(open_db(src)) as s, closing(open_db(dst)) as d:
+        merge_torrents(s, d, stats)
+        merge_torrent_files(s, d, stats)
+        files = {r["torrent_id"]: (r["file_blob"], r["file_size"]) for r in d.execute(
+            "SELECT tf.torrent_id, tf.file_blob, tf.file_size FROM torrent_files tf")}
+        h3 = d.execute("SELECT torrent_id FROM torrents WHERE hash='h3'").fetchone()["torrent_id"]
+        legacy = d.execute("SELECT raw_base64_file FROM torrents WHERE hash='h1'").fetchone()[0]
+
+    # torrent_id берутся из dst, у существующего файла байты не перезаписываются
+    assert files == {1: (b"legacy", 6), 2: (b"kept", 4)}
+    assert h3 not in files and legacy is None
+    assert stats["torrent_files"]["insert"] == 1
+
+
+def _library(path, year, genres):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    save = SaveManager(engine)
+    save.save_title("aniliberty", 900, {"title_id": 7, "name_ru": "Тайтл", "season_year": year})
+    save.save_genre(7, genres)
+    engine.dispose()
+    return str(path)
+
+
+def test_merge_leaves_title_summary_to_be_rebuilt(tmp_path):
+    src = _library(tmp_path / "src.db", 2025, ["Драма", "Фэнтези"])
+    dst = _library(tmp_path / "dst.db", 2024, ["Драма"])
+
+    run_merge(src, dst)
+
+    engine = create_engine(f"sqlite:///{dst}")
+    assert TitleSummaryManager(engine).ensure()  # merge писал в обход SaveManager — проекция пересобрана
+    assert TitleSummaryManager(engine).check().ok
+    counts = GetManager(engine).get_facet_counts()
+    assert dict((v, c) for v, _, c in counts["year"]) == {2025: 1}
+    assert dict((label, c) for _, label, c in counts["genre"]) == {"Драма": 1, "Фэнтези": 1}
+    engine.dispose()
@@ -0,0 +1,51 @@
+import io
+import sqlite3
+
+from app.sync.snapshot_delta import (DELTA_HEADER, apply_delta, block_digests, encode_delta,
+                                     sqlite_backup_snapshot, sqlite_page_size)
+
+
+def make_db(path, rows=2000):
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA page_size = 1024")
+    con.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    con.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"title {i} " * 4) for i in range(rows)])
+    con.commit()
+    con.close()
+
+
+def test_backup_snapshot_reports_stepwise_progress(tmp_path):
+    src, dst = tmp_path / "src.db", tmp_path / "snap.db"
+    make_db(src)
+    steps = []
+
+    sqlite_backup_snapshot(str(src), str(dst), pages=16, progress=lambda done, total: steps.append((done, total)))
+
+    assert len(steps) > 3 and steps[-1][0] == steps[-1][1]
+    assert sqlite3.connect(dst).execute("SELECT COUNT(*) FROM t").fetchone() == (2000,)
+    assert sqlite_page_size(str(dst)) == 1024
+
+
+def test_delta_sends_only_changed_pages_and_rebuilds_chunk(tmp_path):
+    old, new = tmp_path / "old.db", tmp_path / "new.db"
+    make_db(old)
+    make_db(new)
+    con = sqlite3.connect(new)
+    con.execute("UPDATE t SET name = 'changed' WHERE id IN (5, 1500)")
+    con.executemany("INSERT INTO t VALUES (?, ?)", [(i, "appended") for i in range(5000, 5100)])
+    con.commit()
+    con.close()
+
+    block, chunk = 1024, 16 * 1024
+    basis = block_digests(str(old), block)
+    raw = new.read_bytes()
+    rebuilt, wire = io.BytesIO(), 0
+    with open(old, "rb") as basis_f:
+        for seq in range(0, (len(raw) + chunk - 1) // chunk):
+            part = raw[seq * chunk:(seq + 1) * chunk]
+            body = encode_delta(part, seq * chunk // block, basis, block)
+            wire += len(body) - DELTA_HEADER.size
+            rebuilt.write(apply_delta(body, seq * chunk // block, basis_f, block, len(part)))
+
+    assert rebuilt.getvalue() == raw
+    assert wire < len(raw) * 0.25
@@ -0,0 +1,102 @@
+import asyncio
+import os
+
+import pytest
+
+from app.sync.webrtc_stream import FileStreamReceiver, FileStreamSender, StreamProtocolError
+
+
+class Drop(Exception):
+    pass
+
+
+class Pipe:
+    """Упорядоченный канал в памяти: sender.send -> receiver.feed, receiver.send_text -> sender.on_control."""
+
+    def __init__(self, receiver_dir, drop_after=None):
+        self.frames = 0
+        self.drop_after = drop_after
+        self.receiver = FileStreamReceiver(self.to_sender, receiver_dir)
+        self.sender = None
+
+    async def send(self, data):
+        if isinstance(data, bytes):
+            self.frames += 1
+            if self.drop_after is not None and self.frames > self.drop_after:
+                raise Drop()
+        else:
+            data = data.encode("utf-8")
+        self.receiver.feed(data)
+        await asyncio.sleep(0)
+
+    def to_sender(self, text):
+        self.sender.on_control(text.encode("utf-8"))
+
+    async def transfer(self, path, chunk_size):
+        self.sender = FileStreamSender(self.send, chunk_size=chunk_size, timeout=5)
+        try:
+            return await self.sender.send_file(str(path))
+        finally:
+            await asyncio.to_thread(self.receiver.shutdown)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "player.db"
+    path.write_bytes(os.urandom(300_000))
+    return path
+
+
+def test_transfer_writes_verified_file(tmp_path, source):
+    pipe = Pipe(tmp_path / "in")
+    result = asyncio.run(pipe.transfer(source, chunk_size=1000))
+
+    assert result["ok"] and pipe.frames == 300
+    assert (tmp_path / "in" / "player.db").read_bytes() == source.read_bytes()
+    assert sorted(os.listdir(tmp_path / "in")) == ["player.db"]
+
+
+def test_interrupted_transfer_resumes_from_last_chunk(tmp_path, source):
+    with pytest.raises(Drop):
+        asyncio.run(Pipe(tmp_path / "in", drop_after=120).transfer(source, chunk_size=1000))
+    assert (tmp_path / "in" / "player.db.part").stat().st_size == 120_000
+
+    pipe = Pipe(tmp_path / "in")
+    assert asyncio.run(pipe.transfer(source, chunk_size=1000))["ok"]
+    assert pipe.frames == 180
+    assert (tmp_path / "in" / "player.db").read_bytes() == source.read_bytes()
+
+
+def test_corrupted_part_is_rejected_and_dropped(tmp_path, source):
+    with pytest.raises(Drop):
+        asyncio.run(Pipe(tmp_path / "in", drop_after=50).transfer(source, chunk_size=1000))
+    part = tmp_path / "in" / "player.db.part"
+    with open(part, "r+b") as f:
+        f.write(b"\0" * 16)
+
+    with pytest.raises(StreamProtocolError, match="sha256 mismatch"):
+        asyncio.run(Pipe(tmp_path / "in").transfer(source, chunk_size=1000))
+    assert os.listdir(tmp_path / "in") == []
+
+
+def test_aiortc_loopback_transfer(tmp_path, source):
+    pytest.importorskip("aiortc")
+    from app.sync.webrtc_transport import WebRTCReceiverCore, WebRTCSenderCore
+
+    async def run():
+        tx, rx = WebRTCSenderCore(ice_servers=[]), WebRTCReceiverCore(ice_servers=[])
+        receiver = FileStreamReceiver(rx.send_text, tmp_path / "in")
+        rx.set_on_message(receiver.feed)
+        answer = await rx.accept_offer_and_create_answer(await tx.create_offer())
+        await tx.accept_answer(answer)
+        sender = FileStreamSender(tx.send_bytes, timeout=10)
+        tx.set_on_message(sender.on_control)
+        try:
+            return await sender.send_file(str(source))
+        finally:
+            await tx.close()
+            await rx.close()
+            await asyncio.to_thread(receiver.shutdown)
+
+    assert asyncio.run(asyncio.wait_for(run(), 30))["ok"]
+    assert (tmp_path / "in" / "player.db").read_bytes() == source.read_bytes()
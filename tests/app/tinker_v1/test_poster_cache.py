@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.tinker_v1.poster_cache import PhotoLRU, PosterCache
+from app.tinker_v1.tk_tasks import TkTaskRunner
+
+
+class Response:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class Session:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def test_poster_is_served_from_disk_then_revalidated_with_etag(tmp_path):
+    session = Session(Response(200, b"jpeg", {"ETag": '"v1"'}), Response(304))
+    cache = PosterCache(str(tmp_path), session)
+    url = "https://example.org/poster.jpg"
+
+    assert cache.get(url) == b"jpeg"
+    assert cache.get(url) == b"jpeg" and len(session.requests) == 1  # свежий — без сети
+
+    cache.max_age = 0
+    assert cache.get(url) == b"jpeg"
+    assert session.requests[-1] == {"If-None-Match": '"v1"'}
+
+
+def test_stale_copy_is_used_when_offline(tmp_path):
+    session = Session(Response(200, b"png"), Response(503))
+    cache = PosterCache(str(tmp_path), session, max_age=0)
+    assert cache.get("https://example.org/p.png") == b"png"
+    assert cache.get("https://example.org/p.png") == b"png"
+
+    with pytest.raises(RuntimeError):
+        PosterCache(str(tmp_path / "empty"), Session(Response(503))).get("https://example.org/p.png")
+
+
+def test_disk_cache_drops_least_recently_used_posters_over_max_bytes(tmp_path):
+    session = Session(*(Response(200, b"x" * 10) for _ in range(3)))
+    cache = PosterCache(str(tmp_path), session, max_bytes=25)
+    a, b, c = (f"https://example.org/{n}.jpg" for n in "abc")
+
+    cache.get(a)
+    cache.get(b)
+    os.utime(cache._paths(a)[0], (1, 1))
+    os.utime(cache._paths(b)[0], (2, 2))
+    cache.get(a)  # попадание обновляет mtime — теперь самый старый b
+    cache.get(c)
+
+    assert not os.path.exists(cache._paths(b)[0]) and not os.path.exists(cache._paths(b)[1])
+    assert os.path.exists(cache._paths(a)[0]) and os.path.exists(cache._paths(c)[0])
+    assert cache._total == 20 and len(session.requests) == 3
+
+    # при старте каталог тоже подрезается
+    assert PosterCache(str(tmp_path), Session(), max_bytes=10)._total == 10
+    assert len([n for n in os.listdir(tmp_path) if n.endswith(".img")]) == 1
+
+
+def test_photo_lru_evicts_least_recently_used():
+    lru = PhotoLRU(capacity=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    lru.get("a")
+    lru.put("c", 3)
+    assert lru.get("b") is None and lru.get("a") == 1 and len(lru) == 2
+
+
+class FakeWindow:
+    """after() без Tk: колбэки выполняются в потоке теста при pump()."""
+
+    def __init__(self):
+        self.pending = []
+        self.thread = threading.get_ident()
+
+    def after(self, ms, callback):
+        assert threading.get_ident() == self.thread, "Tk touched from a worker thread"
+        self.pending.append(callback)
+
+    def pump(self):
+        callbacks, self.pending = self.pending, []
+        for callback in callbacks:
+            callback()
+
+
+def test_task_results_are_delivered_on_tk_thread():
+    window = FakeWindow()
+    results = []
+    with ThreadPoolExecutor(2) as pool:
+        runner = TkTaskRunner(window, pool)
+        runner.submit(lambda x: x * 2, 21, on_done=lambda r: results.append((r, threading.get_ident())))
+        runner.submit(lambda: 1 / 0, on_error=lambda e: results.append((type(e), threading.get_ident())))
+        deadline = time.time() + 5
+        while len(results) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+            window.pump()
+
+    assert (42, window.thread) in results
+    assert (ZeroDivisionError, window.thread) in results
+    assert all(tid == window.thread for _, tid in results)
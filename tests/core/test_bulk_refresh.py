@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+
+from core.bulk_refresh import BulkTitleRefresher, release_changed
+from core.get import GetManager
+from core.save import SaveManager
+from core.tables import Base, Episode, Provider, Title, TitleProviderMap
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def _db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'r.db'}")
+    Base.metadata.create_all(engine)
+    save, get = SaveManager(engine), GetManager(engine)
+    with save.Session as session:
+        session.add(Provider(provider_id=1, code="aniliberty", name="AniLiberty"))
+        for tid, updated, age in ((1, 100, 10), (2, 200, 5), (3, 300, 0)):
+            session.add(Title(title_id=tid, name_ru=f"t{tid}", updated=updated, last_change=updated,
+                              last_updated=NOW - timedelta(days=age)))
+            session.add(TitleProviderMap(title_id=tid, provider_id=1, external_title_id=str(tid + 100)))
+            session.add(Episode(title_id=tid, episode_number=1, uuid=f"e{tid}"))
+        session.commit()
+
+    ingested = []
+
+    def ingest_titles(releases):
+        ingested.extend(releases)
+        return [int(r["external_id"]) - 100 for r in releases]
+
+    db = SimpleNamespace(
+        get_stale_title_markers=get.get_stale_title_markers,
+        mark_titles_checked=save.mark_titles_checked,
+        ingest_titles=ingest_titles,
+    )
+    return db, get, ingested
+
+
+class FakeAdapter:
+    def __init__(self, releases):
+        self.releases = releases
+        self.list_calls, self.full_calls = [], []
+
+    def get_releases_list(self, ids):
+        self.list_calls.append(list(ids))
+        return {"list": [self.releases[i] for i in ids if i in self.releases]}
+
+    def get_releases_full(self, ids, max_workers=4):
+        self.full_calls.append(list(ids))
+        return [{**self.releases[i], "full": True} for i in ids]
+
+
+def test_stale_markers_are_oldest_first_and_respect_cutoff(tmp_path):
+    db, _, _ = _db(tmp_path)
+    refresher = BulkTitleRefresher(db, FakeAdapter({}))
+
+    assert list(refresher.stale_markers(timedelta(days=1))) == ["101", "102"]
+    assert list(refresher.stale_markers()) == ["101", "102", "103"]
+    assert list(refresher.stale_markers(limit=1)) == ["101"]
+
+
+def test_only_changed_titles_are_fetched_in_full_and_saved(tmp_path):
+    db, get, ingested = _db(tmp_path)
+    adapter = FakeAdapter({
+        101: {"external_id": 101, "updated": 100, "last_change": 100},  # без изменений
+        102: {"external_id": 102, "updated": 250, "last_change": 250},  # изменился
+        # 103 не вернулся из API
+    })
+    refresher = BulkTitleRefresher(db, adapter, batch_size=2)
+
+    report = refresher.run()
+
+    assert adapter.list_calls == [[101, 102], [103]]
+    assert adapter.full_calls == [[102]]
+    assert [r["external_id"] for r in ingested] == [102] and ingested[0]["full"]
+    assert (report.checked, report.changed, report.unchanged, report.missing) == (3, 1, 1, 1)
+    assert report.title_ids == [2]
+    # 101 отмечен проверенным одним UPDATE; last_updated изменившегося 102 ставит настоящий ingest
+    assert list(get.get_stale_title_markers("aniliberty", NOW - timedelta(hours=1))) == ["102"]
+
+
+def test_release_changed_rules():
+    marker = (1, 100, 100, True)
+    assert release_changed({"updated": 100, "last_change": 100}, None)
+    assert release_changed({"updated": 100}, (1, 100, 100, False))
+    assert release_changed({}, marker)
+    assert not release_changed({"updated": 100, "last_change": 100}, marker)
+    assert release_changed({"updated": 101}, marker)
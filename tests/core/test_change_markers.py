@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+
+from core.get import GetManager
+from core.tables import Base, Episode, Provider, Title, TitleProviderMap
+
+
+def test_change_markers_cover_known_titles_only(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'm.db'}")
+    Base.metadata.create_all(engine)
+    get = GetManager(engine)
+    stamp = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    with get.Session as session:
+        session.add_all([Provider(provider_id=1, code="aniliberty"), Provider(provider_id=2, code="animedia")])
+        # save_title кладёт datetime в INTEGER-колонки — читаем их как epoch seconds
+        session.add_all([Title(title_id=1, name_ru="a", updated=stamp.replace(tzinfo=None), last_change=100),
+                         Title(title_id=2, name_ru="b", updated=None, last_change=None)])
+        session.add_all([TitleProviderMap(title_id=1, provider_id=1, external_title_id="10"),
+                         TitleProviderMap(title_id=2, provider_id=1, external_title_id="20"),
+                         TitleProviderMap(title_id=2, provider_id=2, external_title_id="30")])
+        session.add(Episode(title_id=1, episode_number=1))
+        session.commit()
+
+    markers = get.get_title_change_markers("aniliberty", [10, "20", 30, 99, None])
+    assert markers == {"10": (1, int(stamp.timestamp()), 100, True), "20": (2, None, None, False)}
+    assert get.get_title_change_markers("aniliberty", []) == {}
+    assert get.get_title_change_markers("missing", [10]) == {}
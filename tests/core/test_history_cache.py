@@ -0,0 +1,71 @@
+from sqlalchemy import create_engine, event
+
+from core.get import GetManager
+from core.history_cache import HistoryCache
+from core.save import SaveManager
+from core.tables import Base, History, Title
+
+
+def _managers(tmp_path, max_titles=4096):
+    engine = create_engine(f"sqlite:///{tmp_path / 'h.db'}")
+    Base.metadata.create_all(engine)
+    cache = HistoryCache(max_titles)
+    save, get = SaveManager(engine, cache), GetManager(engine, cache)
+    with save.Session as session:
+        session.add_all([Title(title_id=1, name_ru="a"), Title(title_id=2, name_ru="b")])
+        session.add_all([
+            History(user_id=7, title_id=1, episode_id=10, is_watched=True),
+            History(user_id=7, title_id=1, episode_id=11, is_watched=False),
+            History(user_id=7, title_id=1, torrent_id=5, is_download=True),
+            History(user_id=7, title_id=2, need_to_see=True),
+        ])
+        session.commit()
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+    return save, get, queries
+
+
+def test_history_map_is_loaded_once_for_a_page(tmp_path):
+    _, get, queries = _managers(tmp_path)
+    states = get.get_history_map(7, [1, 2, 3])
+    assert len(queries) == 1
+
+    assert states[1].status(episode_id=10) == (True, False)
+    assert states[1].status(torrent_id=5) == (False, True)
+    assert states[1].all_episodes_watched is False
+    assert states[2].need_to_see and not states[3].rows
+
+    assert get.get_history_status(7, 1, episode_id=11) == (False, False)
+    assert get.get_all_episodes_watched_status(7, 3) is False
+    assert len(queries) == 1
+
+
+def test_saves_keep_cache_coherent_without_rereading(tmp_path):
+    save, get, queries = _managers(tmp_path)
+    get.get_history_map(7, [1, 2])
+
+    save.save_watch_status(7, 1, episode_id=11, is_watched=True)
+    save.save_watch_status(7, 1, torrent_id=5, is_download=False)
+    save.save_need_to_see(7, 1, need_to_see=True)
+    save.save_watch_all_episodes(7, 2, is_watched=True, episode_ids=[20])
+    queries.clear()
+
+    assert get.get_all_episodes_watched_status(7, 1) is True
+    assert get.get_history_status(7, 1, torrent_id=5) == (False, False)
+    states = get.get_history_map(7, [1, 2])
+    assert states[1].need_to_see and states[2].all_episodes_watched
+    assert queries == []
+
+
+def test_cache_is_bounded_and_reloads_evicted_titles(tmp_path):
+    save, get, queries = _managers(tmp_path, max_titles=2)
+    states = get.get_history_map(7, [1, 2, 3])  # страница больше лимита — всё равно полная
+    assert states[1].status(episode_id=10) == (True, False) and states[2].need_to_see
+    assert len(get.history_cache) == 2 and get.history_cache.get(7, 1) is None
+
+    # запись по вытесненному тайтлу не воскрешает неполное состояние
+    save.save_watch_status(7, 1, episode_id=11, is_watched=True)
+    assert get.history_cache.get(7, 1) is None
+    queries.clear()
+    assert get.get_all_episodes_watched_status(7, 1) is True
+    assert len(queries) == 1 and len(get.history_cache) == 2
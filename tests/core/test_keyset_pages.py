@@ -0,0 +1,61 @@
+from sqlalchemy import create_engine, event
+
+from core.get import GetManager
+from core.tables import Base, Title
+from core.title_summary import TitleSummaryManager
+from core.types import Seek
+
+
+def _get_manager(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'k.db'}")
+    Base.metadata.create_all(engine)
+    get = GetManager(engine)
+    with get.Session as session:
+        # дырявые id — keyset не должен зависеть от их непрерывности
+        session.add_all([Title(title_id=tid, name_ru=f"t{tid}", status_code=1 if tid % 2 else 2)
+                         for tid in range(3, 60, 2)] + [Title(title_id=100, name_ru="t100", status_code=2)])
+        session.commit()
+    TitleSummaryManager(engine).rebuild()  # тайтлы вставлены в обход SaveManager
+    return engine, get
+
+
+def _ids(titles):
+    return [t.title_id for t in titles]
+
+
+def test_keyset_pages_match_offset_pages(tmp_path):
+    _, get = _get_manager(tmp_path)
+    first = _ids(get.get_titles_list_from_db(batch_size=12))
+    second = _ids(get.get_titles_list_from_db(batch_size=12, offset=12))
+    assert first == sorted(first) and len(first) == 12
+
+    assert _ids(get.get_titles_list_from_db(batch_size=12, offset=12, seek=Seek(after_id=first[-1]))) == second
+    assert _ids(get.get_titles_list_from_db(batch_size=12, offset=0, seek=Seek(before_id=second[0]))) == first
+
+    last = _ids(get.get_titles_from_db(show_all=True, batch_size=12, seek=Seek(after_id=second[-1])))
+    assert last == _ids(get.get_titles_from_db(show_all=True, batch_size=12, offset=24))
+    assert last[-1] == 100
+
+
+def test_keyset_page_reads_ids_without_offset(tmp_path):
+    engine, get = _get_manager(tmp_path)
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.append((args[2], args[3])))
+    titles = get.get_ongoing_titles(batch_size=5, seek=Seek(after_id=21))
+    assert _ids(titles) == [23, 25, 27, 29, 31]
+    ids_sql, ids_params = queries[0]  # ongoing — одна таблица title_summary
+    # SQLite всегда рендерит "LIMIT ? OFFSET ?" — смотрим, что позицию задаёт курсор, а не OFFSET
+    assert "title_summary.title_id > ?" in ids_sql and "JOIN" not in ids_sql
+    assert ids_params[-2:] == (5, 0)
+
+
+def test_poster_grid_window_seeks_after_last_card(tmp_path):
+    engine, get = _get_manager(tmp_path)
+    first = get.get_title_cards_window(limit=10)
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.append((args[2], args[3])))
+    second = get.get_title_cards_window(offset=10, limit=10, seek=Seek(after_id=first[-1][0]))
+    assert second == get.get_title_cards_window(offset=10, limit=10)
+    assert second[0] == (23, "t23", None, None)
+    sql, params = queries[0]
+    assert "title_summary.title_id > ?" in sql and params[-2:] == (10, 0)
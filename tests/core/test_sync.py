@@ -0,0 +1,160 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+
+from core.get import GetManager
+from core.save import SaveManager
+from core.sync import LibrarySync, SYNC_POSTERS, SYNC_SCHEDULE
+from core.tables import Base, Poster, Title
+from core.types import PosterValidators
+from utils.downloads.poster_manager import PosterDownload
+
+
+NOW = datetime.now(timezone.utc)
+
+
+class FakeDB:
+    def __init__(self):
+        self.thread_ids = set()
+        self.schedule = {1: {10, 99}}  # 99 выпал из расписания
+        self.saved, self.posters, self.touched = [], [], []
+
+    def _touch(self):
+        self.thread_ids.add(threading.get_ident())
+
+    def get_title_change_markers(self, provider, ids):
+        self._touch()
+        return {"501": (10, 100, 100, True)}  # 501 не изменился, 502 новый
+
+    def ingest_titles(self, releases):
+        self._touch()
+        self.saved.extend(releases)
+        return [int(r["external_id"]) - 480 for r in releases]
+
+    def save_schedule(self, day, title_id, last_updated=None):
+        self._touch()
+        self.schedule.setdefault(day, set()).add(title_id)
+
+    def get_titles_for_day(self, day):
+        return [SimpleNamespace(title_id=tid) for tid in self.schedule.get(day, ())]
+
+    def remove_schedule_day(self, title_ids, day):
+        self._touch()
+        self.schedule[day] -= set(title_ids)
+
+    def get_stale_poster_links(self, size_key, refresh_before, final_before, limit=None):
+        return [(10, "/storage/p.jpg?x=1"), (11, "https://cdn.example/q.webp"), (12, "/storage/same.jpg")]
+
+    def get_poster_validators(self, title_id, size_key="original"):
+        return PosterValidators(etag='"v1"', content_length=2048) if title_id == 12 else None
+
+    def save_poster(self, title_id, blob, hash_value, size_key="original", validators=None):
+        self._touch()
+        self.posters.append((title_id, blob, size_key))
+
+    def touch_poster(self, title_id, size_key="original", validators=None):
+        self._touch()
+        self.touched.append((title_id, size_key, validators.etag))
+
+
+class FakeAdapter:
+    def get_schedule(self, day, *, enrich=True):
+        if day != 1:
+            return [{"day": day, "list": []}]
+        return [{"day": 1, "list": [{"external_id": 501, "updated": 100, "last_change": 100},
+                                    {"external_id": 502, "updated": 5}]}]
+
+    def get_release_full(self, release_id, **kwargs):
+        return {"external_id": release_id, "full": True}
+
+
+class FakePosters:
+    def __init__(self):
+        self.urls = []
+
+    def download_poster(self, title_id, url, validators=None):
+        self.urls.append(url)
+        if "webp" in url:
+            return None
+        if validators:
+            return PosterDownload(None, None, validators, not_modified=True)
+        return PosterDownload(b"img", "md5", PosterValidators(etag='"v2"', content_length=3))
+
+
+def test_jobs_run_through_pool_and_write_on_calling_thread():
+    db, posters = FakeDB(), FakePosters()
+    services = SimpleNamespace(db_manager=db, api_adapter=FakeAdapter(), poster_manager=posters,
+                               base_al_url="aniliberty.example")
+    report = LibrarySync(services, workers=3).run([SYNC_SCHEDULE, SYNC_POSTERS])
+
+    assert report.errors == []
+    assert [r["external_id"] for r in db.saved] == [502] and db.saved[0]["full"]
+    assert db.schedule[1] == {10, 22}
+    assert (report.schedule_days, report.schedule_titles, report.schedule_removed) == (7, 2, 1)
+    assert sorted(posters.urls) == ["https://aniliberty.example/storage/p.jpg",
+                                    "https://aniliberty.example/storage/same.jpg", "https://cdn.example/q.webp"]
+    assert db.posters == [(10, b"img", "original")]
+    assert db.touched == [(12, "original", '"v1"')]
+    assert (report.posters_saved, report.posters_not_modified, report.posters_failed) == (1, 1, 1)
+    assert report.poster_bytes_saved == 2048
+    assert db.thread_ids == {threading.get_ident()}
+
+
+def test_stale_poster_links_follow_app_age_rules(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'p.db'}")
+    Base.metadata.create_all(engine)
+    with SaveManager(engine).Session as session:
+        for tid in range(1, 6):
+            session.add(Title(title_id=tid, name_ru=f"t{tid}", poster_path_original=f"/p/{tid}.jpg"))
+        session.add(Title(title_id=6, name_ru="no link"))
+        session.add(Poster(title_id=2, poster_blob=b"x", last_updated=NOW - timedelta(days=1)))    # свежий
+        session.add(Poster(title_id=3, poster_blob=b"x", last_updated=NOW - timedelta(days=30)))   # устарел
+        session.add(Poster(title_id=4, poster_blob=b"x", last_updated=NOW - timedelta(days=120)))  # финальный
+        session.add(Poster(title_id=5, poster_blob=None))
+        session.commit()
+
+    links = GetManager(engine).get_stale_poster_links("original", NOW - timedelta(days=7), NOW - timedelta(days=90))
+
+    assert links == [(1, "/p/1.jpg"), (3, "/p/3.jpg"), (5, "/p/5.jpg")]
+
+
+def test_poster_validators_round_trip_and_touch(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'p.db'}")
+    Base.metadata.create_all(engine)
+    saver, getter = SaveManager(engine), GetManager(engine)
+    with saver.Session as session:
+        session.add(Title(title_id=1, name_ru="t1"))
+        session.commit()
+    assert getter.get_poster_validators(1) is None
+
+    saver.save_poster(1, b"not an image", "h1", validators=PosterValidators('"e1"', "Mon, 01 Jan 2024", 12))
+    assert getter.get_poster_validators(1) == PosterValidators('"e1"', "Mon, 01 Jan 2024", 12)
+    assert getter.get_poster_validators(1, "medium") is None  # medium_blob нет — условный запрос не нужен
+
+    with saver.Session as session:
+        session.query(Poster).update({Poster.last_updated: NOW - timedelta(days=30)})
+        session.commit()
+    # 304 без Last-Modified: дата сдвигается, blob и прежние валидаторы остаются
+    assert saver.touch_poster(1, validators=PosterValidators('"e2"')) is True
+    assert getter.get_poster_validators(1) == PosterValidators('"e2"', "Mon, 01 Jan 2024", 12)
+    assert getter.get_poster_blob(1) == (b"not an image", False)
+    age = datetime.now(timezone.utc) - getter.get_poster_last_updated(1).replace(tzinfo=timezone.utc)
+    assert age < timedelta(minutes=1)
+    assert saver.touch_poster(99) is False
+
+    # новый 200 без ETag/Last-Modified: валидаторы прежней картинки не должны дать 304 на новую
+    saver.save_poster(1, b"another image", "h2", validators=PosterValidators(content_length=13))
+    assert getter.get_poster_validators(1) is None
+    saver.save_poster(1, b"third image", "h3", validators=PosterValidators('"e3"'))
+    saver.save_poster(1, b"fourth image", "h4")  # без validators — тоже очищаются
+    assert getter.get_poster_validators(1) is None
+
+
+def test_core_sync_does_not_import_qt():
+    code = "import sys, core.sync; sys.exit(any(m.startswith('PyQt5') for m in sys.modules))"
+    assert subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parents[2]).returncode == 0
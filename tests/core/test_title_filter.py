@@ -0,0 +1,79 @@
+from sqlalchemy import create_engine, event
+
+from core.delete import DeleteManager
+from core.get import GetManager
+from core.save import SaveManager
+from core.tables import Base, Genre
+from core.title_summary import TitleSummaryManager
+from core.types import Seek, TitleFilter
+
+
+def _library(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'f.db'}")
+    Base.metadata.create_all(engine)
+    save, get = SaveManager(engine), GetManager(engine)
+    ids = []
+    for n in range(12):
+        tid = save.save_title("aniliberty", 700 + n, {
+            "name_ru": f"Тайтл {n}", "season_year": 2023 + n % 2,
+            "status_code": 1 if n % 3 else 2, "status_string": "В работе" if n % 3 else "Завершён",
+        })
+        save.save_genre(tid, ["Драма"] + (["Фэнтези"] if n % 2 else []))
+        ids.append(tid)
+    save.save_team_members(ids[1], {"voice": "['Голос']"})
+    with get.Session as session:
+        genres = dict(session.query(Genre.name, Genre.genre_id))
+    return engine, save, get, ids, genres
+
+
+def _ids(titles):
+    return [t.title_id for t in titles]
+
+
+def test_filters_combine_in_one_query(tmp_path):
+    engine, save, get, ids, genres = _library(tmp_path)
+    flt = TitleFilter(genre_ids=(genres["Драма"], genres["Фэнтези"]), years=(2024,), status_codes=(1,))
+    expected = [tid for n, tid in enumerate(ids) if n % 2 and n % 3]
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+    assert _ids(get.get_filtered_titles(flt)) == expected
+    assert len(queries) == 1 and "title_summary.title_id > ?" not in queries[0]
+    assert get.get_filtered_count(flt) == len(expected)
+
+    first = _ids(get.get_filtered_titles(flt, batch_size=2))
+    rest = _ids(get.get_filtered_titles(flt, batch_size=2, offset=2, seek=Seek(after_id=first[-1])))
+    assert first + rest == expected
+    assert "title_summary.title_id > ?" in queries[-1]
+
+    assert _ids(get.get_filtered_titles(TitleFilter(team_member="Голос"))) == [ids[1]]
+    assert _ids(get.get_filtered_titles(TitleFilter(provider_code="aniliberty", years=(2023,)))) == ids[0::2]
+
+    save.save_watch_status(7, ids[1], is_watched=True)
+    assert ids[1] not in _ids(get.get_filtered_titles(flt.with_value("not_watched"), user_id=7))
+
+
+def test_facet_counts_follow_saves(tmp_path):
+    engine, save, get, ids, genres = _library(tmp_path)
+    counts = get.get_facet_counts()
+    assert dict((v, c) for v, _, c in counts["year"]) == {2023: 6, 2024: 6}
+    assert dict((label, c) for _, label, c in counts["genre"]) == {"Драма": 12, "Фэнтези": 6}
+
+    save.save_title("aniliberty", 700, {"season_year": 2025, "status_code": 2, "status_string": "Завершён"})
+    DeleteManager(engine).delete_titles([ids[1]])
+    counts = get.get_facet_counts()
+    assert dict((v, c) for v, _, c in counts["year"]) == {2023: 5, 2024: 5, 2025: 1}
+    assert dict((label, c) for _, label, c in counts["genre"]) == {"Драма": 11, "Фэнтези": 5}
+    assert TitleSummaryManager(engine).check().ok
+
+    # с фильтром: год считается без своего фасета, жанр — по всему фильтру
+    counts = get.get_facet_counts(TitleFilter(years=(2024,), genre_ids=(genres["Фэнтези"],)))
+    assert dict((v, c) for v, _, c in counts["year"]) == {2024: 5}
+    assert dict((label, c) for _, label, c in counts["genre"]) == {"Драма": 5, "Фэнтези": 5}
+
+
+def test_filter_state_round_trip():
+    flt = TitleFilter().with_value("genre", "3").with_value("genre", 1).toggle("year", 2024).with_value("provider", "x")
+    assert flt.genre_ids == (1, 3) and flt.years == (2024,)
+    assert TitleFilter.from_state(flt.to_state()) == flt
+    assert not flt.toggle("year", 2024).years and not flt.without("genre").genre_ids
+    assert not TitleFilter() and TitleFilter.from_state({"years": ["x"]}) is None
@@ -0,0 +1,75 @@
+import json
+
+from sqlalchemy import create_engine, update
+
+from core.delete import DeleteManager
+from core.get import GetManager
+from core.save import SaveManager
+from core.tables import Base, DaysOfWeek, Title, TitleSummary
+from core.title_summary import TitleSummaryManager
+
+
+def _managers(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 's.db'}")
+    Base.metadata.create_all(engine)
+    save, get = SaveManager(engine), GetManager(engine)
+    with save.Session as session:
+        session.add_all([DaysOfWeek(day_of_week=3, day_name="Wednesday"),
+                         DaysOfWeek(day_of_week=5, day_name="Friday")])
+        session.commit()
+    tid = save.save_title("AniLiberty", 501, {"name_ru": "Тайтл", "name_en": "Title", "status_code": 1,
+                                              "status_string": "В работе", "season_year": 2024,
+                                              "poster_path_original": "/p/501.jpg"})
+    return engine, save, get, tid
+
+
+def _row(get, tid):
+    with get.Session as session:
+        return session.get(TitleSummary, tid)
+
+
+def test_saves_keep_summary_row_current(tmp_path):
+    engine, save, get, tid = _managers(tmp_path)
+    assert _row(get, tid).provider_code == "aniliberty"
+
+    save.save_genre(tid, ["Драма", "Фэнтези"])
+    save.save_schedule(5, tid)
+    save.save_schedule(3, tid)
+    save.save_ratings(tid, score_external=8.3, name_external="IMDb")
+    save.save_title("aniliberty", 501, {"status_code": 2, "status_string": "Завершён"})
+
+    row = _row(get, tid)
+    assert json.loads(row.genres) == ["Драма", "Фэнтези"]
+    assert (row.day_of_week, row.day_name) == (3, "Wednesday")
+    assert (row.rating_name, row.rating_value) == ("CMERS", 5)
+    assert (row.status_code, row.season_year, row.poster_path) == (2, 2024, "/p/501.jpg")
+    assert TitleSummaryManager(engine).check().ok
+
+    save.remove_schedule_day([tid], 3)
+    assert _row(get, tid).day_of_week == 5
+
+    # Список и контекст карточек читаются из проекции и совпадают с исходными таблицами
+    assert [t.title_id for t in get.get_ongoing_titles(batch_size=12)] == []
+    assert [t.name_en for t in get.get_titles_list_from_db(batch_size=12)] == ["Title"]
+    with get.Session as session:
+        assert get.get_title_cards_context([tid]) == GetManager._joined_cards_context(session, [tid])
+
+
+def test_check_finds_and_fixes_drift(tmp_path):
+    engine, save, get, tid = _managers(tmp_path)
+    other = save.save_title("aniliberty", 502, {"name_ru": "Другой", "season_year": 2023})
+    with engine.begin() as conn:  # записи в обход SaveManager
+        conn.execute(update(Title).where(Title.title_id == tid).values(season_year=1999))
+        conn.execute(TitleSummary.__table__.delete().where(TitleSummary.title_id == other))
+        conn.execute(TitleSummary.__table__.insert().values(title_id=999, name_ru="ghost"))
+
+    manager = TitleSummaryManager(engine)
+    report = manager.check()
+    assert (report.missing, report.stale, report.orphaned) == ([other], [tid], [999])
+
+    assert manager.check(fix=True).fixed == 3
+    assert manager.check().ok and _row(get, tid).season_year == 1999
+
+    DeleteManager(engine).delete_titles([tid])
+    assert _row(get, tid) is None
+    assert manager.ensure() is False
@@ -0,0 +1,72 @@
+import base64
+
+from sqlalchemy import create_engine, event, text, update
+
+from core.get import GetManager
+from core.save import SaveManager
+from core.tables import Base, Torrent, TorrentFile
+
+
+def _managers(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tf.db'}")
+    Base.metadata.create_all(engine)
+    return engine, SaveManager(engine), GetManager(engine)
+
+
+def test_migration_moves_inline_base64_to_torrent_files(tmp_path):
+    engine, save, _ = _managers(tmp_path)
+    with save.Session as session:
+        session.add_all([Torrent(torrent_id=1, title_id=5, hash="a"), Torrent(torrent_id=2, title_id=5, hash="b")])
+        session.commit()
+    with engine.begin() as conn:  # строки из старой схемы: payload прямо в torrents
+        conn.execute(update(Torrent).where(Torrent.torrent_id == 1).values(
+            raw_base64_file=base64.b64encode(b"d8:announce").decode(), torrent_metadata='{"x": 1}'))
+        conn.execute(update(Torrent).where(Torrent.torrent_id == 2).values(torrent_metadata='{"y": 2}'))
+
+    assert save.migrate_torrent_payloads(batch_size=1) == 2
+    assert save.migrate_torrent_payloads() == 0
+
+    with save.Session as session:
+        files = {f.torrent_id: f for f in session.query(TorrentFile)}
+        assert (files[1].file_blob, files[1].file_size, files[1].title_id) == (b"d8:announce", 11, 5)
+        assert files[2].file_blob is None and files[2].torrent_metadata == '{"y": 2}'
+        assert session.query(Torrent).filter(Torrent.raw_base64_file.isnot(None)).count() == 0
+
+
+def test_migration_is_skipped_once_recorded(tmp_path):
+    engine, save, _ = _managers(tmp_path)
+    assert save.migrate_torrent_payloads() == 0
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA user_version")).scalar() == 1
+
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+    assert SaveManager(engine).migrate_torrent_payloads() == 0
+    assert not any("FROM torrents" in q for q in queries)
+
+
+def test_failed_migration_is_not_recorded(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")  # без таблиц: скан падает
+    assert SaveManager(engine).migrate_torrent_payloads() == 0
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA user_version")).scalar() == 0
+
+
+def test_torrent_file_streams_in_chunks(tmp_path):
+    _, save, get = _managers(tmp_path)
+    with save.Session as session:
+        session.add(Torrent(torrent_id=3, title_id=5, hash="c"))
+        session.commit()
+    blob = bytes(range(256)) * 5
+    assert save.save_torrent_file_blob(3, blob)
+    assert not save.save_torrent_file_blob(404, blob)
+
+    assert [len(c) for c in get.iter_torrent_file(3, chunk_size=500)] == [500, 500, 280]
+    assert b"".join(get.iter_torrent_file(3, chunk_size=500)) == blob
+    assert list(get.iter_torrent_file(404)) == []
+
+    # брошенный на середине поток не держит общую сессию в транзакции
+    stream = get.iter_torrent_file(3, chunk_size=100)
+    next(stream)
+    assert not get.Session.in_transaction()
+    stream.close()
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+
+from core.save import SaveManager
+from core.tables import Base, Torrent, TorrentFile
+from core.torrent_prune import TorrentPruneRow, codec_family, select_torrents_to_prune
+
+
+def _row(tid, rng, res="1080p", enc="h264", size=100, quality="webrip 1080p", ts=None):
+    first, last = rng
+    return TorrentPruneRow(
+        torrent_id=tid, quality=quality, encoder=enc, resolution=res,
+        episodes_range=f"{first}-{last}", range_first=first, range_last=last,
+        total_size=size, uploaded_timestamp=ts,
+    )
+
+
+def test_codec_family():
+    assert codec_family(" HEVC ") == "h265"
+    assert codec_family("x264") == "h264"
+    assert codec_family("AV1") == "av1"
+    assert codec_family(None) == ""
+
+
+def test_wider_range_covers_narrower_only_in_same_res_codec():
+    rows = [
+        _row(1, (1, 3)),
+        _row(2, (1, 4)),
+        _row(3, (1, 3), res="720p", quality="webrip 720p"),
+        _row(4, (2, 3), enc="hevc"),
+    ]
+    assert select_torrents_to_prune(rows, dedupe=False) == {1}
+
+
+def test_identical_ranges_keep_best_one():
+    rows = [
+        _row(1, (1, 12), size=100),
+        _row(2, (1, 12), size=200),
+        _row(3, (1, 12), size=200, ts=datetime(2024, 1, 2)),
+    ]
+    assert select_torrents_to_prune(rows, dedupe=False) == set()
+    assert select_torrents_to_prune(rows) == {1, 2}
+
+
+def test_dedupe_by_res_codec_across_quality_labels():
+    rows = [
+        _row(1, (1, 12), quality="webrip 1080p", enc="x265", size=300),
+        _row(2, (1, 12), quality="bdrip 1080p", enc="hevc", size=500),
+    ]
+    assert select_torrents_to_prune(rows) == {1}
+
+
+def _torrent(tid, rng, res="1080p", in_production=False, **extra):
+    return {"torrent_id": tid, "episodes_range": rng, "quality": f"webrip {res}", "resolution": res,
+            "encoder": "h264", "total_size": 100, "is_in_production": in_production, **extra}
+
+
+def test_save_torrents_prunes_superseded_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 't.db'}")
+    Base.metadata.create_all(engine)
+    save = SaveManager(engine)
+    payload = "ZGF0YQ=="  # base64 "data"
+    assert save.save_torrents(7, [_torrent(1, "1-3", in_production=True, raw_base64_file=payload),
+                                  _torrent(2, "1-3", res="720p", in_production=True)]) == 0
+    with save.Session as session:
+        assert session.get(TorrentFile, 1).file_blob == b"data"
+
+    # 1-4 в том же (1080p, h264) вытесняет 1-3; 720p и чужой тайтл не трогаются
+    save.save_torrents(8, [_torrent(9, "1-2")])
+    assert save.save_torrents(7, [_torrent(3, "1-4", in_production=True)]) == 1
+
+    with save.Session as session:
+        assert sorted(tid for (tid,) in session.query(Torrent.torrent_id)) == [2, 3, 9]
+        assert session.query(TorrentFile).filter_by(torrent_id=1).count() == 0
@@ -0,0 +1,108 @@
+import hashlib
+import sqlite3
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from core.tables import Base
+from midnight.db_maintenance import hash_posters, run_duplicates, run_maintenance
+
+
+T0 = datetime(2025, 1, 1)
+
+
+def make_db(path):
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    con = sqlite3.connect(path)
+    rows = [(1, 10, T0), (1, 10, T0 + timedelta(days=2)), (1, 10, T0 + timedelta(days=1)),
+            (1, 11, T0), (2, 10, T0), (2, 10, T0)]
+    con.executemany("INSERT INTO title_genre_relation (title_id, genre_id, last_updated) VALUES (?, ?, ?)", rows)
+    con.executemany("INSERT INTO posters (title_id, poster_blob, thumb_blob) VALUES (?, ?, ?)",
+                    [(tid, f"poster {tid}".encode(), b"thumb" if tid % 2 else None) for tid in range(1, 41)])
+    con.commit()
+    con.close()
+
+
+def test_dry_run_reports_without_deleting(tmp_path):
+    db = str(tmp_path / "a.db")
+    make_db(db)
+
+    report = run_maintenance(db, ["title_genre_relation", "history"], dry_run=True)
+
+    genre, history = report.tables
+    assert (genre.groups, genre.extra_rows, genre.deleted) == (2, 3, 0)
+    assert (history.groups, history.error) == (0, None)
+    assert sqlite3.connect(db).execute("SELECT COUNT(*) FROM title_genre_relation").fetchone() == (6,)
+    assert "dry run" in report.summary()
+
+
+def test_fix_keeps_latest_row_per_key_in_batches(tmp_path):
+    db = str(tmp_path / "a.db")
+    make_db(db)
+
+    [report] = run_duplicates(db, ["title_genre_relation"], keep_latest=True, batch=1)
+
+    assert report.deleted == 3
+    rows = sqlite3.connect(db).execute(
+        "SELECT id, title_id, genre_id FROM title_genre_relation ORDER BY id").fetchall()
+    assert rows == [(2, 1, 10), (4, 1, 11), (6, 2, 10)]
+
+
+def test_keep_oldest_keeps_earliest_date_not_first_insert(tmp_path):
+    db = str(tmp_path / "a.db")
+    make_db(db)
+    con = sqlite3.connect(db)
+    con.execute("UPDATE title_genre_relation SET last_updated = ? WHERE id = 1", (T0 + timedelta(days=5),))
+    con.commit()
+
+    run_duplicates(db, ["title_genre_relation"], keep_latest=False)
+
+    rows = con.execute("SELECT id, title_id, genre_id FROM title_genre_relation ORDER BY id").fetchall()
+    assert rows == [(3, 1, 10), (4, 1, 11), (5, 2, 10)]
+    con.close()
+
+
+def test_hash_posters_fills_all_size_hashes_in_process_pool(tmp_path):
+    db = str(tmp_path / "a.db")
+    make_db(db)
+
+    assert hash_posters(db, workers=2, range_rows=7, log=lambda *_: None) == 40
+
+    con = sqlite3.connect(db)
+    assert con.execute("SELECT COUNT(*) FROM posters WHERE hash_value IS NULL").fetchone() == (0,)
+    assert con.execute("SELECT hash_value, thumb_hash FROM posters WHERE title_id = 3").fetchone() == (
+        hashlib.md5(b"poster 3").hexdigest(), hashlib.md5(b"thumb").hexdigest())
+    assert con.execute("SELECT thumb_hash FROM posters WHERE title_id = 4").fetchone() == (None,)
+
+
+def test_hash_posters_on_legacy_schema_without_size_columns(tmp_path):
+    db = str(tmp_path / "legacy.db")
+    con = sqlite3.connect(db)
+    con.execute("CREATE TABLE posters (poster_id INTEGER PRIMARY KEY, title_id INTEGER, poster_blob BLOB, "
+                "hash_value TEXT, last_updated DATETIME)")
+    con.executemany("INSERT INTO posters (title_id, poster_blob) VALUES (?, ?)",
+                    [(tid, f"poster {tid}".encode()) for tid in range(1, 6)])
+    con.commit()
+    con.close()
+
+    assert hash_posters(db, workers=1, range_rows=2, log=lambda *_: None) == 5
+    assert sqlite3.connect(db).execute("SELECT hash_value FROM posters WHERE title_id = 5").fetchone() == (
+        hashlib.md5(b"poster 5").hexdigest(),)
+
+
+def test_torrent_duplicates_take_their_files_along(tmp_path):
+    db = str(tmp_path / "a.db")
+    make_db(db)
+    con = sqlite3.connect(db)
+    con.executemany("INSERT INTO torrents (torrent_id, title_id, hash, uploaded_timestamp) VALUES (?, ?, ?, ?)",
+                    [(1, 5, "h", 100), (2, 5, "h", 200), (3, 5, "other", 100)])
+    con.executemany("INSERT INTO torrent_files (torrent_id, title_id, file_blob, file_size) VALUES (?, ?, ?, ?)",
+                    [(1, 5, b"old", 3), (2, 5, b"new", 3), (3, 5, b"x", 1)])
+    con.commit()
+
+    [report] = run_duplicates(db, ["torrents"], keep_latest=True)
+
+    assert report.deleted == 1
+    assert con.execute("SELECT torrent_id FROM torrents ORDER BY torrent_id").fetchall() == [(2,), (3,)]
+    assert con.execute("SELECT torrent_id FROM torrent_files ORDER BY torrent_id").fetchall() == [(2,), (3,)]
+    con.close()
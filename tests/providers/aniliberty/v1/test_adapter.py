@@ -35,13 +35,13 @@ class FakeClient:
 
 
 class FakeMapper:
-    def __init__(self):
-        self.stream_video_host = None
-
     def adapt_structure(self, raw):
         return {"id": raw.get("id"), "player": {"list": []}, "torrents": {"list": []}}
 
-    def adapt_episode(self, ep):
+    def adapt_bundle(self, raw, **flags):
+        return self.adapt_structure(raw)
+
+    def adapt_episode(self, ep, ctx=None):
         return ep
 
     def adapt_torrent(self, t):
@@ -107,3 +107,75 @@ def test_adapter_propagates_error_dict():
     out = ad.get_app_status()
     assert out == {"error": "boom"}
 
+
+
+def test_schedule_without_enrich_maps_embedded_payload_only():
+    from datetime import datetime
+
+    class Client(FakeClient):
+        def __init__(self):
+            self.release_calls = 0
+
+        def get_schedule_week(self):
+            day = datetime.now().isoweekday() % 7 + 1  # не сегодня -> /schedule/week
+            self.day = day
+            return [{"release": {"id": 7, "publish_day": {"value": day}}},
+                    {"release": {"id": 8, "publish_day": {"value": day % 7 + 1}}}]
+
+        def get_release_by_id(self, rid):
+            self.release_calls += 1
+            return super().get_release_by_id(rid)
+
+    client = Client()
+    ad = APIAdapter(client, logging.getLogger("test"))
+    ad.mapper = FakeMapper()
+    client.get_schedule_week()
+    out = ad.get_schedule(client.day, enrich=False)
+
+    assert [r["id"] for r in out[0]["list"]] == [7]
+    assert client.release_calls == 0
+
+
+def test_releases_list_is_one_request_without_bundles():
+    class Client(FakeClient):
+        def __init__(self):
+            self.calls = []
+
+        def get_releases_list(self, **kwargs):
+            self.calls.append(kwargs)
+            return {"data": [{"id": 1}, {"id": 2}], "meta": {"pagination": {}}}
+
+        def get_release_by_id(self, rid):
+            raise AssertionError("bundle fetch is not expected")
+
+    client = Client()
+    ad = APIAdapter(client, logging.getLogger("test"))
+    ad.mapper = FakeMapper()
+    out = ad.get_releases_list(["1", 2])
+
+    assert [r["id"] for r in out["list"]] == [1, 2]
+    assert client.calls == [{"ids": [1, 2], "page": 1, "limit": 2}]
+
+
+def test_schedule_without_enrich_passes_errors_and_skips_malformed_entries():
+    from datetime import datetime
+
+    day = datetime.now().isoweekday() % 7 + 1
+
+    class Client(FakeClient):
+        week = {"error": "HTTP 502"}
+
+        def get_schedule_week(self):
+            return self.week
+
+        def get_release_by_id(self, rid):
+            raise AssertionError("enrich=False must not fetch releases")
+
+    client = Client()
+    ad = APIAdapter(client, logging.getLogger("test"))
+    ad.mapper = FakeMapper()
+    assert ad.get_schedule(day, enrich=False) == {"error": "HTTP 502"}
+
+    client.week = [{"release": {"id": 1}}, "junk", {"release": {"id": 2, "publish_day": {"value": "x"}}},
+                   {"id": 3, "publish_day": {"value": day}}]
+    assert [r["id"] for r in ad.get_schedule(day, enrich=False)[0]["list"]] == [3]
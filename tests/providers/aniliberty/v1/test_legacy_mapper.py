@@ -0,0 +1,48 @@
+import logging
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from providers.aniliberty.v1.legacy_mapper import LegacyMapper, MappingContext, adapt_bundles
+
+
+def release(rid, host):
+    return {
+        "id": rid,
+        "episodes": {"list": [
+            {"id": f"{rid}-{n}", "ordinal": n, "hls_1080": f"https://{host}/v/{rid}/{n}.m3u8?sig=1"}
+            for n in (1, 2, 3)
+        ]},
+        "torrents": [],
+    }
+
+
+def test_normalize_episode_url_keeps_host_in_context():
+    mapper = LegacyMapper(logger=logging.getLogger("test"))
+    ctx = MappingContext()
+
+    assert mapper.normalize_episode_url("https://cache.example/a/b.m3u8?x=1", ctx) == "/a/b.m3u8"
+    assert ctx.stream_video_host == "cache.example"
+    assert mapper.normalize_episode_url("/already/path?x=1", ctx) == "/already/path"
+    assert mapper.normalize_episode_url("relative/path?x=1") == "relative/path"
+    assert mapper.normalize_episode_url("https://host.only") == ""
+    assert mapper.normalize_episode_url("") == ""
+
+
+def test_parallel_bundles_do_not_share_stream_host():
+    raws = [release(i, f"cache-{i}.example") for i in range(40)]
+    serial = adapt_bundles(raws)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        parallel = adapt_bundles(raws, executor=pool)
+
+    assert parallel == serial
+    assert [r["player"]["host"] for r in parallel] == [f"cache-{i}.example" for i in range(40)]
+    assert parallel[5]["player"]["list"][1]["hls"]["fhd"] == "/v/5/2.m3u8"
+
+
+def test_single_episode_and_picklable_mapper():
+    mapper = pickle.loads(pickle.dumps(LegacyMapper(logger=logging.getLogger("test"))))
+    out = mapper.adapt_bundle(release(1, "h"), single_episode=2, fetch_team=False, fetch_franchises=False)
+
+    assert [e["episode"] for e in out["player"]["list"]] == [2]
+    assert out["player"]["host"] == "h"
@@ -0,0 +1,56 @@
+import json
+import threading
+import time
+
+from providers.animedia.v0.cache_manager import AniMediaCacheManager, AniMediaCacheStatus
+
+
+def test_item_roundtrip_and_invalidate(tmp_path):
+    cache = AniMediaCacheManager(tmp_path)
+    assert cache.load_vlink("42") is None
+
+    cache.save_vlink("42", {"https://a/1": "https://b/1"})
+    assert cache.load_vlink("42") == {"https://a/1": "https://b/1"}
+
+    cache.invalidate_item(cache.cfg.vlink_key, "42")
+    assert cache.load_item(cache.cfg.vlink_key, "42", ttl=60) == (AniMediaCacheStatus.MISSING, None)
+
+
+def test_ttl_expiry_and_purge(tmp_path):
+    cache = AniMediaCacheManager(tmp_path)
+    cache.save(cache.cfg.schedule_key, ["a", "b"])
+    assert cache.load(cache.cfg.schedule_key, ttl=60) == (AniMediaCacheStatus.VALID, ["a", "b"])
+
+    later = int(time.time()) + cache.cfg.schedule_ttl + 1
+    assert cache.purge_expired(now=later) == 1
+    assert cache.load(cache.cfg.schedule_key, ttl=60)[0] is AniMediaCacheStatus.MISSING
+
+
+def test_batch_put_and_concurrent_writers(tmp_path):
+    cache = AniMediaCacheManager(tmp_path)
+    cache.save_items("am_vlink_cache", {str(i): {"u": str(i)} for i in range(100)})
+
+    def writer(start):
+        for i in range(start, start + 50):
+            cache.save_vlink(str(i), {"u": str(i)})
+
+    threads = [threading.Thread(target=writer, args=(100 + n * 50,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(cache.load_vlink(str(i)) == {"u": str(i)} for i in range(300))
+
+
+def test_legacy_json_files_are_imported(tmp_path):
+    now = int(time.time())
+    (tmp_path / "am_vlink_cache.json").write_text(json.dumps(
+        {"items": {"7": {"last_updated": now, "data": {"x": "y"}}}}), encoding="utf-8")
+    (tmp_path / "am_all_titles_cache.json").write_text(json.dumps(
+        {"key": "am_all_titles_cache", "last_updated": now, "data": ["t1"]}), encoding="utf-8")
+
+    cache = AniMediaCacheManager(tmp_path)
+    assert cache.load_vlink("7") == {"x": "y"}
+    assert cache.load("am_all_titles_cache", ttl=60) == (AniMediaCacheStatus.VALID, ["t1"])
+    assert not list(tmp_path.glob("*.json"))
@@ -0,0 +1,98 @@
+import asyncio
+
+from providers.animedia.v0.catalog_store import AniMediaCatalogStore
+from providers.animedia.v0.crawler import CatalogCrawler
+
+PER_PAGE = 10
+
+
+def row(n, episode=1):
+    return f"Title {n}·8.{n % 10}·{episode} серия·{n}·https://amd.online/p/{n}.jpg·https://amd.online/{n}-title.html"
+
+
+class Catalog:
+    def __init__(self, count):
+        self.rows = [row(n) for n in range(count, 0, -1)]  # новые сверху
+        self.fetched = []
+
+    @property
+    def total_pages(self):
+        return (len(self.rows) + PER_PAGE - 1) // PER_PAGE
+
+    async def fetch(self, page):
+        self.fetched.append(page)
+        return self.rows[(page - 1) * PER_PAGE:page * PER_PAGE]
+
+    def crawl(self, crawler, need):
+        self.fetched = []
+        return asyncio.run(crawler.crawl("catalog", self.fetch, self.total_pages, need, wave_size=2))
+
+
+def test_refresh_touches_only_changed_head(tmp_path):
+    site = Catalog(300)
+    crawler = CatalogCrawler(AniMediaCatalogStore(tmp_path))
+
+    first = site.crawl(crawler, need=300)
+    assert first.pages_fetched == 30 and first.new_titles == 300
+
+    # два новых тайтла и новая серия у третьего: всё остальное сдвинулось на две позиции
+    site.rows = [row(302), row(301)] + site.rows
+    site.rows[5] = row(297, episode=2)
+    report = site.crawl(crawler, need=300)
+
+    assert site.fetched == [1, 2, 3, 4]
+    assert report.stopped_early and report.new_titles == 2 and report.updated_titles == 1
+    top = crawler.grouped("catalog", limit=3)
+    assert top == [{"page": 1, "titles": [row(302), row(301), row(300)]}]
+    assert crawler.store.count("catalog") == 302
+
+    # вытесненные с перечитанных страниц строки идут сразу за ними, порядок совпадает с сайтом
+    grouped = crawler.grouped("catalog")
+    assert [r for e in grouped for r in e["titles"]] == site.rows
+    assert [e["page"] for e in grouped] == list(range(1, 31))
+    assert report.displaced_titles == 2
+
+
+def test_full_crawl_prunes_titles_gone_from_site(tmp_path):
+    site = Catalog(300)
+    crawler = CatalogCrawler(AniMediaCatalogStore(tmp_path))
+    site.crawl(crawler, need=300)
+
+    del site.rows[150]
+    site.rows = site.rows[:-5]
+    report = site.crawl(crawler, need=1000)
+
+    assert not report.stopped_early and report.pruned_titles == 6
+    assert crawler.store.count("catalog") == 294
+    assert [r for e in crawler.grouped("catalog") for r in e["titles"]] == site.rows
+
+
+def test_first_crawl_stops_when_enough_titles(tmp_path):
+    site = Catalog(300)
+    crawler = CatalogCrawler(AniMediaCatalogStore(tmp_path))
+
+    report = site.crawl(crawler, need=35)
+    assert site.fetched == [1, 2, 3, 4] and report.stopped_early
+    assert sum(len(e["titles"]) for e in crawler.grouped("catalog", limit=35)) == 35
+    assert crawler.is_fresh("catalog", 1, ttl=60, need=35) and not crawler.is_fresh("catalog", 1, ttl=60, need=100)
+
+
+def test_growing_need_resumes_after_known_pages(tmp_path):
+    site = Catalog(300)
+    crawler = CatalogCrawler(AniMediaCatalogStore(tmp_path))
+
+    site.crawl(crawler, need=36)
+    assert site.fetched == [1, 2, 3, 4]
+    # первая страница не менялась — известные страницы не перечитываются
+    for need, pages in ((72, [5, 6, 7, 8]), (108, [9, 10, 11, 12]), (144, [13, 14, 15, 16])):
+        report = site.crawl(crawler, need=need)
+        assert site.fetched == [1] + pages
+        assert crawler.store.count("catalog") >= need and report.displaced_titles == 0
+    assert [r for e in crawler.grouped("catalog") for r in e["titles"]] == site.rows[:160]
+
+    # голова сдвинулась — обход снова идёт с начала
+    site.rows = [row(301)] + site.rows
+    site.crawl(crawler, need=170)
+    assert site.fetched[:3] == [1, 2, 3]
+    stored = [r for e in crawler.grouped("catalog") for r in e["titles"]]
+    assert stored == site.rows[:len(stored)] and len(stored) >= 170
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from providers.animedia.v0.cache_manager import AniMediaCacheManager
+from providers.animedia.v0.vlnk_resolver import AdaptiveRateLimiter, DeadVlnkError, VlnkResolver
+
+
+class StatusError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+class FakeSite:
+    def __init__(self, dead=(), throttle_first=0, delay=0.02):
+        self.calls = {}
+        self.dead = set(dead)
+        self.throttle_left = throttle_first
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    async def fetch(self, url):
+        with self._lock:
+            self.calls[url] = self.calls.get(url, 0) + 1
+        await asyncio.sleep(self.delay)
+        if url in self.dead:
+            raise StatusError(404) if url.endswith("404") else DeadVlnkError(url)
+        if self.throttle_left:
+            self.throttle_left -= 1
+            raise StatusError(429, {"Retry-After": "0.1"})
+        return url.replace("vlnk", "file")
+
+
+def urls(*names):
+    return [f"https://aser.pro/vlnk/{n}" for n in names]
+
+
+def test_concurrent_titles_share_inflight_requests():
+    site = FakeSite()
+    resolver = VlnkResolver(site.fetch)
+
+    async def run():
+        return await asyncio.gather(resolver.resolve(urls(1, 2, 3), "a"), resolver.resolve(urls(2, 3, 4), "b"))
+
+    first, second = asyncio.run(run())
+    assert first[urls(2)[0]] == "https://aser.pro/file/2" and len(second) == 3
+    assert all(n == 1 for n in site.calls.values()) and len(site.calls) == 4
+
+
+def test_dead_links_are_negatively_cached(tmp_path):
+    site = FakeSite(dead=set(urls("gone", "404")))
+    cache = AniMediaCacheManager(tmp_path)
+    links = urls(1, "gone", "404")
+
+    assert set(asyncio.run(VlnkResolver(site.fetch, cache).resolve(links, "t"))) == set(urls(1))
+
+    # новый резолвер (перезапуск приложения): мёртвые ссылки не запрашиваются и не ретраятся
+    resolver = VlnkResolver(site.fetch, cache)
+    calls_before = dict(site.calls)
+    assert asyncio.run(resolver.resolve(links[1:], "t")) == {}
+    assert resolver.last_report.negative_hits == 2
+    assert site.calls == calls_before
+    assert site.calls[urls("gone")[0]] == 1 and site.calls[urls("404")[0]] == 1
+
+
+def test_negative_cache_is_bounded():
+    site = FakeSite(dead=set(urls(*range(5))), delay=0)
+    resolver = VlnkResolver(site.fetch, negative_max=3, dead_ttl=60)
+    for url in urls(0, 1, 2):
+        resolver._mark_negative(url, 60, "dead")
+    assert resolver.is_negative(urls(0)[0])  # 0 становится самым свежим
+
+    resolver._mark_negative(urls(3)[0], 60, "dead")
+    assert list(resolver._negative) == urls(2, 0, 3)
+
+    # истёкшие записи уходят первыми, живые остаются
+    resolver._negative[urls(2)[0]] = time.time() - 1
+    resolver._mark_negative(urls(4)[0], 60, "dead")
+    assert list(resolver._negative) == urls(0, 3, 4)
+    assert not resolver.is_negative(urls(1)[0])
+    assert len(resolver._negative) == 3
+
+
+def test_throttling_slows_down_and_recovers():
+    site = FakeSite(throttle_first=1, delay=0)
+    limiter = AdaptiveRateLimiter(step=0.1)
+    resolver = VlnkResolver(site.fetch, limiter=limiter, retry_delay=0)
+
+    start = time.perf_counter()
+    assert asyncio.run(resolver.resolve(urls(1), "t")) == {urls(1)[0]: "https://aser.pro/file/1"}
+    assert time.perf_counter() - start >= 0.1  # ждали Retry-After
+    assert limiter.interval < limiter.throttle_floor  # успех уменьшил интервал после 429
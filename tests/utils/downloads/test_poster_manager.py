@@ -0,0 +1,71 @@
+import io
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from core.types import PosterValidators
+from utils.downloads.poster_manager import PosterManager
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _png() -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (20, 30), "red").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class FakeNet:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.calls = []
+
+    def get(self, url, headers=None, stream=False, **kwargs):
+        self.calls.append((url, dict(headers or {}), kwargs))
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return SimpleNamespace(status_code=304, headers={"ETag": '"v1"'}, close=lambda: None)
+        return SimpleNamespace(status_code=200, content=self.body, raise_for_status=lambda: None,
+                               headers={"Content-Type": "image/png", "ETag": '"v1"',
+                                        "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+
+def test_download_poster_is_conditional_and_counts_saved_bytes():
+    body = _png()
+    net = FakeNet(body)
+    manager = PosterManager(net_client=net)
+
+    first = manager.download_poster(1, "https://cdn.example/p.png", retry_delay=0)
+    assert not first.not_modified and first.content == body
+    assert first.validators == PosterValidators('"v1"', "Mon, 01 Jan 2024 00:00:00 GMT", len(body))
+    assert net.calls[0][1].get("If-None-Match") is None and net.calls[0][2] == {}  # без no_cache/timestamp
+
+    second = manager.download_poster(1, "https://cdn.example/p.png", retry_delay=0, validators=first.validators)
+    assert second.not_modified and second.content is None
+    assert net.calls[1][1]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert (manager.stats.requests, manager.stats.downloaded, manager.stats.not_modified) == (2, 1, 1)
+    assert manager.stats.bytes_saved == len(body)
+
+
+def test_background_download_touches_instead_of_saving_on_304():
+    saved, touched, lookup_threads = [], [], []
+
+    def validators(tid, sk):
+        lookup_threads.append(threading.get_ident())
+        return PosterValidators('"v1"', content_length=10) if tid == 2 else None
+
+    manager = PosterManager(
+        save_callback=lambda *args: saved.append(args),
+        touch_callback=lambda tid, sk, v: touched.append((tid, sk, v.etag)),
+        validators_callback=validators,
+        net_client=FakeNet(_png()),
+    )
+    manager.write_poster_links([(1, "https://cdn.example/1.png", "original"),
+                                (2, "https://cdn.example/2.png", "original")])
+    manager._download_thread.join()
+    manager.save_queue.join()
+
+    # валидаторы читаются из БД на вызывающем потоке, не на потоке загрузки
+    assert lookup_threads == [threading.get_ident()] * 2
+    assert [(a[0], a[3]) for a in saved] == [(1, "original")]
+    assert touched == [(2, "original", '"v1"')]
@@ -0,0 +1,68 @@
+from utils.runtime.log_tail import LogTail
+
+
+def _line(level, msg):
+    return f"2025-01-01 10:00:00 | {level} | 1 | 2 | app.func | {msg}\n"
+
+
+def test_reads_only_appended_lines(tmp_path):
+    log = tmp_path / "debug_log.txt"
+    log.write_text(_line("INFO", "one") + _line("DEBUG", "two"), encoding="utf-8")
+
+    tail = LogTail(str(log))
+    lines, reset = tail.read_new()
+    assert [l.level for l in lines] == ["INFO", "DEBUG"]
+    assert reset is False
+
+    assert tail.read_new() == ([], False)
+
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(_line("ERROR", "three"))
+        f.write("Traceback (most recent call last):\n")
+        f.write("partial")
+
+    lines, _ = tail.read_new()
+    assert [l.text.endswith("three") for l in lines] == [True, False]
+    assert lines[1].level == "ERROR"  # продолжение записи
+
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(" line\n")
+    lines, _ = tail.read_new()
+    assert [l.text for l in lines] == ["partial line"]
+
+
+def test_ring_is_bounded_and_initial_read_starts_at_tail(tmp_path):
+    log = tmp_path / "debug_log.txt"
+    log.write_text("".join(_line("INFO", f"msg {i}") for i in range(1000)), encoding="utf-8")
+
+    tail = LogTail(str(log), max_lines=10, initial_bytes=2048)
+    lines, _ = tail.read_new()
+    assert len(tail.snapshot()) == 10
+    assert tail.snapshot()[-1].text.endswith("msg 999")
+    assert all(l.level == "INFO" for l in lines)
+
+
+def test_truncation_resets_ring(tmp_path):
+    log = tmp_path / "debug_log.txt"
+    log.write_text(_line("INFO", "old") * 5, encoding="utf-8")
+    tail = LogTail(str(log))
+    tail.read_new()
+
+    log.write_text(_line("WARNING", "new"), encoding="utf-8")
+    lines, reset = tail.read_new()
+    assert reset is True
+    assert [l.level for l in tail.snapshot()] == ["WARNING"]
+
+
+def test_filtered_by_level_and_search(tmp_path):
+    log = tmp_path / "debug_log.txt"
+    log.write_text(
+        _line("DEBUG", "poster") + _line("WARNING", "Poster slow") + _line("ERROR", "db"),
+        encoding="utf-8",
+    )
+    tail = LogTail(str(log))
+    tail.read_new()
+
+    assert [l.level for l in tail.filtered(min_level="WARNING")] == ["WARNING", "ERROR"]
+    assert [l.level for l in tail.filtered(search="poster")] == ["DEBUG", "WARNING"]
+    assert [l.level for l in tail.filtered(min_level="WARNING", search="poster")] == ["WARNING"]
@@ -0,0 +1,26 @@
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+
+from utils.runtime.runtime_manager import LogWindow
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_steady_writes_do_not_postpone_tail_read(qapp, tmp_path):
+    log = tmp_path / "debug_log.txt"
+    log.write_text("", encoding="utf-8")
+    window = LogWindow(str(log))
+
+    window._on_file_changed(str(log))
+    time.sleep(0.3)
+    window._on_file_changed(str(log))  # запись чаще DEBOUNCE_MS не откладывает уже назначенное чтение
+    assert 0 <= window.debounce_timer.remainingTime() <= window.DEBOUNCE_MS - 250
+    window.close()
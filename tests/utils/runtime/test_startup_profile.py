@@ -0,0 +1,63 @@
+import logging
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from utils.runtime.startup_profile import StartupProfiler, lazy_subsystem
+
+
+def test_lazy_subsystem_is_built_once_across_threads():
+    calls = []
+    gate = threading.Event()
+
+    class Owner:
+        @lazy_subsystem
+        def client(self):
+            gate.wait(1)
+            calls.append(1)
+            return object()
+
+    owner = Owner()
+    assert not Owner.client.is_created(owner)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(owner.client)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert len({id(r) for r in results}) == 1 and Owner.client.is_created(owner)
+
+
+def test_profiler_reports_nested_stages_and_budget(caplog):
+    profiler = StartupProfiler(enabled=True, budget_ms=0)
+    with profiler.stage("outer"):
+        with profiler.stage("inner"):
+            pass
+    profiler.mark("first view")
+
+    with caplog.at_level(logging.INFO):
+        profiler.report(logging.getLogger("startup"), budget_mark="first view")
+        with profiler.stage("late"):
+            pass
+
+    text = caplog.text
+    assert text.index("outer") < text.index("    inner") < text.index("@ first view")
+    assert "Startup budget exceeded" in text and "Startup profile (late): late" in text
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = StartupProfiler(enabled=False)
+    with profiler.stage("x"):
+        pass
+    profiler.mark("y")
+    assert profiler.stages == [] and profiler.marks == []
+
+
+def test_app_module_does_not_import_network_stack():
+    code = ("import sys, app.qt.app; "
+            "sys.exit(any(m in sys.modules for m in ('requests', 'httpx', 'bs4', 'app.vlc.vlc_player', 'PIL.Image')))")
+    assert subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parents[3]).returncode == 0
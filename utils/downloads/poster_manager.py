@@ -4,22 +4,59 @@ import time
 import queue
 import logging
 import hashlib
-import requests
 import threading
 
-from PIL import Image, UnidentifiedImageError
+from dataclasses import dataclass
+from typing import Optional
+
+from core.types import PosterValidators
 
 
 MAX_RETRIES = 3
 RETRY_DELAY = 10  # seconds
 MAX_IMAGE_SIZE_KB = 5000
 
+
+@dataclass
+class PosterDownload:
+    """Результат download_poster: новый постер (content/hash) или not_modified после 304."""
+    content: Optional[bytes]
+    hash_value: Optional[str]
+    validators: PosterValidators
+    not_modified: bool = False
+
+
+@dataclass
+class PosterStats:
+    requests: int = 0
+    downloaded: int = 0
+    not_modified: int = 0
+    bytes_downloaded: int = 0
+    bytes_saved: int = 0  # размер постеров, которые не пришлось качать благодаря 304
+
+    def line(self) -> str:
+        return (f"posters: requests={self.requests} downloaded={self.downloaded} "
+                f"not_modified={self.not_modified} received={self.bytes_downloaded / 1024:.1f} Kb "
+                f"saved={self.bytes_saved / 1024:.1f} Kb")
+
+
 class PosterManager:
-    def __init__(self, save_callback=None, net_client=None):
+    def __init__(self, save_callback=None, net_client=None, validators_callback=None, touch_callback=None):
+        """
+        save_callback(title_id, content, hash_value, size_key, validators) — новый постер;
+        touch_callback(title_id, size_key, validators) — 304, обновить только дату;
+        validators_callback(title_id, size_key) -> PosterValidators | None — для условного запроса;
+        зовётся в write_poster_links, на потоке вызывающего (он ходит в общую сессию БД), не на потоке загрузки.
+        """
         self.logger = logging.getLogger(__name__)
         self.poster_links = []
+        self._validators = {}  # (title_id, size_key) -> PosterValidators, собраны в write_poster_links
         self.save_callback = save_callback
+        self.touch_callback = touch_callback
+        self.validators_callback = validators_callback
         self.net_client = net_client
+        self.stats = PosterStats()
+        self._stats_lock = threading.Lock()
         self.save_queue = queue.Queue()
         self._save_thread = None
         self._download_thread = None
@@ -35,12 +72,22 @@ class PosterManager:
         for title_id, link, size_key in links:
             key = (title_id, size_key)
             if key not in existing_keys:
+                self._validators[key] = self._lookup_validators(title_id, size_key)
                 self.poster_links.append((title_id, link, size_key))
                 existing_keys.add(key)
                 self.logger.debug(f"Added poster link for title_id={title_id}, size_key={size_key}: {link[-41:]}")
 
         self.start_background_download()
 
+    def _lookup_validators(self, title_id, size_key) -> Optional[PosterValidators]:
+        if not self.validators_callback:
+            return None
+        try:
+            return self.validators_callback(title_id, size_key)
+        except Exception as e:
+            self.logger.warning(f"Could not load poster validators for title_id {title_id}: {e}")
+            return None
+
     def start_background_download(self):
         """
         Start the poster downloading process in a background thread.
@@ -67,10 +114,16 @@ class PosterManager:
                     continue
 
                 empty_hits = 0
-                title_id, size_key, content, hash_value = item
+                title_id, size_key, downloaded = item
                 try:
+                    if downloaded.not_modified:
+                        if self.touch_callback:
+                            self.touch_callback(title_id, size_key, downloaded.validators)
+                            self.logger.debug(f"[*] Poster not modified for title_id: {title_id}")
+                        continue
                     if self.save_callback:
-                        self.save_callback(title_id, content, hash_value, size_key)
+                        self.save_callback(title_id, downloaded.content, downloaded.hash_value, size_key,
+                                           downloaded.validators)
                         self.logger.info(f"[*] Saved poster for title_id: {title_id}")
                     else:
                         self.logger.warning("[!] save_callback is not set; skipping save")
@@ -103,106 +156,150 @@ class PosterManager:
         items_queued = False
         while self.poster_links:
             title_id, link, size_key = self.poster_links.pop(0)
-            retries = 0
-            while retries < MAX_RETRIES:
-                try:
-                    headers = {
-                        'User-Agent': (
-                            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                            'AppleWebKit/537.36 (KHTML, like Gecko) '
-                            'Chrome/128.0.0.0 Safari/537.36'
-                        )
-                    }
-                    params = {'no_cache': 'true', 'timestamp': time.time()}
-                    start_time = time.time()
-                    self.logger.info(f"Запрос к URL: {link}")
-                    response = self.net_client.get(link, headers=headers, stream=True, params=params)
-                    self.logger.info(f"Статус ответа: {response.status_code}")
-                    response.raise_for_status()
-                    end_time = time.time()
-                    content_type = response.headers.get('Content-Type', '')
-                    self.logger.info(f"Content-Type: {content_type}")
-
-                    # ⛔ НЕ картинка — бессмысленно ретраиться
-                    if 'image' not in content_type.lower():
-                        self.logger.error(
-                            f"The URL did not return an image for title_id {title_id}: {link}"
-                        )
-                        # не ретраим, просто пропускаем этот постер
-                        break
+            validators = self._validators.pop((title_id, size_key), None)
+            downloaded = self.download_poster(title_id, link, validators=validators)
+            if downloaded is None:
+                continue
+            self.save_queue.put((title_id, size_key, downloaded))
+            items_queued = True
+            self.logger.debug(f"Queued poster save for title_id: {title_id}")
 
-                    content = response.content
-                    hash_value = hashlib.md5(content).hexdigest()
-
-                    link_io = io.BytesIO(content)
-                    img = Image.open(link_io)
-                    img.load()
-                    width, height = img.size
-                    img_format = img.format
-                    num_kilobytes = len(content) / 1024
-
-                    # ⛔ Некорректные размеры — тоже не надо долбить этот же URL
-                    if width < 10 or height < 10 or width > 10000 or height > 10000:
-                        self.logger.error(
-                            f"Invalid image dimensions: {width}x{height} for title_id {title_id}"
-                        )
-                        break  # без ретраев
-
-                    # ⛔ Неподдерживаемый формат
-                    if img_format not in ["JPEG", "PNG", "GIF", "WEBP"]:
-                        self.logger.error(
-                            f"Unsupported image format: {img_format} for title_id {title_id}"
-                        )
-                        break  # без ретраев
-
-                    # ⛔ Слишком большой файл
-                    if num_kilobytes > MAX_IMAGE_SIZE_KB:
-                        self.logger.error(
-                            f"Image too large ({num_kilobytes:.2f}KB > {MAX_IMAGE_SIZE_KB}KB) "
-                            f"for title_id {title_id}"
-                        )
-                        break  # без ретраев
-
-                    # ✅ Всё ок — сохраняем
-                    self.logger.info(f"Successfully downloaded poster for title_id {title_id}")
-                    self.logger.debug(
-                        f"Poster details - URL: '{link[-41:]}', Format: {img_format}"
-                    )
-                    self.logger.debug(
-                        f"Poster metrics - Dimensions: {width}x{height}, "
-                        f"Size: {num_kilobytes:.2f} KB"
-                    )
-                    self.logger.debug(
-                        f"Performance - Time: {end_time - start_time:.2f}s, "
-                        f"Hash: {hash_value}..."
+        if items_queued:
+            self.logger.info(f"[+] Starting save thread to process {self.save_queue.qsize()} posters")
+            self._ensure_save_thread_running()
+        self.logger.info(self.stats.line())
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self.stats, name, getattr(self.stats, name) + delta)
+
+    def download_poster(self, title_id, link, max_retries: int = MAX_RETRIES, retry_delay: float = RETRY_DELAY,
+                        validators: Optional[PosterValidators] = None):
+        """
+        Скачивает и проверяет один постер (с ретраями), ничего не сохраняя.
+        Потокобезопасен: headless-синхронизация (core.sync) зовёт его из пула.
+        validators — ETag/Last-Modified сохранённой копии: запрос становится условным,
+        и на 304 постер не качается и не декодируется.
+        Returns: PosterDownload или None.
+        """
+        from PIL import Image, UnidentifiedImageError  # PIL грузится при первом скачивании, не на старте
+
+        retries = 0
+        while retries < max_retries:
+            try:
+                headers = {
+                    'User-Agent': (
+                        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+                        'AppleWebKit/537.36 (KHTML, like Gecko) '
+                        'Chrome/128.0.0.0 Safari/537.36'
                     )
+                }
+                if validators:
+                    if validators.etag:
+                        headers['If-None-Match'] = validators.etag
+                    if validators.last_modified:
+                        headers['If-Modified-Since'] = validators.last_modified
+                start_time = time.time()
+                self.logger.info(f"Запрос к URL: {link}")
+                response = self.net_client.get(link, headers=headers, stream=True)
+                self._count(requests=1)
+                self.logger.info(f"Статус ответа: {response.status_code}")
+                if response.status_code == 304 and validators:
+                    response.close()
+                    saved = validators.content_length or 0
+                    self._count(not_modified=1, bytes_saved=saved)
+                    self.logger.info(f"Poster not modified for title_id {title_id} ({saved / 1024:.1f} KB saved)")
+                    return PosterDownload(None, None, PosterValidators(
+                        etag=response.headers.get('ETag') or validators.etag,
+                        last_modified=response.headers.get('Last-Modified') or validators.last_modified,
+                        content_length=validators.content_length,
+                    ), not_modified=True)
+                response.raise_for_status()
+                end_time = time.time()
+                content_type = response.headers.get('Content-Type', '')
+                self.logger.info(f"Content-Type: {content_type}")
 
-                    self.save_queue.put((title_id, size_key, content, hash_value))
-                    items_queued = True
-                    self.logger.debug(f"Queued poster save for title_id: {title_id}")
+                # ⛔ НЕ картинка — бессмысленно ретраиться
+                if 'image' not in content_type.lower():
+                    self.logger.error(
+                        f"The URL did not return an image for title_id {title_id}: {link}"
+                    )
+                    # не ретраим, просто пропускаем этот постер
                     break
 
-                except (UnidentifiedImageError, IOError, OSError) as img_err:
-                    # сюда имеет смысл дать несколько ретраев (битый поток и т.п.)
-                    retries += 1
+                content = response.content
+                self._count(bytes_downloaded=len(content))
+                hash_value = hashlib.md5(content).hexdigest()
+
+                link_io = io.BytesIO(content)
+                img = Image.open(link_io)
+                img.load()
+                width, height = img.size
+                img_format = img.format
+                num_kilobytes = len(content) / 1024
+
+                # ⛔ Некорректные размеры — тоже не надо долбить этот же URL
+                if width < 10 or height < 10 or width > 10000 or height > 10000:
                     self.logger.error(
-                        f"Failed to identify and process the image data from: {link}: {img_err}"
+                        f"Invalid image dimensions: {width}x{height} for title_id {title_id}"
                     )
-                except Exception as e:
-                    retries += 1
+                    break  # без ретраев
+
+                # ⛔ Неподдерживаемый формат
+                if img_format not in ["JPEG", "PNG", "GIF", "WEBP"]:
                     self.logger.error(
-                        f"An error occurred while downloading the poster from {link}: {str(e)}"
+                        f"Unsupported image format: {img_format} for title_id {title_id}"
                     )
+                    break  # без ретраев
 
-                if retries < MAX_RETRIES:
-                    self.logger.info(f"Retrying in {RETRY_DELAY} seconds...")
-                    time.sleep(RETRY_DELAY)
-                else:
+                # ⛔ Слишком большой файл
+                if num_kilobytes > MAX_IMAGE_SIZE_KB:
                     self.logger.error(
-                        "Maximum number of retries reached. Unable to download posters "
-                        f"for title_id {title_id}, URL: {link}"
+                        f"Image too large ({num_kilobytes:.2f}KB > {MAX_IMAGE_SIZE_KB}KB) "
+                        f"for title_id {title_id}"
                     )
+                    break  # без ретраев
 
-        if items_queued:
-            self.logger.info(f"[+] Starting save thread to process {self.save_queue.qsize()} posters")
-            self._ensure_save_thread_running()
+                # ✅ Всё ок — сохраняем
+                self.logger.info(f"Successfully downloaded poster for title_id {title_id}")
+                self.logger.debug(
+                    f"Poster details - URL: '{link[-41:]}', Format: {img_format}"
+                )
+                self.logger.debug(
+                    f"Poster metrics - Dimensions: {width}x{height}, "
+                    f"Size: {num_kilobytes:.2f} KB"
+                )
+                self.logger.debug(
+                    f"Performance - Time: {end_time - start_time:.2f}s, "
+                    f"Hash: {hash_value}..."
+                )
+
+                self._count(downloaded=1)
+                return PosterDownload(content, hash_value, PosterValidators(
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                    content_length=len(content),
+                ))
+
+            except (UnidentifiedImageError, IOError, OSError) as img_err:
+                # сюда имеет смысл дать несколько ретраев (битый поток и т.п.)
+                retries += 1
+                self.logger.error(
+                    f"Failed to identify and process the image data from: {link}: {img_err}"
+                )
+            except Exception as e:
+                retries += 1
+                self.logger.error(
+                    f"An error occurred while downloading the poster from {link}: {str(e)}"
+                )
+
+            if retries < max_retries:
+                self.logger.info(f"Retrying in {retry_delay} seconds...")
+                time.sleep(retry_delay)
+            else:
+                self.logger.error(
+                    "Maximum number of retries reached. Unable to download posters "
+                    f"for title_id {title_id}, URL: {link}"
+                )
+        return None
@@ -4,25 +4,63 @@ import subprocess
 import logging
 
 class TorrentManager:
-    def __init__(self, torrent_save_path="torrents/", torrent_client_path=None, base_url=None, net_client=None):
+    def __init__(self, torrent_save_path="torrents/", torrent_client_path=None, base_url=None, net_client=None,
+                 load_callback=None, save_callback=None):
+        """
+        :param load_callback: (torrent_id) -> iterable[bytes], поток сохранённого в БД .torrent
+        :param save_callback: (torrent_id, bytes) -> None, кэширует скачанный .torrent в БД
+        """
         self.logger = logging.getLogger(__name__)
         self.torrent_save_path = torrent_save_path
         self.torrent_client_path = torrent_client_path
         self.pre = "https://"
         self.base_url = base_url
         self.net_client = net_client
+        self.load_callback = load_callback
+        self.save_callback = save_callback
         os.makedirs(self.torrent_save_path, exist_ok=True)
 
-    def save_torrent_file(self, torrent_url, file_name):
+    def _write_from_store(self, torrent_id, file_path) -> bool:
+        """Пишет .torrent из БД на диск по частям. False, если в БД файла нет."""
+        if not self.load_callback or torrent_id is None:
+            return False
+        written = 0
+        tmp_path = f"{file_path}.part"
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in self.load_callback(torrent_id):
+                    f.write(chunk)
+                    written += len(chunk)
+            if not written:
+                os.remove(tmp_path)
+                return False
+            os.replace(tmp_path, file_path)
+            self.logger.info(f"Torrent restored from DB: {file_path} ({written} bytes)")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Failed to restore torrent_id={torrent_id} from DB, downloading: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def save_torrent_file(self, torrent_url, file_name, torrent_id=None):
         """
         Download and save the torrent file from the given URL.
         :type torrent_url: object
         :param torrent_url: URL of the torrent file.
         :param file_name: The name to save the torrent file as.
+        :param torrent_id: If set, the file is taken from the DB when stored there,
+            and a downloaded file is cached in the DB for the next time.
         ИСПРАВЛЕНИЕ: Поддержка новых URL API v1:
         /api/v1/anime/torrents/{hash}/file
         """
         try:
+            file_path = os.path.join(self.torrent_save_path, file_name)
+            if self._write_from_store(torrent_id, file_path):
+                if self.torrent_client_path:
+                    self.open_torrent_client(file_path)
+                return True
+
             # Строим полный URL
             if torrent_url.startswith(("http://", "https://")):
                 full_url = torrent_url
@@ -37,12 +75,17 @@ class TorrentManager:
             response.raise_for_status()
 
             # Сохраняем
-            file_path = os.path.join(self.torrent_save_path, file_name)
             with open(file_path, 'wb') as f:
                 f.write(response.content)
 
             self.logger.info(f"Torrent saved: {file_path}")
 
+            if self.save_callback and torrent_id is not None:
+                try:
+                    self.save_callback(torrent_id, response.content)
+                except Exception as e:
+                    self.logger.warning(f"Failed to cache torrent_id={torrent_id} in DB: {e}")
+
             # Открываем торрент-клиент
             if self.torrent_client_path:
                 self.open_torrent_client(file_path)
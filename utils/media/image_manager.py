@@ -4,10 +4,6 @@ import sys
 import hashlib
 
 from io import BytesIO
-from PIL import Image, ImageFilter
-
-from PyQt5.QtCore import QByteArray, QBuffer
-from PyQt5.QtGui import QPixmap
 
 MIN_ORIGINAL_W = 455
 
@@ -17,6 +13,8 @@ def sha256(blob: bytes) -> str:
 
 
 def make_small_poster(blob: bytes, target_w: int = 80) -> bytes:
+    from PIL import Image
+
     img = Image.open(BytesIO(blob))
     w, h = img.size
     new_h = int(h * target_w / w)
@@ -48,7 +46,9 @@ def normalize_poster_blob_if_needed(
     if size_key != "original" and not is_webp:
         return poster_blob, False
 
-    # Открываем через PIL (делаем это только когда реально нужно)
+    # Открываем через PIL (делаем это только когда реально нужно — и импорт тоже)
+    from PIL import Image, ImageFilter
+
     img = Image.open(BytesIO(poster_blob))
 
     w, h = img.size
@@ -92,6 +92,10 @@ def convert_image(blob: bytes) -> bytes | None:
     Convert any blob (e.g. WEBP) to PNG bytes using QPixmap.
     More compatible with Qt5 QTextBrowser.
     """
+    # Qt и PIL импортируются лениво: core.save тянет этот модуль на старте и в headless-режиме (core.sync)
+    from PyQt5.QtCore import QByteArray, QBuffer
+    from PyQt5.QtGui import QPixmap
+
     try:
         if not blob:
             return None
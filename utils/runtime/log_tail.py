@@ -0,0 +1,105 @@
+# log_tail.py
+import os
+import re
+import threading
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+# "%(asctime)s | %(levelname)s | ..." — см. config/logging.conf
+_LEVEL_RE = re.compile(r"^\S+ \S+ \| (DEBUG|INFO|WARNING|ERROR|CRITICAL) \|")
+
+
+@dataclass(frozen=True)
+class LogLine:
+    text: str
+    level: Optional[str]
+
+
+class LogTail:
+    """
+    Инкрементальное чтение лог-файла.
+    Запоминает offset и дочитывает только новые байты, храня ограниченное кольцо последних строк.
+    Ротация/усечение файла определяется по смене inode или уменьшению размера.
+    """
+
+    def __init__(self, log_file: str, max_lines: int = 5000, initial_bytes: int = 512 * 1024):
+        self.log_file = log_file
+        self.max_lines = max_lines
+        self.initial_bytes = initial_bytes
+        self.lines: deque[LogLine] = deque(maxlen=max_lines)
+        self._offset = 0
+        self._inode = None
+        self._partial = b""
+        self._last_level = None
+        self._lock = threading.Lock()
+
+    def read_new(self) -> tuple[list[LogLine], bool]:
+        """
+        Дочитывает добавленные байты.
+        :return: (новые строки в порядке записи, reset) — reset=True, если файл был ротирован и кольцо сброшено.
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.log_file)
+            except FileNotFoundError:
+                return [], False
+
+            reset = False
+            if self._inode is None or st.st_ino != self._inode or st.st_size < self._offset:
+                reset = self._inode is not None
+                self.lines.clear()
+                self._partial = b""
+                self._last_level = None
+                self._inode = st.st_ino
+                # Стартуем с хвоста файла, чтобы не читать мегабайты истории
+                self._offset = max(0, st.st_size - self.initial_bytes)
+                skip_first = self._offset > 0
+            else:
+                skip_first = False
+
+            if st.st_size == self._offset:
+                return [], reset
+
+            with open(self.log_file, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read(st.st_size - self._offset)
+            self._offset += len(chunk)
+
+            data = self._partial + chunk
+            parts = data.split(b"\n")
+            self._partial = parts.pop()
+            if skip_first and parts:
+                parts = parts[1:]  # первая строка после seek обрезана
+
+            new_lines = [self._make_line(raw.decode("utf-8", errors="replace").rstrip("\r")) for raw in parts]
+            self.lines.extend(new_lines)
+            return new_lines[-self.max_lines:], reset
+
+    def _make_line(self, text: str) -> LogLine:
+        m = _LEVEL_RE.match(text)
+        if m:
+            self._last_level = m.group(1)
+            return LogLine(text, self._last_level)
+        # продолжение многострочной записи (traceback) наследует уровень
+        return LogLine(text, self._last_level)
+
+    def snapshot(self) -> list[LogLine]:
+        with self._lock:
+            return list(self.lines)
+
+    @staticmethod
+    def matches(line: LogLine, min_level: Optional[str] = None, search: str = "") -> bool:
+        if min_level and min_level in LOG_LEVELS:
+            if line.level is None or LOG_LEVELS.index(line.level) < LOG_LEVELS.index(min_level):
+                return False
+        if search and search.lower() not in line.text.lower():
+            return False
+        return True
+
+    def filtered(self, min_level: Optional[str] = None, search: str = "") -> list[LogLine]:
+        """Строки кольца, прошедшие фильтр по уровню и подстроке (в порядке записи)."""
+        return [line for line in self.snapshot() if self.matches(line, min_level, search)]
@@ -4,8 +4,12 @@ import sys
 import os
 import subprocess
 
-from PyQt5.QtCore import QObject, pyqtSignal, Qt, QRunnable, QThreadPool, QTimer, QFileSystemWatcher
-from PyQt5.QtWidgets import QVBoxLayout, QTextEdit, QPushButton, QLabel, QWidget
+from PyQt5.QtCore import QObject, pyqtSignal, Qt, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, \
+    QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QListView, QPushButton, QLabel, QWidget, QComboBox, QLineEdit
+
+from utils.runtime.log_tail import LogTail, LOG_LEVELS
 
 
 def test_exception():
@@ -27,60 +31,144 @@ def restart_application():
 
 class LogWorkerSignals(QObject):
     """Сигналы для обновления UI из фонового потока."""
-    logLoaded = pyqtSignal(str)  # Сигнал для передачи текста логов в UI
+    linesLoaded = pyqtSignal(list, bool)  # Новые строки (LogLine) и флаг сброса после ротации
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
 
 class LogWorker(QRunnable):
-    """Фоновая задача для загрузки логов без зависания интерфейса."""
-    def __init__(self, log_file):
+    """Фоновая задача: дочитывает только новые байты лог-файла."""
+    def __init__(self, log_tail: LogTail):
         super().__init__()
-        self.log_file = log_file
+        self.log_tail = log_tail
         self.signals = LogWorkerSignals()  # Создаем сигналы
 
     def run(self):
-        """Читает лог-файл в фоне и отправляет результат в UI-поток через сигнал."""
+        """Читает добавленную часть лог-файла в фоне и отправляет строки в UI-поток через сигнал."""
         try:
-            with open(self.log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            reversed_logs = "".join(lines[::-1])  # Переворачиваем порядок строк
-            self.signals.logLoaded.emit(reversed_logs)  # Отправляем текст в UI
+            lines, reset = self.log_tail.read_new()
+            if lines or reset:
+                self.signals.linesLoaded.emit(lines, reset)
         except Exception as e:
-            self.signals.logLoaded.emit(f"Ошибка загрузки логов: {e}")
+            self.signals.error.emit(f"Ошибка загрузки логов: {e}")
+        finally:
+            self.signals.finished.emit()
+
+class LogListModel(QAbstractListModel):
+    """Модель для QListView: ограниченное кольцо строк, новые сверху. Рисуются только видимые строки."""
+    LEVEL_COLORS = {"WARNING": QColor("#c77c00"), "ERROR": QColor("#d0312d"), "CRITICAL": QColor("#d0312d")}
+
+    def __init__(self, max_lines, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self._rows = []  # newest first
+        self.min_level = None
+        self.search = ""
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        line = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return line.text
+        if role == Qt.ForegroundRole:
+            return self.LEVEL_COLORS.get(line.level)
+        return None
+
+    def prepend(self, lines):
+        """Добавляет новые строки (в порядке записи) в начало списка с учётом фильтра."""
+        accepted = [line for line in lines if LogTail.matches(line, self.min_level, self.search)]
+        if not accepted:
+            return
+        accepted.reverse()
+        accepted = accepted[:self.max_lines]
+        self.beginInsertRows(QModelIndex(), 0, len(accepted) - 1)
+        self._rows[0:0] = accepted
+        self.endInsertRows()
+        overflow = len(self._rows) - self.max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), self.max_lines, len(self._rows) - 1)
+            del self._rows[self.max_lines:]
+            self.endRemoveRows()
+
+    def reset_rows(self, lines):
+        """Полностью пересобирает строки (смена фильтра или ротация файла)."""
+        self.beginResetModel()
+        rows = [line for line in lines if LogTail.matches(line, self.min_level, self.search)]
+        rows.reverse()
+        self._rows = rows[:self.max_lines]
+        self.endResetModel()
 
 class LogWindow(QWidget):
     closed = pyqtSignal()
+    MAX_LINES = 5000
+    DEBOUNCE_MS = 500
 
     def __init__(self, log_file, theme="default"):
         super().__init__()
         self.log_file = log_file
         self.thread_pool = QThreadPool.globalInstance()  # Создаем пул потоков
+        self.log_tail = LogTail(log_file, max_lines=self.MAX_LINES)
+        self._loading = False
+        self._pending = False
         self.setWindowTitle("Anime Player App Logs.")
         self.setGeometry(100, 100, 800, 600)
 
         # Основной layout
         layout = QVBoxLayout()
 
-        # Текстовое поле для логов
-        self.log_view = QTextEdit(self)
-        self.log_view.setReadOnly(True)
-        self.log_view.setAlignment(Qt.AlignTop)  # Выравнивание текста сверху
+        # Фильтры: уровень и поиск по подстроке (только по кольцу последних строк)
+        filter_layout = QHBoxLayout()
+        self.level_combo = QComboBox(self)
+        self.level_combo.addItem("ALL")
+        self.level_combo.addItems(LOG_LEVELS)
+        self.level_combo.currentTextChanged.connect(self.apply_filter)
+        self.search_input = QLineEdit(self)
+        self.search_input.setPlaceholderText("Search...")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.apply_filter)
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start())
+        filter_layout.addWidget(self.level_combo)
+        filter_layout.addWidget(self.search_input)
+
+        # Виртуализированный список строк логов
+        self.log_model = LogListModel(self.MAX_LINES, self)
+        self.log_view = QListView(self)
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setEditTriggers(QListView.NoEditTriggers)
+        self.log_view.setSelectionMode(QListView.ExtendedSelection)
+        self.log_view.setWordWrap(False)
 
         # Кнопка обновления логов
         self.refresh_button = QPushButton("UPDATE")
         self.refresh_button.clicked.connect(self.load_logs)
 
         # Информационная метка
-        self.info_label = QLabel("⚡ Auto-updates every 60 seconds. 📜 Newest logs appear first.")
+        self.info_label = QLabel(
+            f"⚡ Live tail, last {self.MAX_LINES} lines. 📜 Newest logs appear first."
+        )
         self.info_label.setAlignment(Qt.AlignCenter)
 
-        # Таймер для автообновления логов (каждые 60 секунд)
+        # Таймер для автообновления логов (каждые 60 секунд) — страховка, если watcher пропустил событие
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.load_logs)
         self.timer.start(60000)
 
+        # События watcher'а приходят на каждую запись — склеиваем их в одно чтение за DEBOUNCE_MS
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(self.DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.load_logs)
+
         # Следим за изменением файла
         self.file_watcher = QFileSystemWatcher()
         self.file_watcher.addPath(self.log_file)
-        self.file_watcher.fileChanged.connect(self.load_logs)
+        self.file_watcher.fileChanged.connect(self._on_file_changed)
 
         # Применяем стили
         self.apply_theme(theme)
@@ -88,21 +176,53 @@ class LogWindow(QWidget):
         # Загружаем логи при старте (асинхронно)
         self.load_logs()
 
+        layout.addLayout(filter_layout)
         layout.addWidget(self.log_view)
         layout.addWidget(self.refresh_button)
         layout.addWidget(self.info_label)
         self.setLayout(layout)
 
+    def _on_file_changed(self, path):
+        # После ротации файл пересоздаётся и пропадает из watcher'а
+        if path not in self.file_watcher.files() and os.path.exists(path):
+            self.file_watcher.addPath(path)
+        # Не перезапускаем активный таймер: при непрерывной записи чтение всё равно идёт раз в DEBOUNCE_MS
+        if not self.debounce_timer.isActive():
+            self.debounce_timer.start()
+
     def load_logs(self):
-        """Запускает фоновую загрузку логов."""
-        worker = LogWorker(self.log_file)
-        worker.signals.logLoaded.connect(self.update_log_view)  # Подключаем сигнал к UI-методу
+        """Запускает фоновое дочитывание логов (не более одной задачи одновременно)."""
+        if self._loading:
+            self._pending = True
+            return
+        self._loading = True
+        worker = LogWorker(self.log_tail)
+        worker.signals.linesLoaded.connect(self.update_log_view)  # Подключаем сигнал к UI-методу
+        worker.signals.error.connect(self.info_label.setText)
+        worker.signals.finished.connect(self._on_worker_done)
         self.thread_pool.start(worker)
 
-    def update_log_view(self, log_text):
-        """Обновляет текстовое поле логов в UI-потоке."""
-        self.log_view.setPlainText(log_text)
-        self.log_view.verticalScrollBar().setValue(0)  # Прокрутка наверх
+    def _on_worker_done(self):
+        self._loading = False
+        if self._pending:
+            self._pending = False
+            self.load_logs()
+
+    def update_log_view(self, lines, reset):
+        """Добавляет новые строки в модель в UI-потоке."""
+        if reset:
+            self.log_model.reset_rows(self.log_tail.snapshot())
+        else:
+            self.log_model.prepend(lines)
+        if self.log_view.verticalScrollBar().value() <= 1:
+            self.log_view.scrollToTop()  # Прокрутка наверх, если пользователь не листает историю
+
+    def apply_filter(self, *_):
+        level = self.level_combo.currentText()
+        self.log_model.min_level = None if level == "ALL" else level
+        self.log_model.search = self.search_input.text().strip()
+        self.log_model.reset_rows(self.log_tail.snapshot())
+        self.log_view.scrollToTop()
 
     def apply_theme(self, theme):
         """Применяет стили к окну логов в зависимости от шаблона"""
@@ -111,7 +231,7 @@ class LogWindow(QWidget):
                 QWidget {
                     background-color: rgba(240, 240, 240, 1.0);
                 }
-                QTextEdit {
+                QListView {
                     background-color: white;
                     color: black;
                     font-family: Consolas, monospace;
@@ -132,7 +252,7 @@ class LogWindow(QWidget):
                 QWidget {
                     background-color: rgba(140, 140, 140, 1.0);
                 }
-                QTextEdit {
+                QListView {
                     background-color: black;
                     color: lime;
                     font-family: Consolas, monospace;
@@ -154,7 +274,7 @@ class LogWindow(QWidget):
                 QWidget {
                     background-color: rgba(220, 220, 220, 1.0);
                 }
-                QTextEdit {
+                QListView {
                     background-color: white;
                     color: black;
                     font-family: Consolas, monospace;
@@ -177,5 +297,9 @@ class LogWindow(QWidget):
 
     def closeEvent(self, event):
         """Перехватываем закрытие окна и испускаем сигнал."""
+        self.timer.stop()
+        self.debounce_timer.stop()
+        if self.file_watcher.files():
+            self.file_watcher.removePaths(self.file_watcher.files())
         self.closed.emit()  # Отправляем сигнал, что окно закрылось
         event.accept()  # Закрываем окно
\ No newline at end of file
@@ -0,0 +1,120 @@
+# startup_profile.py
+"""
+Профиль холодного старта: время импортов и конструкторов подсистем пишется в лог.
+
+Включается флагом `--profile-startup` у main.py или переменной окружения ANIME_PLAYER_PROFILE_STARTUP=1.
+Модуль без зависимостей (только stdlib) — его импортируют до тяжёлых модулей.
+
+    from utils.runtime.startup_profile import profiler
+
+    with profiler.stage("import app.qt.app"):
+        from app.qt.app import AnimePlayerAppVer3
+    ...
+    profiler.mark("first view")
+    profiler.report(logger)
+"""
+import os
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Optional
+
+
+ENV_FLAG = "ANIME_PLAYER_PROFILE_STARTUP"
+CLI_FLAG = "--profile-startup"
+STARTUP_BUDGET_MS = 1500  # от импорта профайлера (начало main.py) до показа сохранённого вида
+
+
+class StartupProfiler:
+    def __init__(self, enabled: bool = False, budget_ms: float = STARTUP_BUDGET_MS):
+        self.enabled = enabled
+        self.budget_ms = budget_ms
+        self.started = time.perf_counter()
+        self.stages: list[tuple[int, str, float, int]] = []  # (depth, name, ms, новых модулей)
+        self.marks: list[tuple[str, float]] = []
+        self._depth = 0
+        self._logger = None  # после report() поздние стадии (ленивые подсистемы) пишутся в лог сразу
+
+    @contextmanager
+    def stage(self, name: str):
+        """Замер блока (импорт, конструктор); вложенные стадии выводятся с отступом."""
+        if not self.enabled:
+            yield
+            return
+        index = len(self.stages)
+        self.stages.append((self._depth, name, 0.0, 0))
+        modules = len(sys.modules)
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            ms = (time.perf_counter() - start) * 1000
+            self.stages[index] = (self._depth, name, ms, len(sys.modules) - modules)
+            if self._logger is not None and not self._depth:
+                self._logger.info(f"Startup profile (late): {name} {ms:.1f} ms (+{len(sys.modules) - modules} modules)")
+
+    def mark(self, name: str) -> float:
+        """Веха от начала старта (мс): «window shown», «first view»."""
+        elapsed = self.elapsed_ms()
+        if self.enabled:
+            self.marks.append((name, elapsed))
+        return elapsed
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def report(self, logger, budget_mark: Optional[str] = None) -> None:
+        """Одна таблица в лог; budget_mark — веха, сравниваемая с бюджетом старта."""
+        if not self.enabled or self._logger is not None:
+            return
+        self._logger = logger
+        lines = ["Startup profile:"]
+        for depth, name, ms, modules in self.stages:
+            extra = f"  (+{modules} modules)" if modules else ""
+            lines.append(f"  {'  ' * depth}{name:<{44 - 2 * depth}} {ms:8.1f} ms{extra}")
+        for name, ms in self.marks:
+            lines.append(f"  @ {name:<42} {ms:8.1f} ms")
+        logger.info("\n".join(lines))
+
+        budget = dict(self.marks).get(budget_mark) if budget_mark else None
+        if budget is not None and budget > self.budget_ms:
+            logger.warning(f"Startup budget exceeded: '{budget_mark}' at {budget:.0f} ms > {self.budget_ms:.0f} ms")
+
+
+profiler = StartupProfiler(enabled=os.environ.get(ENV_FLAG) == "1" or CLI_FLAG in sys.argv)
+
+
+class lazy_subsystem:
+    """
+    Подсистема, которая создаётся при первом обращении к атрибуту (cached_property с блокировкой).
+    Блокировка нужна, т.к. первое обращение может прийти из рабочего потока QThreadPool.
+    Созданный объект кладётся в __dict__ экземпляра, дальше атрибут читается без дескриптора.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.name = factory.__name__
+        self.__doc__ = factory.__doc__
+        self._lock = threading.RLock()
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        values = instance.__dict__
+        if self.name in values:
+            return values[self.name]
+        with self._lock:
+            if self.name not in values:
+                with profiler.stage(f"lazy {owner.__name__ if owner else ''}.{self.name}"):
+                    values[self.name] = self.factory(instance)
+            return values[self.name]
+
+    def is_created(self, instance) -> bool:
+        return self.name in instance.__dict__